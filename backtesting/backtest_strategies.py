@@ -22,12 +22,34 @@ Usage:
     
     # Export results to CSV
     python backtest_strategies.py --start-date 2024-01-01 --output results.csv
+    
+    # Portfolio backtest: shared capital, position limit and a daily equity curve
+    python backtest_strategies.py --portfolio --max-positions 20 --output portfolio.csv
+    
+    # Parameter sweep (grid x strategies in a process pool, one combined table)
+    python backtest_strategies.py --sweep cooldown_days=0,20,60 position_size=0.01,0.02 --output sweep.csv
+    
+    # Also exit on the trading bot's intrabar stop-loss / take-profit levels
+    python backtest_strategies.py --stop-loss 0.10 --take-profit 0.15
+    
+    # 95% confidence intervals from 10,000 bootstrap resamples per strategy
+    python backtest_strategies.py --bootstrap 10000 --output results.csv
+    
+    # Reuse results of strategies whose signals have not changed since the last run
+    python backtest_strategies.py --result-cache
+    
+    # Parquet output: typed trade log (one row group per strategy) instead of CSV
+    python backtest_strategies.py --output results.parquet
 """
 
+import os
 import sys
+import time
 import logging
 import argparse
+import itertools
 from datetime import datetime, timedelta
+from multiprocessing import Pool
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -38,6 +60,13 @@ import numpy as np
 sys.path.append(str(Path(__file__).parent.parent))
 
 from db.postgres_database_manager import PostgresDatabaseManager
+from db.ohlcv_cache import OhlcvCache
+from backtesting.trade_simulator import ArrayTradeSimulator
+from backtesting.exit_engine import IntrabarExitEngine, PRICE_COLUMNS
+from backtesting.portfolio_simulator import PortfolioSimulator, equity_metrics
+from backtesting.monte_carlo import MonteCarloBootstrap
+from backtesting.result_cache import BacktestResultCache
+from backtesting.trade_log import is_trade_log, write_trade_log
 
 # Configure logging
 logging.basicConfig(
@@ -47,11 +76,109 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Parameters a sweep can vary, with the type their values are parsed as
+SWEEP_PARAMETERS = {
+    'cooldown_days': int,
+    'position_size': float,
+    'commission': float,
+    'initial_capital': float,
+    'stop_loss_pct': float,
+    'take_profit_pct': float,
+}
+
+# Signal columns the trade simulation reads
+SWEEP_SIGNAL_COLUMNS = ['symbol', 'symbol_id', 'date', 'buy_signal', 'sell_signal', 'close']
+
+# Per-strategy signals shared by a sweep pool worker (set by _init_sweep_worker)
+_sweep_signals = None
+_sweep_engine = 'array'
+_sweep_exit_engine = None
+
+
+def parse_sweep(specs):
+    """
+    Parse --sweep arguments into a parameter grid.
+    
+    Args:
+        specs (list): Strings like 'cooldown_days=0,20,60'
+        
+    Returns:
+        dict: Parameter name -> list of values
+    """
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition('=')
+        name = name.strip()
+        if not sep or name not in SWEEP_PARAMETERS:
+            raise ValueError(
+                f"Invalid sweep parameter '{spec}'; expected NAME=V1,V2,... "
+                f"with NAME in {', '.join(SWEEP_PARAMETERS)}"
+            )
+        try:
+            grid[name] = [SWEEP_PARAMETERS[name](v) for v in values.split(',') if v.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid value in sweep parameter '{spec}'")
+        if not grid[name]:
+            raise ValueError(f"No values given for sweep parameter '{name}'")
+    return grid
+
+
+def _init_sweep_worker(signals, engine, exit_engine=None):
+    """
+    Pool initializer: keep the sweep's signals for the life of the worker.
+    
+    The signals arrive once per process (inherited without copying when the
+    pool forks) instead of being pickled with every task.
+    
+    Args:
+        signals (dict): Strategy name -> signal DataFrame
+        engine (str): Trade simulation engine
+        exit_engine (IntrabarExitEngine, optional): Daily bars for stop-loss /
+            take-profit exits
+    """
+    global _sweep_signals, _sweep_engine, _sweep_exit_engine
+    
+    _sweep_signals = signals
+    _sweep_engine = engine
+    _sweep_exit_engine = exit_engine
+    logger.setLevel(logging.WARNING)
+
+
+def _sweep_worker(task):
+    """
+    Backtest one strategy with one parameter set.
+    
+    Defined at module level to be picklable for multiprocessing.
+    
+    Args:
+        task (tuple): (strategy_name, params) with params holding every
+            SWEEP_PARAMETERS key
+        
+    Returns:
+        dict: params plus the strategy's performance metrics
+    """
+    strategy_name, params = task
+    
+    # Simulation and metrics only; workers never touch the database
+    backtester = StrategyBacktester(
+        initial_capital=params['initial_capital'],
+        position_size=params['position_size'],
+        commission=params['commission'],
+        engine=_sweep_engine,
+        stop_loss_pct=params['stop_loss_pct'],
+        take_profit_pct=params['take_profit_pct'],
+    )
+    backtester.exit_engine = _sweep_exit_engine
+    
+    trades_df = backtester.simulate_trades(_sweep_signals[strategy_name], strategy_name, params['cooldown_days'])
+    return {**params, **backtester.calculate_metrics(trades_df, strategy_name)}
+
 
 class StrategyBacktester:
     """Backtest trading strategies with comprehensive performance metrics."""
     
-    def __init__(self, initial_capital=100000, position_size=0.02, commission=0.001):
+    def __init__(self, initial_capital=100000, position_size=0.02, commission=0.001, ohlcv_cache=None,
+                 engine='array', stop_loss_pct=None, take_profit_pct=None, result_cache=None, db=None):
         """
         Initialize backtester.
         
@@ -59,13 +186,71 @@ class StrategyBacktester:
             initial_capital (float): Starting capital in dollars
             position_size (float): Fraction of capital per trade (0.02 = 2%)
             commission (float): Commission rate per trade (0.001 = 0.1%)
+            ohlcv_cache (OhlcvCache, optional): Read prices from this local
+                cache instead of raw.time_series_daily_adjusted
+            engine (str): Trade simulation: 'array' (per-symbol NumPy arrays,
+                default) or 'legacy' (row-by-row iterrows loop)
+            stop_loss_pct (float, optional): Also exit when a day's low is
+                this fraction below the entry, as the trading bot does
+                (0.10 = 10%; array engine only)
+            take_profit_pct (float, optional): Also exit when a day's high is
+                this fraction above the entry (0.15 = 15%; array engine only)
+            result_cache (BacktestResultCache, optional): Reuse per-strategy
+                results of backtest_all_strategies while a strategy's signals
+                and the parameters are unchanged
+            db (PostgresDatabaseManager, optional): Database manager
+                (default: created on first use, so a backtester that only
+                simulates never needs database settings)
         """
-        self.db = PostgresDatabaseManager()
+        if engine not in ('array', 'legacy'):
+            raise ValueError(f"Unknown simulation engine: {engine}")
+        if engine == 'legacy' and (stop_loss_pct or take_profit_pct):
+            raise ValueError("Stop-loss / take-profit exits need the array engine")
+        
+        self._db = db
         self.initial_capital = initial_capital
         self.position_size = position_size
         self.commission = commission
+        self.ohlcv_cache = ohlcv_cache
+        self.engine = engine
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.exit_engine = None
+        self._exit_coverage = None
+        self.result_cache = result_cache
+    
+    @property
+    def db(self):
+        """The PostgresDatabaseManager, created on first access."""
+        if self._db is None:
+            self._db = PostgresDatabaseManager()
+        return self._db
+        
+    def _signal_filters(self, strategy=None, start_date=None, end_date=None, strategies=None):
+        """WHERE clause and parameters over transforms.trading_signals (aliased s)."""
+        filters = []
+        params = []
         
-    def get_signals(self, strategy=None, start_date=None, end_date=None):
+        if strategy:
+            filters.append("s.trade_strategy = %s")
+            params.append(strategy)
+        
+        if strategies is not None:
+            filters.append("s.trade_strategy = ANY(%s)")
+            params.append(list(strategies))
+        
+        if start_date:
+            filters.append("s.date >= %s")
+            params.append(start_date)
+        
+        if end_date:
+            filters.append("s.date <= %s")
+            params.append(end_date)
+        
+        where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+        return where_clause, params
+    
+    def get_signals(self, strategy=None, start_date=None, end_date=None, strategies=None):
         """
         Fetch trading signals from database.
         
@@ -73,6 +258,7 @@ class StrategyBacktester:
             strategy (str, optional): Filter by specific strategy
             start_date (str, optional): Start date (YYYY-MM-DD)
             end_date (str, optional): End date (YYYY-MM-DD)
+            strategies (list, optional): Only these strategies
             
         Returns:
             pd.DataFrame: Trading signals with price data
@@ -80,23 +266,12 @@ class StrategyBacktester:
         try:
             self.db.connect()
             
-            # Build query filters
-            filters = []
-            params = []
-            
-            if strategy:
-                filters.append("s.trade_strategy = %s")
-                params.append(strategy)
-            
-            if start_date:
-                filters.append("s.date >= %s")
-                params.append(start_date)
-            
-            if end_date:
-                filters.append("s.date <= %s")
-                params.append(end_date)
+            where_clause, params = self._signal_filters(strategy, start_date, end_date, strategies)
             
-            where_clause = "WHERE " + " AND ".join(filters) if filters else ""
+            if self.ohlcv_cache is not None:
+                df = self._join_cached_prices(where_clause, params, start_date, end_date)
+                logger.info(f"Loaded {len(df):,} signals")
+                return df
             
             query = f"""
                 SELECT 
@@ -114,7 +289,7 @@ class StrategyBacktester:
                     r.volume
                 FROM transforms.trading_signals s
                 INNER JOIN raw.time_series_daily_adjusted r
-                    ON s.symbol_id = r.symbol_id::integer 
+                    ON s.symbol_id = r.symbol_id_int
                     AND s.date = r.date
                 {where_clause}
                 ORDER BY s.trade_strategy, s.date, s.symbol
@@ -133,6 +308,78 @@ class StrategyBacktester:
         finally:
             self.db.close()
     
+    def get_signal_snapshots(self, strategy=None, start_date=None, end_date=None):
+        """
+        Fingerprint of each strategy's signals: max(processed_at) and row count.
+        
+        Args:
+            strategy (str, optional): Filter by specific strategy
+            start_date (str, optional): Start date (YYYY-MM-DD)
+            end_date (str, optional): End date (YYYY-MM-DD)
+            
+        Returns:
+            dict: Strategy name -> {'max_processed_at': str, 'rows': int}
+        """
+        try:
+            self.db.connect()
+            where_clause, params = self._signal_filters(strategy, start_date, end_date)
+            query = f"""
+                SELECT s.trade_strategy, MAX(s.processed_at) AS max_processed_at, COUNT(*) AS rows
+                FROM transforms.trading_signals s
+                {where_clause}
+                GROUP BY s.trade_strategy
+                ORDER BY s.trade_strategy
+            """
+            rows = self.db.fetch_query(query, params if params else None) or []
+            return {
+                name: {'max_processed_at': str(max_processed_at), 'rows': int(count)}
+                for name, max_processed_at, count in rows
+            }
+        finally:
+            self.db.close()
+    
+    def _result_key_params(self, start_date, end_date, cooldown_days):
+        """Everything besides the signals that a strategy's backtest result depends on."""
+        return {
+            'initial_capital': self.initial_capital,
+            'position_size': self.position_size,
+            'commission': self.commission,
+            'cooldown_days': cooldown_days,
+            'stop_loss_pct': self.stop_loss_pct,
+            'take_profit_pct': self.take_profit_pct,
+            'start_date': start_date,
+            'end_date': end_date,
+            'prices': f"ohlcv_cache:{self.ohlcv_cache.synced_at}" if self.ohlcv_cache is not None else 'postgres',
+        }
+    
+    def _join_cached_prices(self, where_clause, params, start_date, end_date):
+        """get_signals' join with the OHLCV coming from the local cache."""
+        query = f"""
+            SELECT 
+                s.symbol,
+                s.symbol_id,
+                s.date,
+                s.buy_signal,
+                s.sell_signal,
+                s.trade_strategy,
+                s.signal_strength
+            FROM transforms.trading_signals s
+            {where_clause}
+        """
+        
+        signals_df = pd.read_sql(query, self.db.connection, params=params if params else None)
+        signals_df['date'] = pd.to_datetime(signals_df['date'])
+        
+        prices_df = self.ohlcv_cache.load_panel(
+            signals_df['symbol_id'].unique(),
+            columns=['open', 'high', 'low', 'close', 'volume'],
+            start=start_date, end=end_date,
+        ).drop(columns='symbol')
+        signals_df['symbol_id'] = signals_df['symbol_id'].astype(prices_df['symbol_id'].dtype)
+        
+        df = signals_df.merge(prices_df, on=['symbol_id', 'date'], how='inner')
+        return df.sort_values(['trade_strategy', 'date', 'symbol'], kind='stable').reset_index(drop=True)
+    
     def get_price_data(self, symbol_id, start_date, end_date):
         """
         Fetch historical price data for a symbol.
@@ -146,20 +393,26 @@ class StrategyBacktester:
             pd.DataFrame: Price data
         """
         try:
+            if self.ohlcv_cache is not None:
+                return self.ohlcv_cache.load_frame(
+                    symbol_id, columns=['open', 'high', 'low', 'close', 'volume'],
+                    start=start_date, end=end_date,
+                )
+            
             if not self.db.connection or self.db.connection.closed:
                 self.db.connect()
             
             query = """
                 SELECT date, open, high, low, close, volume
                 FROM raw.time_series_daily_adjusted
-                WHERE symbol_id = %s
+                WHERE symbol_id_int = %s
                   AND date >= %s
                   AND date <= %s
                 ORDER BY date
             """
             
             df = pd.read_sql(query, self.db.connection, 
-                           params=(str(symbol_id), start_date, end_date))
+                           params=(int(symbol_id), start_date, end_date))
             df['date'] = pd.to_datetime(df['date'])
             
             return df
@@ -168,6 +421,76 @@ class StrategyBacktester:
             logger.error(f"Error fetching price data for {symbol_id}: {e}")
             return pd.DataFrame()
     
+    def get_price_panel(self, symbol_ids, start_date=None, end_date=None, columns=('close',)):
+        """
+        Fetch daily prices for many symbols at once.
+        
+        Args:
+            symbol_ids (list): Symbol IDs
+            start_date (optional): Start date (inclusive)
+            end_date (optional): End date (inclusive)
+            columns (sequence): Price columns (default: close only)
+            
+        Returns:
+            pd.DataFrame: symbol_id, date and columns sorted by (symbol_id, date)
+        """
+        symbol_ids = sorted({int(i) for i in symbol_ids})
+        columns = list(columns)
+        
+        if self.ohlcv_cache is not None:
+            df = self.ohlcv_cache.load_panel(symbol_ids, columns=columns, start=start_date, end=end_date)
+            return df[['symbol_id', 'date'] + columns]
+        
+        if not self.db.connection or self.db.connection.closed:
+            self.db.connect()
+        
+        filters = ["symbol_id_int = ANY(%s)"]
+        params = [symbol_ids]
+        if start_date is not None:
+            filters.append("date >= %s")
+            params.append(start_date)
+        if end_date is not None:
+            filters.append("date <= %s")
+            params.append(end_date)
+        
+        query = f"""
+            SELECT symbol_id_int AS symbol_id, date, {", ".join(columns)}
+            FROM raw.time_series_daily_adjusted
+            WHERE {" AND ".join(filters)}
+            ORDER BY symbol_id_int, date
+        """
+        
+        df = pd.read_sql(query, self.db.connection, params=params)
+        df['date'] = pd.to_datetime(df['date'])
+        df[columns] = df[columns].astype(float)
+        
+        return df
+    
+    def load_exit_engine(self, signals_df):
+        """
+        Load the daily bars stop-loss / take-profit exits are checked against.
+        
+        Covers every symbol in signals_df from its first to its last signal
+        date; a later call for the same symbols and dates reuses the bars.
+        
+        Args:
+            signals_df (pd.DataFrame): Signals with symbol_id and date
+            
+        Returns:
+            IntrabarExitEngine: Also kept as self.exit_engine
+        """
+        symbol_ids = np.unique(signals_df['symbol_id'].to_numpy(dtype=np.int64))
+        start_date, end_date = signals_df['date'].min(), signals_df['date'].max()
+        coverage = (symbol_ids.tobytes(), start_date, end_date)
+        
+        if self.exit_engine is None or self._exit_coverage != coverage:
+            prices_df = self.get_price_panel(symbol_ids, start_date, end_date, columns=PRICE_COLUMNS)
+            logger.info(f"Loaded {len(prices_df):,} daily bars for stop-loss / take-profit exits")
+            self.exit_engine = IntrabarExitEngine(prices_df)
+            self._exit_coverage = coverage
+        
+        return self.exit_engine
+    
     def simulate_trades(self, signals_df, strategy_name, cooldown_days=60):
         """
         Simulate trades for a specific strategy with cooldown period.
@@ -180,6 +503,30 @@ class StrategyBacktester:
         Returns:
             pd.DataFrame: Trade history
         """
+        if self.engine == 'legacy':
+            return self._simulate_trades_legacy(signals_df, strategy_name, cooldown_days)
+        
+        logger.info(f"Simulating trades for {strategy_name}...")
+        
+        simulator = ArrayTradeSimulator(
+            self.initial_capital, self.position_size, self.commission,
+            exit_engine=self.exit_engine, stop_loss_pct=self.stop_loss_pct, take_profit_pct=self.take_profit_pct
+        )
+        trades_df = simulator.simulate(signals_df, strategy_name, cooldown_days)
+        logger.info(f"Simulated {len(trades_df)} trades for {strategy_name}")
+        
+        return trades_df
+    
+    def _price_exit_label(self):
+        """Stop-loss / take-profit levels for the run header."""
+        if not (self.stop_loss_pct or self.take_profit_pct):
+            return "off (sell signals only)"
+        stop = f"-{self.stop_loss_pct * 100:g}%" if self.stop_loss_pct else "none"
+        target = f"+{self.take_profit_pct * 100:g}%" if self.take_profit_pct else "none"
+        return f"{stop} / {target}"
+    
+    def _simulate_trades_legacy(self, signals_df, strategy_name, cooldown_days=60):
+        """Row-by-row simulate_trades (reference for backtesting/trade_simulator.py)."""
         logger.info(f"Simulating trades for {strategy_name}...")
         
         trades = []
@@ -407,36 +754,62 @@ class StrategyBacktester:
         logger.info(f"Position Size: {self.position_size * 100}%")
         logger.info(f"Commission Rate: {self.commission * 100}%")
         logger.info(f"Cooldown Period: {cooldown_days} days")
+        logger.info(f"Stop Loss / Take Profit: {self._price_exit_label()}")
         logger.info(f"Date Range: {start_date or 'All'} to {end_date or 'All'}")
         logger.info("=" * 80)
         
-        # Fetch all signals
-        signals_df = self.get_signals(strategy, start_date, end_date)
+        # Strategy name -> (metrics or None without trades, trades_df)
+        results = {}
         
-        if signals_df.empty:
+        # Reuse results whose signal snapshot and parameters match the cache
+        keys = {}
+        stale = None
+        if self.result_cache is not None:
+            params = self._result_key_params(start_date, end_date, cooldown_days)
+            snapshots = self.get_signal_snapshots(strategy, start_date, end_date)
+            keys = {name: self.result_cache.key(name, snapshot, params) for name, snapshot in snapshots.items()}
+            for strategy_name, key in keys.items():
+                cached = self.result_cache.get(strategy_name, key)
+                if cached is not None:
+                    results[strategy_name] = cached
+            stale = [name for name in keys if name not in results]
+            logger.info(f"Result cache: {len(results)} strategies unchanged, {len(stale)} to backtest")
+        
+        # Fetch all signals (only the changed strategies' with a cache)
+        signals_df = pd.DataFrame()
+        if stale is None or stale:
+            signals_df = self.get_signals(strategy, start_date, end_date, strategies=stale)
+        
+        if signals_df.empty and not results:
             logger.warning("No signals found for backtesting")
             return pd.DataFrame(), pd.DataFrame()
         
+        if not signals_df.empty and (self.stop_loss_pct or self.take_profit_pct):
+            self.load_exit_engine(signals_df)
+        
         # Get unique strategies
-        strategies = signals_df['trade_strategy'].unique()
+        strategies = signals_df['trade_strategy'].unique() if not signals_df.empty else []
         logger.info(f"Found {len(strategies)} strategies to backtest")
         
         # Backtest each strategy
-        performance_results = []
-        all_trades = []
-        
         for strategy_name in strategies:
             strategy_signals = signals_df[signals_df['trade_strategy'] == strategy_name]
             
             # Simulate trades with cooldown period
             trades_df = self.simulate_trades(strategy_signals, strategy_name, cooldown_days)
             
-            if not trades_df.empty:
-                all_trades.append(trades_df)
-                
-                # Calculate metrics
-                metrics = self.calculate_metrics(trades_df, strategy_name)
-                performance_results.append(metrics)
+            # Calculate metrics
+            metrics = self.calculate_metrics(trades_df, strategy_name) if not trades_df.empty else None
+            results[strategy_name] = (metrics, trades_df)
+        
+        for strategy_name in stale or []:
+            # Signals without price rows simulate nothing; cache that too
+            results.setdefault(strategy_name, (None, pd.DataFrame()))
+            self.result_cache.put(strategy_name, keys[strategy_name], *results[strategy_name])
+        
+        order = list(keys) or list(strategies)
+        performance_results = [results[name][0] for name in order if results[name][0] is not None]
+        all_trades = [results[name][1] for name in order if results[name][0] is not None]
         
         # Create performance summary
         performance_df = pd.DataFrame(performance_results)
@@ -450,6 +823,233 @@ class StrategyBacktester:
         
         return performance_df, all_trades_df
     
+    def backtest_portfolio(self, start_date=None, end_date=None, strategy=None, cooldown_days=60,
+                           max_positions=50):
+        """
+        Backtest each strategy as one account with shared capital.
+        
+        The strategy's simulated trades are the candidates; PortfolioSimulator
+        funds them from one cash balance at position_size of current equity,
+        holds at most max_positions at a time and marks the account to market
+        every day. Returns, Sharpe ratio and drawdown come from the daily
+        equity curve rather than from per-trade returns.
+        
+        Args:
+            start_date (str, optional): Start date (YYYY-MM-DD)
+            end_date (str, optional): End date (YYYY-MM-DD)
+            strategy (str, optional): Test specific strategy only
+            cooldown_days (int): Days to wait before buying same symbol again (default: 60)
+            max_positions (int): Most positions held at once (default: 50)
+            
+        Returns:
+            tuple: (performance_df, equity_df, all_trades_df); equity_df has
+                one row per strategy and day
+        """
+        logger.info("=" * 80)
+        logger.info("PORTFOLIO BACKTEST")
+        logger.info("=" * 80)
+        logger.info(f"Initial Capital: ${self.initial_capital:,.2f}")
+        logger.info(f"Position Size: {self.position_size * 100}% of equity, max {max_positions} positions")
+        logger.info(f"Commission Rate: {self.commission * 100}%")
+        logger.info(f"Cooldown Period: {cooldown_days} days")
+        logger.info(f"Stop Loss / Take Profit: {self._price_exit_label()}")
+        logger.info(f"Date Range: {start_date or 'All'} to {end_date or 'All'}")
+        logger.info("=" * 80)
+        
+        signals_df = self.get_signals(strategy, start_date, end_date)
+        
+        if signals_df.empty:
+            logger.warning("No signals found for backtesting")
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        
+        if self.stop_loss_pct or self.take_profit_pct:
+            self.load_exit_engine(signals_df)
+        
+        symbol_ids = signals_df.drop_duplicates('symbol').set_index('symbol')['symbol_id']
+        prices_df = self.get_price_panel(
+            symbol_ids.unique(), signals_df['date'].min(), signals_df['date'].max()
+        )
+        logger.info(f"Loaded {len(prices_df):,} daily closes for {len(symbol_ids)} symbols")
+        
+        simulator = PortfolioSimulator(self.initial_capital, self.position_size, self.commission, max_positions)
+        
+        performance_results = []
+        equity_curves = []
+        all_trades = []
+        
+        for strategy_name in signals_df['trade_strategy'].unique():
+            strategy_signals = signals_df[signals_df['trade_strategy'] == strategy_name]
+            candidates = self.simulate_trades(strategy_signals, strategy_name, cooldown_days)
+            if candidates.empty:
+                continue
+            
+            candidates['symbol_id'] = candidates['symbol'].map(symbol_ids).to_numpy()
+            equity_df, trades_df = simulator.simulate(candidates, prices_df)
+            if equity_df.empty:
+                continue
+            
+            metrics = {
+                'strategy': strategy_name,
+                'candidate_trades': len(candidates),
+                'total_trades': len(trades_df),
+                'win_rate': (trades_df['pnl'] > 0).mean() * 100 if not trades_df.empty else 0.0,
+                'final_equity': equity_df['equity'].iloc[-1],
+                **equity_metrics(equity_df['equity'].to_numpy(), self.initial_capital),
+                'avg_open_positions': equity_df['open_positions'].mean(),
+                'max_open_positions': int(equity_df['open_positions'].max()),
+                'total_commission': trades_df['commission'].sum() if not trades_df.empty else 0.0,
+            }
+            performance_results.append(metrics)
+            equity_curves.append(equity_df.assign(strategy=strategy_name))
+            if not trades_df.empty:
+                all_trades.append(trades_df)
+        
+        performance_df = pd.DataFrame(performance_results)
+        if not performance_df.empty:
+            performance_df = performance_df.sort_values('total_return_pct', ascending=False)
+        
+        equity_df = pd.concat(equity_curves, ignore_index=True) if equity_curves else pd.DataFrame()
+        if not equity_df.empty:
+            equity_df = equity_df[['strategy'] + [c for c in equity_df.columns if c != 'strategy']]
+        all_trades_df = pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame()
+        
+        return performance_df, equity_df, all_trades_df
+    
+    def print_portfolio_report(self, performance_df):
+        """
+        Print formatted portfolio backtest report.
+        
+        Args:
+            performance_df (pd.DataFrame): Portfolio metrics by strategy
+        """
+        if performance_df.empty:
+            logger.warning("No results to display")
+            return
+        
+        print("\n" + "=" * 120)
+        print("PORTFOLIO PERFORMANCE REPORT (daily mark-to-market)")
+        print("=" * 120)
+        
+        cols_to_display = [
+            'strategy', 'total_trades', 'candidate_trades', 'win_rate', 'total_return_pct',
+            'annual_return_pct', 'annual_volatility_pct', 'sharpe_ratio', 'max_drawdown',
+            'max_drawdown_days', 'avg_open_positions'
+        ]
+        print(performance_df[cols_to_display].to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+        print("=" * 120)
+    
+    def sweep_parameters(self, grid, start_date=None, end_date=None, strategy=None, cooldown_days=60,
+                         workers=None):
+        """
+        Backtest every strategy for every combination of a parameter grid.
+        
+        Signals are loaded once and handed to a process pool, which runs
+        each (parameter set, strategy) pair as its own task. Parameters not
+        in the grid keep this backtester's values (and cooldown_days).
+        
+        Args:
+            grid (dict): Parameter name -> list of values (see parse_sweep)
+            start_date (str, optional): Start date (YYYY-MM-DD)
+            end_date (str, optional): End date (YYYY-MM-DD)
+            strategy (str, optional): Test specific strategy only
+            cooldown_days (int): Cooldown when not part of the grid
+            workers (int, optional): Worker processes (default: CPU count)
+            
+        Returns:
+            pd.DataFrame: One row per (parameter set, strategy): the
+                SWEEP_PARAMETERS columns followed by calculate_metrics()
+        """
+        unknown = set(grid) - set(SWEEP_PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+        
+        signals_df = self.get_signals(strategy, start_date, end_date)
+        
+        if signals_df.empty:
+            logger.warning("No signals found for backtesting")
+            return pd.DataFrame()
+        
+        signals = {
+            name: group[SWEEP_SIGNAL_COLUMNS].reset_index(drop=True)
+            for name, group in signals_df.groupby('trade_strategy', sort=False)
+        }
+        del signals_df
+        
+        defaults = {
+            'cooldown_days': cooldown_days,
+            'position_size': self.position_size,
+            'commission': self.commission,
+            'initial_capital': self.initial_capital,
+            'stop_loss_pct': self.stop_loss_pct,
+            'take_profit_pct': self.take_profit_pct,
+        }
+        names = list(grid)
+        param_sets = [
+            {**defaults, **dict(zip(names, values))}
+            for values in itertools.product(*(grid[name] for name in names))
+        ]
+        
+        exit_engine = None
+        if any(params['stop_loss_pct'] or params['take_profit_pct'] for params in param_sets):
+            if self.engine == 'legacy':
+                raise ValueError("Stop-loss / take-profit exits need the array engine")
+            exit_engine = self.load_exit_engine(pd.concat(
+                [group[['symbol_id', 'date']] for group in signals.values()], ignore_index=True
+            ))
+        tasks = [(name, params) for params in param_sets for name in signals]
+        
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        logger.info(f"Sweeping {len(param_sets)} parameter sets x {len(signals)} strategies "
+                    f"= {len(tasks)} backtests on {workers} workers")
+        
+        start = time.perf_counter()
+        if workers <= 1:
+            level = logger.level
+            _init_sweep_worker(signals, self.engine, exit_engine)
+            try:
+                results = [_sweep_worker(task) for task in tasks]
+            finally:
+                logger.setLevel(level)
+        else:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with Pool(processes=workers, initializer=_init_sweep_worker,
+                      initargs=(signals, self.engine, exit_engine)) as pool:
+                results = list(pool.imap(_sweep_worker, tasks, chunksize=chunksize))
+                pool.close()
+                pool.join()
+        logger.info(f"Sweep completed in {time.perf_counter() - start:.1f}s")
+        
+        sweep_df = pd.DataFrame(results)
+        columns = ['strategy'] + list(SWEEP_PARAMETERS)
+        sweep_df = sweep_df[columns + [c for c in sweep_df.columns if c not in columns]]
+        
+        return sweep_df.sort_values('total_return_pct', ascending=False, kind='stable').reset_index(drop=True)
+    
+    def print_sweep_report(self, sweep_df, grid):
+        """
+        Print the best parameter set for each strategy.
+        
+        Args:
+            sweep_df (pd.DataFrame): Result of sweep_parameters()
+            grid (dict): The swept parameters
+        """
+        if sweep_df.empty:
+            logger.warning("No results to display")
+            return
+        
+        best = sweep_df.drop_duplicates('strategy')
+        
+        print("\n" + "=" * 120)
+        print(f"PARAMETER SWEEP: BEST SETTINGS PER STRATEGY ({len(sweep_df)} backtests)")
+        print("=" * 120)
+        
+        cols_to_display = [
+            'strategy', *grid, 'total_trades', 'win_rate', 'total_return_pct',
+            'max_drawdown', 'sharpe_ratio', 'profit_factor'
+        ]
+        print(best[cols_to_display].to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+        print("=" * 120)
+    
     def print_report(self, performance_df):
         """
         Print formatted performance report.
@@ -501,9 +1101,38 @@ class StrategyBacktester:
         print(f"Average Sharpe Ratio: {performance_df['sharpe_ratio'].mean():.2f}")
         print("=" * 120)
     
+    def print_bootstrap_report(self, ci_df, confidence):
+        """
+        Print bootstrap confidence intervals.
+        
+        Args:
+            ci_df (pd.DataFrame): MonteCarloBootstrap.bootstrap_trades() or
+                bootstrap_equity() result
+            confidence (float): Interval coverage
+        """
+        if ci_df.empty:
+            logger.warning("No results to display")
+            return
+        
+        print("\n" + "=" * 120)
+        print(f"BOOTSTRAP {confidence * 100:g}% CONFIDENCE INTERVALS "
+              f"({ci_df['resamples'].iloc[0]:,} resamples, {ci_df['method'].iloc[0]})")
+        print("=" * 120)
+        
+        table = ci_df.assign(interval=[
+            f"{row.estimate:8.2f}  [{row.ci_lower:8.2f}, {row.ci_upper:8.2f}]" for row in ci_df.itertuples()
+        ])
+        table = table.pivot(index='strategy', columns='metric', values='interval')
+        table = table.reindex(ci_df['strategy'].unique())[['win_rate', 'profit_factor', 'sharpe_ratio', 'max_drawdown']]
+        print(table.to_string())
+        print("=" * 120)
+    
     def export_results(self, performance_df, all_trades_df, output_file):
         """
-        Export results to CSV files.
+        Export results to CSV files, or Parquet for a .parquet output_file.
+        
+        In Parquet the trade history is a trade log (backtesting/trade_log.py)
+        written one strategy at a time.
         
         Args:
             performance_df (pd.DataFrame): Performance metrics
@@ -512,19 +1141,43 @@ class StrategyBacktester:
         """
         try:
             # Export performance summary
-            performance_df.to_csv(output_file, index=False)
+            write_frame(performance_df, output_file)
             logger.info(f"Performance report exported to {output_file}")
             
             # Export trade history
             if not all_trades_df.empty:
-                trades_file = output_file.replace('.csv', '_trades.csv')
-                all_trades_df.to_csv(trades_file, index=False)
+                trades_file = companion_file(output_file, 'trades')
+                if is_trade_log(trades_file):
+                    write_trade_log(all_trades_df, trades_file)
+                else:
+                    all_trades_df.to_csv(trades_file, index=False)
                 logger.info(f"Trade history exported to {trades_file}")
             
         except Exception as e:
             logger.error(f"Error exporting results: {e}")
 
 
+def companion_file(output_file, name):
+    """Path next to the report: results.csv -> results_<name>.csv (same extension)."""
+    path = Path(output_file)
+    return str(path.with_name(f"{path.stem}_{name}{path.suffix or '.csv'}"))
+
+
+def write_frame(df, path):
+    """Write a result table as Parquet or CSV, by the file's extension."""
+    if is_trade_log(path):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def export_bootstrap(ci_df, output_file):
+    """Write bootstrap confidence intervals next to the performance report."""
+    ci_file = companion_file(output_file, 'bootstrap')
+    write_frame(ci_df, ci_file)
+    logger.info(f"Bootstrap confidence intervals exported to {ci_file}")
+
+
 def main():
     """Main execution function."""
     parser = argparse.ArgumentParser(
@@ -543,6 +1196,12 @@ Examples:
   
   # Custom capital and position size
   python backtest_strategies.py --capital 50000 --position-size 0.05 --start-date 2024-01-01
+  
+  # Parameter sweep across all strategies
+  python backtest_strategies.py --sweep cooldown_days=0,20,60 position_size=0.01,0.02 --output sweep.csv
+  
+  # Exit like the trading bot: 10% stop loss, 15% take profit
+  python backtest_strategies.py --stop-loss 0.10 --take-profit 0.15
         """
     )
     
@@ -561,7 +1220,33 @@ Examples:
     parser.add_argument('--cooldown-days', type=int, default=60,
                        help='Days to wait before buying same symbol again (default: 60)')
     parser.add_argument('--output', type=str,
-                       help='Output CSV file path')
+                       help='Output CSV file path (.parquet writes Parquet and a typed trade log)')
+    parser.add_argument('--stop-loss', type=float, default=None,
+                       help='Also exit when the day\'s low is this fraction below the entry (e.g. 0.10; default: off)')
+    parser.add_argument('--take-profit', type=float, default=None,
+                       help='Also exit when the day\'s high is this fraction above the entry (e.g. 0.15; default: off)')
+    parser.add_argument('--engine', choices=['array', 'legacy'], default='array',
+                       help='Trade simulation: NumPy arrays (default) or the legacy row loop')
+    parser.add_argument('--ohlcv-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Read prices from the local OHLCV cache (scripts/sync_ohlcv_cache.py) '
+                            'instead of Postgres; DIR defaults to OHLCV_CACHE_DIR or data/ohlcv_cache')
+    parser.add_argument('--result-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Reuse per-strategy results while its signals (max processed_at, row count) '
+                            'and the parameters are unchanged; DIR defaults to BACKTEST_CACHE_DIR or data/backtest_cache')
+    parser.add_argument('--portfolio', action='store_true',
+                       help='Simulate each strategy as one account with shared capital and a daily equity curve')
+    parser.add_argument('--max-positions', type=int, default=50,
+                       help='Most positions held at once with --portfolio (default: 50)')
+    parser.add_argument('--sweep', nargs='+', metavar='NAME=V1,V2',
+                       help='Backtest every combination of these values '
+                            f'({", ".join(SWEEP_PARAMETERS)}) and write one combined metrics table')
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                       help='Report confidence intervals from N bootstrap resamples per strategy '
+                            '(trades, or daily equity blocks with --portfolio; default: off)')
+    parser.add_argument('--block-days', type=int, default=20,
+                       help='Days per block when bootstrapping the --portfolio equity curve (default: 20)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --sweep (default: CPU count)')
     
     args = parser.parse_args()
     
@@ -580,13 +1265,75 @@ Examples:
             logger.error("Invalid end date format. Use YYYY-MM-DD")
             return
     
+    grid = None
+    if args.sweep:
+        try:
+            grid = parse_sweep(args.sweep)
+        except ValueError as e:
+            logger.error(str(e))
+            return
+    
+    if args.engine == 'legacy' and (args.stop_loss or args.take_profit):
+        logger.error("--stop-loss / --take-profit need the array engine")
+        return
+    
     # Initialize backtester
     backtester = StrategyBacktester(
         initial_capital=args.capital,
         position_size=args.position_size,
-        commission=args.commission
+        commission=args.commission,
+        ohlcv_cache=OhlcvCache(args.ohlcv_cache or None) if args.ohlcv_cache is not None else None,
+        engine=args.engine,
+        stop_loss_pct=args.stop_loss,
+        take_profit_pct=args.take_profit,
+        result_cache=BacktestResultCache(args.result_cache or None) if args.result_cache is not None else None
     )
     
+    if grid:
+        sweep_df = backtester.sweep_parameters(
+            grid,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            strategy=args.strategy,
+            cooldown_days=args.cooldown_days,
+            workers=args.workers
+        )
+        backtester.print_sweep_report(sweep_df, grid)
+        
+        if args.output and not sweep_df.empty:
+            write_frame(sweep_df, args.output)
+            logger.info(f"Sweep results exported to {args.output}")
+        
+        logger.info("Backtesting completed!")
+        return
+    
+    if args.portfolio:
+        performance_df, equity_df, all_trades_df = backtester.backtest_portfolio(
+            start_date=args.start_date,
+            end_date=args.end_date,
+            strategy=args.strategy,
+            cooldown_days=args.cooldown_days,
+            max_positions=args.max_positions
+        )
+        backtester.print_portfolio_report(performance_df)
+        
+        ci_df = pd.DataFrame()
+        if args.bootstrap and not equity_df.empty:
+            bootstrap = MonteCarloBootstrap(n_resamples=args.bootstrap, block_days=args.block_days)
+            ci_df = bootstrap.bootstrap_equity(equity_df, backtester.initial_capital)
+            backtester.print_bootstrap_report(ci_df, bootstrap.confidence)
+        
+        if args.output and not performance_df.empty:
+            backtester.export_results(performance_df, all_trades_df, args.output)
+            equity_file = companion_file(args.output, 'equity')
+            write_frame(equity_df, equity_file)
+            logger.info(f"Daily equity curves exported to {equity_file}")
+            if not ci_df.empty:
+                export_bootstrap(ci_df, args.output)
+        
+        logger.info("Backtesting completed!")
+        return
+    
     # Run backtest
     performance_df, all_trades_df = backtester.backtest_all_strategies(
         start_date=args.start_date,
@@ -599,9 +1346,17 @@ Examples:
     if not performance_df.empty:
         backtester.print_report(performance_df)
         
+        ci_df = pd.DataFrame()
+        if args.bootstrap:
+            bootstrap = MonteCarloBootstrap(n_resamples=args.bootstrap)
+            ci_df = bootstrap.bootstrap_trades(all_trades_df, backtester.initial_capital)
+            backtester.print_bootstrap_report(ci_df, bootstrap.confidence)
+        
         # Export if requested
         if args.output:
             backtester.export_results(performance_df, all_trades_df, args.output)
+            if not ci_df.empty:
+                export_bootstrap(ci_df, args.output)
     
     logger.info("Backtesting completed!")
 
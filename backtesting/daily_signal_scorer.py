@@ -23,7 +23,6 @@ import sys
 import os
 import argparse
 import logging
-import pickle
 from datetime import datetime, timedelta
 
 import pandas as pd
@@ -32,6 +31,8 @@ import numpy as np
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.postgres_database_manager import PostgresDatabaseManager
+from backtesting.feature_store import FeatureStore
+from backtesting.scoring_service import ScoringService
 
 # Configure logging
 logging.basicConfig(
@@ -42,21 +43,25 @@ logger = logging.getLogger(__name__)
 
 
 def load_model(model_path):
-    """Load trained XGBoost model and feature names."""
+    """Load the trained model (artifact or pickle) into a scoring service."""
     logger.info(f"Loading model from {model_path}...")
-    with open(model_path, 'rb') as f:
-        model_data = pickle.load(f)
-    logger.info(f"Model loaded with {len(model_data['feature_names'])} features")
-    return model_data['model'], model_data['feature_names']
+    service = ScoringService(model_path)
+    logger.info(f"Model loaded with {len(service.feature_names)} features")
+    return service
 
 
-def load_recent_signals(days=30):
+def _read_sql(query, db=None):
+    """Run a query on the given manager, or on a pooled connection borrowed for this call."""
+    if db is not None:
+        return pd.read_sql(query, db.connection)
+    with PostgresDatabaseManager() as own_db:
+        return pd.read_sql(query, own_db.connection)
+
+
+def load_recent_signals(days=30, db=None):
     """Load trading signals from the last N days."""
     logger.info(f"Loading trading signals from the last {days} days...")
     
-    db = PostgresDatabaseManager()
-    db.connect()
-    
     # Calculate cutoff date
     cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
     
@@ -75,40 +80,32 @@ def load_recent_signals(days=30):
         ORDER BY date DESC, symbol_id
     """
     
-    signals_df = pd.read_sql(query, db.connection)
-    db.close()
+    signals_df = _read_sql(query, db)
     
     logger.info(f"Loaded {len(signals_df):,} buy signals")
     return signals_df
 
 
-def get_symbol_lookup():
+def get_symbol_lookup(db=None):
     """Get symbol_id to symbol mapping."""
     logger.info("Loading symbol lookup table...")
     
-    db = PostgresDatabaseManager()
-    db.connect()
-    
     query = """
         SELECT DISTINCT symbol_id, symbol
         FROM raw.company_overview
         WHERE symbol_id IS NOT NULL
     """
     
-    lookup_df = pd.read_sql(query, db.connection)
-    db.close()
+    lookup_df = _read_sql(query, db)
     
     logger.info(f"Loaded {len(lookup_df):,} symbol mappings")
     return lookup_df
 
 
-def join_company_overview(signals_df):
+def join_company_overview(signals_df, db=None):
     """Join signals with company overview to get sector and industry."""
     logger.info("Joining with company overview data...")
     
-    db = PostgresDatabaseManager()
-    db.connect()
-    
     query = """
         SELECT 
             symbol_id,
@@ -122,8 +119,7 @@ def join_company_overview(signals_df):
         WHERE symbol_id IS NOT NULL
     """
     
-    overview_df = pd.read_sql(query, db.connection)
-    db.close()
+    overview_df = _read_sql(query, db)
     
     # Join with signals
     df = signals_df.merge(overview_df, on='symbol_id', how='left')
@@ -138,85 +134,19 @@ def join_company_overview(signals_df):
     return df
 
 
-def join_fundamental_scores(df):
+def join_fundamental_scores(df, db=None, store=None):
     """Join signals with fundamental quality scores.
     
-    Applies 45-day publication lag to ensure no lookahead bias.
+    Scores come from the feature store, as-of each signal date with the 45-day
+    publication lag, so there is no lookahead bias.
     """
     logger.info("Joining with fundamental quality scores...")
     
-    db = PostgresDatabaseManager()
-    db.connect()
-    
-    # Get all fundamental scores
-    query = """
-        SELECT 
-            symbol,
-            fiscal_date_ending,
-            overall_quality_score,
-            balance_sheet_quality_score,
-            cash_flow_quality_score, 
-            income_statement_quality_score,
-            bs_liquidity_score,
-            bs_leverage_score,
-            bs_asset_quality_score,
-            cf_generation_score,
-            cf_efficiency_score,
-            cf_sustainability_score,
-            is_profitability_score,
-            is_margin_score,
-            is_growth_score
-        FROM transforms.fundamental_quality_scores
-        WHERE processed_at IS NOT NULL
-        ORDER BY symbol, fiscal_date_ending DESC
-    """
-    
-    fundamentals_df = pd.read_sql(query, db.connection)
-    db.close()
-    
-    # Add 45-day publication lag
-    fundamentals_df['fiscal_date_ending'] = pd.to_datetime(fundamentals_df['fiscal_date_ending'])
-    fundamentals_df['publication_date'] = fundamentals_df['fiscal_date_ending'] + pd.Timedelta(days=45)
-    fundamentals_df['valid_until_date'] = fundamentals_df['publication_date'] + pd.Timedelta(days=90)
+    store = store or FeatureStore()
+    store.sync(['fundamentals'], db=db)
     
-    # Convert signal date to datetime
     df['date'] = pd.to_datetime(df['date'])
-    
-    # For each signal, find the most recent published fundamental data
-    # where publication_date <= signal_date <= valid_until_date
-    df_with_fundamentals = []
-    
-    for _, signal in df.iterrows():
-        symbol = signal['symbol']
-        signal_date = signal['date']
-        
-        # Get fundamentals for this symbol that were published before the signal date
-        available = fundamentals_df[
-            (fundamentals_df['symbol'] == symbol) &
-            (fundamentals_df['publication_date'] <= signal_date) &
-            (fundamentals_df['valid_until_date'] >= signal_date)
-        ]
-        
-        if len(available) > 0:
-            # Use the most recent one
-            most_recent = available.iloc[0]
-            signal_dict = signal.to_dict()
-            
-            # Add fundamental scores
-            for col in fundamentals_df.columns:
-                if col not in ['symbol', 'fiscal_date_ending', 'publication_date', 'valid_until_date']:
-                    signal_dict[col] = most_recent[col]
-            
-            df_with_fundamentals.append(signal_dict)
-        else:
-            # No fundamentals available - add signal with NaN fundamentals
-            signal_dict = signal.to_dict()
-            for col in fundamentals_df.columns:
-                if col not in ['symbol', 'fiscal_date_ending', 'publication_date', 'valid_until_date']:
-                    signal_dict[col] = np.nan
-            df_with_fundamentals.append(signal_dict)
-    
-    result_df = pd.DataFrame(df_with_fundamentals)
+    result_df = store.join(df, 'date', sources=['fundamentals'])
     
     fundamentals_count = result_df['overall_quality_score'].notna().sum()
     logger.info(f"Signals with fundamental data: {fundamentals_count:,} ({100*fundamentals_count/len(result_df):.1f}%)")
@@ -224,27 +154,10 @@ def join_fundamental_scores(df):
     return result_df
 
 
-def prepare_features_for_prediction(df, feature_names):
-    """Prepare features matching the training data format."""
+def prepare_features_for_prediction(df, service):
+    """Prepare features matching the training data format (see backtesting/scoring_service.py)."""
     logger.info("Preparing features for prediction...")
     
-    # Numeric features
-    numeric_features = [
-        'overall_quality_score',
-        'balance_sheet_quality_score',
-        'cash_flow_quality_score', 
-        'income_statement_quality_score',
-        'bs_liquidity_score',
-        'bs_leverage_score',
-        'bs_asset_quality_score',
-        'cf_generation_score',
-        'cf_efficiency_score',
-        'cf_sustainability_score',
-        'is_profitability_score',
-        'is_margin_score',
-        'is_growth_score'
-    ]
-    
     # Filter to signals with fundamental data
     df_with_fundamentals = df.dropna(subset=['overall_quality_score']).copy()
     logger.info(f"Signals with fundamentals: {len(df_with_fundamentals):,}")
@@ -253,31 +166,9 @@ def prepare_features_for_prediction(df, feature_names):
         logger.warning("No signals with fundamental data found!")
         return None, None
     
-    # Create feature matrix starting with numeric features
-    X = df_with_fundamentals[numeric_features].copy()
-    
-    # Fill missing numeric values with median (same as training)
-    for col in X.columns:
-        if X[col].isna().any():
-            median_val = X[col].median()
-            X[col] = X[col].fillna(median_val)
-    
-    # One-hot encode sector
-    sector_dummies = pd.get_dummies(df_with_fundamentals['sector'], prefix='sector', drop_first=False)
-    X = pd.concat([X, sector_dummies], axis=1)
-    
-    # One-hot encode strategy (rename to match training data format)
+    # Training data calls the strategy column 'strategy'
     df_with_fundamentals['strategy'] = df_with_fundamentals['trade_strategy']
-    strategy_dummies = pd.get_dummies(df_with_fundamentals['strategy'], prefix='strategy', drop_first=False)
-    X = pd.concat([X, strategy_dummies], axis=1)
-    
-    # Ensure all training features are present
-    for feature in feature_names:
-        if feature not in X.columns:
-            X[feature] = 0
-    
-    # Reorder columns to match training data
-    X = X[feature_names]
+    X = service.build_features(df_with_fundamentals)
     
     logger.info(f"Feature matrix prepared: {X.shape[0]:,} rows × {X.shape[1]} features")
     
@@ -330,10 +221,10 @@ def filter_and_rank_signals(df, threshold=0.8):
 def main():
     parser = argparse.ArgumentParser(description='Score daily trading signals with XGBoost model')
     parser.add_argument('--days', type=int, default=30, help='Number of days to look back (default: 30)')
-    parser.add_argument('--model', type=str, default='models/trade_success_model.pkl', 
-                       help='Path to trained model')
-    parser.add_argument('--threshold', type=float, default=0.8, 
-                       help='Minimum success probability threshold (default: 0.8)')
+    parser.add_argument('--model', type=str, default='models/trade_success_model.ubj', 
+                       help='Path to trained model artifact (.ubj) or pickle')
+    parser.add_argument('--threshold', type=float, default=None, 
+                       help="Minimum success probability threshold (default: the model's, else 0.8)")
     parser.add_argument('--output', type=str, default=None,
                        help='Output CSV file (default: backtesting/daily_signals_scored_YYYYMMDD.csv)')
     
@@ -349,34 +240,38 @@ def main():
     logger.info("="*100)
     logger.info(f"Model: {args.model}")
     logger.info(f"Days: {args.days}")
-    logger.info(f"Threshold: {args.threshold:.0%}")
     logger.info(f"Output: {args.output}")
     
     # Load model
-    model, feature_names = load_model(args.model)
-    
-    # Load recent signals
-    signals_df = load_recent_signals(args.days)
-    
-    if len(signals_df) == 0:
-        logger.warning("No signals found in the specified time period!")
-        return
-    
-    # Join with company overview (sector, industry)
-    signals_df = join_company_overview(signals_df)
+    service = load_model(args.model)
+    if args.threshold is None:
+        args.threshold = service.threshold
+    logger.info(f"Threshold: {args.threshold:.0%}")
     
-    # Join with fundamental scores (with publication lag)
-    signals_df = join_fundamental_scores(signals_df)
+    # One pooled connection for all the lookups below
+    with PostgresDatabaseManager() as db:
+        # Load recent signals
+        signals_df = load_recent_signals(args.days, db=db)
+        
+        if len(signals_df) == 0:
+            logger.warning("No signals found in the specified time period!")
+            return
+        
+        # Join with company overview (sector, industry)
+        signals_df = join_company_overview(signals_df, db=db)
+        
+        # Join with fundamental scores (with publication lag)
+        signals_df = join_fundamental_scores(signals_df, db=db, store=service.store)
     
     # Prepare features
-    X, df_with_fundamentals = prepare_features_for_prediction(signals_df, feature_names)
+    X, df_with_fundamentals = prepare_features_for_prediction(signals_df, service)
     
     if X is None:
         logger.error("Could not prepare features. Exiting.")
         return
     
     # Predict success probability
-    df_scored = predict_success_probability(model, X, df_with_fundamentals)
+    df_scored = predict_success_probability(service.model, X, df_with_fundamentals)
     
     # Filter and rank signals
     df_filtered = filter_and_rank_signals(df_scored, args.threshold)
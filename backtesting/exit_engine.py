@@ -0,0 +1,155 @@
+"""
+Intrabar Exit Engine for Strategy Backtests
+
+The trading bot (trading_bot/automated_trading_bot.py) leaves a position as
+soon as it is down stop_loss_pct or up take_profit_pct from the entry, and
+otherwise on a sell signal. The backtest only exited on sell signals at the
+close. This engine adds the price exits to the backtest: for each entry it
+finds the first later bar whose low reaches the stop or whose high reaches the
+target.
+
+Fills follow what a resting order would get:
+- stop:   the stop price, or the open when the bar gaps below it
+- target: the target price, or the open when the bar gaps above it
+- a bar that reaches both: the stop, unless the bar opened at or above the
+  target (the daily bar doesn't say which came first, so assume the worse)
+
+Bars are one long array per column sorted by (symbol, date), as in the OHLCV
+cache. All entries are searched together: each pass gathers the next `window`
+bars of every unresolved entry as a 2-D block, compares the block's lows and
+highs against each entry's stop and target, and takes the first breach. Entries
+with no breach move on by one window, so the passes needed are
+(longest holding period / window) and not one per bar or per entry.
+
+Usage:
+    from backtesting.exit_engine import IntrabarExitEngine
+
+    engine = IntrabarExitEngine(prices_df)  # symbol_id, date, open, high, low
+    exits = engine.first_exits(symbol_ids, entry_dates, entry_prices, end_dates,
+                               stop_loss_pct=0.10, take_profit_pct=0.15)
+"""
+
+import numpy as np
+import pandas as pd
+
+EXIT_REASONS = np.array(['signal', 'stop_loss', 'take_profit', 'end_of_data'])
+SIGNAL, STOP_LOSS, TAKE_PROFIT, END_OF_DATA = range(4)
+
+PRICE_COLUMNS = ['open', 'high', 'low']
+
+
+def _date_ns(values):
+    """Dates as int64 nanoseconds since the epoch."""
+    return pd.to_datetime(values).to_numpy().astype('datetime64[ns]').astype(np.int64)
+
+
+class IntrabarExitEngine:
+    """First stop-loss / take-profit breach after each entry, from daily OHLC arrays."""
+
+    def __init__(self, prices_df, window=32):
+        """
+        Args:
+            prices_df (pd.DataFrame): Daily bars with symbol_id, date, open,
+                high and low (any order)
+            window (int): Bars compared per entry per pass (default: 32)
+        """
+        symbol_ids = prices_df['symbol_id'].to_numpy(dtype=np.int64)
+        dates_ns = _date_ns(prices_df['date'])
+        order = np.lexsort((dates_ns, symbol_ids))
+
+        self.window = window
+        self.symbol_ids = np.unique(symbol_ids)
+        self.dates_ns = dates_ns[order]
+        self.open = prices_df['open'].to_numpy(dtype=float)[order]
+        self.high = prices_df['high'].to_numpy(dtype=float)[order]
+        self.low = prices_df['low'].to_numpy(dtype=float)[order]
+
+        # Sorted (symbol, date) key: dense symbol code, then date rank
+        self.calendar = np.unique(self.dates_ns)
+        self.key_base = len(self.calendar) + 1
+        codes = np.searchsorted(self.symbol_ids, symbol_ids[order])
+        self.key = codes * self.key_base + np.searchsorted(self.calendar, self.dates_ns)
+
+    def last_bar(self, symbol_ids, dates_ns):
+        """Index of each symbol's last bar on or before the date (-1 if none)."""
+        symbol_ids = np.asarray(symbol_ids, dtype=np.int64)
+        codes = np.searchsorted(self.symbol_ids, symbol_ids)
+        known = codes < len(self.symbol_ids)
+        known[known] = self.symbol_ids[codes[known]] == symbol_ids[known]
+
+        date_rank = np.searchsorted(self.calendar, dates_ns, 'right') - 1
+        row = np.searchsorted(self.key, codes * self.key_base + date_rank, 'right') - 1
+        valid = known & (date_rank >= 0) & (row >= 0)
+        valid[valid] = self.key[row[valid]] // self.key_base == codes[valid]
+        return np.where(valid, row, -1)
+
+    def first_exits(self, symbol_ids, entry_dates, entry_prices, end_dates,
+                    stop_loss_pct=None, take_profit_pct=None):
+        """
+        First stop or target breach after each entry, up to and including end_dates.
+
+        Args:
+            symbol_ids (np.ndarray): Symbol of each entry
+            entry_dates (np.ndarray): Entry dates (entered at that day's close)
+            entry_prices (np.ndarray): Entry prices
+            end_dates (np.ndarray): Last date to search (e.g. the sell signal)
+            stop_loss_pct (float, optional): Exit at a loss of this fraction
+            take_profit_pct (float, optional): Exit at a gain of this fraction
+
+        Returns:
+            dict: hit (bool), bar (index, -1 if no hit), date_ns, price and
+                reason (STOP_LOSS / TAKE_PROFIT) per entry
+        """
+        n = len(entry_prices)
+        entry_prices = np.asarray(entry_prices, dtype=float)
+        stop = entry_prices * (1 - stop_loss_pct) if stop_loss_pct else np.full(n, -np.inf)
+        target = entry_prices * (1 + take_profit_pct) if take_profit_pct else np.full(n, np.inf)
+
+        start = self.last_bar(symbol_ids, _date_ns(entry_dates)) + 1
+        end = self.last_bar(symbol_ids, _date_ns(end_dates))
+        bar = np.full(n, -1)
+        is_stop = np.zeros(n, dtype=bool)
+
+        # Entries without a bar on record search nothing
+        active = np.flatnonzero((start > 0) & (end >= start) & (bool(stop_loss_pct) | bool(take_profit_pct)))
+        position = start.copy()
+        offsets = np.arange(self.window)
+
+        while len(active):
+            rows = position[active][:, None] + offsets
+            in_range = rows <= end[active][:, None]
+            rows = np.minimum(rows, len(self.low) - 1)
+
+            stop_hit = in_range & (self.low[rows] <= stop[active][:, None])
+            target_hit = in_range & (self.high[rows] >= target[active][:, None])
+            breach = stop_hit | target_hit
+            found = breach.any(axis=1)
+
+            first = breach[found].argmax(axis=1)
+            resolved = active[found]
+            bar[resolved] = rows[found, first]
+            is_stop[resolved] = stop_hit[found, first]
+
+            position[active] += self.window
+            active = active[~found & (position[active] <= end[active])]
+
+        hit = bar >= 0
+        bar_open = self.open[bar[hit]]
+
+        # Both levels in one bar: the stop, unless the bar opened through the target
+        stop_first = np.zeros(n, dtype=bool)
+        stop_first[hit] = is_stop[hit] & (bar_open < target[hit])
+        price = np.full(n, np.nan)
+        price[hit] = np.where(
+            stop_first[hit], np.minimum(bar_open, stop[hit]), np.maximum(bar_open, target[hit])
+        )
+        date_ns = np.zeros(n, dtype=np.int64)
+        date_ns[hit] = self.dates_ns[bar[hit]]
+
+        return {
+            'hit': hit,
+            'bar': bar,
+            'date_ns': date_ns,
+            'price': price,
+            'reason': np.where(stop_first, STOP_LOSS, TAKE_PROFIT),
+        }
@@ -0,0 +1,171 @@
+"""
+Trade Success Feature Encoder
+
+Training built its matrix with pd.get_dummies on sector and strategy. Each
+scorer then repeated that on its own batch and added the training columns
+the batch lacked one at a time, so the columns a batch produced depended on
+which categories it happened to contain. FeatureEncoder fixes the feature
+schema when the model is trained and applies it unchanged everywhere:
+
+- numeric: the fundamental score columns, in order
+- vocabularies: the sorted categories of each one-hot feature seen in
+  training (a missing value counts as UNKNOWN)
+- fill_values: training medians for numeric gaps
+
+transform() allocates one float32 matrix in model column order and fills it
+in place. Numeric columns are copied in. For each categorical feature the
+values are factorized once, the distinct values are looked up in the
+vocabulary, and one cell per row is set. Categories outside the vocabulary
+set no column, as the dropped get_dummies columns did.
+
+The encoder is saved with the model (backtesting/model_artifact.py manifest)
+and with cached feature matrices (backtesting/feature_matrix_cache.py).
+
+Usage:
+    from backtesting.feature_encoder import FeatureEncoder
+
+    encoder = FeatureEncoder.fit(trades_df, numeric=NUMERIC_FEATURES, categorical=['sector', 'strategy'])
+    X_train = encoder.transform(trades_df)
+    X_live = encoder.transform(signals_df, columns={'strategy': 'trade_strategy'})
+"""
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN = 'UNKNOWN'
+
+
+class FeatureEncoder:
+    """Numeric features plus one-hot categories, with the schema frozen at training time."""
+
+    def __init__(self, numeric, vocabularies, fill_values=None, feature_names=None):
+        """
+        Args:
+            numeric (list): Numeric feature columns
+            vocabularies (dict): Categorical feature -> categories
+            fill_values (dict, optional): Numeric feature -> value for gaps
+                (None: the batch median, for models saved without them)
+            feature_names (list, optional): Column order of the model
+                (default: numeric, then each feature's categories)
+        """
+        self.numeric = list(numeric)
+        self.vocabularies = {feature: [str(value) for value in values] for feature, values in vocabularies.items()}
+        self.fill_values = fill_values
+
+        one_hot = [f"{feature}_{value}" for feature, values in self.vocabularies.items() for value in values]
+        self.feature_names = list(feature_names) if feature_names is not None else self.numeric + one_hot
+        if sorted(self.feature_names) != sorted(self.numeric + one_hot):
+            raise ValueError("feature_names must be the numeric features plus one column per category")
+
+        positions = {name: i for i, name in enumerate(self.feature_names)}
+        self._numeric_positions = np.array([positions[name] for name in self.numeric], dtype=np.intp)
+        self._category_positions = {
+            feature: np.array([positions[f"{feature}_{value}"] for value in values], dtype=np.intp)
+            for feature, values in self.vocabularies.items()
+        }
+        self._category_index = {feature: pd.Index(values) for feature, values in self.vocabularies.items()}
+
+    @classmethod
+    def fit(cls, df, numeric, categorical):
+        """
+        Freeze the schema of a training set.
+
+        Args:
+            df (pd.DataFrame): Training rows
+            numeric (list): Numeric feature columns
+            categorical (list): One-hot encoded feature columns
+
+        Returns:
+            FeatureEncoder: Encoder with the training vocabularies and medians
+        """
+        vocabularies = {}
+        for feature in categorical:
+            values = df[feature]
+            categories = {str(value) for value in values.dropna().unique()}
+            if values.isna().any():
+                categories.add(UNKNOWN)
+            vocabularies[feature] = sorted(categories)
+        medians = df[list(numeric)].median()
+        fill_values = {col: None if pd.isna(medians[col]) else float(medians[col]) for col in numeric}
+        return cls(numeric, vocabularies, fill_values)
+
+    @classmethod
+    def from_feature_names(cls, feature_names, categorical):
+        """
+        Schema of a model saved with its column names only (old pickles).
+
+        Args:
+            feature_names (list): Model columns, e.g. ['overall_quality_score', 'sector_ENERGY']
+            categorical (list): One-hot encoded features, e.g. ['sector', 'strategy']
+
+        Returns:
+            FeatureEncoder: Encoder filling numeric gaps with batch medians
+        """
+        vocabularies = {
+            feature: [name[len(feature) + 1:] for name in feature_names if name.startswith(f"{feature}_")]
+            for feature in categorical
+        }
+        one_hot = {f"{feature}_{value}" for feature, values in vocabularies.items() for value in values}
+        numeric = [name for name in feature_names if name not in one_hot]
+        return cls(numeric, vocabularies, feature_names=feature_names)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Encoder from to_dict() output (or a model manifest holding its keys)."""
+        vocabularies = data['vocabularies']
+        if 'numeric_features' not in data:
+            return cls.from_feature_names(data['feature_names'], list(vocabularies))
+        return cls(data['numeric_features'], vocabularies, data.get('fill_values'), data['feature_names'])
+
+    def to_dict(self):
+        """JSON-serializable schema."""
+        return {
+            'feature_names': self.feature_names,
+            'numeric_features': self.numeric,
+            'vocabularies': self.vocabularies,
+            'fill_values': self.fill_values,
+        }
+
+    def transform(self, df, columns=None):
+        """
+        Model input for rows that carry the numeric and categorical features.
+
+        Args:
+            df (pd.DataFrame): Trades or signals
+            columns (dict, optional): Feature -> column of df holding it when
+                the names differ, e.g. {'strategy': 'trade_strategy'}
+
+        Returns:
+            np.ndarray: float32, rows x len(feature_names), in model column order
+        """
+        columns = columns or {}
+        n = len(df)
+        X = np.zeros((n, len(self.feature_names)), dtype=np.float32)
+
+        # Numeric features; a column with no value to fill with stays NaN
+        # (missing to XGBoost)
+        numeric = df.reindex(columns=self.numeric).to_numpy(dtype=np.float32, na_value=np.nan, copy=True)
+        for j in np.flatnonzero(np.isnan(numeric).any(axis=0)):
+            values = numeric[:, j]
+            missing = np.isnan(values)
+            if self.fill_values is not None:
+                fill = self.fill_values.get(self.numeric[j])
+            else:
+                fill = np.median(values[~missing]) if (~missing).any() else None
+            values[missing] = np.nan if fill is None else fill
+        X[:, self._numeric_positions] = numeric
+
+        # One-hot features: one cell per row, found from the distinct values
+        offsets = np.arange(n) * X.shape[1]
+        flat = X.reshape(-1)
+        for feature, positions in self._category_positions.items():
+            column = columns.get(feature, feature)
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column])
+            index = self._category_index[feature]
+            lookup = np.append(index.get_indexer(pd.Index(uniques).astype(str)), index.get_indexer([UNKNOWN]))
+            codes = lookup[codes]   # a missing value (-1) takes the last entry, UNKNOWN
+            known = codes >= 0
+            flat[offsets[known] + positions[codes[known]]] = 1.0
+        return X
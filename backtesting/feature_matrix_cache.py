@@ -0,0 +1,161 @@
+"""
+Feature-Matrix Cache
+
+Every TradeSuccessPredictor run used to re-read the trade file, join sector
+data, one-hot encode sector and strategy and coerce every column before
+training started. The result depends only on:
+
+- the content of the input file (hashed, not its name or mtime)
+- the feature definition: numeric columns, categorical columns and a version
+- the feature store's sector snapshot the sectors were joined from
+
+So the matrix is kept under a key derived from those, and hyperparameter
+experiments and retrains on the same data go straight to training::
+
+    <root>/<key>/X.npy            float32, rows x features
+    <root>/<key>/y.npy            int8 labels
+    <root>/<key>/dates.npy        entry date of each row (optional)
+    <root>/<key>/meta.json        feature names, encoder, rows, input file
+
+X and y load memory-mapped, so a hit costs a file open rather than a read.
+Entries are written to a temporary directory and renamed into place; clear()
+removes them.
+
+Usage:
+    from backtesting.feature_matrix_cache import FeatureMatrixCache
+
+    cache = FeatureMatrixCache()
+    key = cache.key(cache.file_hash(input_file), feature_spec)
+    cached = cache.get(key)                    # (X, y, feature_names) or None
+    cache.put(key, X, y, feature_names, input_file=input_file, dates=entry_dates, encoder=encoder)
+    entry_dates = cache.dates(key)             # for time-ordered splits
+    encoder = cache.encoder(key)               # saved with the model
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from backtesting.feature_encoder import FeatureEncoder
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'feature_matrix_cache'
+
+# Bump when feature preparation changes the matrix for the same inputs
+CACHE_VERSION = 3
+
+
+class FeatureMatrixCache:
+    """Prepared training matrices on disk, keyed by input content and feature definition."""
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root (str or Path, optional): Cache directory. Defaults to
+                FEATURE_MATRIX_CACHE_DIR, else data/feature_matrix_cache in the
+                repository.
+        """
+        self.root = Path(root or os.getenv('FEATURE_MATRIX_CACHE_DIR') or DEFAULT_CACHE_DIR)
+
+    @staticmethod
+    def file_hash(path, chunk_size=1 << 20):
+        """SHA-256 hex digest of a file's content."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(input_hash, feature_spec):
+        """
+        Cache key of one feature matrix.
+
+        Args:
+            input_hash (str): file_hash() of the input file
+            feature_spec (dict): Everything else the matrix depends on
+                (JSON-serializable values)
+
+        Returns:
+            str: Hex digest
+        """
+        payload = json.dumps(
+            {'version': CACHE_VERSION, 'input': input_hash, 'features': feature_spec},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def get(self, key):
+        """
+        Cached matrix.
+
+        Returns:
+            tuple: (X memory-mapped float32 array, y memory-mapped int8
+                array, feature names list), or None on a miss
+        """
+        entry = self.root / key
+        if not (entry / 'meta.json').exists():
+            return None
+
+        meta = json.loads((entry / 'meta.json').read_text())
+        X = np.load(entry / 'X.npy', mmap_mode='r')
+        y = np.load(entry / 'y.npy', mmap_mode='r')
+        return X, y, meta['feature_names']
+
+    def dates(self, key):
+        """Entry dates of a cached matrix's rows (datetime64 array), or None."""
+        path = self.root / key / 'dates.npy'
+        if not path.exists():
+            return None
+        return np.load(path)
+
+    def encoder(self, key):
+        """FeatureEncoder a cached matrix was built with, or None."""
+        path = self.root / key / 'meta.json'
+        if not path.exists():
+            return None
+        meta = json.loads(path.read_text())
+        return FeatureEncoder.from_dict(meta['encoder']) if meta.get('encoder') else None
+
+    def put(self, key, X, y, feature_names, input_file=None, dates=None, encoder=None):
+        """
+        Store a prepared matrix.
+
+        Args:
+            key (str): Result of key()
+            X (array-like): Feature matrix (stored as float32)
+            y (array-like): Labels (stored as int8)
+            feature_names (list): Column names of X
+            input_file (str, optional): Input file, recorded for reference
+            dates (array-like, optional): Entry date of each row
+            encoder (FeatureEncoder, optional): Encoder X was built with
+        """
+        entry = self.root / key
+        tmp = self.root / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp.mkdir(parents=True)
+        try:
+            np.save(tmp / 'X.npy', np.ascontiguousarray(X, dtype=np.float32))
+            np.save(tmp / 'y.npy', np.asarray(y, dtype=np.int8))
+            if dates is not None:
+                np.save(tmp / 'dates.npy', np.asarray(dates, dtype='datetime64[ns]'))
+            (tmp / 'meta.json').write_text(json.dumps({
+                'feature_names': list(feature_names),
+                'encoder': None if encoder is None else encoder.to_dict(),
+                'rows': int(len(y)),
+                'input_file': None if input_file is None else str(input_file),
+            }, indent=2))
+            if entry.exists():
+                shutil.rmtree(entry)
+            tmp.rename(entry)
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp)
+
+    def clear(self):
+        """Remove every cached matrix."""
+        if self.root.exists():
+            shutil.rmtree(self.root)
@@ -0,0 +1,409 @@
+"""
+Point-in-Time Feature Store
+
+Model features live in separate tables: fundamental quality scores, sector,
+insider aggregates, earnings call sentiment, economic indicators and
+commodities. Training and every scorer used to query and join them ad hoc.
+The feature store keeps one local copy of each source and builds as-of feature
+vectors for (symbol, date) pairs with one batched call:
+
+    publication_date = source date + publication_lag_days
+    a row is usable from publication_date until publication_date + validity_days
+
+(backtesting/point_in_time.py). Each source is one Parquet file sorted by
+symbol (or series) and date, so reading a batch of symbols only touches the
+row groups that hold them::
+
+    <root>/manifest.json
+    <root>/fundamentals.parquet
+    <root>/sector.parquet
+    ...
+
+sync() re-reads a source only when its snapshot has moved, i.e. its row count
+or max(processed_at). Sources without processed_at (sector) are compared by
+row count, so use sync(full=True) after they are restated. Reads never touch
+Postgres: a store is as fresh as its last sync. A long-lived reader (the
+scoring service) can keep the tables in memory with in_memory=True instead of
+reading Parquet on every call.
+
+Sources come in three shapes:
+- per symbol and date (fundamentals, insider, earnings_sentiment): as-of by symbol
+- per symbol without a date (sector): plain lookup
+- market-wide series (economic, commodities): as-of by date for each series,
+  with one column per series and feature, e.g. econ_treasury_yield_value
+
+Usage:
+    from backtesting.feature_store import FeatureStore
+
+    store = FeatureStore()
+    store.sync()
+    features = store.get_features(['AAPL', 'MSFT'], ['2024-06-03', '2024-06-03'])
+    signals = store.join(signals_df, 'signal_date', sources=['sector', 'fundamentals'])
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from backtesting.point_in_time import point_in_time_join
+from db.postgres_database_manager import PostgresDatabaseManager
+
+DEFAULT_STORE_DIR = Path(__file__).parent.parent / 'data' / 'feature_store'
+
+FUNDAMENTAL_SCORE_COLUMNS = [
+    'overall_quality_score',
+    'balance_sheet_quality_score',
+    'cash_flow_quality_score',
+    'income_statement_quality_score',
+    'bs_liquidity_score',
+    'bs_leverage_score',
+    'bs_asset_quality_score',
+    'cf_generation_score',
+    'cf_efficiency_score',
+    'cf_sustainability_score',
+    'is_profitability_score',
+    'is_margin_score',
+    'is_growth_score',
+]
+
+# Each source: table and filter; key (symbol column) or series (column naming a
+# market-wide series); date column (and the SQL that computes it, if any); the
+# feature columns; the column whose max tracks updates; and the publication
+# lag / validity window in days
+SOURCES = {
+    'fundamentals': {
+        'table': 'transforms.fundamental_quality_scores',
+        'where': 'processed_at IS NOT NULL',
+        'key': 'symbol',
+        'date': 'fiscal_date_ending',
+        'columns': FUNDAMENTAL_SCORE_COLUMNS + ['is_high_quality', 'is_investment_grade', 'has_red_flags'],
+        'watermark': 'processed_at',
+        'publication_lag_days': 45,
+        'validity_days': 90,
+    },
+    'sector': {
+        'table': 'raw.company_overview',
+        'where': 'sector IS NOT NULL',
+        'key': 'symbol',
+        'date': None,
+        'columns': ['sector', 'industry'],
+        'watermark': None,
+    },
+    'insider': {
+        'table': 'transforms.insider_transactions_agg',
+        'where': 'processed_at IS NOT NULL',
+        'key': 'symbol',
+        'date': 'transaction_date',
+        'columns': ['total_value_a', 'total_value_d', 'transaction_count_a', 'transaction_count_d',
+                    'total_value_a_tier_3', 'total_value_d_tier_3'],
+        'watermark': 'processed_at',
+        'publication_lag_days': 2,
+        'validity_days': 90,
+    },
+    'earnings_sentiment': {
+        'table': 'transforms.earnings_sentiment_agg',
+        'where': 'processed_at IS NOT NULL',
+        'key': 'symbol',
+        'date': 'quarter_end',
+        # quarter is 'YYYYQn'; the call covers the quarter ending on this date
+        'date_sql': ("(make_date(left(quarter, 4)::int, right(quarter, 1)::int * 3, 1) "
+                     "+ interval '1 month' - interval '1 day')::date"),
+        'columns': ['sentiment_management_weighted', 'sentiment_management_all', 'sentiment_cfo',
+                    'sentiment_csuite', 'count_management_total'],
+        'watermark': 'processed_at',
+        'publication_lag_days': 45,
+        'validity_days': 90,
+    },
+    'economic': {
+        'table': 'transforms.economic_indicators',
+        'where': 'processed_at IS NOT NULL',
+        'series': 'indicator',
+        'prefix': 'econ',
+        'date': 'date',
+        'columns': ['value', 'econ_return_21d', 'econ_value_zscore_63d'],
+        'watermark': 'processed_at',
+        'publication_lag_days': 30,
+        'validity_days': None,
+    },
+    'commodities': {
+        'table': 'transforms.commodities',
+        'where': 'processed_at IS NOT NULL',
+        'series': 'commodity',
+        'prefix': 'comm',
+        'date': 'date',
+        'columns': ['value', 'comm_return_21d', 'comm_price_zscore_63d'],
+        'watermark': 'processed_at',
+        'publication_lag_days': 1,
+        'validity_days': None,
+    },
+}
+
+# What the trade success model uses
+DEFAULT_SOURCES = ('fundamentals', 'sector')
+
+
+class FeatureStore:
+    """Local Parquet copies of the feature sources, joined point-in-time on request."""
+
+    def __init__(self, root=None, sources=None, row_group_size=50000, in_memory=False):
+        """
+        Args:
+            root (str or Path, optional): Store directory. Defaults to
+                FEATURE_STORE_DIR, else data/feature_store in the repository.
+            sources (dict, optional): Source definitions (default: SOURCES)
+            row_group_size (int): Rows per Parquet row group
+            in_memory (bool): Keep each table in memory after its first read
+        """
+        self.root = Path(root or os.getenv('FEATURE_STORE_DIR') or DEFAULT_STORE_DIR)
+        self.sources = sources or SOURCES
+        self.row_group_size = row_group_size
+        self.in_memory = in_memory
+        self._tables = {}
+        self.manifest = self._read_manifest() or {'sources': {}}
+
+    # ==================== SYNC ====================
+
+    def _read_manifest(self):
+        path = self.root / 'manifest.json'
+        if path.exists():
+            return json.loads(path.read_text())
+        return None
+
+    def _write_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".manifest.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(self.manifest, indent=2, default=str))
+        os.replace(tmp, self.root / 'manifest.json')
+
+    def _path(self, name):
+        return self.root / f"{name}.parquet"
+
+    def _query(self, name):
+        """SELECT of a source's rows, sorted the way they are stored."""
+        source = self.sources[name]
+        if source.get('series'):
+            select = [f"{source['series']} AS series", source['date']]
+            order = f"{source['series']}, {source['date']}"
+        elif source['date'] is None:
+            return f"""
+                SELECT DISTINCT ON ({source['key']}) {source['key']} AS symbol, {', '.join(source['columns'])}
+                FROM {source['table']}
+                WHERE {source['where']}
+                ORDER BY {source['key']}
+            """
+        else:
+            date = f"{source['date_sql']} AS {source['date']}" if source.get('date_sql') else source['date']
+            select = [f"{source['key']} AS symbol", date]
+            order = f"{source['key']}, {source['date']}"
+        return f"""
+            SELECT {', '.join(select + source['columns'])}
+            FROM {source['table']}
+            WHERE {source['where']}
+            ORDER BY {order}
+        """
+
+    def _fetch(self, name, db):
+        return pd.read_sql(self._query(name), db.connection)
+
+    def _snapshot(self, name, db):
+        """Row count and max watermark of a source."""
+        source = self.sources[name]
+        watermark = f"MAX({source['watermark']})" if source.get('watermark') else 'NULL'
+        rows, max_watermark = db.fetch_query(
+            f"SELECT COUNT(*), {watermark} FROM {source['table']} WHERE {source['where']}"
+        )[0]
+        return {'rows': int(rows), 'max_watermark': None if max_watermark is None else str(max_watermark)}
+
+    def write_table(self, name, df, snapshot=None):
+        """
+        Store a source's rows, replacing the previous copy.
+
+        Args:
+            name (str): Source name
+            df (pd.DataFrame): Rows in the source's stored layout (symbol or
+                series, date column, feature columns)
+            snapshot (dict, optional): Snapshot the rows were read at
+        """
+        source = self.sources[name]
+        df = df.copy()
+        if source['date'] is not None:
+            df[source['date']] = pd.to_datetime(df[source['date']])
+        sort_by = ['series' if source.get('series') else 'symbol']
+        if source['date'] is not None:
+            sort_by.append(source['date'])
+        df = df.sort_values(sort_by, kind='stable').reset_index(drop=True)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(name)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp,
+                           row_group_size=self.row_group_size, compression='zstd')
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self._tables.pop(name, None)
+
+        self.manifest['sources'][name] = {
+            'rows': len(df),
+            'snapshot': snapshot,
+            'synced_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._write_manifest()
+
+    def sync(self, names=None, full=False, db=None):
+        """
+        Refresh sources whose snapshot moved since the last sync.
+
+        Args:
+            names (list, optional): Sources to sync (default: all)
+            full (bool): Re-read every source regardless of its snapshot
+            db (PostgresDatabaseManager, optional): Connected manager to use
+
+        Returns:
+            list: Names of the sources that were re-read
+        """
+        if db is None:
+            with PostgresDatabaseManager() as own_db:
+                return self.sync(names, full, own_db)
+
+        refreshed = []
+        for name in names or self.sources:
+            snapshot = self._snapshot(name, db)
+            stored = self.manifest['sources'].get(name)
+            if not full and stored and stored['snapshot'] == snapshot and self._path(name).exists():
+                continue
+            self.write_table(name, self._fetch(name, db), snapshot)
+            refreshed.append(name)
+        return refreshed
+
+    # ==================== READS ====================
+
+    def table(self, name, symbols=None):
+        """
+        A source's stored rows, syncing it first if it was never stored.
+
+        Args:
+            name (str): Source name
+            symbols (list, optional): Only these symbols (ignored for
+                market-wide sources)
+
+        Returns:
+            pd.DataFrame: Rows sorted by symbol (or series) and date
+        """
+        if not self._path(name).exists():
+            self.sync([name])
+        source = self.sources[name]
+        if symbols is not None and not source.get('series'):
+            symbols = sorted({str(symbol) for symbol in symbols if pd.notna(symbol)})
+
+        if self.in_memory:
+            if name not in self._tables:
+                self._tables[name] = pd.read_parquet(self._path(name))
+            rows = self._tables[name]
+            if symbols is None or source.get('series'):
+                return rows
+            return rows[rows['symbol'].isin(symbols)]
+
+        filters = None
+        if symbols is not None and not source.get('series'):
+            if not symbols:
+                return pd.read_parquet(self._path(name)).iloc[:0]
+            filters = [('symbol', 'in', symbols)]
+        return pd.read_parquet(self._path(name), filters=filters)
+
+    def feature_columns(self, sources=DEFAULT_SOURCES):
+        """Names of the columns join() adds for these sources."""
+        columns = []
+        for name in sources:
+            source = self.sources[name]
+            if source.get('series'):
+                series = self.table(name)['series'].unique()
+                columns += [_series_column(source, s, col) for s in series for col in source['columns']]
+            else:
+                columns += source['columns']
+        return columns
+
+    def join(self, df, date_column, sources=DEFAULT_SOURCES, key='symbol'):
+        """
+        Add the as-of features of each row's symbol and date.
+
+        Args:
+            df (pd.DataFrame): Trades or signals
+            date_column (str): Date each row's features must be known by
+            sources (list): Source names (default: fundamentals and sector)
+            key (str): Symbol column of df
+
+        Returns:
+            pd.DataFrame: df's rows, index and order plus the feature columns
+                (NaN where a source has nothing valid for the row)
+        """
+        result = df
+        for name in sources:
+            source = self.sources[name]
+            if source.get('series'):
+                result = self._join_series(result, date_column, name)
+                continue
+
+            rows = self.table(name, symbols=df[key].unique())
+            if source['date'] is None:
+                rows = rows.drop_duplicates('symbol').set_index('symbol')[source['columns']]
+                features = rows.reindex(df[key].astype(object).to_numpy())
+                features.index = result.index
+                result = pd.concat([result.drop(columns=source['columns'], errors='ignore'), features], axis=1)
+            else:
+                result = point_in_time_join(
+                    result.drop(columns=source['columns'], errors='ignore'),
+                    rows.rename(columns={'symbol': key}), left_on=date_column, right_on=source['date'], by=key,
+                    publication_lag_days=source['publication_lag_days'],
+                    validity_days=source['validity_days'], date_columns=False,
+                )
+        return result
+
+    def _join_series(self, df, date_column, name):
+        """As-of join of every series of a market-wide source, one column set per series."""
+        source = self.sources[name]
+        rows = self.table(name)
+        features = []
+        for series, group in rows.groupby('series', sort=True):
+            renamed = {col: _series_column(source, series, col) for col in source['columns']}
+            joined = point_in_time_join(
+                df[[date_column]], group.drop(columns=['series']).rename(columns=renamed),
+                left_on=date_column, right_on=source['date'], by=None,
+                publication_lag_days=source['publication_lag_days'],
+                validity_days=source['validity_days'], date_columns=False,
+            )
+            features.append(joined[list(renamed.values())])
+        if not features:
+            return df
+        features = pd.concat(features, axis=1)
+        return pd.concat([df.drop(columns=features.columns, errors='ignore'), features], axis=1)
+
+    def get_features(self, symbols, dates, sources=DEFAULT_SOURCES):
+        """
+        As-of feature vectors for (symbol, date) pairs.
+
+        Args:
+            symbols (list): Symbol of each pair
+            dates (list): Date of each pair
+            sources (list): Source names (default: fundamentals and sector)
+
+        Returns:
+            pd.DataFrame: symbol, date and the feature columns, one row per
+                pair in the order given
+        """
+        pairs = pd.DataFrame({'symbol': np.asarray(symbols, dtype=object), 'date': pd.to_datetime(dates)})
+        return self.join(pairs, 'date', sources=sources)
+
+
+def _series_column(source, series, column):
+    """Column name of one feature of one market-wide series, e.g. econ_treasury_yield_return_21d."""
+    prefix = source['prefix']
+    feature = column[len(prefix) + 1:] if column.startswith(f"{prefix}_") else column
+    return f"{prefix}_{str(series).lower()}_{feature}"
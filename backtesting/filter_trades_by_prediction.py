@@ -12,21 +12,25 @@ Usage:
     python filter_trades_by_prediction.py --threshold 0.75
     
     # Custom input/output
-    python filter_trades_by_prediction.py --model models/trade_success_model.pkl --threshold 0.8
+    python filter_trades_by_prediction.py --model models/trade_success_model.ubj --threshold 0.8
+    
+    # Trade logs in and out (backtest_strategies.py --output results.parquet)
+    python filter_trades_by_prediction.py --trades results_trades.parquet --output-trades trades_filtered.parquet
 """
 
 import sys
 import os
 import argparse
 import logging
-import pickle
 
 import pandas as pd
 import numpy as np
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from db.postgres_database_manager import PostgresDatabaseManager
+from backtesting.feature_store import DEFAULT_SOURCES, FeatureStore
+from backtesting.scoring_service import ScoringService
+from backtesting.trade_log import is_trade_log, read_trades, write_trade_log
 
 # Configure logging
 logging.basicConfig(
@@ -37,94 +41,35 @@ logger = logging.getLogger(__name__)
 
 
 def load_model(model_path):
-    """Load trained model."""
+    """Load trained model (artifact or pickle) into a scoring service."""
     logger.info(f"Loading model from {model_path}...")
-    with open(model_path, 'rb') as f:
-        model_data = pickle.load(f)
-    return model_data['model'], model_data['feature_names']
+    return ScoringService(model_path)
 
 
-def load_trades_with_sector(trades_csv):
-    """Load trades and attach sector and fundamental information."""
-    logger.info(f"Loading trades from {trades_csv}...")
-    df = pd.read_csv(trades_csv)
+def load_trades_with_sector(trades_path):
+    """Load trades (trade log or CSV) and attach sector and fundamental information."""
+    logger.info(f"Loading trades from {trades_path}...")
+    df = read_trades(trades_path)
     logger.info(f"Loaded {len(df):,} trades")
     
-    # Get sector and fundamentals data
+    # Sector and the fundamentals published by each entry date, as in training
+    # (join_fundamentals_to_trades.py), not each symbol's latest quarter
     logger.info("Fetching sector and fundamental data...")
-    db = PostgresDatabaseManager()
-    db.connect()
-    
-    # Get sector data
-    query_sector = """
-        SELECT symbol, sector
-        FROM raw.company_overview
-        WHERE sector IS NOT NULL
-    """
-    sector_df = pd.read_sql(query_sector, db.connection)
-    
-    # Get fundamental quality scores
-    query_fundamentals = """
-        SELECT 
-            symbol,
-            fiscal_date_ending,
-            overall_quality_score,
-            balance_sheet_quality_score,
-            cash_flow_quality_score, 
-            income_statement_quality_score,
-            bs_liquidity_score,
-            bs_leverage_score,
-            bs_asset_quality_score,
-            cf_generation_score,
-            cf_efficiency_score,
-            cf_sustainability_score,
-            is_profitability_score,
-            is_margin_score,
-            is_growth_score
-        FROM transforms.fundamental_quality_scores
-        WHERE processed_at IS NOT NULL
-        ORDER BY symbol, fiscal_date_ending DESC
-    """
-    fundamentals_df = pd.read_sql(query_fundamentals, db.connection)
-    db.close()
-    
-    # For each symbol, keep only the most recent fundamental data
-    fundamentals_df = fundamentals_df.drop_duplicates(subset=['symbol'], keep='first')
-    
-    # Join sector
-    df = df.merge(sector_df, on='symbol', how='left')
+    store = FeatureStore()
+    store.sync(DEFAULT_SOURCES)
+    df = store.join(df, 'entry_date', sources=DEFAULT_SOURCES)
     df['sector'] = df['sector'].fillna('UNKNOWN')
     
-    # Join fundamentals
-    df = df.merge(fundamentals_df.drop(columns=['fiscal_date_ending']), on='symbol', how='left')
-    
     logger.info(f"Sector data attached for {df['sector'].notna().sum():,} trades")
     logger.info(f"Fundamental data attached for {df['overall_quality_score'].notna().sum():,} trades")
     
     return df
 
 
-def prepare_features_for_prediction(df, feature_names):
-    """Prepare features matching the training data format."""
+def prepare_features_for_prediction(df, service):
+    """Prepare features matching the training data format (see backtesting/scoring_service.py)."""
     logger.info("Preparing features for prediction...")
     
-    # Numeric features
-    numeric_features = [
-        'overall_quality_score',
-        'balance_sheet_quality_score',
-        'cash_flow_quality_score', 
-        'income_statement_quality_score',
-        'bs_liquidity_score',
-        'bs_leverage_score',
-        'bs_asset_quality_score',
-        'cf_generation_score',
-        'cf_efficiency_score',
-        'cf_sustainability_score',
-        'is_profitability_score',
-        'is_margin_score',
-        'is_growth_score'
-    ]
-    
     # For trades without fundamentals, we can't make predictions
     # Filter to trades with fundamental data
     df_with_fundamentals = df.dropna(subset=['overall_quality_score']).copy()
@@ -134,42 +79,7 @@ def prepare_features_for_prediction(df, feature_names):
         logger.error("No trades with fundamental data found!")
         return None, None
     
-    # Create feature matrix starting with numeric features
-    X = df_with_fundamentals[numeric_features].copy()
-    
-    # Fill missing numeric values with median (same as training)
-    for col in X.columns:
-        if X[col].isna().any():
-            median_val = X[col].median()
-            X[col] = X[col].fillna(median_val)
-    
-    # One-hot encode sector
-    sector_dummies = pd.get_dummies(df_with_fundamentals['sector'], prefix='sector', drop_first=False)
-    X = pd.concat([X, sector_dummies], axis=1)
-    
-    # One-hot encode strategy
-    strategy_dummies = pd.get_dummies(df_with_fundamentals['strategy'], prefix='strategy', drop_first=False)
-    X = pd.concat([X, strategy_dummies], axis=1)
-    
-    # Ensure all features from training are present
-    current_features = set(X.columns)
-    required_features = set(feature_names)
-    
-    # Add missing features as zeros
-    missing_features = required_features - current_features
-    if missing_features:
-        logger.info(f"Adding {len(missing_features)} missing features as zeros")
-        for feat in missing_features:
-            X[feat] = 0
-    
-    # Remove extra features
-    extra_features = current_features - required_features
-    if extra_features:
-        logger.info(f"Removing {len(extra_features)} extra features")
-        X = X.drop(columns=list(extra_features))
-    
-    # Reorder columns to match training
-    X = X[feature_names]
+    X = service.build_features(df_with_fundamentals)
     
     logger.info(f"Feature matrix prepared: {X.shape[0]:,} rows × {X.shape[1]} features")
     
@@ -310,14 +220,14 @@ def main():
     parser.add_argument(
         '--model',
         type=str,
-        default='models/trade_success_model.pkl',
-        help='Path to trained model (default: models/trade_success_model.pkl)'
+        default='models/trade_success_model.ubj',
+        help='Path to trained model artifact (.ubj) or pickle (default: models/trade_success_model.ubj)'
     )
     parser.add_argument(
         '--trades',
         type=str,
         default='backtesting/strategy_performance_with_cooldown_trades.csv',
-        help='Path to trades CSV (default: strategy_performance_with_cooldown_trades.csv)'
+        help='Path to trades CSV or trade log .parquet (default: strategy_performance_with_cooldown_trades.csv)'
     )
     parser.add_argument(
         '--threshold',
@@ -335,7 +245,7 @@ def main():
         '--output-trades',
         type=str,
         default='backtesting/trades_filtered_80pct.csv',
-        help='Output CSV for filtered trades'
+        help='Output CSV (or .parquet trade log) for filtered trades'
     )
     
     args = parser.parse_args()
@@ -352,20 +262,20 @@ def main():
     logger.info(f"Threshold: {args.threshold * 100:.0f}%")
     
     # Load model
-    model, feature_names = load_model(args.model)
+    service = load_model(args.model)
     
     # Load trades
     df = load_trades_with_sector(args.trades)
     
     # Prepare features
-    X, df_with_fundamentals = prepare_features_for_prediction(df, feature_names)
+    X, df_with_fundamentals = prepare_features_for_prediction(df, service)
     
     if X is None:
         logger.error("Failed to prepare features")
         return
     
     # Predict and filter
-    filtered_df = predict_and_filter(df_with_fundamentals, X, model, args.threshold)
+    filtered_df = predict_and_filter(df_with_fundamentals, X, service.model, args.threshold)
     
     if len(filtered_df) == 0:
         logger.warning(f"No trades met the {args.threshold} probability threshold!")
@@ -382,7 +292,10 @@ def main():
     performance_df.to_csv(args.output_performance, index=False)
     logger.info(f"  Performance report: {args.output_performance}")
     
-    filtered_df.to_csv(args.output_trades, index=False)
+    if is_trade_log(args.output_trades):
+        write_trade_log(filtered_df, args.output_trades)
+    else:
+        filtered_df.to_csv(args.output_trades, index=False)
     logger.info(f"  Filtered trades: {args.output_trades}")
     
     logger.info("\n" + "=" * 80)
@@ -0,0 +1,273 @@
+"""
+Hyperparameter Search for the Trade Success Model
+
+TradeSuccessPredictor trains one fixed XGBoost configuration. This module
+searches tree depth, learning rate, row/column subsampling and
+min_child_weight (tree_method='hist' throughout) by successive halving:
+
+1. --search random configurations are drawn from SEARCH_SPACE
+2. every configuration is trained with the fewest boosting rounds
+   (min_rounds) and scored by its mean out-of-sample AUC over time-ordered
+   folds
+3. the best 1/eta of them go on to eta times as many rounds, and so on up to
+   max_rounds
+
+so most of the compute goes to the configurations that look best, and a
+configuration's AUC at the last rung it reached is directly comparable to
+the others there. A configuration left alone before the last rung goes
+straight to max_rounds, so the winner, the best configuration of the final
+rung, always comes with max_rounds boosting rounds.
+
+Folds are expanding windows over the rows sorted by entry date: the rows are
+cut into n_folds + 1 consecutive blocks, and fold i trains on blocks 0..i and
+validates on block i + 1. No fold validates on trades older than the ones it
+trained on.
+
+Trials of a rung run in a process pool. Each worker gets cpus // workers
+XGBoost threads, so the pool never asks for more threads than there are
+cores. Every trial records its wall-clock time.
+
+Usage:
+    from backtesting.hyperparameter_search import SuccessiveHalvingSearch
+
+    search = SuccessiveHalvingSearch(predictor, n_trials=27, n_folds=4)
+    trials_df, best_params = search.run(X_train, y_train, entry_dates, workers=8)
+    predictor.params = best_params
+"""
+
+import os
+import time
+import logging
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+
+logger = logging.getLogger(__name__)
+
+# Choices (list) or ranges (tuple); learning_rate is sampled log-uniformly
+SEARCH_SPACE = {
+    'max_depth': [3, 4, 5, 6, 8, 10],
+    'learning_rate': (0.01, 0.3),
+    'subsample': (0.5, 1.0),
+    'colsample_bytree': (0.5, 1.0),
+    'min_child_weight': [1, 2, 5, 10, 20],
+}
+LOG_UNIFORM = {'learning_rate'}
+
+
+# Search, data and settings owned by a trial pool worker (set by _init_trial_worker)
+_trial_worker = None
+
+
+def _init_trial_worker(search, X, y, folds, n_jobs):
+    """
+    Pool initializer: keep the training data for the life of the worker.
+
+    Args:
+        search (SuccessiveHalvingSearch): Search the trials belong to
+        X (np.ndarray): Feature matrix
+        y (np.ndarray): Labels
+        folds (list): (train_idx, valid_idx) pairs from time_series_folds()
+        n_jobs (int): XGBoost threads per trial
+    """
+    global _trial_worker
+    _trial_worker = (search, X, y, folds, n_jobs)
+
+
+def _run_trial_worker(trial):
+    """
+    Evaluate one trial in a pool worker.
+
+    Args:
+        trial (dict): Trial id and params
+
+    Returns:
+        dict: Result of evaluate()
+    """
+    search, X, y, folds, n_jobs = _trial_worker
+    return search.evaluate(trial, X, y, folds, n_jobs)
+
+
+def time_series_folds(dates, n_folds=4):
+    """
+    Expanding-window folds over rows sorted by date.
+
+    Args:
+        dates (array-like): Entry date of each row
+        n_folds (int): Number of folds
+
+    Returns:
+        list: (train_idx, valid_idx) row position arrays, oldest fold first
+    """
+    order = np.argsort(np.asarray(dates, dtype='datetime64[ns]'), kind='stable')
+    blocks = np.array_split(order, n_folds + 1)
+    return [(np.concatenate(blocks[:i + 1]), blocks[i + 1]) for i in range(n_folds)]
+
+
+class SuccessiveHalvingSearch:
+    """Random hyperparameter configurations, successively halved by out-of-sample AUC."""
+
+    def __init__(self, predictor, n_trials=27, n_folds=4, eta=3, min_rounds=50, max_rounds=400,
+                 space=None, random_state=42):
+        """
+        Args:
+            predictor (TradeSuccessPredictor): Builds the classifiers
+            n_trials (int): Configurations drawn (default: 27)
+            n_folds (int): Time-ordered CV folds (default: 4)
+            eta (int): Keep 1/eta of the configurations per rung and give
+                them eta times the rounds (default: 3)
+            min_rounds (int): Boosting rounds of the first rung (default: 50)
+            max_rounds (int): Boosting rounds of the last rung (default: 400)
+            space (dict, optional): Search space (default: SEARCH_SPACE)
+            random_state (int): Seed of the configuration draw
+        """
+        self.predictor = predictor
+        self.n_trials = n_trials
+        self.n_folds = n_folds
+        self.eta = eta
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.space = space or SEARCH_SPACE
+        self.random_state = random_state
+
+    def sample_configs(self):
+        """n_trials random configurations from the search space."""
+        rng = np.random.default_rng(self.random_state)
+        configs = []
+        for _ in range(self.n_trials):
+            config = {}
+            for name, values in self.space.items():
+                if isinstance(values, list):
+                    config[name] = values[rng.integers(len(values))]
+                elif name in LOG_UNIFORM:
+                    config[name] = float(np.exp(rng.uniform(np.log(values[0]), np.log(values[1]))))
+                else:
+                    config[name] = float(rng.uniform(*values))
+            configs.append(config)
+        return configs
+
+    def rungs(self):
+        """Boosting rounds of each rung, e.g. [50, 150, 400]."""
+        rounds, rungs = self.min_rounds, []
+        while rounds < self.max_rounds:
+            rungs.append(int(rounds))
+            rounds *= self.eta
+        return rungs + [self.max_rounds]
+
+    def evaluate(self, trial, X, y, folds, n_jobs=-1):
+        """
+        Train one configuration on every fold.
+
+        Args:
+            trial (dict): trial (id), rung, params (including n_estimators)
+            X (np.ndarray): Feature matrix
+            y (np.ndarray): Labels
+            folds (list): (train_idx, valid_idx) pairs
+            n_jobs (int): XGBoost threads
+
+        Returns:
+            dict: Trial id, rung, params, mean/std AUC over folds and seconds
+        """
+        start = time.perf_counter()
+        aucs = []
+        for train_idx, valid_idx in folds:
+            y_train, y_valid = y[train_idx], y[valid_idx]
+            if len(np.unique(y_train)) < 2 or len(np.unique(y_valid)) < 2:
+                continue
+            scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
+            model = self.predictor.make_classifier(scale_pos_weight, n_jobs=n_jobs, tree_method='hist',
+                                                   **trial['params'])
+            model.fit(X[train_idx], y_train, verbose=False)
+            aucs.append(roc_auc_score(y_valid, model.predict_proba(X[valid_idx])[:, 1]))
+
+        return {
+            'trial': trial['trial'],
+            'rung': trial['rung'],
+            **trial['params'],
+            'auc': float(np.mean(aucs)) if aucs else np.nan,
+            'auc_std': float(np.std(aucs)) if aucs else np.nan,
+            'folds': len(aucs),
+            'seconds': time.perf_counter() - start,
+        }
+
+    def run(self, X, y, dates, workers=None):
+        """
+        Run the search.
+
+        Args:
+            X (pd.DataFrame or np.ndarray): Feature matrix
+            y (array-like): Labels
+            dates (array-like): Entry date of each row
+            workers (int, optional): Trial processes, at most one per
+                configuration (default: one per CPU; 1 = no pool)
+
+        Returns:
+            tuple: (trials DataFrame with one row per trial and rung, best
+                params including n_estimators)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        folds = time_series_folds(dates, self.n_folds)
+        configs = self.sample_configs()
+        rungs = self.rungs()
+
+        cpus = os.cpu_count() or 1
+        workers = min(workers or cpus, len(configs))
+        n_jobs = max(1, cpus // workers)
+        logger.info(f"Searching {len(configs)} configurations over rungs {rungs} "
+                    f"({self.n_folds} time-ordered folds) on {workers} workers x {n_jobs} threads")
+
+        pool = None
+        if workers > 1:
+            pool = Pool(processes=workers, initializer=_init_trial_worker,
+                        initargs=(self, X, y, folds, n_jobs))
+        try:
+            results = []
+            candidates = list(enumerate(configs))
+            rung = 0
+            while True:
+                # A lone candidate has nothing left to be ranked against: train
+                # it with the final rung's rounds straight away
+                if len(candidates) == 1:
+                    rung = len(rungs) - 1
+                rounds = rungs[rung]
+                trials = [{'trial': trial_id, 'rung': rung, 'params': {**config, 'n_estimators': rounds}}
+                          for trial_id, config in candidates]
+                start = time.perf_counter()
+                if pool is None:
+                    rung_results = [self.evaluate(trial, X, y, folds, n_jobs) for trial in trials]
+                else:
+                    rung_results = list(pool.imap(_run_trial_worker, trials))
+                results += rung_results
+
+                for result in rung_results:
+                    logger.info(f"  rung {rung} ({rounds} rounds) trial {result['trial']:3d}: "
+                                f"AUC {result['auc']:.4f} ± {result['auc_std']:.4f} in {result['seconds']:.1f}s")
+                logger.info(f"Rung {rung}: {len(trials)} trials in {time.perf_counter() - start:.1f}s")
+
+                if rung == len(rungs) - 1:
+                    break
+                ranked = sorted(rung_results, key=lambda r: -np.nan_to_num(r['auc'], nan=-np.inf))
+                keep = {r['trial'] for r in ranked[:max(1, len(candidates) // self.eta)]}
+                candidates = [(trial_id, config) for trial_id, config in candidates if trial_id in keep]
+                rung += 1
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        trials_df = pd.DataFrame(results)
+        final = trials_df[trials_df['rung'] == trials_df['rung'].max()]
+        best = final.loc[final['auc'].fillna(-np.inf).idxmax()]
+        best_params = {name: best[name] for name in self.space}
+        best_params['n_estimators'] = int(best['n_estimators'])
+        for name, values in self.space.items():
+            if isinstance(values, list):
+                best_params[name] = type(values[0])(best_params[name])
+            else:
+                best_params[name] = float(best_params[name])
+
+        logger.info(f"Best configuration (trial {int(best['trial'])}, AUC {best['auc']:.4f}): {best_params}")
+        return trials_df, best_params
@@ -1,7 +1,7 @@
 """Join fundamental quality scores to backtest trades with 45-day lag.
 
 This program:
-1. Loads backtest trades from CSV (or regenerates from database)
+1. Loads backtest trades from a Parquet trade log or CSV (or regenerates from database)
 2. Loads fundamental quality scores with +45 day lag applied
 3. Joins fundamentals to trades where trade date is within 90 days after lagged fundamental date
 4. Outputs enriched dataset with same number of records as input trades
@@ -13,7 +13,8 @@ Lag Logic:
 - This ensures fundamentals are available before trades and maximizes sample size
 
 Usage:
-    # From CSV (faster)
+    # From a trade log (backtest_strategies.py --output results.parquet) or CSV
+    python join_fundamentals_to_trades.py --input results_trades.parquet
     python join_fundamentals_to_trades.py --input strategy_performance_report_trades.csv
     
     # Regenerate from database
@@ -36,6 +37,9 @@ import numpy as np
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.postgres_database_manager import PostgresDatabaseManager
+from backtesting.feature_store import FeatureStore
+from backtesting.point_in_time import point_in_time_join
+from backtesting.trade_log import read_trades
 
 # Configure logging
 logging.basicConfig(
@@ -60,14 +64,10 @@ class FundamentalTradeJoiner:
         self.publication_lag_days = publication_lag_days
         self.lookforward_window_days = lookforward_window_days
         
-    def load_trades_from_csv(self, csv_path: str) -> pd.DataFrame:
-        """Load trades from CSV file."""
-        logger.info(f"Loading trades from {csv_path}...")
-        df = pd.read_csv(csv_path)
-        
-        # Ensure date columns are datetime
-        df['entry_date'] = pd.to_datetime(df['entry_date'])
-        df['exit_date'] = pd.to_datetime(df['exit_date'])
+    def load_trades_from_file(self, trades_path: str) -> pd.DataFrame:
+        """Load trades from a Parquet trade log or CSV file."""
+        logger.info(f"Loading trades from {trades_path}...")
+        df = read_trades(trades_path)
         
         logger.info(f"Loaded {len(df):,} trades")
         logger.info(f"Date range: {df['entry_date'].min()} to {df['entry_date'].max()}")
@@ -104,7 +104,7 @@ class FundamentalTradeJoiner:
                     r.adjusted_close
                 FROM transforms.trading_signals ts
                 INNER JOIN raw.time_series_daily_adjusted r
-                    ON r.symbol_id::integer = ts.symbol_id
+                    ON r.symbol_id_int = ts.symbol_id
                     AND r.date = ts.date
                 WHERE ts.processed_at IS NOT NULL
                 {date_filter}
@@ -120,38 +120,14 @@ class FundamentalTradeJoiner:
         return df
     
     def load_fundamental_scores(self) -> pd.DataFrame:
-        """Load fundamental quality scores from database."""
+        """Load every quarter of fundamental quality scores from the feature store."""
         logger.info("Loading fundamental quality scores...")
         
-        query = """
-            SELECT 
-                symbol_id,
-                symbol,
-                fiscal_date_ending,
-                balance_sheet_quality_score,
-                cash_flow_quality_score,
-                income_statement_quality_score,
-                overall_quality_score,
-                bs_liquidity_score,
-                bs_leverage_score,
-                bs_asset_quality_score,
-                cf_generation_score,
-                cf_efficiency_score,
-                cf_sustainability_score,
-                is_profitability_score,
-                is_margin_score,
-                is_growth_score,
-                is_high_quality,
-                is_investment_grade,
-                has_red_flags,
-                processed_at
-            FROM transforms.fundamental_quality_scores
-            WHERE processed_at IS NOT NULL
-            ORDER BY symbol_id, fiscal_date_ending
-        """
-        
+        # Every quarter from the feature store (the copy the scorers join from)
         self.db.connect()
-        df = pd.read_sql(query, self.db.connection)
+        store = FeatureStore()
+        store.sync(['fundamentals'], db=self.db)
+        df = store.table('fundamentals')
         
         # Convert dates
         df['fiscal_date_ending'] = pd.to_datetime(df['fiscal_date_ending'])
@@ -184,10 +160,6 @@ class FundamentalTradeJoiner:
         logger.info(f"Publication lag: {self.publication_lag_days} days")
         logger.info(f"Lookforward window: {self.lookforward_window_days} days")
         
-        # Add unique trade ID to preserve all original trades
-        trades_df = trades_df.copy()
-        trades_df['_trade_id'] = range(len(trades_df))
-        
         # Prepare fundamentals for merge
         fund_cols = [
             'symbol', 'fiscal_date_ending', 'publication_date', 'valid_until_date',
@@ -198,58 +170,14 @@ class FundamentalTradeJoiner:
             'is_profitability_score', 'is_margin_score', 'is_growth_score',
             'is_high_quality', 'is_investment_grade', 'has_red_flags'
         ]
-        fundamentals_df = fundamentals_df[fund_cols].copy()
         
-        # Use conditional merge: join all matching symbol/date pairs, then filter
-        logger.info("Performing conditional merge (this may take a few minutes)...")
-        
-        # Step 1: Cross join on symbol (use left join to preserve all trades)
-        enriched_df = trades_df.merge(fundamentals_df, on='symbol', how='left', suffixes=('', '_fund'))
-        
-        logger.info(f"After initial merge: {len(enriched_df):,} rows")
-        
-        # Step 2: Filter to valid date ranges OR keep if no fundamental match
-        # Keep only where: publication_date <= entry_date <= valid_until_date OR fundamentals are null
-        valid_mask = (
-            enriched_df['publication_date'].isna() |  # Keep unmatched trades
-            (
-                (enriched_df['publication_date'] <= enriched_df['entry_date']) &
-                (enriched_df['entry_date'] <= enriched_df['valid_until_date'])
-            )
+        # Latest publication on or before entry_date per symbol, dropped once it expires:
+        # one row per trade, in trade order, without a symbol-level cross join
+        enriched_df = point_in_time_join(
+            trades_df, fundamentals_df[fund_cols], left_on='entry_date', right_on='fiscal_date_ending',
+            by='symbol', publication_lag_days=self.publication_lag_days,
+            validity_days=self.lookforward_window_days, suffixes=('', '_fund'),
         )
-        enriched_df = enriched_df[valid_mask].copy()
-        
-        logger.info(f"After date filtering: {len(enriched_df):,} rows")
-        
-        # Step 3: For each trade, keep only the most recent fundamental data (or the null match)
-        # Sort by fiscal_date_ending descending so we keep the latest fundamental
-        enriched_df = enriched_df.sort_values('fiscal_date_ending', ascending=False, na_position='last')
-        enriched_df = enriched_df.drop_duplicates(
-            subset=['_trade_id'],  # Use unique trade ID to preserve all original trades
-            keep='first'
-        ).sort_index()
-        
-        # Step 4: Add back trades that were completely filtered out (no valid fundamental match)
-        matched_trade_ids = set(enriched_df['_trade_id'])
-        all_trade_ids = set(trades_df['_trade_id'])
-        missing_trade_ids = all_trade_ids - matched_trade_ids
-        
-        if len(missing_trade_ids) > 0:
-            logger.info(f"Adding back {len(missing_trade_ids):,} trades with no valid fundamental match")
-            missing_trades = trades_df[trades_df['_trade_id'].isin(missing_trade_ids)].copy()
-            
-            # Add null fundamental columns to match schema
-            fund_cols_to_add = [col for col in enriched_df.columns if col not in missing_trades.columns]
-            for col in fund_cols_to_add:
-                missing_trades[col] = None
-            
-            # Combine
-            enriched_df = pd.concat([enriched_df, missing_trades], ignore_index=True)
-        
-        # Drop the temporary trade ID
-        enriched_df = enriched_df.drop(columns=['_trade_id'])
-        
-        logger.info(f"After adding missing trades: {len(enriched_df):,} rows")
         
         # Count matches
         matched = enriched_df['fiscal_date_ending'].notna().sum()
@@ -333,7 +261,7 @@ def main():
         '--input',
         type=str,
         default='backtesting/strategy_performance_report_trades.csv',
-        help='Input CSV file with backtest trades'
+        help='Input trade log (.parquet) or CSV file with backtest trades'
     )
     parser.add_argument(
         '--output',
@@ -344,7 +272,7 @@ def main():
     parser.add_argument(
         '--regenerate',
         action='store_true',
-        help='Regenerate trades from database instead of loading from CSV'
+        help='Regenerate trades from database instead of loading from --input'
     )
     parser.add_argument(
         '--lag-days',
@@ -387,7 +315,7 @@ def main():
     if args.regenerate:
         trades_df = joiner.load_trades_from_database(args.start_date, args.end_date)
     else:
-        trades_df = joiner.load_trades_from_csv(args.input)
+        trades_df = joiner.load_trades_from_file(args.input)
     
     # Load fundamentals
     fundamentals_df = joiner.load_fundamental_scores()
@@ -0,0 +1,240 @@
+"""
+Trade Success Model Artifact
+
+The model used to be a pickled dict holding the sklearn-API XGBClassifier and
+its feature names. Unpickling it imports xgboost and sklearn and rebuilds the
+whole estimator, so it was tied to the xgboost version that wrote it and every
+scorer paid for the import at start-up even before it had a signal to score.
+An artifact is two files instead:
+
+    models/trade_success_model.ubj     the booster in XGBoost's native UBJSON
+    models/trade_success_model.json    sidecar manifest
+
+The manifest holds everything needed to build and judge a feature matrix:
+
+- feature_names: column order the booster expects
+- numeric_features, vocabularies and fill_values: the FeatureEncoder fitted
+  on the training data (backtesting/feature_encoder.py)
+- threshold: success probability at which a signal is taken
+- training_data_hash: SHA-256 of the training input file
+- params: XGBoost hyperparameters, plus format and xgboost versions
+
+ModelArtifact reads only the manifest. xgboost is imported and the booster
+loaded on the first prediction (or by load_booster()). That moves the cost
+rather than removing it: the time to the first score is about what unpickling
+took (scripts/benchmark_model_load.py), but a scorer that finds nothing to
+score never pays it, and a long-lived service pays it once while warming up.
+Old pickles still load through load_model().
+
+Usage:
+    from backtesting.model_artifact import load_model, save_artifact
+
+    save_artifact(model, 'models/trade_success_model.ubj', encoder, threshold=0.8)
+    model = load_model('models/trade_success_model.ubj')
+    probabilities = model.predict_proba(model.encoder.transform(signals_df))[:, 1]
+
+    # Convert a pickled model
+    python -m backtesting.model_artifact old_model.pkl models/trade_success_model.ubj
+"""
+
+import json
+import logging
+import os
+import pickle
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from backtesting.feature_encoder import FeatureEncoder
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 1
+DEFAULT_THRESHOLD = 0.8
+
+
+def manifest_path(path):
+    """Sidecar manifest of a booster file: same name, .json suffix."""
+    return Path(path).with_suffix('.json')
+
+
+def save_artifact(model, path, encoder, threshold=DEFAULT_THRESHOLD, training_data_hash=None, params=None):
+    """
+    Write a model's booster and manifest.
+
+    Args:
+        model (xgb.XGBClassifier or xgb.Booster): Trained model
+        path (str or Path): Booster file (.ubj); the manifest goes next to it
+        encoder (FeatureEncoder): Encoder the training matrix was built with
+        threshold (float): Success probability at which a signal is taken
+        training_data_hash (str, optional): SHA-256 of the training input
+        params (dict, optional): Hyperparameters, recorded for reference
+
+    Returns:
+        Path: The booster file
+    """
+    import xgboost as xgb
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+
+    manifest = {
+        'version': ARTIFACT_VERSION,
+        'booster': path.name,
+        **encoder.to_dict(),
+        'threshold': threshold,
+        'training_data_hash': training_data_hash,
+        'params': params or {},
+        'xgboost_version': xgb.__version__,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+    # Booster first, manifest last: a manifest always describes a complete booster
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp.ubj")
+    try:
+        booster.save_model(str(tmp))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    manifest_file = manifest_path(path)
+    tmp = manifest_file.with_name(f".{manifest_file.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, default=str))
+    os.replace(tmp, manifest_file)
+    return path
+
+
+class ModelArtifact:
+    """A saved model: manifest read at once, booster loaded on first use."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str or Path): Booster file (.ubj) with its manifest next to it
+        """
+        self.path = Path(path)
+        self.manifest = json.loads(manifest_path(self.path).read_text())
+        if self.manifest.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported model artifact version {self.manifest.get('version')} in {self.path}")
+        self.encoder = FeatureEncoder.from_dict(self.manifest)
+        if self.encoder.fill_values is None:
+            logger.warning(f"{self.path} has no training medians: numeric gaps get each batch's median. "
+                           f"Retrain with backtesting/trade_success_predictor.py to record them.")
+        self.feature_names = self.encoder.feature_names
+        self.vocabularies = self.encoder.vocabularies
+        self.threshold = self.manifest.get('threshold', DEFAULT_THRESHOLD)
+        self.training_data_hash = self.manifest.get('training_data_hash')
+        self._booster = None
+
+    @property
+    def booster(self):
+        """The xgb.Booster, loaded (and xgboost imported) on first access."""
+        if self._booster is None:
+            import xgboost as xgb
+
+            booster = xgb.Booster()
+            booster.load_model(str(self.path))
+            self._booster = booster
+        return self._booster
+
+    def load_booster(self):
+        """Load the booster now and run one prediction, so the first real one is not slowed by it."""
+        self.predict_proba(np.zeros((1, len(self.feature_names)), dtype=np.float32))
+        return self
+
+    def predict_proba(self, X):
+        """
+        Class probabilities, as XGBClassifier.predict_proba returns them.
+
+        Args:
+            X (pd.DataFrame or np.ndarray): Features; DataFrame columns are
+                taken in feature_names order
+
+        Returns:
+            np.ndarray: rows x 2, [P(unsuccessful), P(successful)]
+        """
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got {X.shape[1]}")
+        success = self.booster.inplace_predict(X, validate_features=False)
+        return np.column_stack([1 - success, success])
+
+    @classmethod
+    def from_pickle(cls, path, categorical=('sector', 'strategy')):
+        """
+        Wrap a pickled model dict (TradeSuccessPredictor.save_model) in the
+        artifact interface.
+
+        Args:
+            path (str or Path): Pickle file
+            categorical (tuple): One-hot encoded features
+
+        Returns:
+            ModelArtifact: Artifact with the booster already loaded
+        """
+        with open(path, 'rb') as f:
+            model_data = pickle.load(f)
+
+        if model_data.get('encoder'):
+            encoder = FeatureEncoder.from_dict(model_data['encoder'])
+        else:
+            encoder = FeatureEncoder.from_feature_names(model_data['feature_names'], categorical)
+
+        artifact = cls.__new__(cls)
+        artifact.path = Path(path)
+        artifact.encoder = encoder
+        artifact.feature_names = encoder.feature_names
+        artifact.vocabularies = encoder.vocabularies
+        artifact.threshold = model_data.get('threshold', DEFAULT_THRESHOLD)
+        artifact.training_data_hash = model_data.get('training_data_hash')
+        artifact.manifest = {
+            'version': ARTIFACT_VERSION,
+            **encoder.to_dict(),
+            'threshold': artifact.threshold,
+            'training_data_hash': artifact.training_data_hash,
+            'params': model_data.get('params') or _estimator_params(model_data['model']),
+        }
+        artifact._booster = model_data['model'].get_booster()
+        return artifact
+
+    def save(self, path):
+        """Write this model as an artifact (e.g. to convert a pickle)."""
+        return save_artifact(self.booster, path, self.encoder, threshold=self.threshold,
+                             training_data_hash=self.training_data_hash, params=self.manifest.get('params'))
+
+
+def _estimator_params(model):
+    """Hyperparameters set on a pickled XGBClassifier (pickles saved before params were recorded)."""
+    return {
+        key: value.item() if isinstance(value, np.generic) else value
+        for key, value in model.get_params().items()
+        if isinstance(value, (bool, int, float, str, np.generic)) and not (isinstance(value, float) and np.isnan(value))
+    }
+
+
+def load_model(path):
+    """
+    Load a model artifact, or a pickled model when path is a pickle.
+
+    Args:
+        path (str or Path): Booster file (.ubj) or pickle (.pkl)
+
+    Returns:
+        ModelArtifact: Model with encoder, feature_names, vocabularies,
+            threshold and predict_proba()
+    """
+    if Path(path).suffix == '.pkl':
+        return ModelArtifact.from_pickle(path)
+    return ModelArtifact(path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m backtesting.model_artifact <model.pkl> <model.ubj>")
+    saved = ModelArtifact.from_pickle(sys.argv[1]).save(sys.argv[2])
+    print(f"Saved {saved} and {manifest_path(saved)}")
@@ -0,0 +1,259 @@
+"""
+Monte Carlo Bootstrap of Backtest Results
+
+calculate_metrics and equity_metrics give one number per strategy: the win
+rate, profit factor, Sharpe ratio and drawdown of the one trade sequence the
+backtest happened to produce. This module resamples that sequence many times
+(10,000 by default) and reports how much each metric moves, as a confidence
+interval:
+
+- trades: draw len(trades) trades with replacement, in random order, and
+  compute the calculate_metrics definitions on each draw (max drawdown then
+  also reflects the luck of the trade order)
+- daily equity: rebuild the curve from blocks of consecutive daily returns
+  (circular moving-block bootstrap, so volatility clustering within a block
+  survives) and compute the equity_metrics definitions; win rate and profit
+  factor are then over days
+
+Resamples are built as 2-D index arrays, one row per resample, and every
+metric is a reduction along axis 1, so there is no Python loop per resample.
+Rows are processed in batches that keep each 2-D array under max_cells
+values.
+
+Usage:
+    from backtesting.monte_carlo import MonteCarloBootstrap
+
+    bootstrap = MonteCarloBootstrap(n_resamples=10000, confidence=0.95, random_state=42)
+    ci_df = bootstrap.bootstrap_trades(all_trades_df, initial_capital=100000)
+    ci_df = bootstrap.bootstrap_equity(equity_df, initial_capital=100000)
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+
+METRICS = ['win_rate', 'profit_factor', 'sharpe_ratio', 'max_drawdown', 'total_return_pct']
+
+CI_COLUMNS = ['strategy', 'method', 'metric', 'estimate', 'mean', 'ci_lower', 'ci_upper', 'observations', 'resamples']
+
+
+def trade_metrics(pnl, pnl_pct, initial_capital, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    calculate_metrics' win rate, profit factor, Sharpe and drawdown, per row.
+
+    Args:
+        pnl (np.ndarray): Trade P&L in dollars, shape (resamples, trades) in
+            exit order
+        pnl_pct (np.ndarray): Trade return in percent, same shape
+        initial_capital (float): Starting capital
+        periods_per_year (int): Sharpe annualization (default: 252)
+
+    Returns:
+        dict: METRICS name -> array of one value per row
+    """
+    n_trades = pnl.shape[1]
+    gross_profit = np.where(pnl > 0, pnl, 0).sum(axis=1)
+    gross_loss = -np.where(pnl < 0, pnl, 0).sum(axis=1)
+
+    mean = pnl_pct.mean(axis=1)
+    std = pnl_pct.std(axis=1)
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std != 0) * np.sqrt(periods_per_year)
+    if n_trades < 2:
+        sharpe[:] = 0.0
+
+    capital = initial_capital + np.cumsum(pnl, axis=1)
+    running_max = np.maximum.accumulate(capital, axis=1)
+
+    return {
+        'win_rate': (pnl > 0).mean(axis=1) * 100,
+        'profit_factor': np.divide(gross_profit, gross_loss, out=np.zeros_like(gross_profit),
+                                   where=gross_loss != 0),
+        'sharpe_ratio': sharpe,
+        'max_drawdown': ((capital - running_max) / running_max).min(axis=1) * 100,
+        'total_return_pct': pnl.sum(axis=1) / initial_capital * 100,
+    }
+
+
+def return_metrics(returns, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    equity_metrics' Sharpe, drawdown and return plus daily win rate and profit factor, per row.
+
+    Args:
+        returns (np.ndarray): Daily returns (0.01 = 1%), shape (resamples, days)
+        periods_per_year (int): Sharpe annualization (default: 252)
+
+    Returns:
+        dict: METRICS name -> array of one value per row
+    """
+    gains = np.where(returns > 0, returns, 0).sum(axis=1)
+    losses = -np.where(returns < 0, returns, 0).sum(axis=1)
+
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(returns))
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0) * np.sqrt(periods_per_year)
+
+    curve = np.cumprod(1 + returns, axis=1)
+    running_max = np.maximum(np.maximum.accumulate(curve, axis=1), 1.0)  # the starting equity is a high
+
+    return {
+        'win_rate': (returns > 0).mean(axis=1) * 100,
+        'profit_factor': np.divide(gains, losses, out=np.zeros_like(gains), where=losses != 0),
+        'sharpe_ratio': sharpe,
+        'max_drawdown': np.minimum((curve / running_max - 1).min(axis=1), 0.0) * 100,
+        'total_return_pct': (curve[:, -1] - 1) * 100,
+    }
+
+
+class MonteCarloBootstrap:
+    """Confidence intervals for backtest metrics from batched 2-D resamples."""
+
+    def __init__(self, n_resamples=10000, confidence=0.95, block_days=20, random_state=None,
+                 max_cells=4_000_000):
+        """
+        Args:
+            n_resamples (int): Resamples per strategy (default: 10,000)
+            confidence (float): Two-sided interval coverage (default: 0.95)
+            block_days (int): Consecutive days per block in bootstrap_equity
+                (default: 20, about a trading month)
+            random_state (int, optional): Seed for reproducible intervals
+            max_cells (int): Most values in one 2-D batch array
+        """
+        if not 0 < confidence < 1:
+            raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+        if n_resamples < 1 or block_days < 1:
+            raise ValueError("n_resamples and block_days must be positive")
+
+        self.n_resamples = int(n_resamples)
+        self.confidence = confidence
+        self.block_days = int(block_days)
+        self.max_cells = int(max_cells)
+        self.rng = np.random.default_rng(random_state)
+
+    def _batches(self, row_length):
+        """Row counts per batch so that rows x row_length stays under max_cells."""
+        size = max(1, min(self.n_resamples, self.max_cells // max(row_length, 1)))
+        for start in range(0, self.n_resamples, size):
+            yield min(size, self.n_resamples - start)
+
+    def resample_trades(self, pnl, pnl_pct, initial_capital):
+        """
+        Metrics of n_resamples trade sequences drawn with replacement.
+
+        Args:
+            pnl (np.ndarray): Trade P&L in dollars
+            pnl_pct (np.ndarray): Trade return in percent
+            initial_capital (float): Starting capital
+
+        Returns:
+            dict: METRICS name -> array of n_resamples values
+        """
+        pnl = np.asarray(pnl, dtype=float)
+        pnl_pct = np.asarray(pnl_pct, dtype=float)
+        n = len(pnl)
+
+        batches = []
+        for size in self._batches(n):
+            idx = self.rng.integers(0, n, (size, n))
+            batches.append(trade_metrics(pnl[idx], pnl_pct[idx], initial_capital))
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in METRICS}
+
+    def resample_returns(self, returns):
+        """
+        Metrics of n_resamples daily return paths from circular moving blocks.
+
+        Args:
+            returns (np.ndarray): Daily returns in order
+
+        Returns:
+            dict: METRICS name -> array of n_resamples values
+        """
+        returns = np.asarray(returns, dtype=float)
+        n = len(returns)
+        block = min(self.block_days, n)
+        n_blocks = -(-n // block)
+        offsets = np.arange(block)
+
+        batches = []
+        for size in self._batches(n_blocks * block):
+            starts = self.rng.integers(0, n, (size, n_blocks, 1))
+            idx = ((starts + offsets) % n).reshape(size, -1)[:, :n]
+            batches.append(return_metrics(returns[idx]))
+        return {name: np.concatenate([batch[name] for batch in batches]) for name in METRICS}
+
+    def summarize(self, estimates, samples):
+        """
+        Point estimate, bootstrap mean and percentile interval per metric.
+
+        Args:
+            estimates (dict): METRICS name -> value on the original sequence
+            samples (dict): METRICS name -> resampled values
+
+        Returns:
+            list: One dict per metric (estimate, mean, ci_lower, ci_upper)
+        """
+        tail = (1 - self.confidence) / 2 * 100
+        rows = []
+        for name in METRICS:
+            lower, upper = np.percentile(samples[name], [tail, 100 - tail])
+            rows.append({
+                'metric': name,
+                'estimate': float(estimates[name]),
+                'mean': float(samples[name].mean()),
+                'ci_lower': float(lower),
+                'ci_upper': float(upper),
+            })
+        return rows
+
+    def bootstrap_trades(self, trades_df, initial_capital):
+        """
+        Trade-resampling intervals for each strategy in a trade list.
+
+        Args:
+            trades_df (pd.DataFrame): Trades with strategy, exit_date, pnl
+                and pnl_pct (e.g. backtest_all_strategies' all_trades_df)
+            initial_capital (float): Capital the trades were sized from
+
+        Returns:
+            pd.DataFrame: CI_COLUMNS, one row per (strategy, metric)
+        """
+        rows = []
+        for strategy_name, group in trades_df.groupby('strategy', sort=False):
+            group = group.sort_values('exit_date')
+            pnl = group['pnl'].to_numpy(dtype=float)
+            pnl_pct = group['pnl_pct'].to_numpy(dtype=float)
+
+            estimates = {name: value[0] for name, value in
+                         trade_metrics(pnl[None], pnl_pct[None], initial_capital).items()}
+            samples = self.resample_trades(pnl, pnl_pct, initial_capital)
+            rows += [{'strategy': strategy_name, 'method': 'trades', **row,
+                      'observations': len(pnl), 'resamples': self.n_resamples}
+                     for row in self.summarize(estimates, samples)]
+
+        return pd.DataFrame(rows, columns=CI_COLUMNS)
+
+    def bootstrap_equity(self, equity_df, initial_capital):
+        """
+        Block-resampling intervals for each strategy's daily equity curve.
+
+        Args:
+            equity_df (pd.DataFrame): strategy, date and equity per day (e.g.
+                backtest_portfolio's equity_df)
+            initial_capital (float): Equity before the first day
+
+        Returns:
+            pd.DataFrame: CI_COLUMNS, one row per (strategy, metric)
+        """
+        rows = []
+        for strategy_name, group in equity_df.groupby('strategy', sort=False):
+            equity = group.sort_values('date')['equity'].to_numpy(dtype=float)
+            curve = np.concatenate([[initial_capital], equity])
+            returns = curve[1:] / curve[:-1] - 1
+
+            estimates = {name: value[0] for name, value in return_metrics(returns[None]).items()}
+            samples = self.resample_returns(returns)
+            rows += [{'strategy': strategy_name, 'method': f'equity_blocks_{self.block_days}d', **row,
+                      'observations': len(returns), 'resamples': self.n_resamples}
+                     for row in self.summarize(estimates, samples)]
+
+        return pd.DataFrame(rows, columns=CI_COLUMNS)
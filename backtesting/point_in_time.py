@@ -0,0 +1,108 @@
+"""
+Point-in-Time Join
+
+Quarterly data (fundamental quality scores) may only be joined to a trade or
+signal once it was published, and only while it is still recent. For each
+left row this module takes the right row with the same key (symbol) and:
+
+    publication_date = right date (fiscal_date_ending) + publication_lag_days
+    publication_date <= left date <= publication_date + validity_days
+
+choosing the latest publication when several qualify. Rows with no such match
+keep NaN in the right columns.
+
+With a fixed window, the latest publication on or before the left date is the
+only candidate. Any older one expires first. So the join is a backward
+pd.merge_asof on the publication date by key, followed by one vectorized
+validity check. The cost is two sorts, O(n log n), and the output has exactly
+one row per left row in the left's order, without the key-level cross join.
+
+Usage:
+    from backtesting.point_in_time import point_in_time_join
+
+    enriched = point_in_time_join(trades_df, fundamentals_df, left_on='entry_date',
+                                  right_on='fiscal_date_ending', by='symbol',
+                                  publication_lag_days=45, validity_days=90)
+"""
+
+import numpy as np
+import pandas as pd
+
+PUBLICATION_LAG_DAYS = 45
+VALIDITY_DAYS = 90
+
+
+def point_in_time_join(left, right, left_on, right_on, by='symbol',
+                       publication_lag_days=PUBLICATION_LAG_DAYS, validity_days=VALIDITY_DAYS,
+                       date_columns=True, suffixes=('', '_pit')):
+    """
+    Join each left row to the latest right row published by its date.
+
+    Args:
+        left (pd.DataFrame): Trades or signals
+        right (pd.DataFrame): Dated records, e.g. quarterly scores
+        left_on (str): Date column of left (entry or signal date)
+        right_on (str): Date column of right the lag is added to
+        by (str, optional): Key column in both frames (default: symbol);
+            None joins every left row to one series (market-wide data)
+        publication_lag_days (int): Days after right_on until a record is
+            usable (default: 45)
+        validity_days (int, optional): Days after publication a record stays
+            usable; None keeps it until the next one (default: 90)
+        date_columns (bool): Keep right_on, publication_date and
+            valid_until_date in the result (default: True)
+        suffixes (tuple): Suffixes for other overlapping column names
+
+    Returns:
+        pd.DataFrame: left's rows, index and order, plus right's columns
+    """
+    right = right.copy()
+    right[right_on] = pd.to_datetime(right[right_on])
+    right['publication_date'] = right[right_on] + pd.Timedelta(days=publication_lag_days)
+    if validity_days is not None:
+        right['valid_until_date'] = right['publication_date'] + pd.Timedelta(days=validity_days)
+    else:
+        right['valid_until_date'] = pd.NaT
+
+    # merge_asof needs one date dtype, one key dtype and no missing values on either
+    # side: keys become integer codes of right's keys (-1 for a key right lacks)
+    if by is None:
+        right['_pit_key'] = 0
+        left_keys = np.zeros(len(left), dtype=np.intp)
+    else:
+        keys = pd.Index(right[by].dropna().unique())
+        right['_pit_key'] = keys.get_indexer(right[by])
+        left_keys = keys.get_indexer(left[by].astype(object))
+        right = right.drop(columns=[by])
+    right['_pit_date'] = right['publication_date'].astype('datetime64[ns]')
+    right = right[right['_pit_key'] >= 0].dropna(subset=['_pit_date'])
+    right = right.sort_values(['_pit_date', right_on], kind='stable')
+
+    dates = pd.to_datetime(left[left_on]).astype('datetime64[ns]')
+    probe = pd.DataFrame({
+        '_pit_row': np.arange(len(left)),
+        '_pit_date': dates.to_numpy(),
+        '_pit_key': left_keys,
+    })
+    probe = probe[probe['_pit_key'] >= 0].dropna(subset=['_pit_date']).sort_values('_pit_date', kind='stable')
+
+    matched = pd.merge_asof(probe, right, on='_pit_date', by='_pit_key', direction='backward')
+
+    # Expired records do not count
+    if validity_days is not None:
+        expired = matched['_pit_date'] > matched['valid_until_date'].astype('datetime64[ns]')
+        matched.loc[expired, matched.columns.difference(['_pit_row', '_pit_date', '_pit_key'])] = np.nan
+
+    matched = matched.set_index('_pit_row').drop(columns=['_pit_date', '_pit_key'])
+    matched = matched.reindex(np.arange(len(left)))
+    if not date_columns:
+        matched = matched.drop(columns=[right_on, 'publication_date', 'valid_until_date'])
+    elif validity_days is None:
+        matched = matched.drop(columns=['valid_until_date'])
+
+    overlap = matched.columns.intersection(left.columns)
+    matched = matched.rename(columns={col: f"{col}{suffixes[1]}" for col in overlap})
+    left = left.rename(columns={col: f"{col}{suffixes[0]}" for col in overlap}) if suffixes[0] else left
+    matched.index = left.index
+
+    return pd.concat([left, matched], axis=1)
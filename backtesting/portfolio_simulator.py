@@ -0,0 +1,299 @@
+"""
+Portfolio Simulator for Strategy Backtests
+
+StrategyBacktester.simulate_trades sizes every trade at a fixed
+initial_capital * position_size and lets any number of positions overlap, so
+its results describe trades, not an account. This module runs a strategy's
+trades through one shared account instead:
+
+1. each day, positions whose exit date has come are sold at the close and
+   their proceeds go back to cash
+2. the day's new entries are sized at position_size of the previous close's
+   equity and taken in trade-list order while cash and the max_positions
+   limit allow; the rest are skipped
+3. open positions are marked to market at the close (the last known close when
+   a symbol has no bar that day)
+
+The result is a daily equity curve. Returns, Sharpe ratio and drawdown come
+from that curve with whole-array NumPy operations (equity_metrics).
+
+Prices are held as one long array of closes sorted by (symbol, date), and a
+close is found by binary search on a (symbol, date) key. The day loop only
+touches the day's entries, exits and open positions, so the cost grows with
+days x max_positions and not with the number of symbols in the universe.
+
+Usage:
+    from backtesting.portfolio_simulator import PortfolioSimulator, equity_metrics
+
+    simulator = PortfolioSimulator(initial_capital=100000, position_size=0.02, max_positions=50)
+    equity_df, trades_df = simulator.simulate(candidate_trades_df, prices_df)
+    metrics = equity_metrics(equity_df['equity'].to_numpy())
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtesting.trade_simulator import TRADE_COLUMNS
+
+TRADING_DAYS_PER_YEAR = 252
+
+EQUITY_COLUMNS = ['date', 'cash', 'positions_value', 'equity', 'open_positions', 'daily_return', 'drawdown']
+
+
+def _date_ns(values):
+    """Dates as int64 nanoseconds since the epoch."""
+    return pd.to_datetime(values).to_numpy().astype('datetime64[ns]').astype(np.int64)
+
+
+class _PriceArrays:
+    """Closes of many symbols in one array, searchable by (symbol_id, date)."""
+
+    def __init__(self, symbol_ids, dates_ns, close):
+        symbol_ids = np.asarray(symbol_ids, dtype=np.int64)
+        dates_ns = np.asarray(dates_ns, dtype=np.int64)
+        close = np.asarray(close, dtype=float)
+
+        new_symbol = np.diff(symbol_ids) != 0
+        if not ((np.diff(symbol_ids) >= 0).all() and (new_symbol | (np.diff(dates_ns) > 0)).all()):
+            order = np.lexsort((dates_ns, symbol_ids))
+            symbol_ids, dates_ns, close = symbol_ids[order], dates_ns[order], close[order]
+            new_symbol = np.diff(symbol_ids) != 0
+
+        # Rows are sorted by (symbol_id, date): codes count symbol changes
+        codes = np.concatenate([[0], np.cumsum(new_symbol)]) if len(symbol_ids) else symbol_ids
+        self.symbol_ids = symbol_ids[np.concatenate([[True], new_symbol])] if len(symbol_ids) else symbol_ids
+        self.calendar = np.unique(dates_ns)
+        self.close = close
+
+        # Dense date ranks give every (symbol, date) a sorted integer key
+        self.key_base = len(self.calendar) + 1
+        self.key = codes * self.key_base + np.searchsorted(self.calendar, dates_ns)
+
+    def codes(self, symbol_ids):
+        """Dense code per symbol_id (-1 for symbols without prices)."""
+        symbol_ids = np.asarray(symbol_ids, dtype=np.int64)
+        codes = np.searchsorted(self.symbol_ids, symbol_ids)
+        found = codes < len(self.symbol_ids)
+        found[found] = self.symbol_ids[codes[found]] == symbol_ids[found]
+        return np.where(found, codes, -1)
+
+    def close_at(self, codes, day):
+        """Last close on or before calendar day `day` for each code (NaN if none)."""
+        if not len(codes):
+            return np.empty(0)
+        row = np.searchsorted(self.key, codes * self.key_base + day, 'right') - 1
+        valid = (codes >= 0) & (row >= 0)
+        valid[valid] = self.key[row[valid]] // self.key_base == codes[valid]
+        return np.where(valid, self.close[np.maximum(row, 0)], np.nan)
+
+
+def equity_metrics(equity, initial_capital=None, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Return and risk metrics of a daily equity curve.
+
+    Args:
+        equity (np.ndarray): Account equity at each close
+        initial_capital (float, optional): Starting equity (default: equity[0])
+        periods_per_year (int): Periods used to annualize (default: 252)
+
+    Returns:
+        dict: total_return_pct, annual_return_pct, annual_volatility_pct,
+            sharpe_ratio, sortino_ratio, max_drawdown (negative %),
+            max_drawdown_days (longest stretch below a prior high)
+    """
+    equity = np.asarray(equity, dtype=float)
+    if not len(equity):
+        return {
+            'total_return_pct': 0.0,
+            'annual_return_pct': 0.0,
+            'annual_volatility_pct': 0.0,
+            'sharpe_ratio': 0.0,
+            'sortino_ratio': 0.0,
+            'max_drawdown': 0.0,
+            'max_drawdown_days': 0,
+        }
+
+    start = float(initial_capital) if initial_capital is not None else equity[0]
+    curve = np.concatenate([[start], equity])
+    returns = curve[1:] / curve[:-1] - 1
+
+    total_return = curve[-1] / start - 1
+    annual_return = (curve[-1] / start) ** (periods_per_year / len(returns)) - 1 if curve[-1] > 0 else -1.0
+
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+    sortino = returns.mean() / downside * np.sqrt(periods_per_year) if downside > 0 else 0.0
+
+    running_max = np.maximum.accumulate(curve)
+    drawdown = curve / running_max - 1
+
+    # Longest run of days below the running high: distance to the last new high
+    at_high = np.flatnonzero(drawdown == 0)
+    last_high = at_high[np.searchsorted(at_high, np.arange(len(curve)), 'right') - 1]
+    underwater_days = np.arange(len(curve)) - last_high
+
+    return {
+        'total_return_pct': total_return * 100,
+        'annual_return_pct': annual_return * 100,
+        'annual_volatility_pct': std * np.sqrt(periods_per_year) * 100,
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+        'max_drawdown': drawdown.min() * 100,
+        'max_drawdown_days': int(underwater_days.max()),
+    }
+
+
+class PortfolioSimulator:
+    """One shared account: cash, position limits and daily mark-to-market equity."""
+
+    def __init__(self, initial_capital=100000, position_size=0.02, commission=0.001, max_positions=50):
+        """
+        Args:
+            initial_capital (float): Starting cash in dollars
+            position_size (float): Fraction of current equity per new position
+            commission (float): Commission rate per trade (0.001 = 0.1%)
+            max_positions (int): Most positions held at once
+        """
+        self.initial_capital = initial_capital
+        self.position_size = position_size
+        self.commission = commission
+        self.max_positions = max_positions
+
+    def simulate(self, trades_df, prices_df, start_date=None, end_date=None):
+        """
+        Run candidate trades through the account.
+
+        Args:
+            trades_df (pd.DataFrame): Candidate trades with symbol_id, symbol,
+                strategy, entry_date, exit_date, entry_price and exit_price
+                (e.g. simulate_trades() output plus symbol_id); same-day entries
+                are funded in this order
+            prices_df (pd.DataFrame): Closes with symbol_id, date and close
+            start_date, end_date (optional): Equity curve bounds (default:
+                first entry to last exit)
+
+        Returns:
+            tuple: (equity_df with EQUITY_COLUMNS, trades_df of the trades
+                taken, with shares and P&L at portfolio size)
+        """
+        prices = _PriceArrays(prices_df['symbol_id'], _date_ns(prices_df['date']), prices_df['close'])
+        calendar = prices.calendar
+
+        if trades_df.empty or not len(calendar):
+            return pd.DataFrame(columns=EQUITY_COLUMNS), pd.DataFrame()
+
+        entry_ns = _date_ns(trades_df['entry_date'])
+        exit_ns = _date_ns(trades_df['exit_date'])
+        first = _date_ns([start_date])[0] if start_date is not None else entry_ns.min()
+        last = _date_ns([end_date])[0] if end_date is not None else exit_ns.max()
+        lo = np.searchsorted(calendar, first, 'left')
+        hi = np.searchsorted(calendar, last, 'right')
+        if hi <= lo:
+            return pd.DataFrame(columns=EQUITY_COLUMNS), pd.DataFrame()
+
+        # Candidates must enter and exit on trading days inside the window
+        entry_day = np.searchsorted(calendar, entry_ns)
+        exit_day = np.searchsorted(calendar, exit_ns)
+        usable = (
+            (entry_day >= lo) & (exit_day < hi)
+            & (calendar[np.minimum(entry_day, len(calendar) - 1)] == entry_ns)
+            & (calendar[np.minimum(exit_day, len(calendar) - 1)] == exit_ns)
+        )
+        candidates = np.flatnonzero(usable)
+        candidates = candidates[np.argsort(entry_day[candidates], kind='stable')]
+
+        codes = prices.codes(trades_df['symbol_id'].to_numpy())
+        entry_price = trades_df['entry_price'].to_numpy(dtype=float)
+        exit_price = trades_df['exit_price'].to_numpy(dtype=float)
+        day_bounds = np.searchsorted(entry_day[candidates], np.arange(lo, hi + 1))
+
+        shares = np.zeros(len(trades_df))
+        n_days = hi - lo
+        cash_curve = np.empty(n_days)
+        value_curve = np.empty(n_days)
+        open_curve = np.empty(n_days, dtype=np.int64)
+
+        cash = float(self.initial_capital)
+        equity = cash
+        held = np.empty(0, dtype=np.int64)  # candidate indices of open positions
+
+        for i, day in enumerate(range(lo, hi)):
+            # Sell what exits today (before buying, so the cash can be reused)
+            held, cash = self._close_positions(held, day, exit_day, shares, exit_price, cash)
+
+            # Buy today's entries in order while cash and slots last
+            todays = candidates[day_bounds[i]:day_bounds[i + 1]]
+            if len(todays):
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    size = np.trunc(equity * self.position_size / entry_price[todays])
+                size = np.where(np.isfinite(size) & (size > 0), size, 0)
+                cost = size * entry_price[todays] * (1 + self.commission)
+                wanted = size > 0
+                taken = (
+                    wanted
+                    & (np.cumsum(np.where(wanted, cost, 0)) <= cash)
+                    & (np.cumsum(wanted) <= self.max_positions - len(held))
+                )
+                shares[todays[taken]] = size[taken]
+                cash -= cost[taken].sum()
+                held = np.concatenate([held, todays[taken]])
+
+                # Same-day round trips (entry and exit on one date)
+                held, cash = self._close_positions(held, day, exit_day, shares, exit_price, cash)
+
+            # Mark to market; a symbol missing from the price panel keeps its entry price
+            close = prices.close_at(codes[held], day)
+            close = np.where(np.isnan(close), entry_price[held], close)
+            value = float((shares[held] * close).sum())
+
+            equity = cash + value
+            cash_curve[i] = cash
+            value_curve[i] = value
+            open_curve[i] = len(held)
+
+        equity_curve = cash_curve + value_curve
+        curve = np.concatenate([[self.initial_capital], equity_curve])
+        running_max = np.maximum.accumulate(curve)[1:]
+        equity_df = pd.DataFrame({
+            'date': pd.to_datetime(calendar[lo:hi]),
+            'cash': cash_curve,
+            'positions_value': value_curve,
+            'equity': equity_curve,
+            'open_positions': open_curve,
+            'daily_return': equity_curve / curve[:-1] - 1,
+            'drawdown': (equity_curve / running_max - 1) * 100,
+        }, columns=EQUITY_COLUMNS)
+
+        return equity_df, self._taken_trades(trades_df, shares)
+
+    def _close_positions(self, held, day, exit_day, shares, exit_price, cash):
+        """Sell held positions exiting on `day`; returns (still held, cash)."""
+        exiting = exit_day[held] <= day
+        if not exiting.any():
+            return held, cash
+        closed = held[exiting]
+        cash += float((shares[closed] * exit_price[closed] * (1 - self.commission)).sum())
+        return held[~exiting], cash
+
+    def _taken_trades(self, trades_df, shares):
+        """The candidates the account took, resized to portfolio shares."""
+        taken = shares > 0
+        if not taken.any():
+            return pd.DataFrame()
+
+        trades = trades_df.loc[taken].reset_index(drop=True)
+        n_shares = shares[taken]
+        entry_value = n_shares * trades['entry_price'].to_numpy(dtype=float)
+        exit_value = n_shares * trades['exit_price'].to_numpy(dtype=float)
+        total_commission = entry_value * self.commission + exit_value * self.commission
+        pnl = exit_value - entry_value - total_commission
+
+        trades['shares'] = n_shares.astype(np.int64)
+        trades['pnl'] = pnl
+        trades['pnl_pct'] = pnl / entry_value * 100
+        trades['commission'] = total_commission
+        trades['entry_value'] = entry_value
+        trades['exit_value'] = exit_value
+        return trades[[c for c in TRADE_COLUMNS if c in trades.columns]
+                      + [c for c in trades.columns if c not in TRADE_COLUMNS]]
@@ -0,0 +1,127 @@
+"""
+Backtest Result Cache
+
+A strategy's backtest depends only on its signals and the backtest
+parameters, and transforms.trading_signals changes one strategy at a time. This
+cache keeps each strategy's trades and metrics as Parquet under a key derived
+from:
+
+- the strategy name
+- its signal snapshot: max(processed_at) and the row count in the backtest's
+  date range (a new or reprocessed signal moves one or the other)
+- the parameters: capital, position size, commission, cooldown, stop-loss /
+  take-profit, date range and where prices came from
+
+StrategyBacktester.backtest_all_strategies looks every strategy up first and
+only loads and simulates the ones whose key is missing::
+
+    <root>/<strategy>/<key>/trades.parquet
+    <root>/<strategy>/<key>/metrics.parquet
+
+Entries are written to a temporary directory and renamed into place, so a
+reader never sees a half-written entry. Old keys are never read again once
+the signals move; clear() removes them.
+
+Usage:
+    from backtesting.result_cache import BacktestResultCache
+
+    cache = BacktestResultCache()
+    key = cache.key('ema_crossover', snapshot, params)
+    cached = cache.get('ema_crossover', key)       # (metrics, trades_df) or None
+    cache.put('ema_crossover', key, metrics, trades_df)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'backtest_cache'
+
+# Bump when simulation or metric code changes results for the same inputs
+CACHE_VERSION = 1
+
+
+class BacktestResultCache:
+    """Per-strategy backtest trades and metrics on disk, keyed by signal snapshot and parameters."""
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root (str or Path, optional): Cache directory. Defaults to
+                BACKTEST_CACHE_DIR, else data/backtest_cache in the repository.
+        """
+        self.root = Path(root or os.getenv('BACKTEST_CACHE_DIR') or DEFAULT_CACHE_DIR)
+
+    @staticmethod
+    def key(strategy_name, snapshot, params):
+        """
+        Cache key of one strategy's backtest.
+
+        Args:
+            strategy_name (str): Strategy name
+            snapshot (dict): max_processed_at and rows of the strategy's signals
+            params (dict): Backtest parameters (JSON-serializable values)
+
+        Returns:
+            str: Hex digest
+        """
+        payload = json.dumps(
+            {'version': CACHE_VERSION, 'strategy': strategy_name, 'snapshot': snapshot, 'params': params},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _entry(self, strategy_name, key):
+        return self.root / strategy_name / key
+
+    def get(self, strategy_name, key):
+        """
+        Cached result of one strategy's backtest.
+
+        Returns:
+            tuple: (metrics dict or None when there were no trades,
+                trades DataFrame), or None on a miss
+        """
+        entry = self._entry(strategy_name, key)
+        if not (entry / 'metrics.parquet').exists():
+            return None
+
+        metrics_df = pd.read_parquet(entry / 'metrics.parquet')
+        trades_df = pd.read_parquet(entry / 'trades.parquet')
+        metrics = metrics_df.iloc[0].to_dict() if len(metrics_df) else None
+        return metrics, trades_df
+
+    def put(self, strategy_name, key, metrics, trades_df):
+        """
+        Store one strategy's backtest result.
+
+        Args:
+            strategy_name (str): Strategy name
+            key (str): Result of key()
+            metrics (dict or None): calculate_metrics() result (None when the
+                strategy had no trades)
+            trades_df (pd.DataFrame): Trade history
+        """
+        entry = self._entry(strategy_name, key)
+        tmp = entry.parent / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp.mkdir(parents=True)
+        try:
+            pd.DataFrame([metrics] if metrics else []).to_parquet(tmp / 'metrics.parquet', index=False)
+            trades_df.reset_index(drop=True).to_parquet(tmp / 'trades.parquet', index=False)
+            if entry.exists():
+                shutil.rmtree(entry)
+            tmp.rename(entry)
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp)
+
+    def clear(self, strategy_name=None):
+        """Remove every cached result, or one strategy's."""
+        target = self.root / strategy_name if strategy_name else self.root
+        if target.exists():
+            shutil.rmtree(target)
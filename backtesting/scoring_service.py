@@ -0,0 +1,354 @@
+"""
+Trade Success Scoring Service
+
+The live scorer (trading_bot/daily_signal_scorer.py), the backtest scorer
+(backtesting/daily_signal_scorer.py) and filter_trades_by_prediction.py each
+built their own feature matrix: pd.get_dummies on sector and strategy, then
+one column at a time for every training feature the batch happened to lack.
+ScoringService is the one place that turns (symbol, date, strategy) rows into
+model input:
+
+- the model artifact is loaded once (backtesting/model_artifact.py), and the
+  FeatureEncoder in its manifest fixes the column order, the one-hot
+  vocabularies and the values numeric gaps are filled with
+- the endpoint loads the booster in warm_up() before it accepts requests, so
+  the first request does not pay for the xgboost import
+- the encoder allocates the matrix once per batch as float32 in model column
+  order (backtesting/feature_encoder.py). Categories the model never saw set
+  no column, as the dropped get_dummies columns did
+- rows without fundamentals get no score (NaN), as the scorers skipped them
+
+Each batch's latency and size are recorded, and metrics() reports them.
+
+The service can also run as a local endpoint (HTTP on localhost or a Unix
+socket):
+
+    POST /score     {"requests": [{"symbol": "AAPL", "date": "2024-06-03", "strategy": "rsi_crossing"}]}
+                    -> {"scores": [{..., "success_probability": 0.83, "take": true}]}
+    GET  /metrics   latency and batch size metrics
+    GET  /health    {"status": "ok"}
+
+Usage:
+    from backtesting.scoring_service import ScoringService
+
+    service = ScoringService('models/trade_success_model.ubj')
+    scores = service.score([{'symbol': 'AAPL', 'date': '2024-06-03', 'strategy': 'rsi_crossing'}])
+    probabilities = service.score_frame(signals_df, strategy_column='trade_strategy')
+
+    # Local endpoint
+    python backtesting/scoring_service.py --port 8765
+    python backtesting/scoring_service.py --socket /tmp/trade_scoring.sock --sync
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import logging
+import socketserver
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backtesting.feature_store import DEFAULT_SOURCES, FeatureStore
+from backtesting.model_artifact import load_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'models/trade_success_model.ubj'
+
+# Rows without this feature have no fundamentals and are not scored
+REQUIRED_FEATURE = 'overall_quality_score'
+
+
+class ScoringService:
+    """Long-lived trade success scorer: one model, one feature schema, batched requests."""
+
+    def __init__(self, model_path=DEFAULT_MODEL, store=None, sources=DEFAULT_SOURCES, latency_window=1000):
+        """
+        Args:
+            model_path (str): Model artifact (.ubj) or pickle
+            store (FeatureStore, optional): Feature store for score() requests
+                (default: the local store, kept in memory)
+            sources (tuple): Feature store sources to join (default:
+                fundamentals and sector)
+            latency_window (int): Batches kept for the latency percentiles
+        """
+        self.model = load_model(model_path)
+        self.store = store or FeatureStore(in_memory=True)
+        self.sources = sources
+        self.feature_names = self.model.feature_names
+        self.threshold = self.model.threshold
+
+        self.encoder = self.model.encoder
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._totals = {'batches': 0, 'rows': 0, 'rows_scored': 0, 'seconds': 0.0}
+
+    def warm_up(self):
+        """Import xgboost and load the booster before the first request."""
+        start = time.perf_counter()
+        self.model.load_booster()
+        logger.info(f"Model warmed up in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self
+
+    # ==================== FEATURES ====================
+
+    def build_features(self, df, strategy_column='strategy'):
+        """
+        Model input for rows that already carry their features.
+
+        Args:
+            df (pd.DataFrame): Rows with the numeric features, sector and strategy
+            strategy_column (str): Column holding the strategy name
+
+        Returns:
+            np.ndarray: float32, rows x len(feature_names), in model column order
+        """
+        return self.encoder.transform(df, columns={'strategy': strategy_column})
+
+    # ==================== SCORING ====================
+
+    def _score_frame(self, df, strategy_column='strategy'):
+        probabilities = np.full(len(df), np.nan)
+        scored = df[REQUIRED_FEATURE].notna().to_numpy() if REQUIRED_FEATURE in df.columns \
+            else np.zeros(len(df), dtype=bool)
+        if scored.any():
+            X = self.build_features(df[scored], strategy_column)
+            probabilities[scored] = self.model.predict_proba(X)[:, 1]
+        return probabilities, int(scored.sum())
+
+    def score_frame(self, df, strategy_column='strategy'):
+        """
+        Success probability of rows that already carry their features.
+
+        Args:
+            df (pd.DataFrame): Signals or trades joined to the feature store
+            strategy_column (str): Column holding the strategy name
+
+        Returns:
+            np.ndarray: Probability per row, NaN where a row has no fundamentals
+        """
+        start = time.perf_counter()
+        probabilities, n_scored = self._score_frame(df, strategy_column)
+        self._record(len(df), n_scored, time.perf_counter() - start)
+        return probabilities
+
+    def score(self, requests):
+        """
+        Score a batch of (symbol, date, strategy) requests.
+
+        Features come from the feature store as of each request's date.
+
+        Args:
+            requests (list or pd.DataFrame): Rows with symbol, date and strategy
+
+        Returns:
+            pd.DataFrame: symbol, date, strategy, success_probability (NaN
+                without fundamentals) and take (probability >= threshold),
+                one row per request in the order given
+        """
+        start = time.perf_counter()
+        requests = pd.DataFrame(requests, columns=['symbol', 'date', 'strategy'])
+        if requests.empty:
+            result = requests.assign(success_probability=pd.Series(dtype=float), take=pd.Series(dtype=bool))
+            self._record(0, 0, time.perf_counter() - start)
+            return result
+
+        features = self.store.get_features(requests['symbol'].tolist(), requests['date'].tolist(),
+                                           sources=self.sources)
+        features['strategy'] = requests['strategy'].to_numpy()
+        probabilities, n_scored = self._score_frame(features)
+
+        result = requests[['symbol', 'strategy']].assign(date=pd.to_datetime(requests['date']))
+        result = result[['symbol', 'date', 'strategy']]
+        result['success_probability'] = probabilities
+        result['take'] = probabilities >= self.threshold
+        self._record(len(requests), n_scored, time.perf_counter() - start)
+        return result
+
+    # ==================== METRICS ====================
+
+    def _record(self, rows, rows_scored, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            self._batch_sizes.append(rows)
+            self._totals['batches'] += 1
+            self._totals['rows'] += rows
+            self._totals['rows_scored'] += rows_scored
+            self._totals['seconds'] += seconds
+
+    def metrics(self):
+        """
+        Scoring metrics since start.
+
+        Returns:
+            dict: batches, rows, rows_scored, rows_per_second, and latency
+                (ms: mean, p50, p95, max) and batch size (mean, max) over the
+                most recent batches
+        """
+        with self._lock:
+            totals = dict(self._totals)
+            latencies = np.array(self._latencies) * 1000
+            sizes = np.array(self._batch_sizes)
+
+        metrics = {
+            **{key: totals[key] for key in ('batches', 'rows', 'rows_scored')},
+            'rows_per_second': totals['rows'] / totals['seconds'] if totals['seconds'] > 0 else 0.0,
+            'latency_ms': {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0},
+            'batch_size': {'mean': 0.0, 'max': 0},
+        }
+        if len(latencies):
+            metrics['latency_ms'] = {
+                'mean': float(latencies.mean()),
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'max': float(latencies.max()),
+            }
+            metrics['batch_size'] = {'mean': float(sizes.mean()), 'max': int(sizes.max())}
+        return metrics
+
+
+# ==================== LOCAL ENDPOINT ====================
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    """JSON endpoint for the server's ScoringService."""
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._send(200, self.server.service.metrics())
+        else:
+            self._send(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            requests = payload.get('requests', []) if isinstance(payload, dict) else payload
+            scores = self.server.service.score(requests)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+        scores['date'] = scores['date'].dt.strftime('%Y-%m-%d')
+        scores['success_probability'] = scores['success_probability'].astype(object).where(
+            scores['success_probability'].notna(), None)
+        self._send(200, {'scores': scores.to_dict(orient='records')})
+
+    def address_string(self):
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host='127.0.0.1', port=8765, unix_socket=None):
+    """
+    HTTP server for a ScoringService, on a TCP port or a Unix socket.
+
+    Args:
+        service (ScoringService): Service to expose
+        host (str): TCP host (default: localhost only)
+        port (int): TCP port (0 picks a free one)
+        unix_socket (str, optional): Unix socket path, used instead of TCP
+
+    Returns:
+        socketserver.BaseServer: Server; call serve_forever() to run it
+    """
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = _UnixHTTPServer(unix_socket, _ScoringHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), _ScoringHandler)
+    server.service = service
+    return server
+
+
+def main():
+    """Run the scoring service as a local endpoint."""
+    parser = argparse.ArgumentParser(
+        description='Serve trade success scores on a local HTTP port or Unix socket',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        '--model',
+        type=str,
+        default=DEFAULT_MODEL,
+        help=f'Model artifact (.ubj) or pickle (default: {DEFAULT_MODEL})'
+    )
+    parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help='Host to bind (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='Port to bind (default: 8765)'
+    )
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=None,
+        help='Unix socket path to bind instead of a TCP port'
+    )
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        help='Sync the feature store before serving'
+    )
+
+    args = parser.parse_args()
+
+    service = ScoringService(args.model)
+    if args.sync:
+        service.store.sync(list(service.sources))
+    service.warm_up()
+
+    server = make_server(service, args.host, args.port, args.socket)
+    logger.info(f"Scoring service on {args.socket or f'http://{args.host}:{args.port}'} "
+                f"({len(service.feature_names)} features, threshold {service.threshold:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    main()
@@ -0,0 +1,180 @@
+"""
+Parquet Trade Log
+
+Backtest trade lists used to travel as CSV: every consumer re-parsed every
+column as text and re-converted the dates, even to look up one symbol's trades.
+A trade log is a Parquet file with typed columns instead:
+
+- strategy, symbol, sector and exit_reason as dictionary (categorical)
+  columns: one small dictionary per row group plus integer codes
+- entry_date / exit_date as timestamps, holding_days and shares as integers,
+  prices and P&L as float64
+- any other column (fundamental scores, success_probability) with its
+  pandas type
+
+TradeLogWriter appends one row group per write, so a backtest can write
+strategy by strategy without building one big table first. read_trades reads
+a trade log or a legacy CSV. For a trade log it loads only the requested
+columns and pushes symbol / strategy filters down to the row groups.
+
+Usage:
+    from backtesting.trade_log import TradeLogWriter, read_trades, write_trade_log
+
+    with TradeLogWriter('results_trades.parquet') as writer:
+        for strategy_name, trades_df in results:
+            writer.write(trades_df)
+
+    write_trade_log(all_trades_df, 'results_trades.parquet')        # one row group per strategy
+    trades = read_trades('results_trades.parquet', columns=['symbol', 'entry_date', 'pnl'],
+                         symbols=['AAPL'])
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CATEGORICAL_COLUMNS = ['strategy', 'symbol', 'sector', 'exit_reason']
+DATE_COLUMNS = ['entry_date', 'exit_date']
+
+# Trade columns the signal charts draw (backtesting/visualize_signals*.py)
+TRADE_CHART_COLUMNS = ['symbol', 'entry_date', 'exit_date', 'pnl', 'pnl_pct']
+
+# Types of the trade columns (backtesting/trade_simulator.py TRADE_COLUMNS)
+COLUMN_TYPES = {
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    **{col: pa.timestamp('s') for col in DATE_COLUMNS},
+    'holding_days': pa.int32(),
+    'shares': pa.int64(),
+    **{col: pa.float64() for col in ['entry_price', 'exit_price', 'pnl', 'pnl_pct', 'commission',
+                                     'entry_value', 'exit_value']},
+}
+
+
+def is_trade_log(path):
+    """True for a Parquet trade log, False for CSV."""
+    return Path(path).suffix.lower() in ('.parquet', '.pq')
+
+
+def trade_log_schema(trades_df):
+    """Arrow schema of a trade frame: COLUMN_TYPES where known, inferred elsewhere."""
+    inferred = pa.Schema.from_pandas(trades_df, preserve_index=False)
+    return pa.schema([
+        pa.field(field.name, COLUMN_TYPES.get(field.name, field.type)) for field in inferred
+    ])
+
+
+class TradeLogWriter:
+    """Writes trade frames to one Parquet file, one row group per write."""
+
+    def __init__(self, path, compression='zstd'):
+        """
+        Args:
+            path (str or Path): Output file; replaced when the writer closes
+            compression (str): Parquet compression codec (default: zstd)
+        """
+        self.path = Path(path)
+        self.compression = compression
+        self.rows = 0
+        self._tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._writer = None
+        self._schema = None
+
+    def write(self, trades_df):
+        """Append trades as a row group. The first write fixes the columns and types."""
+        if trades_df.empty:
+            return
+        if self._writer is None:
+            self._schema = trade_log_schema(trades_df)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp, self._schema, compression=self.compression)
+
+        frame = trades_df.reset_index(drop=True)
+        for col in DATE_COLUMNS:
+            if col in frame:
+                frame[col] = pd.to_datetime(frame[col]).astype('datetime64[s]')
+        table = pa.Table.from_pandas(frame[self._schema.names], preserve_index=False)
+        self._writer.write_table(table.cast(self._schema))
+        self.rows += len(frame)
+
+    def close(self):
+        """Finish the file and move it into place (nothing is written without rows)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.replace(self._tmp, self.path)
+
+    def abort(self):
+        """Drop a partly written file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_trade_log(trades_df, path, group_by='strategy'):
+    """
+    Write a trade frame as a trade log, one row group per strategy.
+
+    Args:
+        trades_df (pd.DataFrame): Trades
+        path (str or Path): Output .parquet file
+        group_by (str, optional): Column whose values get their own row group
+
+    Returns:
+        int: Rows written
+    """
+    with TradeLogWriter(path) as writer:
+        if group_by and group_by in trades_df:
+            for _, group in trades_df.groupby(group_by, sort=False, observed=True):
+                writer.write(group)
+        else:
+            writer.write(trades_df)
+    return writer.rows
+
+
+def read_trades(path, columns=None, symbols=None, strategies=None):
+    """
+    Read trades from a Parquet trade log or a CSV trade file.
+
+    Args:
+        path (str or Path): .parquet trade log or .csv file
+        columns (list, optional): Columns to load (default: all)
+        symbols (list, optional): Only these symbols
+        strategies (list, optional): Only these strategies
+
+    Returns:
+        pd.DataFrame: Trades with datetime entry/exit dates and categorical
+            strategy / symbol columns
+    """
+    filters = []
+    if symbols is not None:
+        filters.append(('symbol', 'in', list(symbols)))
+    if strategies is not None:
+        filters.append(('strategy', 'in', list(strategies)))
+
+    if is_trade_log(path):
+        return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = None if columns is None else list(dict.fromkeys([*columns, *(col for col, _, _ in filters)]))
+    df = pd.read_csv(
+        path,
+        usecols=usecols,
+        dtype={col: 'category' for col in CATEGORICAL_COLUMNS if col in header},
+        parse_dates=[col for col in DATE_COLUMNS if col in header and (usecols is None or col in usecols)],
+    )
+    for col, _, values in filters:
+        df = df[df[col].isin(values)]
+    return df[columns if columns is not None else df.columns].reset_index(drop=True)
@@ -0,0 +1,292 @@
+"""
+Array Trade Simulator for Strategy Backtests
+
+Array implementation of StrategyBacktester's row-by-row trade simulation
+(_simulate_trades_legacy in backtest_strategies.py). Instead of walking the
+signal frame with iterrows() and keeping dicts of open positions and
+cooldowns, the signals are laid out as integer-indexed NumPy arrays grouped by
+symbol, and every symbol advances one trade per round:
+
+1. the next buy row at or after the symbol's pointer whose date is past the
+   cooldown and whose position size is at least one share
+2. the next sell row after that buy, which closes the trade
+
+Both steps are binary searches over sorted row indices, done for all symbols
+at once, so the work per round is a handful of vectorized searches and the
+number of rounds is the largest trade count of any one symbol.
+
+The output matches the legacy engine trade for trade: same rules (a row with
+both flags opens a flat position and closes an open one, cooldown counts whole
+days since the last exit, leftover positions close at the strategy's last
+date if the symbol has a row that day), same float arithmetic and the same
+order (closed trades in exit order, then leftover positions in entry order).
+
+Usage:
+    from backtesting.trade_simulator import ArrayTradeSimulator
+
+    simulator = ArrayTradeSimulator(initial_capital=100000, position_size=0.02, commission=0.001)
+    trades_df = simulator.simulate(signals_df, 'ema_crossover', cooldown_days=60)
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtesting.exit_engine import EXIT_REASONS, SIGNAL, END_OF_DATA
+
+TRADE_COLUMNS = [
+    'strategy',
+    'symbol',
+    'entry_date',
+    'exit_date',
+    'holding_days',
+    'entry_price',
+    'exit_price',
+    'shares',
+    'pnl',
+    'pnl_pct',
+    'commission',
+    'entry_value',
+    'exit_value',
+]
+
+_DAY_NS = 86_400_000_000_000
+
+
+class _SignalArrays:
+    """Signal columns in legacy processing order, regrouped so each symbol is contiguous."""
+
+    def __init__(self, signals_df):
+        # The legacy loop visits rows in signals_df.sort_values('date') order;
+        # the same sort gives the same permutation, ties included
+        frame = signals_df.reset_index(drop=True)
+        order = frame.sort_values('date').index.to_numpy()
+
+        codes, self.symbols = pd.factorize(frame['symbol'].to_numpy()[order], use_na_sentinel=False)
+        by_symbol = np.argsort(codes, kind='stable')
+        rows = order[by_symbol]
+
+        # Row of signals_df (after reset_index) behind each array position
+        self.rows = rows
+
+        # Rank of each row in the legacy processing order
+        self.rank = by_symbol
+        self.code = codes[by_symbol]
+
+        dates = pd.to_datetime(frame['date']).to_numpy()[rows]
+        self.dates = dates
+        self.date_ns = dates.astype('datetime64[ns]').astype(np.int64)
+        self.close = frame['close'].to_numpy(dtype=float)[rows]
+        self.buy = frame['buy_signal'].to_numpy(dtype=bool)[rows]
+        self.sell = frame['sell_signal'].to_numpy(dtype=bool)[rows]
+
+        self.n_rows = len(rows)
+        self.n_symbols = len(self.symbols)
+        self.start = np.searchsorted(self.code, np.arange(self.n_symbols), 'left')
+        self.stop = np.searchsorted(self.code, np.arange(self.n_symbols), 'right')
+
+        # Dense date ranks give every (symbol, date) a sortable integer key
+        self.unique_ns, date_rank = np.unique(self.date_ns, return_inverse=True)
+        self.key_base = len(self.unique_ns) + 1
+        self.key = self.code.astype(np.int64) * self.key_base + date_rank
+
+    def first_row_on_or_after(self, codes, date_ns):
+        """Each symbol's first row (in processing order) dated >= date_ns."""
+        date_rank = np.searchsorted(self.unique_ns, date_ns, 'left')
+        return np.searchsorted(self.key, codes.astype(np.int64) * self.key_base + date_rank, 'left')
+
+
+class ArrayTradeSimulator:
+    """Trade simulation over per-symbol NumPy arrays, identical to the legacy iterrows loop."""
+
+    def __init__(self, initial_capital=100000, position_size=0.02, commission=0.001,
+                 exit_engine=None, stop_loss_pct=None, take_profit_pct=None):
+        """
+        Args:
+            initial_capital (float): Starting capital in dollars
+            position_size (float): Fraction of capital per trade (0.02 = 2%)
+            commission (float): Commission rate per trade (0.001 = 0.1%)
+            exit_engine (IntrabarExitEngine, optional): Daily bars for price
+                exits; required with stop_loss_pct or take_profit_pct
+            stop_loss_pct (float, optional): Also exit when a bar's low is
+                this fraction below the entry (0.10 = 10%)
+            take_profit_pct (float, optional): Also exit when a bar's high is
+                this fraction above the entry (0.15 = 15%)
+        """
+        if (stop_loss_pct or take_profit_pct) and exit_engine is None:
+            raise ValueError("stop_loss_pct/take_profit_pct need an exit_engine with daily bars")
+
+        self.initial_capital = initial_capital
+        self.position_size = position_size
+        self.commission = commission
+        self.exit_engine = exit_engine
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+
+    @property
+    def price_exits(self):
+        """True when stops or targets are simulated."""
+        return bool(self.stop_loss_pct or self.take_profit_pct)
+
+    def simulate(self, signals_df, strategy_name, cooldown_days=60):
+        """
+        Simulate trades for one strategy's signals.
+
+        With stop_loss_pct/take_profit_pct, a position also closes on the
+        first bar after the entry (up to and including its sell signal's
+        bar) that reaches the stop or target, and an exit_reason column is
+        added. The next entry then needs a signal dated after that bar.
+
+        Args:
+            signals_df (pd.DataFrame): Signals with symbol, date, buy_signal,
+                sell_signal and close (and symbol_id for price exits)
+            strategy_name (str): Strategy name
+            cooldown_days (int): Days to wait after an exit before buying the
+                same symbol again
+
+        Returns:
+            pd.DataFrame: Trade history (TRADE_COLUMNS), as the legacy engine
+        """
+        if signals_df.empty:
+            return pd.DataFrame()
+
+        arrays = _SignalArrays(signals_df)
+        shares = self._shares(arrays.close)
+
+        buy_rows = np.flatnonzero(arrays.buy & (shares > 0))
+        sell_rows = np.flatnonzero(arrays.sell)
+        cooldown_ns = int(cooldown_days) * _DAY_NS
+        last_ns = arrays.date_ns.max()
+        if self.price_exits:
+            symbol_ids = signals_df.reset_index(drop=True)['symbol_id'].to_numpy(dtype=np.int64)[arrays.rows]
+
+        # Closed trades: entry row, exit date/price, ordering key, exit reason
+        entries, exit_ns, exit_price, exit_key, reasons = [], [], [], [], []
+        open_entries = []
+
+        codes = np.arange(arrays.n_symbols)
+        pointer = arrays.start.copy()
+        earliest = np.full(arrays.n_symbols, np.iinfo(np.int64).min)
+
+        while len(codes):
+            # Next eligible buy: at/after the pointer and out of cooldown
+            first = np.maximum(pointer, arrays.first_row_on_or_after(codes, earliest))
+            at = np.searchsorted(buy_rows, first, 'left')
+            entry = buy_rows[np.minimum(at, len(buy_rows) - 1)] if len(buy_rows) else first
+            found = (at < len(buy_rows)) & (entry < arrays.stop[codes])
+            codes, entry = codes[found], entry[found]
+
+            # Next sell strictly after the entry row closes the trade
+            at = np.searchsorted(sell_rows, entry + 1, 'left')
+            exit_ = sell_rows[np.minimum(at, len(sell_rows) - 1)] if len(sell_rows) else entry
+            closed = (at < len(sell_rows)) & (exit_ < arrays.stop[codes])
+
+            # ...unless a stop or target is reached first (on or before the sell's bar)
+            hit = np.zeros(len(entry), dtype=bool)
+            if self.price_exits and len(entry):
+                price_exit = self.exit_engine.first_exits(
+                    symbol_ids[entry], arrays.date_ns[entry], arrays.close[entry],
+                    np.where(closed, arrays.date_ns[exit_], last_ns),
+                    self.stop_loss_pct, self.take_profit_pct,
+                )
+                hit = price_exit['hit']
+                entries.append(entry[hit])
+                exit_ns.append(price_exit['date_ns'][hit])
+                exit_price.append(price_exit['price'][hit])
+                exit_key.append(np.full(hit.sum(), -1))  # intrabar: before that day's closes
+                reasons.append(price_exit['reason'][hit])
+                closed &= ~hit
+
+            open_entries.append(entry[~closed & ~hit])
+            entries.append(entry[closed])
+            exit_ns.append(arrays.date_ns[exit_[closed]])
+            exit_price.append(arrays.close[exit_[closed]])
+            exit_key.append(arrays.rank[exit_[closed]])
+            reasons.append(np.full(closed.sum(), SIGNAL))
+
+            # Continue after the exit: the next row for signal exits, the next date for price exits
+            next_codes = np.concatenate([codes[closed], codes[hit]])
+            pointer = np.concatenate([
+                exit_[closed] + 1,
+                arrays.first_row_on_or_after(codes[hit], price_exit['date_ns'][hit] + 1) if hit.any()
+                else np.empty(0, dtype=np.intp),
+            ])
+            earliest = np.concatenate([
+                arrays.date_ns[exit_[closed]],
+                price_exit['date_ns'][hit] if hit.any() else np.empty(0, dtype=np.int64),
+            ]) + cooldown_ns
+            codes = next_codes
+
+        entries = np.concatenate(entries).astype(np.intp)
+        exit_ns = np.concatenate(exit_ns).astype(np.int64)
+        exit_price = np.concatenate(exit_price).astype(float)
+        exit_key = np.concatenate(exit_key)
+        reasons = np.concatenate(reasons)
+        open_entries = np.concatenate(open_entries).astype(np.intp)
+
+        # Closed trades in the order their exits happened (the legacy sell row order)
+        order = np.lexsort((arrays.rank[entries], exit_key, exit_ns))
+        entries, exit_ns, exit_price, reasons = entries[order], exit_ns[order], exit_price[order], reasons[order]
+
+        # Leftover positions close at the last date, on the symbol's first row that day
+        # (no row is dated after the last date, so any row found is on it)
+        open_entries = open_entries[np.argsort(arrays.rank[open_entries], kind='stable')]
+        open_codes = arrays.code[open_entries]
+        last_row = arrays.first_row_on_or_after(open_codes, np.full(len(open_entries), last_ns))
+        on_last = last_row < arrays.stop[open_codes]
+        open_entries, last_row = open_entries[on_last], last_row[on_last]
+
+        return self._trades(
+            arrays, shares, strategy_name,
+            np.concatenate([entries, open_entries]),
+            np.concatenate([exit_ns, arrays.date_ns[last_row]]),
+            np.concatenate([exit_price, arrays.close[last_row]]),
+            np.concatenate([reasons, np.full(len(open_entries), END_OF_DATA)]) if self.price_exits else None,
+        )
+
+    def _shares(self, close):
+        """int((capital * position_size) / price) per row (0 where it can't be bought)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shares = np.trunc((self.initial_capital * self.position_size) / close)
+        return np.where(np.isfinite(shares), shares, 0).astype(np.int64)
+
+    def _trades(self, arrays, shares, strategy_name, entry_rows, exit_ns, exit_price, reasons=None):
+        """Trade records with the legacy engine's arithmetic."""
+        if not len(entry_rows):
+            return pd.DataFrame()
+
+        n_shares = shares[entry_rows]
+        entry_price = arrays.close[entry_rows]
+
+        position_value = n_shares * entry_price
+        entry_commission = position_value * self.commission
+        exit_value = n_shares * exit_price
+        exit_commission = exit_value * self.commission
+        entry_value = n_shares * entry_price
+        total_commission = entry_commission + exit_commission
+        pnl = exit_value - entry_value - total_commission
+        pnl_pct = (pnl / entry_value) * 100
+
+        entry_dates = arrays.dates[entry_rows]
+        exit_dates = exit_ns.astype('datetime64[ns]').astype(arrays.dates.dtype)
+        holding_days = (exit_ns - arrays.date_ns[entry_rows]) // _DAY_NS
+
+        trades_df = pd.DataFrame({
+            'strategy': strategy_name,
+            'symbol': arrays.symbols[arrays.code[entry_rows]],
+            'entry_date': entry_dates,
+            'exit_date': exit_dates,
+            'holding_days': holding_days,
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'shares': n_shares,
+            'pnl': pnl,
+            'pnl_pct': pnl_pct,
+            'commission': total_commission,
+            'entry_value': entry_value,
+            'exit_value': exit_value,
+        }, columns=TRADE_COLUMNS)
+
+        if reasons is not None:
+            trades_df['exit_reason'] = EXIT_REASONS[reasons]
+
+        return trades_df
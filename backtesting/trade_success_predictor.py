@@ -17,11 +17,26 @@ Usage:
     # Train with custom test split
     python trade_success_predictor.py --test-size 0.3
     
-    # Export model
-    python trade_success_predictor.py --output models/trade_predictor.pkl
+    # Export model (.ubj: XGBoost booster plus JSON manifest; .pkl: pickle)
+    python trade_success_predictor.py --output models/trade_success_model.ubj
     
     # Load trades with fundamentals
     python trade_success_predictor.py --input backtesting/trades_with_fundamentals.csv
+    
+    # Rebuild the feature matrix instead of reading it from the cache
+    python trade_success_predictor.py --no-cache
+    
+    # Search 27 hyperparameter configurations before training, 8 workers
+    python trade_success_predictor.py --search 27 --workers 8
+
+The prepared feature matrix is cached in data/feature_matrix_cache, keyed by the
+input file's content, the feature definition and the feature store's sector
+snapshot (backtesting/feature_matrix_cache.py), so re-runs on the same data
+skip loading and encoding.
+
+With --search, the hyperparameters are chosen by successive halving over
+time-ordered folds of the training split (backtesting/hyperparameter_search.py)
+and the final model is trained with the best configuration.
 """
 
 import sys
@@ -31,6 +46,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 import pickle
+import json
 
 import pandas as pd
 import numpy as np
@@ -41,12 +57,14 @@ from sklearn.metrics import (
 )
 from sklearn.preprocessing import LabelEncoder
 import xgboost as xgb
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from db.postgres_database_manager import PostgresDatabaseManager
+from backtesting.feature_encoder import FeatureEncoder
+from backtesting.feature_matrix_cache import FeatureMatrixCache
+from backtesting.feature_store import FeatureStore
+from backtesting.hyperparameter_search import SuccessiveHalvingSearch
+from backtesting.model_artifact import DEFAULT_THRESHOLD, manifest_path, save_artifact
 
 # Configure logging
 logging.basicConfig(
@@ -55,64 +73,94 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Numeric features: fundamental quality scores
+NUMERIC_FEATURES = [
+    'overall_quality_score',
+    'balance_sheet_quality_score',
+    'cash_flow_quality_score', 
+    'income_statement_quality_score',
+    'bs_liquidity_score',
+    'bs_leverage_score',
+    'bs_asset_quality_score',
+    'cf_generation_score',
+    'cf_efficiency_score',
+    'cf_sustainability_score',
+    'is_profitability_score',
+    'is_margin_score',
+    'is_growth_score'
+]
+
+# Categorical features (one-hot encoded)
+CATEGORICAL_FEATURES = ['sector', 'strategy']
+
+DEFAULT_INPUT = 'backtesting/trades_with_fundamentals.parquet'
+
+# XGBoost hyperparameters of the model (overridden by TradeSuccessPredictor.params,
+# e.g. the best configuration of a hyperparameter search)
+DEFAULT_PARAMS = {
+    'n_estimators': 200,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'min_child_weight': 1,
+    'tree_method': 'hist',
+}
+
 
 class TradeSuccessPredictor:
     """XGBoost model to predict trade success based on fundamentals and sector."""
     
-    def __init__(self, test_size=0.2, random_state=42):
+    def __init__(self, test_size=0.2, random_state=42, params=None, feature_store=None):
         """
         Initialize predictor.
         
         Args:
             test_size (float): Fraction of data for testing (default: 0.2)
             random_state (int): Random seed for reproducibility (default: 42)
+            params (dict, optional): XGBoost hyperparameters overriding DEFAULT_PARAMS
+            feature_store (FeatureStore, optional): Store sector is joined from
+                (default: the local store)
         """
         self.test_size = test_size
         self.random_state = random_state
+        self.params = dict(params or {})
+        self.feature_store = feature_store if feature_store is not None else FeatureStore()
         self.model = None
         self.feature_names = None
+        self.entry_dates = None
+        self.training_data_hash = None
+        self.encoder = None
         self.label_encoders = {}
         
-    def load_data_with_sector(self, input_file=None):
+    def load_data_with_sector(self, input_file=None, sync=True):
         """
-        Load trades with fundamentals and join sector/industry from company_overview.
+        Load trades with fundamentals and join sector/industry from the feature store.
         
         Args:
-            input_file (str, optional): Path to trades CSV. If None, loads from parquet.
+            input_file (str, optional): Trades CSV or Parquet file (default:
+                backtesting/trades_with_fundamentals.parquet)
+            sync (bool): Refresh the store's sector copy first (False when the
+                caller just did)
             
         Returns:
             pd.DataFrame: Trades with sector/industry information
         """
         logger.info("Loading trade data...")
         
-        if input_file and input_file.endswith('.csv'):
+        input_file = input_file or DEFAULT_INPUT
+        if input_file.endswith('.csv'):
             df = pd.read_csv(input_file)
         else:
-            df = pd.read_parquet('backtesting/trades_with_fundamentals.parquet')
+            df = pd.read_parquet(input_file)
         
         logger.info(f"Loaded {len(df):,} trades")
         
-        # Get sector and industry data
+        # Sector and industry from the feature store, as the scorers get them
         logger.info("Fetching sector and industry data...")
-        db = PostgresDatabaseManager()
-        db.connect()
-        
-        query = """
-            SELECT 
-                symbol,
-                sector,
-                industry
-            FROM raw.company_overview
-            WHERE sector IS NOT NULL
-        """
-        
-        sector_df = pd.read_sql(query, db.connection)
-        db.close()
-        
-        logger.info(f"Loaded sector data for {len(sector_df):,} companies")
-        
-        # Join sector data
-        df = df.merge(sector_df, on='symbol', how='left')
+        if sync:
+            self.feature_store.sync(['sector'])
+        df = self.feature_store.join(df, 'entry_date', sources=['sector'])
         
         # Log missing sectors
         missing_sector = df['sector'].isna().sum()
@@ -144,55 +192,29 @@ class TradeSuccessPredictor:
         success_rate = df_with_fundamentals['success'].mean()
         logger.info(f"Success rate: {success_rate*100:.1f}% (baseline accuracy)")
         
-        # Numeric features: fundamental quality scores
-        numeric_features = [
-            'overall_quality_score',
-            'balance_sheet_quality_score',
-            'cash_flow_quality_score', 
-            'income_statement_quality_score',
-            'bs_liquidity_score',
-            'bs_leverage_score',
-            'bs_asset_quality_score',
-            'cf_generation_score',
-            'cf_efficiency_score',
-            'cf_sustainability_score',
-            'is_profitability_score',
-            'is_margin_score',
-            'is_growth_score'
-        ]
-        
         # Filter to available numeric features
-        available_numeric = [col for col in numeric_features if col in df_with_fundamentals.columns]
+        available_numeric = [col for col in NUMERIC_FEATURES if col in df_with_fundamentals.columns]
         logger.info(f"Using {len(available_numeric)} numeric features")
         
-        # Start with numeric features
-        X = df_with_fundamentals[available_numeric].copy()
-        
-        # Fill missing numeric values with median
-        for col in X.columns:
-            if X[col].isna().any():
-                median_val = X[col].median()
-                X[col].fillna(median_val, inplace=True)
-                logger.info(f"Filled {col} missing values with median: {median_val:.2f}")
-        
-        # One-hot encode SECTOR
+        # Freeze the feature schema (training medians, sector and strategy
+        # vocabularies) and build the matrix with it, as the scorers will
         if 'sector' in df_with_fundamentals.columns:
-            # Fill missing sectors with 'UNKNOWN'
             df_with_fundamentals['sector'] = df_with_fundamentals['sector'].fillna('UNKNOWN')
-            
-            sector_dummies = pd.get_dummies(df_with_fundamentals['sector'], prefix='sector', drop_first=False)
-            X = pd.concat([X, sector_dummies], axis=1)
-            logger.info(f"Added {len(sector_dummies.columns)} sector features")
+        categorical = [col for col in CATEGORICAL_FEATURES if col in df_with_fundamentals.columns]
+        self.encoder = FeatureEncoder.fit(df_with_fundamentals, available_numeric, categorical)
+        for col, values in self.encoder.vocabularies.items():
+            logger.info(f"Added {len(values)} {col} features")
         
-        # One-hot encode STRATEGY
-        if 'strategy' in df_with_fundamentals.columns:
-            strategy_dummies = pd.get_dummies(df_with_fundamentals['strategy'], prefix='strategy', drop_first=False)
-            X = pd.concat([X, strategy_dummies], axis=1)
-            logger.info(f"Added {len(strategy_dummies.columns)} strategy features")
+        X = pd.DataFrame(self.encoder.transform(df_with_fundamentals), columns=self.encoder.feature_names,
+                         index=df_with_fundamentals.index, copy=False)
         
         # Get target variable
         y = df_with_fundamentals['success'].values
         
+        # Entry dates, for time-ordered splits (hyperparameter search)
+        if 'entry_date' in df_with_fundamentals.columns:
+            self.entry_dates = pd.to_datetime(df_with_fundamentals['entry_date']).to_numpy()
+        
         # Store feature names
         feature_names = X.columns.tolist()
         
@@ -200,6 +222,77 @@ class TradeSuccessPredictor:
         
         return X, y, feature_names
     
+    def feature_spec(self):
+        """Everything besides the input file that prepare_features() output depends on."""
+        return {
+            'numeric': NUMERIC_FEATURES,
+            'categorical': CATEGORICAL_FEATURES,
+            'sector': self.feature_store.manifest['sources'].get('sector'),
+        }
+    
+    def load_features(self, input_file=None, cache=None):
+        """
+        Load, join and prepare features, or read them from the feature-matrix cache.
+        
+        With a cache the sector copy is synced first, so the key names the
+        sector data a miss would join; a hit then skips loading, the sector
+        join and encoding. Either way X is float32, so hits and misses train
+        the same model.
+        
+        Args:
+            input_file (str, optional): Trades CSV or Parquet file (default:
+                backtesting/trades_with_fundamentals.parquet)
+            cache (FeatureMatrixCache, optional): Cache to read and fill
+                (None prepares from scratch)
+            
+        Returns:
+            tuple: (X, y, feature_names); entry dates are left in self.entry_dates
+        """
+        input_file = input_file or DEFAULT_INPUT
+        self.training_data_hash = FeatureMatrixCache.file_hash(input_file)
+        if cache is not None:
+            self.feature_store.sync(['sector'])
+            key = cache.key(self.training_data_hash, self.feature_spec())
+            cached = cache.get(key)
+            if cached is not None:
+                X, y, feature_names = cached
+                self.entry_dates = cache.dates(key)
+                self.encoder = cache.encoder(key)
+                logger.info(f"Feature matrix from cache: {X.shape[0]:,} rows × {X.shape[1]} features")
+                return pd.DataFrame(X, columns=feature_names, copy=False), y, feature_names
+        
+        df = self.load_data_with_sector(input_file, sync=cache is None)
+        X, y, feature_names = self.prepare_features(df)
+        X = X.astype(np.float32).reset_index(drop=True)
+        
+        if cache is not None:
+            cache.put(key, X.to_numpy(), y, feature_names,
+                      input_file=input_file, dates=self.entry_dates, encoder=self.encoder)
+            logger.info(f"Feature matrix cached in {cache.root}")
+        
+        return X, y, feature_names
+    
+    def make_classifier(self, scale_pos_weight=1.0, n_jobs=-1, **params):
+        """
+        Untrained XGBoost classifier with the model's hyperparameters.
+        
+        Args:
+            scale_pos_weight (float): Negative/positive class ratio
+            n_jobs (int): Training threads (default: -1 = all cores)
+            **params: Hyperparameters overriding DEFAULT_PARAMS and self.params
+            
+        Returns:
+            xgb.XGBClassifier: Classifier ready to fit
+        """
+        return xgb.XGBClassifier(
+            objective='binary:logistic',
+            **{**DEFAULT_PARAMS, **self.params, **params},
+            scale_pos_weight=scale_pos_weight,
+            random_state=self.random_state,
+            n_jobs=n_jobs,
+            eval_metric='logloss'
+        )
+    
     def train_model(self, X_train, y_train, X_test, y_test):
         """
         Train XGBoost classification model.
@@ -224,18 +317,7 @@ class TradeSuccessPredictor:
         logger.info(f"Using scale_pos_weight: {scale_pos_weight:.2f}")
         
         # Initialize XGBoost classifier
-        self.model = xgb.XGBClassifier(
-            objective='binary:logistic',
-            n_estimators=200,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            scale_pos_weight=scale_pos_weight,
-            random_state=self.random_state,
-            n_jobs=-1,
-            eval_metric='logloss'
-        )
+        self.model = self.make_classifier(scale_pos_weight)
         
         # Train with early stopping
         self.model.fit(
@@ -326,6 +408,10 @@ class TradeSuccessPredictor:
             metrics (dict): Performance metrics from evaluate_model
             output_dir (str): Directory to save plots
         """
+        # Plotting libraries are only needed here
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         logger.info("Generating visualizations...")
         
         os.makedirs(output_dir, exist_ok=True)
@@ -379,24 +465,38 @@ class TradeSuccessPredictor:
         
         plt.close()
     
-    def save_model(self, output_path):
+    def save_model(self, output_path, threshold=DEFAULT_THRESHOLD):
         """
         Save trained model to disk.
         
+        A .ubj path writes a model artifact (booster plus manifest, see
+        backtesting/model_artifact.py); any other path a pickle.
+        
         Args:
             output_path (str): Path to save model
+            threshold (float): Success probability at which scorers take a
+                signal, recorded in the artifact (default: 0.8)
         """
         if self.model is None:
             logger.error("No model to save!")
             return
         
+        encoder = self.encoder or FeatureEncoder.from_feature_names(self.feature_names, CATEGORICAL_FEATURES)
+        if output_path.endswith('.ubj'):
+            save_artifact(self.model, output_path, encoder, threshold=threshold,
+                          training_data_hash=self.training_data_hash, params={**DEFAULT_PARAMS, **self.params})
+            logger.info(f"Model artifact saved to {output_path}")
+            return
+        
         os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
         
         model_data = {
             'model': self.model,
             'feature_names': self.feature_names,
+            'encoder': encoder.to_dict(),
             'test_size': self.test_size,
-            'random_state': self.random_state
+            'random_state': self.random_state,
+            'params': self.params
         }
         
         with open(output_path, 'wb') as f:
@@ -409,15 +509,29 @@ class TradeSuccessPredictor:
         Load trained model from disk.
         
         Args:
-            model_path (str): Path to saved model
+            model_path (str): Path to saved model (.ubj artifact or pickle)
         """
+        if model_path.endswith('.ubj'):
+            with open(manifest_path(model_path)) as f:
+                manifest = json.load(f)
+            self.model = xgb.XGBClassifier()
+            self.model.load_model(model_path)
+            self.encoder = FeatureEncoder.from_dict(manifest)
+            self.feature_names = self.encoder.feature_names
+            self.params = manifest.get('params', {})
+            logger.info(f"Model loaded from {model_path}")
+            return
+        
         with open(model_path, 'rb') as f:
             model_data = pickle.load(f)
         
         self.model = model_data['model']
         self.feature_names = model_data['feature_names']
+        if model_data.get('encoder'):
+            self.encoder = FeatureEncoder.from_dict(model_data['encoder'])
         self.test_size = model_data.get('test_size', 0.2)
         self.random_state = model_data.get('random_state', 42)
+        self.params = model_data.get('params', {})
         
         logger.info(f"Model loaded from {model_path}")
 
@@ -432,7 +546,7 @@ def main():
     parser.add_argument(
         '--input',
         type=str,
-        default='backtesting/trades_with_fundamentals.parquet',
+        default=DEFAULT_INPUT,
         help='Input file with trades and fundamentals'
     )
     parser.add_argument(
@@ -444,7 +558,13 @@ def main():
     parser.add_argument(
         '--output',
         type=str,
-        help='Path to save trained model (optional)'
+        help='Path to save trained model: .ubj for a model artifact, else a pickle (optional)'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help='Success probability threshold recorded in the model artifact (default: 0.8)'
     )
     parser.add_argument(
         '--random-seed',
@@ -453,6 +573,61 @@ def main():
         help='Random seed for reproducibility (default: 42)'
     )
     
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Feature-matrix cache directory (default: FEATURE_MATRIX_CACHE_DIR or data/feature_matrix_cache)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Prepare features without reading or writing the feature-matrix cache'
+    )
+    
+    parser.add_argument(
+        '--search',
+        type=int,
+        default=0,
+        help='Hyperparameter configurations to search before training (default: 0 = no search)'
+    )
+    parser.add_argument(
+        '--search-folds',
+        type=int,
+        default=4,
+        help='Time-ordered CV folds per configuration (default: 4)'
+    )
+    parser.add_argument(
+        '--eta',
+        type=int,
+        default=3,
+        help='Keep 1/eta of the configurations per rung (default: 3)'
+    )
+    parser.add_argument(
+        '--min-rounds',
+        type=int,
+        default=50,
+        help='Boosting rounds of the first rung (default: 50)'
+    )
+    parser.add_argument(
+        '--max-rounds',
+        type=int,
+        default=400,
+        help='Boosting rounds of the last rung (default: 400)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Search processes (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--search-output',
+        type=str,
+        default='backtesting/hyperparameter_search_trials.csv',
+        help='CSV of every search trial with its AUC and wall-clock time'
+    )
+    
     args = parser.parse_args()
     
     # Initialize predictor
@@ -465,11 +640,9 @@ def main():
         random_state=args.random_seed
     )
     
-    # Load data
-    df = predictor.load_data_with_sector(args.input)
-    
-    # Prepare features
-    X, y, feature_names = predictor.prepare_features(df)
+    # Load and prepare features (or read them from the cache)
+    cache = None if args.no_cache else FeatureMatrixCache(args.cache_dir)
+    X, y, feature_names = predictor.load_features(args.input, cache=cache)
     predictor.feature_names = feature_names
     
     # Split data
@@ -481,6 +654,20 @@ def main():
     logger.info(f"Training set: {len(X_train):,} samples")
     logger.info(f"Test set: {len(X_test):,} samples")
     
+    # Choose hyperparameters on the training split only
+    if args.search > 0:
+        if predictor.entry_dates is None:
+            raise ValueError("--search needs an entry_date column for time-ordered folds")
+        search = SuccessiveHalvingSearch(
+            predictor, n_trials=args.search, n_folds=args.search_folds, eta=args.eta,
+            min_rounds=args.min_rounds, max_rounds=args.max_rounds, random_state=args.random_seed
+        )
+        trials_df, best_params = search.run(X_train, y_train, predictor.entry_dates[X_train.index.to_numpy()],
+                                            workers=args.workers)
+        trials_df.to_csv(args.search_output, index=False)
+        logger.info(f"Search trials saved to {args.search_output}")
+        predictor.params = best_params
+    
     # Train model
     predictor.train_model(X_train, y_train, X_test, y_test)
     
@@ -495,7 +682,7 @@ def main():
     
     # Save model if requested
     if args.output:
-        predictor.save_model(args.output)
+        predictor.save_model(args.output, threshold=args.threshold)
     
     logger.info("=" * 80)
     logger.info("Model training completed!")
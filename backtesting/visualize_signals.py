@@ -37,6 +37,8 @@ import seaborn as sns
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.postgres_database_manager import PostgresDatabaseManager
+from db.ohlcv_cache import OhlcvCache
+from backtesting.trade_log import TRADE_CHART_COLUMNS, read_trades
 
 # Configure logging
 logging.basicConfig(
@@ -59,8 +61,13 @@ def load_signals(input_file):
     return df
 
 
-def get_price_data(symbol, start_date, end_date):
-    """Get historical price data for a symbol."""
+def get_price_data(symbol, start_date, end_date, ohlcv_cache=None):
+    """Get historical price data for a symbol (from ohlcv_cache, an OhlcvCache, when given)."""
+    if ohlcv_cache is not None:
+        symbol_id = ohlcv_cache.symbol_id(symbol)
+        if symbol_id is not None:
+            return ohlcv_cache.load_frame(symbol_id, start=start_date, end=end_date)
+    
     db = PostgresDatabaseManager()
     db.connect()
     
@@ -80,7 +87,7 @@ def get_price_data(symbol, start_date, end_date):
         
         symbol_id = int(result['symbol_id'].iloc[0])
         
-        # Get price data from raw schema using symbol_id (cast to text for comparison)
+        # Get price data from raw schema using the integer symbol key
         query = f"""
             SELECT 
                 date,
@@ -91,7 +98,7 @@ def get_price_data(symbol, start_date, end_date):
                 adjusted_close,
                 volume
             FROM raw.time_series_daily_adjusted
-            WHERE symbol_id = '{symbol_id}'
+            WHERE symbol_id_int = {symbol_id}
                 AND date >= '{start_date}'
                 AND date <= '{end_date}'
             ORDER BY date
@@ -155,14 +162,10 @@ def get_completed_trades_for_symbol(symbol, trades_file='backtesting/trades_filt
     Uses ML-filtered trades (80%+ success probability) to show only
     trades that would have been taken with the ML system.
     """
-    # Try to load from specified trades file
+    # Try to load from specified trades file (trade log .parquet or CSV)
     if os.path.exists(trades_file):
         try:
-            trades_df = pd.read_csv(trades_file)
-            trades_df = trades_df[trades_df['symbol'] == symbol].copy()
-            trades_df['entry_date'] = pd.to_datetime(trades_df['entry_date'])
-            trades_df['exit_date'] = pd.to_datetime(trades_df['exit_date'])
-            return trades_df
+            return read_trades(trades_file, columns=TRADE_CHART_COLUMNS, symbols=[symbol])
         except Exception as e:
             logger.warning(f"Could not load trade data from {trades_file}: {e}")
     
@@ -173,10 +176,7 @@ def get_completed_trades_for_symbol(symbol, trades_file='backtesting/trades_filt
         return pd.DataFrame()
     
     try:
-        trades_df = pd.read_csv(backtest_file)
-        trades_df = trades_df[trades_df['symbol'] == symbol].copy()
-        trades_df['entry_date'] = pd.to_datetime(trades_df['entry_date'])
-        trades_df['exit_date'] = pd.to_datetime(trades_df['exit_date'])
+        trades_df = read_trades(backtest_file, columns=TRADE_CHART_COLUMNS, symbols=[symbol])
         logger.warning(f"Using unfiltered trades for {symbol} - {trades_file} not found")
         return trades_df
     except Exception as e:
@@ -335,9 +335,13 @@ def main():
     parser.add_argument('--output-dir', type=str, default='backtesting/signal_charts',
                        help='Output directory for charts')
     parser.add_argument('--trades-file', type=str, default='backtesting/trades_filtered_80pct.csv',
-                       help='Backtest trades file to show (default: ML-filtered 80%% trades)')
+                       help='Backtest trades file, CSV or trade log .parquet (default: ML-filtered 80%% trades)')
+    parser.add_argument('--ohlcv-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Read prices from the local OHLCV cache (scripts/sync_ohlcv_cache.py) '
+                            'instead of Postgres; DIR defaults to OHLCV_CACHE_DIR or data/ohlcv_cache')
     
     args = parser.parse_args()
+    ohlcv_cache = OhlcvCache(args.ohlcv_cache or None) if args.ohlcv_cache is not None else None
     
     # Create output directory
     output_dir = Path(args.output_dir)
@@ -385,7 +389,7 @@ def main():
         
         # Get price data
         price_df = get_price_data(symbol, start_date.strftime('%Y-%m-%d'), 
-                                  end_date.strftime('%Y-%m-%d'))
+                                  end_date.strftime('%Y-%m-%d'), ohlcv_cache)
         
         if len(price_df) == 0:
             logger.warning(f"  No price data found for {symbol}, skipping...")
@@ -28,6 +28,8 @@ import seaborn as sns
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.postgres_database_manager import PostgresDatabaseManager
+from db.ohlcv_cache import OhlcvCache
+from backtesting.trade_log import TRADE_CHART_COLUMNS, read_trades
 
 # Configure logging
 logging.basicConfig(
@@ -55,7 +57,7 @@ def load_signals(input_file):
     return df
 
 
-def get_price_and_indicators(symbol, start_date, end_date):
+def get_price_and_indicators(symbol, start_date, end_date, ohlcv_cache=None):
     """Get historical price data AND technical indicators for a symbol."""
     db = PostgresDatabaseManager()
     db.connect()
@@ -87,7 +89,7 @@ def get_price_and_indicators(symbol, start_date, end_date):
                 adjusted_close,
                 volume
             FROM raw.time_series_daily_adjusted
-            WHERE symbol_id = '{symbol_id}'
+            WHERE symbol_id_int = {symbol_id}
                 AND date >= '{start_date}'
                 AND date <= '{end_date}'
             ORDER BY date
@@ -113,7 +115,10 @@ def get_price_and_indicators(symbol, start_date, end_date):
             ORDER BY date
         """
         
-        price_df = pd.read_sql(query_price, db.connection)
+        if ohlcv_cache is not None:
+            price_df = ohlcv_cache.load_frame(symbol_id, start=start_date, end=end_date)
+        else:
+            price_df = pd.read_sql(query_price, db.connection)
         indicators_df = pd.read_sql(query_indicators, db.connection)
         
         # Merge price and indicators
@@ -174,11 +179,7 @@ def get_completed_trades_for_symbol(symbol, trades_file='backtesting/trades_filt
     """Get completed trades for backtesting visualization."""
     if os.path.exists(trades_file):
         try:
-            trades_df = pd.read_csv(trades_file)
-            trades_df = trades_df[trades_df['symbol'] == symbol].copy()
-            trades_df['entry_date'] = pd.to_datetime(trades_df['entry_date'])
-            trades_df['exit_date'] = pd.to_datetime(trades_df['exit_date'])
-            return trades_df
+            return read_trades(trades_file, columns=TRADE_CHART_COLUMNS, symbols=[symbol])
         except Exception as e:
             logger.warning(f"Could not load trade data from {trades_file}: {e}")
     
@@ -443,9 +444,13 @@ def main():
     parser.add_argument('--output-dir', type=str, default='backtesting/signal_charts_indicators',
                        help='Output directory for charts')
     parser.add_argument('--trades-file', type=str, default='backtesting/trades_filtered_80pct.csv',
-                       help='Path to filtered trades CSV file')
+                       help='Path to filtered trades CSV or trade log .parquet file')
+    parser.add_argument('--ohlcv-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Read prices from the local OHLCV cache (scripts/sync_ohlcv_cache.py) '
+                            'instead of Postgres; DIR defaults to OHLCV_CACHE_DIR or data/ohlcv_cache')
     
     args = parser.parse_args()
+    ohlcv_cache = OhlcvCache(args.ohlcv_cache or None) if args.ohlcv_cache is not None else None
     
     logger.info("=" * 100)
     logger.info("TRADING SIGNAL VISUALIZER WITH INDICATORS")
@@ -480,7 +485,7 @@ def main():
             start_date = signal_row['date'] - timedelta(days=args.days)
             
             # Get data
-            df = get_price_and_indicators(signal_row['symbol'], start_date, end_date)
+            df = get_price_and_indicators(signal_row['symbol'], start_date, end_date, ohlcv_cache)
             
             if df.empty:
                 logger.warning(f"  No price data found for {signal_row['symbol']}")
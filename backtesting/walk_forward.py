@@ -0,0 +1,549 @@
+"""Walk-forward backtest of the trade success model.
+
+trade_success_predictor.py trains once on a random split of the whole trade
+history, and filter_trades_by_prediction.py then scores that same history, so
+most scored trades were seen in training. This script replays history the way
+the model would have been used:
+
+1. the trade history is cut into consecutive test windows (--test-days)
+2. for each window, a model is trained on the trades of the preceding
+   --train-days (rolling) or of all earlier history (--expanding); a trade is
+   only used for training once its exit date (when its outcome is known) is
+   before the test window starts
+3. the model scores the test window's trades, which it has never seen, and
+   trades at or above --threshold are the ones the filter would have taken
+
+Folds are independent and run in parallel in a process pool. Each fold's
+feature matrices (numeric fills and one-hot vocabularies fitted on its own
+training window) are saved in a cache keyed by the input data, the fold
+bounds and the feature set, so a re-run with a new threshold or model only
+trains and scores.
+
+Output: one row per fold (sizes, AUC, trades taken), out-of-sample strategy
+performance per fold, and the scored out-of-sample trades.
+
+Usage:
+    # Two-year rolling window, quarterly folds
+    python walk_forward.py
+
+    # Expanding window, monthly folds, 8 workers
+    python walk_forward.py --expanding --test-days 30 --workers 8
+
+    # Custom input and threshold
+    python walk_forward.py --input backtesting/trades_with_fundamentals.csv --threshold 0.7
+"""
+
+import sys
+import os
+import time
+import hashlib
+import argparse
+import logging
+from multiprocessing import Pool
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backtesting.feature_encoder import FeatureEncoder
+from backtesting.trade_success_predictor import TradeSuccessPredictor, NUMERIC_FEATURES, CATEGORICAL_FEATURES
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'walk_forward_cache'
+
+# Bump when fold feature construction changes, so cached matrices are rebuilt
+FEATURE_VERSION = 1
+
+# Runner, trades and settings owned by a fold pool worker (set by _init_fold_worker)
+_fold_worker = None
+
+
+def _init_fold_worker(runner, trades, data_hash, n_jobs):
+    """
+    Pool initializer: keep the trades for the life of the worker.
+
+    Args:
+        runner (WalkForwardRunner): Runner with the fold settings
+        trades (pd.DataFrame): Prepared trade history
+        data_hash (str): Hash of the trade history (cache key)
+        n_jobs (int): XGBoost threads per fold
+    """
+    global _fold_worker
+
+    _fold_worker = (runner, trades, data_hash, n_jobs)
+    logger.setLevel(logging.WARNING)
+
+
+def _run_fold_worker(fold):
+    """
+    Train and score one fold.
+
+    Defined at module level to be picklable for multiprocessing.
+
+    Args:
+        fold (dict): Fold bounds from make_folds()
+
+    Returns:
+        tuple: (fold metrics dict, test trade positions, probabilities)
+    """
+    runner, trades, data_hash, n_jobs = _fold_worker
+    return runner.run_fold(trades, fold, data_hash, n_jobs)
+
+
+class WalkForwardRunner:
+    """Rolling retrain and out-of-sample scoring of the trade success model."""
+
+    def __init__(self, train_days=730, test_days=90, expanding=False, min_train_trades=200,
+                 threshold=0.8, random_state=42, cache_dir=None, use_cache=True):
+        """
+        Initialize runner.
+
+        Args:
+            train_days (int): Training window length in calendar days (default: 730)
+            test_days (int): Test window length in calendar days (default: 90)
+            expanding (bool): Train on all history before each test window
+            min_train_trades (int): Skip folds with fewer training trades (default: 200)
+            threshold (float): Success probability needed to take a trade (default: 0.8)
+            random_state (int): Random seed for the model (default: 42)
+            cache_dir (str, optional): Fold feature cache (default: data/walk_forward_cache)
+            use_cache (bool): Read and write the fold feature cache (default: True)
+        """
+        self.train_days = train_days
+        self.test_days = test_days
+        self.expanding = expanding
+        self.min_train_trades = min_train_trades
+        self.threshold = threshold
+        self.random_state = random_state
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.use_cache = use_cache
+
+    def prepare_trades(self, df):
+        """
+        Trades the model can use, in a stable order, with the columns folds read.
+
+        Args:
+            df (pd.DataFrame): Trades with fundamentals (and sector)
+
+        Returns:
+            pd.DataFrame: Trades with fundamental data, RangeIndex
+        """
+        df = df[df['overall_quality_score'].notna()].copy()
+        df['entry_date'] = pd.to_datetime(df['entry_date'])
+        df['exit_date'] = pd.to_datetime(df['exit_date'])
+        if 'sector' not in df.columns:
+            df['sector'] = np.nan
+        df['sector'] = df['sector'].fillna('UNKNOWN')
+
+        df = df.sort_values(['entry_date', 'strategy', 'symbol'], kind='stable').reset_index(drop=True)
+        logger.info(f"Using {len(df):,} trades with fundamental data "
+                    f"({df['entry_date'].min().date()} to {df['entry_date'].max().date()})")
+        return df
+
+    def data_hash(self, trades):
+        """Content hash of the columns fold features are built from."""
+        columns = ['entry_date', 'exit_date', 'pnl'] + CATEGORICAL_FEATURES + self.numeric_features(trades)
+        hashed = pd.util.hash_pandas_object(trades[columns], index=True).to_numpy()
+        return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+    def numeric_features(self, trades):
+        """Fundamental score columns present in the trades."""
+        return [col for col in NUMERIC_FEATURES if col in trades.columns]
+
+    def make_folds(self, trades):
+        """
+        Consecutive test windows after the first training window.
+
+        Args:
+            trades (pd.DataFrame): Prepared trades
+
+        Returns:
+            list: Dicts with fold, train_start, test_start, test_end
+        """
+        first = trades['entry_date'].min().normalize()
+        last = trades['entry_date'].max()
+
+        folds = []
+        test_start = first + pd.Timedelta(days=self.train_days)
+        while test_start <= last:
+            test_end = test_start + pd.Timedelta(days=self.test_days)
+            folds.append({
+                'fold': len(folds),
+                'train_start': first if self.expanding else test_start - pd.Timedelta(days=self.train_days),
+                'test_start': test_start,
+                'test_end': test_end,
+            })
+            test_start = test_end
+
+        logger.info(f"{len(folds)} folds of {self.test_days} days after a "
+                    f"{'expanding' if self.expanding else f'{self.train_days}-day rolling'} training window")
+        return folds
+
+    def fold_features(self, trades, fold, data_hash):
+        """
+        Feature matrices for one fold, from the cache when possible.
+
+        Numeric gaps are filled with training medians and the one-hot
+        vocabularies come from the training window only; test categories
+        never seen in training get all-zero columns.
+
+        Args:
+            trades (pd.DataFrame): Prepared trades
+            fold (dict): Fold bounds
+            data_hash (str): data_hash(trades)
+
+        Returns:
+            tuple: (features dict with X_train, y_train, X_test, y_test,
+                test_rows, feature_names; True if read from the cache)
+        """
+        numeric = self.numeric_features(trades)
+        key = hashlib.sha1('|'.join(map(str, [
+            FEATURE_VERSION, data_hash, fold['train_start'], fold['test_start'], fold['test_end'], *numeric
+        ])).encode()).hexdigest()[:24]
+        path = self.cache_dir / f"fold_{key}.npz"
+
+        if self.use_cache and path.exists():
+            with np.load(path) as cached:
+                return {name: cached[name] for name in cached.files}, True
+
+        train_mask = (
+            (trades['entry_date'] >= fold['train_start'])
+            & (trades['exit_date'] < fold['test_start'])
+        ).to_numpy()
+        test_mask = (
+            (trades['entry_date'] >= fold['test_start'])
+            & (trades['entry_date'] < fold['test_end'])
+        ).to_numpy()
+        train, test = trades[train_mask], trades[test_mask]
+
+        encoder = FeatureEncoder.fit(train, numeric, CATEGORICAL_FEATURES)
+        feature_names = encoder.feature_names
+
+        features = {
+            'X_train': encoder.transform(train),
+            'y_train': (train['pnl'] > 0).to_numpy(dtype=np.int8),
+            'X_test': encoder.transform(test),
+            'y_test': (test['pnl'] > 0).to_numpy(dtype=np.int8),
+            'test_rows': np.flatnonzero(test_mask),
+            'feature_names': np.array(feature_names, dtype=str),
+        }
+
+        if self.use_cache:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **features)
+            os.replace(tmp_path, path)
+
+        return features, False
+
+    def run_fold(self, trades, fold, data_hash, n_jobs=-1):
+        """
+        Train on the fold's window and score its test trades.
+
+        Args:
+            trades (pd.DataFrame): Prepared trades
+            fold (dict): Fold bounds
+            data_hash (str): data_hash(trades)
+            n_jobs (int): XGBoost threads
+
+        Returns:
+            tuple: (fold metrics dict, test trade positions, probabilities)
+        """
+        start = time.perf_counter()
+        features, cached = self.fold_features(trades, fold, data_hash)
+        y_train, y_test = features['y_train'], features['y_test']
+
+        result = {
+            **fold,
+            'train_trades': len(y_train),
+            'test_trades': len(y_test),
+            'train_success_rate': y_train.mean() * 100 if len(y_train) else np.nan,
+            'test_success_rate': y_test.mean() * 100 if len(y_test) else np.nan,
+            'auc_score': np.nan,
+            'trades_taken': 0,
+            'taken_win_rate': np.nan,
+            'features_cached': cached,
+            'status': 'ok',
+        }
+
+        if len(y_train) < self.min_train_trades or len(np.unique(y_train)) < 2:
+            result['status'] = 'skipped: too few training trades'
+        elif not len(y_test):
+            result['status'] = 'skipped: no test trades'
+        if result['status'] != 'ok':
+            result['seconds'] = time.perf_counter() - start
+            return result, np.empty(0, dtype=np.int64), np.empty(0)
+
+        predictor = TradeSuccessPredictor(random_state=self.random_state)
+        scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
+        model = predictor.make_classifier(scale_pos_weight, n_jobs=n_jobs)
+        model.fit(features['X_train'], y_train)
+        proba = model.predict_proba(features['X_test'])[:, 1]
+
+        taken = proba >= self.threshold
+        if len(np.unique(y_test)) == 2:
+            result['auc_score'] = roc_auc_score(y_test, proba)
+        result['trades_taken'] = int(taken.sum())
+        if taken.any():
+            result['taken_win_rate'] = y_test[taken].mean() * 100
+        result['seconds'] = time.perf_counter() - start
+
+        return result, features['test_rows'], proba
+
+    def run(self, trades, workers=None):
+        """
+        Run every fold, in parallel across folds.
+
+        Args:
+            trades (pd.DataFrame): Prepared trades (prepare_trades)
+            workers (int, optional): Worker processes (default: CPU count)
+
+        Returns:
+            tuple: (folds_df, scored_df, performance_df); scored_df holds the
+                out-of-sample trades with fold, success_probability and taken
+        """
+        folds = self.make_folds(trades)
+        if not folds:
+            logger.warning("Not enough history for a single fold")
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+        data_hash = self.data_hash(trades)
+        cpus = os.cpu_count() or 1
+        workers = max(1, min(workers or cpus, len(folds)))
+        n_jobs = max(1, cpus // workers)
+        logger.info(f"Running {len(folds)} folds on {workers} workers x {n_jobs} threads")
+
+        start = time.perf_counter()
+        if workers == 1:
+            results = [self.run_fold(trades, fold, data_hash, n_jobs) for fold in folds]
+        else:
+            with Pool(processes=workers, initializer=_init_fold_worker,
+                      initargs=(self, trades, data_hash, n_jobs)) as pool:
+                results = list(pool.imap(_run_fold_worker, folds))
+                pool.close()
+                pool.join()
+        logger.info(f"Walk-forward completed in {time.perf_counter() - start:.1f}s")
+
+        folds_df = pd.DataFrame([result for result, _, _ in results])
+
+        scored = []
+        for (result, rows, proba) in results:
+            if len(rows):
+                fold_trades = trades.iloc[rows].copy()
+                fold_trades['fold'] = result['fold']
+                fold_trades['success_probability'] = proba
+                scored.append(fold_trades)
+        scored_df = pd.concat(scored) if scored else pd.DataFrame()
+        if not scored_df.empty:
+            scored_df['taken'] = scored_df['success_probability'] >= self.threshold
+
+        return folds_df, scored_df, self.fold_performance(scored_df)
+
+    def fold_performance(self, scored_df):
+        """
+        Out-of-sample strategy performance per fold: every trade vs trades taken.
+
+        Args:
+            scored_df (pd.DataFrame): Scored out-of-sample trades
+
+        Returns:
+            pd.DataFrame: One row per (fold, strategy)
+        """
+        if scored_df.empty:
+            return pd.DataFrame()
+
+        df = pd.DataFrame({
+            'fold': scored_df['fold'],
+            'strategy': scored_df['strategy'],
+            'win': scored_df['pnl'] > 0,
+            'pnl': scored_df['pnl'],
+            'pnl_pct': scored_df['pnl_pct'],
+            'taken': scored_df['taken'],
+            'taken_win': (scored_df['pnl'] > 0) & scored_df['taken'],
+            'taken_pnl': scored_df['pnl'].where(scored_df['taken'], 0.0),
+            'taken_pnl_pct': scored_df['pnl_pct'].where(scored_df['taken']),
+        })
+
+        performance_df = df.groupby(['fold', 'strategy'], sort=True).agg(
+            total_trades=('pnl', 'size'),
+            win_rate=('win', 'mean'),
+            total_pnl=('pnl', 'sum'),
+            avg_trade_return_pct=('pnl_pct', 'mean'),
+            trades_taken=('taken', 'sum'),
+            taken_wins=('taken_win', 'sum'),
+            taken_pnl=('taken_pnl', 'sum'),
+            taken_avg_trade_return_pct=('taken_pnl_pct', 'mean'),
+        ).reset_index()
+
+        performance_df['win_rate'] *= 100
+        performance_df['taken_win_rate'] = (
+            performance_df['taken_wins'] / performance_df['trades_taken'].where(performance_df['trades_taken'] > 0) * 100
+        )
+        return performance_df.drop(columns='taken_wins')
+
+    def print_report(self, folds_df, scored_df):
+        """
+        Print fold results and the out-of-sample summary.
+
+        Args:
+            folds_df (pd.DataFrame): Fold metrics
+            scored_df (pd.DataFrame): Scored out-of-sample trades
+        """
+        print("\n" + "=" * 100)
+        print(f"WALK-FORWARD RESULTS (threshold >= {self.threshold*100:.0f}%)")
+        print("=" * 100)
+
+        display_df = folds_df.copy()
+        for col in ('train_start', 'test_start', 'test_end'):
+            display_df[col] = display_df[col].dt.date
+        cols_to_display = [
+            'fold', 'test_start', 'test_end', 'train_trades', 'test_trades', 'auc_score',
+            'trades_taken', 'test_success_rate', 'taken_win_rate', 'status'
+        ]
+        print(display_df[cols_to_display].to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+        if scored_df.empty:
+            print("=" * 100)
+            return
+
+        taken = scored_df[scored_df['taken']]
+        print("\nOUT-OF-SAMPLE SUMMARY:")
+        print(f"  Scored trades: {len(scored_df):,}  win rate {(scored_df['pnl'] > 0).mean()*100:.1f}%  "
+              f"P&L ${scored_df['pnl'].sum():,.2f}")
+        if len(taken):
+            print(f"  Taken trades:  {len(taken):,}  win rate {(taken['pnl'] > 0).mean()*100:.1f}%  "
+                  f"P&L ${taken['pnl'].sum():,.2f}")
+        else:
+            print("  Taken trades:  0")
+        print(f"  Mean fold AUC: {folds_df['auc_score'].mean():.4f}")
+        print("=" * 100 + "\n")
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(
+        description='Walk-forward retrain and out-of-sample scoring of the trade success model',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+
+    parser.add_argument(
+        '--input',
+        type=str,
+        default='backtesting/trades_with_fundamentals.parquet',
+        help='Input file with trades and fundamentals'
+    )
+    parser.add_argument(
+        '--train-days',
+        type=int,
+        default=730,
+        help='Training window in calendar days (default: 730)'
+    )
+    parser.add_argument(
+        '--test-days',
+        type=int,
+        default=90,
+        help='Test window (fold length) in calendar days (default: 90)'
+    )
+    parser.add_argument(
+        '--expanding',
+        action='store_true',
+        help='Train on all history before each test window instead of a rolling window'
+    )
+    parser.add_argument(
+        '--min-train-trades',
+        type=int,
+        default=200,
+        help='Skip folds with fewer training trades (default: 200)'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.8,
+        help='Minimum success probability to take a trade (default: 0.8)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Parallel fold workers (default: CPU count)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Fold feature cache directory (default: data/walk_forward_cache)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Rebuild fold features without reading or writing the cache'
+    )
+    parser.add_argument(
+        '--output-prefix',
+        type=str,
+        default='backtesting/walk_forward',
+        help='Prefix for the _folds, _performance and _trades CSVs'
+    )
+    parser.add_argument(
+        '--random-seed',
+        type=int,
+        default=42,
+        help='Random seed for reproducibility (default: 42)'
+    )
+
+    args = parser.parse_args()
+
+    if not 0 < args.threshold <= 1:
+        logger.error("Threshold must be between 0 and 1")
+        return
+
+    logger.info("=" * 80)
+    logger.info("WALK-FORWARD BACKTEST")
+    logger.info("=" * 80)
+
+    runner = WalkForwardRunner(
+        train_days=args.train_days,
+        test_days=args.test_days,
+        expanding=args.expanding,
+        min_train_trades=args.min_train_trades,
+        threshold=args.threshold,
+        random_state=args.random_seed,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache
+    )
+
+    # Load trades with sector, as for training
+    df = TradeSuccessPredictor(random_state=args.random_seed).load_data_with_sector(args.input)
+    trades = runner.prepare_trades(df)
+
+    folds_df, scored_df, performance_df = runner.run(trades, workers=args.workers)
+
+    if folds_df.empty:
+        return
+
+    runner.print_report(folds_df, scored_df)
+
+    logger.info("Exporting results...")
+    folds_df.to_csv(f"{args.output_prefix}_folds.csv", index=False)
+    performance_df.to_csv(f"{args.output_prefix}_performance.csv", index=False)
+    scored_df.to_csv(f"{args.output_prefix}_trades.csv", index=False)
+    logger.info(f"  Folds: {args.output_prefix}_folds.csv")
+    logger.info(f"  Performance by fold and strategy: {args.output_prefix}_performance.csv")
+    logger.info(f"  Out-of-sample trades: {args.output_prefix}_trades.csv")
+
+    logger.info("=" * 80)
+    logger.info("Walk-forward completed!")
+    logger.info("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Process-wide pooled PostgreSQL connections.
+
+``PostgresDatabaseManager.connect()`` borrows from here and ``close()`` hands
+the connection back, so code that connects and closes per symbol or per
+function reuses a handful of open connections instead of paying a full
+connection handshake each time.
+
+Pools are keyed by connection settings and owned by the process that created
+them. A forked child (multiprocessing workers) never touches its parent's
+sockets: the registry is cleared after fork, and connections borrowed before
+the fork are dropped rather than returned or closed.
+
+Settings (environment):
+    POSTGRES_POOL_MIN      connections opened up front (default 1)
+    POSTGRES_POOL_MAX      connections per process (default 10)
+    POSTGRES_POOL_TIMEOUT  seconds to wait for a free connection (default 30)
+"""
+
+import os
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+_pools = {}
+_registry_lock = threading.Lock()
+
+# Pools inherited across fork. Kept referenced so the child never garbage
+# collects (and so closes) connections whose sockets the parent still uses.
+_inherited = []
+
+
+class PooledConnectionProvider:
+    """A ThreadedConnectionPool that blocks when exhausted and records metrics.
+
+    ``ThreadedConnectionPool.getconn`` raises as soon as every connection is
+    checked out; here callers queue on a semaphore (up to ``timeout`` seconds)
+    and the wait is measured, which is what the saturation metrics report.
+    """
+
+    def __init__(self, config, minconn=1, maxconn=10, timeout=30.0):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            host=config["host"],
+            port=config["port"],
+            user=config["user"],
+            password=config["password"],
+            database=config["database"],
+        )
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def getconn(self):
+        """Borrow a connection, waiting for one to be returned if the pool is full."""
+        start = time.perf_counter()
+        saturated = not self._slots.acquire(blocking=False)
+        if saturated and not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise psycopg2.pool.PoolError(
+                f"Timed out after {self.timeout:.0f}s waiting for a pooled connection "
+                f"({self.maxconn} in use)"
+            )
+        waited = time.perf_counter() - start
+
+        try:
+            connection = self._pool.getconn()
+            if connection.closed:
+                self._pool.putconn(connection, close=True)
+                connection = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._checkouts += 1
+            self._waits += saturated
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+        return connection
+
+    def putconn(self, connection):
+        """Return a borrowed connection; broken connections are discarded.
+
+        Any open transaction is rolled back by the pool, so the next borrower
+        always starts clean. In a forked child, a connection borrowed by the
+        parent is only kept referenced: its socket is the parent's.
+        """
+        if os.getpid() != self.pid:
+            _inherited.append(connection)
+            return
+
+        broken = (
+            connection.closed
+            or connection.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+        )
+        try:
+            self._pool.putconn(connection, close=bool(broken))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def closeall(self):
+        """Close every connection held by the pool."""
+        self._pool.closeall()
+
+    def metrics(self):
+        """Checkout wait time and saturation counters for this pool."""
+        with self._lock:
+            return {
+                "pid": self.pid,
+                "maxconn": self.maxconn,
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "saturation": self._in_use / self.maxconn,
+                "peak_saturation": self._peak_in_use / self.maxconn,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "total_wait_seconds": self._wait_seconds,
+                "avg_wait_ms": 1000 * self._wait_seconds / self._checkouts if self._checkouts else 0.0,
+                "max_wait_ms": 1000 * self._max_wait_seconds,
+            }
+
+
+def _pool_key(config):
+    return tuple(str(config[key]) for key in ("host", "port", "user", "database"))
+
+
+def get_pool(config):
+    """Return this process's pool for the given connection settings, creating it once."""
+    key = _pool_key(config)
+    with _registry_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            if pool is not None:
+                _inherited.append(pool)
+            pool = PooledConnectionProvider(
+                config,
+                minconn=int(os.getenv("POSTGRES_POOL_MIN", "1")),
+                maxconn=int(os.getenv("POSTGRES_POOL_MAX", "10")),
+                timeout=float(os.getenv("POSTGRES_POOL_TIMEOUT", "30")),
+            )
+            _pools[key] = pool
+        return pool
+
+
+def get_pool_metrics():
+    """Metrics for every pool owned by this process, keyed by "user@host:port/database"."""
+    with _registry_lock:
+        pools = [(key, pool) for key, pool in _pools.items() if pool.pid == os.getpid()]
+    return {f"{user}@{host}:{port}/{database}": pool.metrics() for (host, port, user, database), pool in pools}
+
+
+def close_all_pools():
+    """Close every pool owned by this process (e.g. at shutdown)."""
+    with _registry_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.closeall()
+
+
+def _reset_after_fork():
+    """Forget inherited pools in a forked child without closing the parent's sockets."""
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    _inherited.extend(_pools.values())
+    _pools.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,489 @@
+"""Local memory-mapped cache of raw daily OHLCV bars.
+
+Bars from ``raw.time_series_daily_adjusted`` are kept on disk as uncompressed
+Arrow IPC (Feather v2) files, partitioned by symbol bucket
+(``symbol_id % n_buckets``)::
+
+    <root>/manifest.json
+    <root>/bucket=007/part-000000.arrow
+    <root>/bucket=007/part-000042.arrow     # rows appended by a later sync
+
+Every part is sorted by (symbol_id, date), and a symbol's rows in a part never
+span two record batches. Parts are memory-mapped, so ``load_symbol`` hands out
+a symbol's columns as NumPy views of the file: nothing is decoded or copied.
+
+``sync()`` pulls only rows newer than each bucket's max date and writes them
+as a new part. Buckets with more than ``max_parts`` parts are compacted into
+one. The cache only ever appends. Restated history, and symbols backfilled
+behind their bucket's max date, need ``sync(full=True)``.
+
+Readers opt in by taking an OhlcvCache and querying Postgres without one:
+the backtester, the signal charts, signal generation and the time-series
+transform. The cache is as fresh as its last sync.
+
+Usage:
+    cache = OhlcvCache()
+    cache.sync()
+    bars = cache.load_symbol(1234, columns=['close', 'volume'])    # dict of arrays
+    panel = cache.load_panel([1234, 5678], start='2024-01-01')      # long DataFrame
+"""
+
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from db.postgres_database_manager import PostgresDatabaseManager
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'adjusted_close', 'volume']
+
+# Dates are stored as timestamp[s] so they map to datetime64[s] without a copy;
+# volume is float64 (NaN for missing) so every price column does too
+SCHEMA = pa.schema(
+    [('symbol_id', pa.int32()), ('symbol', pa.string()), ('date', pa.timestamp('s'))]
+    + [(col, pa.float64()) for col in PRICE_COLUMNS]
+)
+
+# What pd.to_datetime makes of the DATE values psycopg2 returns, so cached
+# frames merge with frames read from Postgres
+_DATE_DTYPE = pd.to_datetime(pd.Series([date(2000, 1, 1)])).dtype
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'ohlcv_cache'
+
+_SOURCE_QUERY = """
+    SELECT r.symbol_id_int AS symbol_id, r.symbol, r.date,
+           r.open, r.high, r.low, r.close, r.adjusted_close, r.volume
+    FROM raw.time_series_daily_adjusted r
+    {join}
+    WHERE r.symbol_id_int IS NOT NULL {where}
+    ORDER BY r.symbol_id_int, r.date
+"""
+
+
+def _to_batch(df):
+    """Rows from the source query as a record batch in SCHEMA."""
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(df['symbol_id'].to_numpy(dtype=np.int32)),
+            pa.array(df['symbol'].astype(object), type=pa.string()),
+            pa.array(pd.to_datetime(df['date']).to_numpy(dtype='datetime64[s]')),
+        ]
+        + [pa.array(df[col].to_numpy(dtype=float)) for col in PRICE_COLUMNS],
+        schema=SCHEMA,
+    )
+
+
+def _symbol_bounds(ids):
+    """Start and stop offsets of each run of equal, sorted symbol ids."""
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]]) if len(ids) else np.array([], dtype=int)
+    return starts, np.r_[starts[1:], len(ids)].astype(int)
+
+
+def _bounds(dates, start=None, end=None, last=None):
+    """Row range [lo, hi) of sorted dates within inclusive bounds, cut to the last N."""
+    lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 's'), 'left'))
+    hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 's'), 'right'))
+    if last is not None:
+        lo = max(lo, hi - last)
+    return lo, hi
+
+
+class _Part:
+    """One memory-mapped part file and the location of each symbol in it."""
+
+    def __init__(self, path):
+        self.source = pa.memory_map(str(path))
+        reader = pa.ipc.open_file(self.source)
+        self.batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+        self.index = {}
+        for b, batch in enumerate(self.batches):
+            ids = batch.column(0).to_numpy()
+            starts, stops = _symbol_bounds(ids)
+            for symbol_id, start, stop in zip(ids[starts], starts, stops):
+                self.index[int(symbol_id)] = (b, int(start), int(stop))
+
+    def slice(self, symbol_id):
+        """The symbol's rows as a record batch slice, or None."""
+        location = self.index.get(symbol_id)
+        if location is None:
+            return None
+        b, start, stop = location
+        return self.batches[b].slice(start, stop - start)
+
+
+class _BucketWriter:
+    """Streams complete symbols into a new part file, batch_rows at a time."""
+
+    def __init__(self, path, batch_rows):
+        self.path = path
+        self.tmp_path = path.with_suffix('.arrow.tmp')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer = pa.ipc.new_file(str(self.tmp_path), SCHEMA)
+        self.batch_rows = batch_rows
+        self.pending = []
+        self.pending_rows = 0
+        self.rows = 0
+        self.max_date = None
+
+    def add(self, batch):
+        """Queue a batch holding whole symbols."""
+        self.pending.append(batch)
+        self.pending_rows += batch.num_rows
+        self.rows += batch.num_rows
+        batch_max = pc.max(batch.column(2)).as_py()
+        if batch_max is not None and (self.max_date is None or batch_max > self.max_date):
+            self.max_date = batch_max
+        if self.pending_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.writer.write_batch(pa.Table.from_batches(self.pending).combine_chunks().to_batches()[0])
+            self.pending = []
+            self.pending_rows = 0
+
+    def close(self):
+        """Finish the file and move it into place."""
+        self.flush()
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class OhlcvCache:
+    """Memory-mapped, bucket-partitioned cache of raw.time_series_daily_adjusted."""
+
+    def __init__(self, root=None, n_buckets=64, max_parts=8, batch_rows=100000):
+        """
+        Args:
+            root (str or Path, optional): Cache directory. Defaults to
+                OHLCV_CACHE_DIR, else data/ohlcv_cache in the repository.
+            n_buckets (int): Buckets for a new cache (an existing cache keeps
+                the count it was built with)
+            max_parts (int): Parts a bucket may accumulate before sync()
+                compacts it
+            batch_rows (int): Approximate rows per record batch when writing
+        """
+        self.root = Path(root or os.getenv('OHLCV_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.max_parts = max_parts
+        self.batch_rows = batch_rows
+        self.manifest = self._read_manifest() or {
+            'n_buckets': n_buckets, 'next_part': 0, 'synced_at': None, 'buckets': {},
+        }
+        self._parts = {}
+        self._symbols = None
+
+    # ==================== READS ====================
+
+    @property
+    def n_buckets(self):
+        return self.manifest['n_buckets']
+
+    @property
+    def synced_at(self):
+        """Time of the last sync (ISO string), or None for an empty cache."""
+        return self.manifest['synced_at']
+
+    def bucket(self, symbol_id):
+        """Bucket number of a symbol."""
+        return int(symbol_id) % self.n_buckets
+
+    def symbol_ids(self):
+        """Every cached symbol id, ascending."""
+        symbol_ids = set()
+        for key, info in self.manifest['buckets'].items():
+            for name in info['parts']:
+                symbol_ids.update(self._part(int(key), name).index)
+        return np.array(sorted(symbol_ids), dtype=np.int64)
+
+    def symbol_id(self, symbol):
+        """Symbol id for a ticker, or None if the ticker isn't cached."""
+        return self._symbol_map().get(symbol)
+
+    def load_symbol(self, symbol_id, columns=None, start=None, end=None, last=None):
+        """
+        One symbol's bars as NumPy arrays.
+
+        The arrays are read-only views of the memory-mapped file whenever the
+        symbol's rows sit in a single part (always, right after a full sync
+        or compaction), and copies otherwise.
+
+        Args:
+            symbol_id (int): Symbol ID
+            columns (list, optional): Price columns (default: PRICE_COLUMNS)
+            start, end (optional): Inclusive date bounds
+            last (int, optional): Keep only the last N bars (after the bounds)
+
+        Returns:
+            dict: 'date' (datetime64[s]) and each requested column, ascending
+            by date; empty arrays for symbols not in the cache
+        """
+        columns = ['date'] + list(columns or PRICE_COLUMNS)
+        slices = self._slices(int(symbol_id))
+        if not slices:
+            return {col: np.array([], dtype='datetime64[s]' if col == 'date' else float) for col in columns}
+
+        dates = self._column(slices, 'date')
+        lo, hi = _bounds(dates, start, end, last)
+        return {col: (dates if col == 'date' else self._column(slices, col))[lo:hi] for col in columns}
+
+    def load_frame(self, symbol_id, columns=None, start=None, end=None, last=None):
+        """load_symbol as a DataFrame with a 'date' column, like the equivalent SQL read."""
+        arrays = self.load_symbol(symbol_id, columns, start, end, last)
+        df = pd.DataFrame(arrays)
+        df['date'] = df['date'].astype(_DATE_DTYPE)
+        return df
+
+    def load_panel(self, symbol_ids=None, columns=None, start=None, end=None, last=None):
+        """
+        Bars of many symbols as one long frame.
+
+        Args:
+            symbol_ids (list, optional): Symbols to load (default: all cached)
+            columns (list, optional): Price columns (default: PRICE_COLUMNS)
+            start, end (optional): Inclusive date bounds
+            last (int, optional): Keep only the last N bars of each symbol
+
+        Returns:
+            pd.DataFrame: symbol_id, symbol, date and the requested columns,
+            sorted by (symbol_id, date), with a RangeIndex
+        """
+        columns = ['symbol_id', 'symbol', 'date'] + list(columns or PRICE_COLUMNS)
+        if symbol_ids is None:
+            symbol_ids = self.symbol_ids()
+
+        slices = []
+        for symbol_id in sorted({int(i) for i in symbol_ids}):
+            symbol_slices = self._slices(symbol_id)
+            if not symbol_slices:
+                continue
+            if start is not None or end is not None or last is not None:
+                lo, hi = _bounds(self._column(symbol_slices, 'date'), start, end, last)
+                if hi <= lo:
+                    continue
+                symbol_slices = [pa.Table.from_batches(symbol_slices).slice(lo, hi - lo)]
+            slices.extend(symbol_slices)
+
+        if not slices:
+            df = pd.DataFrame({col: pd.Series(dtype=object if col == 'symbol' else float) for col in columns})
+            df['symbol_id'] = df['symbol_id'].astype(np.int64)
+            df['date'] = df['date'].astype(_DATE_DTYPE)
+            return df
+
+        table = pa.concat_tables(
+            s if isinstance(s, pa.Table) else pa.Table.from_batches([s]) for s in slices
+        ).select(columns)
+        df = table.to_pandas()
+        df['symbol_id'] = df['symbol_id'].astype(np.int64)
+        df['date'] = df['date'].astype(_DATE_DTYPE)
+        return df
+
+    def _slices(self, symbol_id):
+        """The symbol's record batch slices, in part (so date) order."""
+        info = self.manifest['buckets'].get(f'{self.bucket(symbol_id):03d}')
+        if info is None:
+            return []
+        slices = []
+        for name in info['parts']:
+            batch = self._part(self.bucket(symbol_id), name).slice(symbol_id)
+            if batch is not None:
+                slices.append(batch)
+        return slices
+
+    @staticmethod
+    def _column(slices, name):
+        """A column across slices: a view for one slice, a copy for several."""
+        if len(slices) == 1:
+            return slices[0].column(name).to_numpy()
+        return np.concatenate([s.column(name).to_numpy() for s in slices])
+
+    def _part(self, bucket, name):
+        path = self._bucket_dir(bucket) / name
+        part = self._parts.get(path)
+        if part is None:
+            part = self._parts[path] = _Part(path)
+        return part
+
+    def _symbol_map(self):
+        """Ticker -> symbol id over every cached symbol."""
+        if self._symbols is None:
+            symbols = {}
+            for key, info in self.manifest['buckets'].items():
+                for name in info['parts']:
+                    for batch in self._part(int(key), name).batches:
+                        starts, _ = _symbol_bounds(batch.column(0).to_numpy())
+                        ids = batch.column(0).to_numpy()[starts]
+                        tickers = batch.column(1).take(pa.array(starts)).to_pylist()
+                        symbols.update(zip(tickers, ids.tolist()))
+            symbols.pop(None, None)
+            self._symbols = symbols
+        return self._symbols
+
+    # ==================== SYNC ====================
+
+    def sync(self, db=None, full=False, fetch_size=50000):
+        """
+        Bring the cache up to date with raw.time_series_daily_adjusted.
+
+        Incremental by default: one query reads the rows newer than each
+        bucket's max date, and each bucket that got rows gains one part.
+        ``full=True`` rebuilds every bucket from the whole table.
+
+        Args:
+            db (PostgresDatabaseManager, optional): Connected manager to read
+                with (default: a new one, closed afterwards)
+            full (bool): Rebuild instead of appending
+            fetch_size (int): Rows per round trip from the server-side cursor
+
+        Returns:
+            int: Rows written
+        """
+        own_db = db is None
+        if own_db:
+            db = PostgresDatabaseManager()
+            db.connect()
+
+        manifest = json.loads(json.dumps(self.manifest))
+        if full:
+            manifest['buckets'] = {}
+
+        join, where, params = '', '', []
+        if manifest['buckets']:
+            n = manifest['n_buckets']
+            watermarks = [manifest['buckets'].get(f'{b:03d}', {}).get('max_date', '0001-01-01') for b in range(n)]
+            join = """
+                JOIN unnest(%s::int[], %s::date[]) AS w(bucket, max_date)
+                  ON r.symbol_id_int %% {n} = w.bucket AND r.date > w.max_date
+            """.format(n=n)
+            where = 'AND r.date > %s'
+            params = [list(range(n)), watermarks, min(watermarks)]
+
+        writers = {}
+        try:
+            cursor = db.connection.cursor(name='ohlcv_cache_sync')
+            cursor.itersize = fetch_size
+            cursor.execute(_SOURCE_QUERY.format(join=join, where=where), params or None)
+
+            buffer = None
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if rows:
+                    columns = [desc[0] for desc in cursor.description]
+                    batch = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                    buffer = batch if buffer is None else pd.concat([buffer, batch], ignore_index=True)
+                if buffer is None or buffer.empty:
+                    break
+
+                # Write whole symbols only; the last one may continue in the next fetch
+                ids = buffer['symbol_id'].to_numpy()
+                starts, _ = _symbol_bounds(ids)
+                cut = len(buffer) if not rows else starts[-1]
+                if cut:
+                    self._route(buffer.iloc[:cut], manifest, writers)
+                    buffer = buffer.iloc[cut:].reset_index(drop=True)
+                if not rows:
+                    break
+
+            cursor.close()
+            db.connection.rollback()
+
+            for writer in writers.values():
+                writer.close()
+        except BaseException:
+            for writer in writers.values():
+                writer.writer.close()
+                writer.tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if own_db:
+                db.close()
+
+        written = 0
+        for key, writer in writers.items():
+            info = manifest['buckets'].setdefault(key, {'parts': [], 'rows': 0, 'max_date': None})
+            info['parts'].append(writer.path.name)
+            info['rows'] += writer.rows
+            info['max_date'] = max(filter(None, [info['max_date'], writer.max_date.date().isoformat()]))
+            written += writer.rows
+
+        for key, info in manifest['buckets'].items():
+            if len(info['parts']) > self.max_parts:
+                self._compact(int(key), info, manifest)
+
+        manifest['synced_at'] = pd.Timestamp.now().isoformat(timespec='seconds')
+        self._write_manifest(manifest)
+        self._remove_unreferenced()
+        return written
+
+    def _route(self, df, manifest, writers):
+        """Send whole symbols to their buckets' writers."""
+        buckets = df['symbol_id'].to_numpy() % manifest['n_buckets']
+        for bucket in np.unique(buckets):
+            key = f'{int(bucket):03d}'
+            writer = writers.get(key)
+            if writer is None:
+                writer = writers[key] = _BucketWriter(self._new_part_path(int(bucket), manifest), self.batch_rows)
+            writer.add(_to_batch(df[buckets == bucket]))
+
+    def _compact(self, bucket, info, manifest):
+        """Rewrite a bucket's parts as one."""
+        writer = _BucketWriter(self._new_part_path(bucket, manifest), self.batch_rows)
+        parts = [self._part(bucket, name) for name in info['parts']]
+        symbol_ids = sorted(set().union(*(part.index for part in parts)))
+        try:
+            for symbol_id in symbol_ids:
+                slices = [s for s in (part.slice(symbol_id) for part in parts) if s is not None]
+                writer.add(pa.Table.from_batches(slices).combine_chunks().to_batches()[0])
+            writer.close()
+        except BaseException:
+            writer.writer.close()
+            writer.tmp_path.unlink(missing_ok=True)
+            raise
+        info['parts'] = [writer.path.name]
+
+    def _new_part_path(self, bucket, manifest):
+        name = f"part-{manifest['next_part']:06d}.arrow"
+        manifest['next_part'] += 1
+        return self._bucket_dir(bucket) / name
+
+    def _bucket_dir(self, bucket):
+        return self.root / f'bucket={bucket:03d}'
+
+    def _read_manifest(self):
+        path = self.root / 'manifest.json'
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        """Replace the manifest atomically, then drop cached handles."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / 'manifest.json.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.root / 'manifest.json')
+        self.manifest = manifest
+        self._parts = {}
+        self._symbols = None
+
+    def _remove_unreferenced(self):
+        """Delete part files the manifest no longer lists.
+
+        Files another process still has mapped may refuse deletion on some
+        platforms; those are left for a later sync.
+        """
+        referenced = {
+            self._bucket_dir(int(key)) / name
+            for key, info in self.manifest['buckets'].items() for name in info['parts']
+        }
+        for path in self.root.glob('bucket=*/part-*.arrow*'):
+            if path not in referenced:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
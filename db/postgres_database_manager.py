@@ -1,22 +1,93 @@
+import io
 import os
+from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import psycopg2
 import psycopg2.extras
 from dotenv import load_dotenv
 
+from db.connection_pool import get_pool, get_pool_metrics
+
+
+class _DataFrameCopyReader(io.TextIOBase):
+    """File-like object that renders a DataFrame as CSV lazily for COPY FROM STDIN.
+
+    Rows are formatted in slices of ``chunk_rows`` as psycopg2 reads, so the
+    full CSV text of a large frame is never held in memory at once.
+    """
+
+    NULL = "\\N"
+
+    def __init__(self, df, chunk_rows=50000):
+        self.df = self._prepare(df)
+        self.chunk_rows = chunk_rows
+        self.position = 0
+        self.buffer = ""
+        self.offset = 0
+
+    @staticmethod
+    def _prepare(df):
+        """Normalize numeric columns so COPY parses them like psycopg2 parameters.
+
+        Object columns holding only numbers and None (e.g. after
+        ``replace([np.inf, -np.inf], None)``) become numeric, and integral float
+        columns (ints that picked up NaN) are written as integers so they load
+        into INTEGER columns.
+        """
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object and pd.api.types.infer_dtype(
+                df[col], skipna=True
+            ) in ("integer", "floating", "mixed-integer-float"):
+                df[col] = pd.to_numeric(df[col])
+
+            if df[col].dtype.kind == "f":
+                values = df[col].to_numpy(dtype=float, na_value=np.nan)
+                present = values[~np.isnan(values)]
+                if (
+                    len(present)
+                    and np.all(np.abs(present) < 2**53)
+                    and np.all(present == np.floor(present))
+                ):
+                    df[col] = df[col].astype("Int64")
+        return df
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while (size < 0 or len(self.buffer) - self.offset < size) and self.position < len(
+            self.df
+        ):
+            chunk = self.df.iloc[self.position : self.position + self.chunk_rows]
+            self.buffer = self.buffer[self.offset :] + chunk.to_csv(
+                header=False, index=False, na_rep=self.NULL
+            )
+            self.offset = 0
+            self.position += self.chunk_rows
+
+        end = len(self.buffer) if size < 0 else self.offset + size
+        data = self.buffer[self.offset : end]
+        self.offset = min(end, len(self.buffer))
+        return data
+
 
 class PostgresDatabaseManager:
     """A class to manage PostgreSQL database connections and queries."""
 
-    def __init__(self, db_config=None):
+    def __init__(self, db_config=None, pooled=None):
         """Initialize with database configuration.
 
         Args:
             db_config (dict, optional): Database configuration dict with keys:
                 host, port, user, password, database
                 If None, will load from environment variables.
+            pooled (bool, optional): Borrow connections from the process-wide
+                pool (db.connection_pool) instead of opening a new one per
+                connect(). Defaults to True unless POSTGRES_POOL_DISABLED is set.
         """
         load_dotenv()
 
@@ -35,10 +106,29 @@ class PostgresDatabaseManager:
         if not self.config["password"]:
             raise ValueError("PostgreSQL password must be provided")
 
+        if pooled is None:
+            pooled = os.getenv("POSTGRES_POOL_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.pooled = pooled
         self.connection = None
+        self._pool = None
+        self._transaction_depth = 0
 
     def connect(self):
-        """Connect to the PostgreSQL database."""
+        """Connect to the PostgreSQL database.
+
+        With pooling, this borrows a connection from the process-wide pool
+        (returning any connection this manager already holds first).
+        """
+        if self.pooled:
+            self.close()
+            try:
+                self._pool = get_pool(self.config)
+                self.connection = self._pool.getconn()
+                self.connection.autocommit = False
+            except psycopg2.Error as e:
+                raise Exception(f"Failed to connect to PostgreSQL: {e}")
+            return
+
         try:
             self.connection = psycopg2.connect(
                 host=self.config["host"],
@@ -53,10 +143,57 @@ class PostgresDatabaseManager:
             raise Exception(f"Failed to connect to PostgreSQL: {e}")
 
     def close(self):
-        """Close the database connection."""
-        if self.connection:
+        """Close the database connection (or return it to the pool)."""
+        if self._pool is not None:
+            pool, connection = self._pool, self.connection
+            self._pool = None
+            self.connection = None
+            if connection is not None:
+                pool.putconn(connection)
+        elif self.connection:
             self.connection.close()
 
+    def pool_metrics(self):
+        """Checkout wait time and saturation metrics for this manager's pool.
+
+        Returns:
+            dict: See PooledConnectionProvider.metrics; empty when not pooled
+        """
+        if not self.pooled:
+            return {}
+        return get_pool_metrics().get(
+            "{user}@{host}:{port}/{database}".format(**self.config), {}
+        )
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into one commit.
+
+        Inside the block, execute_query, execute_many and bulk_upsert_dataframe
+        leave their changes uncommitted; the block commits once on exit, or
+        rolls everything back if it raises. Blocks may be nested, in which case
+        only the outermost one commits.
+        """
+        if not self.connection:
+            raise Exception("Database connection is not established.")
+
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self.connection.rollback()
+            raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0:
+            self.connection.commit()
+
+    def _commit(self):
+        """Commit unless inside a transaction() block."""
+        if not self._transaction_depth:
+            self.connection.commit()
+
     def execute_query(self, query, params=None):
         """Execute a query against the database."""
         if not self.connection:
@@ -69,7 +206,7 @@ class PostgresDatabaseManager:
             else:
                 cursor.execute(query)
 
-            self.connection.commit()
+            self._commit()
 
             # For SELECT queries, return results
             if query.strip().upper().startswith("SELECT"):
@@ -90,7 +227,7 @@ class PostgresDatabaseManager:
         cursor = self.connection.cursor()
         try:
             cursor.executemany(query, params_list)
-            self.connection.commit()
+            self._commit()
             return cursor.rowcount
 
         except psycopg2.Error as e:
@@ -99,6 +236,112 @@ class PostgresDatabaseManager:
         finally:
             cursor.close()
 
+    def bulk_upsert_dataframe(
+        self,
+        table_name,
+        df,
+        conflict_cols,
+        update_cols=None,
+        mode="upsert",
+        timestamp_cols=None,
+    ):
+        """Merge a DataFrame into a table through COPY and a single set-based statement.
+
+        The frame is streamed with ``COPY FROM STDIN`` into a temporary staging
+        table whose columns take their types from the target table, then merged
+        with one statement:
+
+        - ``mode="upsert"``: ``INSERT ... SELECT ... ON CONFLICT (conflict_cols)
+          DO UPDATE SET`` update_cols (``DO NOTHING`` when update_cols is empty)
+        - ``mode="update"``: ``UPDATE ... FROM`` staging, matching on conflict_cols
+
+        Rows repeating the same conflict key keep the last occurrence, which is
+        what a row-by-row ``execute_many`` of the same frame would leave behind.
+
+        Args:
+            table_name (str): Target table, optionally schema-qualified
+            df (pd.DataFrame): Rows to merge; column names must match the table
+            conflict_cols (list): Key columns (the ON CONFLICT / UPDATE match)
+            update_cols (list, optional): Columns to overwrite on a match.
+                Defaults to every non-key column of df.
+            mode (str): "upsert" or "update"
+            timestamp_cols (list, optional): Columns set to NOW() on every
+                merged row, e.g. ["processed_at"]
+
+        Returns:
+            int: Number of rows inserted or updated
+        """
+        if not self.connection:
+            raise Exception("Database connection is not established.")
+
+        if mode not in ("upsert", "update"):
+            raise ValueError(f"Unknown bulk upsert mode: {mode}")
+
+        if df is None or df.empty:
+            return 0
+
+        conflict_cols = list(conflict_cols)
+        columns = list(df.columns)
+        if update_cols is None:
+            update_cols = [col for col in columns if col not in conflict_cols]
+        timestamp_cols = list(timestamp_cols or [])
+
+        df = df.drop_duplicates(subset=conflict_cols, keep="last")
+
+        staging_table = "_bulk_" + table_name.replace(".", "_")
+        columns_str = ", ".join(columns)
+        timestamp_set = [f"{col} = NOW()" for col in timestamp_cols]
+
+        if mode == "upsert":
+            set_clause = [f"{col} = EXCLUDED.{col}" for col in update_cols] + timestamp_set
+            conflict_action = (
+                f"DO UPDATE SET {', '.join(set_clause)}" if set_clause else "DO NOTHING"
+            )
+            merge_sql = f"""
+                INSERT INTO {table_name} ({columns_str})
+                SELECT {columns_str} FROM {staging_table}
+                ON CONFLICT ({', '.join(conflict_cols)}) {conflict_action}
+            """
+        else:
+            set_clause = [f"{col} = s.{col}" for col in update_cols] + timestamp_set
+            if not set_clause:
+                raise ValueError("Bulk update needs update_cols or timestamp_cols")
+            match_clause = " AND ".join(f"t.{col} = s.{col}" for col in conflict_cols)
+            merge_sql = f"""
+                UPDATE {table_name} AS t
+                SET {', '.join(set_clause)}
+                FROM {staging_table} AS s
+                WHERE {match_clause}
+            """
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                f"""
+                CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+                SELECT {columns_str} FROM {table_name} WITH NO DATA
+                """
+            )
+            cursor.copy_expert(
+                f"COPY {staging_table} ({columns_str}) FROM STDIN "
+                f"WITH (FORMAT csv, NULL '{_DataFrameCopyReader.NULL}')",
+                _DataFrameCopyReader(df),
+                size=1 << 20,
+            )
+            cursor.execute(merge_sql)
+            rowcount = cursor.rowcount
+            # Dropped now rather than at commit, so a transaction() block can
+            # merge into the same table more than once
+            cursor.execute(f"DROP TABLE {staging_table}")
+            self._commit()
+            return rowcount
+
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            raise Exception(f"Bulk upsert into {table_name} failed: {e}")
+        finally:
+            cursor.close()
+
     def fetch_query(self, query, params=None):
         """Execute a SELECT query and return results."""
         if not self.connection:
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Run the test_*.py modules' test functions, with or without pytest.
+
+The test modules hold plain test_ functions that pytest collects. This runner
+gives the same check where pytest is not installed: each test is reported as
+passed or failed, an error other than a failed assertion counts as a failure
+(with its traceback) rather than stopping the run, and the exit status is
+non-zero if any test failed.
+
+Modules without test functions (script-style checks such as
+test_rsi_crossing.py) are skipped, since importing them runs them.
+
+Usage:
+    python run_tests.py                         # every test module
+    python run_tests.py test_walk_forward.py    # selected modules
+    python test_walk_forward.py                 # one module (run_module)
+"""
+
+import re
+import sys
+import importlib
+import traceback
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+
+def run_tests(tests):
+    """
+    Run (name, function) pairs, printing one line per test.
+
+    Returns:
+        int: Number of failed tests
+    """
+    failed = 0
+    for name, func in tests:
+        try:
+            func()
+        except AssertionError as e:
+            failed += 1
+            frame = traceback.extract_tb(e.__traceback__)[-1]
+            print(f"  ✗ {name}: {str(e) or frame.line} ({Path(frame.filename).name}:{frame.lineno})")
+        except Exception:
+            failed += 1
+            print(f"  ✗ {name}: error")
+            print('    ' + traceback.format_exc().rstrip().replace('\n', '\n    '))
+        else:
+            print(f"  ✓ {name}")
+    return failed
+
+
+def module_tests(namespace):
+    """test_ functions of a module namespace, in definition order."""
+    return [(name, func) for name, func in namespace.items() if name.startswith('test_') and callable(func)]
+
+
+def run_module(namespace):
+    """
+    Run a test module's tests (its globals()) and print the tally.
+
+    Returns:
+        int: Exit status, 1 if any test failed
+    """
+    tests = module_tests(namespace)
+    failed = run_tests(tests)
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    return 1 if failed else 0
+
+
+def main(paths):
+    """Run the given test files (default: every test module in the repository root)."""
+    sys.path.insert(0, str(ROOT))
+    paths = [Path(p) for p in paths] or sorted(ROOT.glob('test_*.py'))
+    total = failed = 0
+    for path in paths:
+        if not re.search(r'^def test_', path.read_text(), re.MULTILINE):
+            print(f"{path.name}: no test functions, skipped")
+            continue
+        print(path.name)
+        try:
+            module = importlib.import_module(path.stem)
+        except Exception:
+            print('    ' + traceback.format_exc().rstrip().replace('\n', '\n    '))
+            total += 1
+            failed += 1
+            continue
+        tests = module_tests(vars(module))
+        total += len(tests)
+        failed += run_tests(tests)
+    print(f"\n{total - failed}/{total} passed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
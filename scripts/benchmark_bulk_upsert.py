@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: execute_many vs bulk_upsert_dataframe (COPY + single merge).
+
+Loads synthetic trading-signal rows into a scratch TEMP table shaped like
+transforms.trading_signals, once as fresh inserts and once as conflicting
+upserts, through both load paths. Reports rows/sec for each.
+
+Requires a reachable database (same POSTGRES_* settings as the transforms);
+nothing outside the session's temp schema is touched.
+
+Usage:
+    python scripts/benchmark_bulk_upsert.py
+    python scripts/benchmark_bulk_upsert.py --rows 200000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.postgres_database_manager import PostgresDatabaseManager
+
+TABLE = "bench_trading_signals"
+
+COLUMNS = [
+    "symbol", "symbol_id", "date", "buy_signal", "sell_signal", "trade_strategy",
+    "signal_strength", "processed_at", "created_at", "updated_at",
+]
+
+UPSERT_SQL = f"""
+    INSERT INTO {TABLE}
+    ({', '.join(COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(COLUMNS))})
+    ON CONFLICT (symbol_id, date, trade_strategy)
+    DO UPDATE SET
+        buy_signal = EXCLUDED.buy_signal,
+        sell_signal = EXCLUDED.sell_signal,
+        signal_strength = EXCLUDED.signal_strength,
+        processed_at = EXCLUDED.processed_at,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def make_signals(n_rows, seed=0):
+    """Synthetic signals with unique (symbol_id, date, trade_strategy) keys."""
+    rng = np.random.default_rng(seed)
+    strategies = np.array(["ema_crossover", "rsi_crossing", "macd_histogram_reversal", "ma_ribbon"])
+    idx = np.arange(n_rows)
+    buy = rng.random(n_rows) < 0.5
+    now = pd.Timestamp.now()
+    return pd.DataFrame({
+        "symbol": [f"SYM{i}" for i in idx // 10000],
+        "symbol_id": idx // 10000,
+        "date": pd.Timestamp("1990-01-01") + pd.to_timedelta((idx // 4) % 2500, unit="D"),
+        "buy_signal": buy,
+        "sell_signal": ~buy,
+        "trade_strategy": strategies[idx % 4],
+        "signal_strength": np.round(rng.uniform(0, 100, n_rows), 2),
+        "processed_at": now,
+        "created_at": now,
+        "updated_at": now,
+    })
+
+
+def reset_table(db):
+    """(Re)create the scratch table."""
+    db.execute_query(f"""
+        DROP TABLE IF EXISTS {TABLE};
+        CREATE TEMP TABLE {TABLE} (
+            id SERIAL PRIMARY KEY,
+            symbol VARCHAR(10) NOT NULL,
+            symbol_id INTEGER NOT NULL,
+            date DATE NOT NULL,
+            buy_signal BOOLEAN NOT NULL,
+            sell_signal BOOLEAN NOT NULL,
+            trade_strategy VARCHAR(50) NOT NULL,
+            signal_strength NUMERIC(5, 2),
+            processed_at TIMESTAMPTZ,
+            created_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ,
+            UNIQUE (symbol_id, date, trade_strategy)
+        )
+    """)
+
+
+def time_execute_many(db, df):
+    """Current path: records + cursor.executemany."""
+    start = time.perf_counter()
+    records = list(df[COLUMNS].itertuples(index=False, name=None))
+    db.execute_many(UPSERT_SQL, records)
+    return time.perf_counter() - start
+
+
+def time_bulk(db, df):
+    """New path: COPY into staging + one INSERT ... ON CONFLICT."""
+    start = time.perf_counter()
+    db.bulk_upsert_dataframe(
+        TABLE, df[COLUMNS],
+        conflict_cols=["symbol_id", "date", "trade_strategy"],
+        update_cols=["buy_signal", "sell_signal", "signal_strength", "processed_at", "updated_at"],
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark execute_many vs COPY-based bulk upsert")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows per load")
+    args = parser.parse_args()
+
+    df = make_signals(args.rows)
+
+    db = PostgresDatabaseManager()
+    db.connect()
+    try:
+        results = []
+        for name, loader in (("execute_many", time_execute_many), ("bulk_upsert_dataframe", time_bulk)):
+            reset_table(db)
+            insert_time = loader(db, df)
+            update_time = loader(db, df.assign(signal_strength=df["signal_strength"] / 2))
+            count = db.fetch_query(f"SELECT COUNT(*) FROM {TABLE}")[0][0]
+            assert count == args.rows, f"{name} left {count} rows, expected {args.rows}"
+            results.append((name, insert_time, update_time))
+
+        print(f"{args.rows:,} rows per load")
+        print(f"{'path':<24}{'insert rows/s':>16}{'upsert rows/s':>16}")
+        for name, insert_time, update_time in results:
+            print(f"{name:<24}{args.rows / insert_time:>16,.0f}{args.rows / update_time:>16,.0f}")
+
+        base, bulk = results
+        print(f"Speedup: insert {base[1] / bulk[1]:.1f}x, upsert {base[2] / bulk[2]:.1f}x")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
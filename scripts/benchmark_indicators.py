@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: pandas_ta vs the native NumPy indicators, per indicator.
+
+Times each indicator the transformer uses two ways:
+
+- per series: one call on a single symbol's history (the legacy engine's
+  access pattern), best of --repeat runs
+- per panel: one call over a (symbols x bars) matrix through the matrix
+  backends (the panel engine's access pattern); the pandas_ta backend loops
+  over symbols
+
+Every native result is checked against pandas_ta before it is timed.
+No database access is needed.
+
+Usage:
+    python scripts/benchmark_indicators.py
+    python scripts/benchmark_indicators.py --bars 2500 --symbols 1000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from transforms import indicators
+
+# name -> (input columns, parameters), as called by the transformer
+INDICATORS = {
+    'rsi': (['close'], {'length': 14}),
+    'macd': (['close'], {'fast': 12, 'slow': 26, 'signal': 9}),
+    'roc': (['close'], {'length': 10}),
+    'willr': (['high', 'low', 'close'], {'length': 14}),
+    'atr': (['high', 'low', 'close'], {'length': 14}),
+    'bbands': (['close'], {'length': 20, 'std': 2.0}),
+    'obv': (['close', 'volume'], {}),
+    'cmf': (['high', 'low', 'close', 'volume'], {'length': 20}),
+    'ad': (['high', 'low', 'close', 'volume'], {}),
+}
+
+
+def make_panel(n_symbols, bars, seed=7):
+    """Random-walk OHLCV matrices, one row per symbol."""
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, bars)), axis=1))
+    spread = np.abs(rng.normal(0, 0.01, (n_symbols, bars))) * close
+    return {
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.lognormal(13, 0.6, (n_symbols, bars)).round(),
+    }
+
+
+def best_of(func, repeat):
+    """Fastest of `repeat` calls, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark pandas_ta vs native NumPy indicators")
+    parser.add_argument("--bars", type=int, default=1000, help="Bars per symbol")
+    parser.add_argument("--symbols", type=int, default=200, help="Symbols in the panel benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    native_backend = indicators.get_backend('numpy')
+    reference_backend = indicators.get_backend('pandas_ta')
+    ta = reference_backend.series
+
+    panel = make_panel(args.symbols, args.bars)
+    series = {col: pd.Series(values[0]) for col, values in panel.items()}
+
+    print(f"Per series: 1 symbol x {args.bars} bars (best of {args.repeat})")
+    print(f"Per panel:  {args.symbols} symbols x {args.bars} bars (best of {max(1, args.repeat // 2)})")
+    print()
+    print(f"{'indicator':<10}{'pandas_ta':>12}{'numpy':>12}{'speedup':>10}"
+          f"{'pandas_ta':>14}{'numpy':>12}{'speedup':>10}")
+    print(f"{'':<10}{'series ms':>12}{'series ms':>12}{'':>10}{'panel ms':>14}{'panel ms':>12}")
+
+    for name, (columns, params) in INDICATORS.items():
+        series_args = [series[col] for col in columns]
+        panel_args = [panel[col] for col in columns]
+
+        expected = getattr(ta, name)(*series_args, **params)
+        actual = getattr(indicators, name)(*series_args, **params)
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+        ta_series = best_of(lambda: getattr(ta, name)(*series_args, **params), args.repeat)
+        np_series = best_of(lambda: getattr(indicators, name)(*series_args, **params), args.repeat)
+        panel_repeat = max(1, args.repeat // 2)
+        ta_panel = best_of(lambda: getattr(reference_backend, name)(*panel_args, **params), panel_repeat)
+        np_panel = best_of(lambda: getattr(native_backend, name)(*panel_args, **params), panel_repeat)
+
+        print(f"{name:<10}{1000 * ta_series:>12.3f}{1000 * np_series:>12.3f}{ta_series / np_series:>9.1f}x"
+              f"{1000 * ta_panel:>14.1f}{1000 * np_panel:>12.1f}{ta_panel / np_panel:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first score of the trade success model, pickle vs artifact.
+
+Each measurement runs in a fresh interpreter, as a scorer does, and times:
+- load: unpickling the model dict, or reading the artifact manifest (plus
+  load_booster() for the warmed-up artifact, as ScoringService.warm_up does)
+- first prediction: 1,000 rows (includes the lazy xgboost import and booster
+  load for the artifact that was not warmed up)
+- first score: load + first prediction, the end-to-end cost a scorer pays
+
+The lazy artifact only moves the xgboost import from load to the first
+prediction, so its time to first score stays close to the pickle's. The
+pickle is written from the artifact into a temporary directory unless one is
+given, and all predictions are checked to be equal. No database access is
+needed.
+
+Usage:
+    python scripts/benchmark_model_load.py
+    python scripts/benchmark_model_load.py --model models/trade_success_model.ubj --runs 10
+"""
+
+import sys
+import json
+import pickle
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtesting.model_artifact import ModelArtifact, manifest_path
+
+ROOT = Path(__file__).parent.parent
+
+# Run in a fresh interpreter: prints {"load": s, "predict": s, "checksum": x}
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+{load}
+loaded = time.perf_counter()
+import numpy as np
+X = np.random.default_rng(0).uniform(0, 100, (1000, {n_features})).astype(np.float32)
+p = model.predict_proba(X)[:, 1]
+done = time.perf_counter()
+print(json.dumps({{"load": loaded - start, "predict": done - loaded, "checksum": float(p.sum())}}))
+"""
+
+LOAD_PICKLE = """
+import pickle
+with open({path!r}, 'rb') as f:
+    model = pickle.load(f)['model']
+"""
+
+LOAD_ARTIFACT = """
+from backtesting.model_artifact import ModelArtifact
+model = ModelArtifact({path!r})
+"""
+
+LOAD_ARTIFACT_WARM = """
+from backtesting.model_artifact import ModelArtifact
+model = ModelArtifact({path!r}).load_booster()
+"""
+
+
+def probe(load, n_features):
+    code = PROBE.format(root=str(ROOT), load=load.strip(), n_features=n_features)
+    result = subprocess.run([sys.executable, '-W', 'ignore', '-c', code],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def write_pickle(artifact, path):
+    """The artifact's booster as a pickled model dict, as TradeSuccessPredictor.save_model wrote them."""
+    import xgboost as xgb
+
+    model = xgb.XGBClassifier()
+    model.load_model(str(artifact.path))
+    with open(path, 'wb') as f:
+        pickle.dump({'model': model, 'feature_names': artifact.feature_names}, f)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--model',
+        default=str(ROOT / 'models' / 'trade_success_model.ubj'),
+        help='Model artifact to benchmark (default: models/trade_success_model.ubj)'
+    )
+    parser.add_argument(
+        '--pickle',
+        default=None,
+        help='Pickled model to compare (default: written from the artifact)'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=5,
+        help='Fresh interpreters per format (default: 5)'
+    )
+    args = parser.parse_args()
+
+    artifact = ModelArtifact(args.model)
+    n_features = len(artifact.feature_names)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = args.pickle or str(write_pickle(artifact, Path(tmp) / 'model.pkl'))
+        pickle_size = Path(pickle_path).stat().st_size
+        artifact_size = Path(args.model).stat().st_size + manifest_path(args.model).stat().st_size
+        print(f"Model: {args.model} ({n_features} features)")
+        print(f"Size: pickle {pickle_size / 1024:.0f} KB, artifact {artifact_size / 1024:.0f} KB")
+
+        results = {}
+        for name, load in [('pickle', LOAD_PICKLE.format(path=pickle_path)),
+                           ('artifact', LOAD_ARTIFACT.format(path=args.model)),
+                           ('warmed', LOAD_ARTIFACT_WARM.format(path=args.model))]:
+            runs = [probe(load, n_features) for _ in range(args.runs)]
+            results[name] = runs
+            load_s = np.median([r['load'] for r in runs])
+            predict_s = np.median([r['predict'] for r in runs])
+            first_score_s = np.median([r['load'] + r['predict'] for r in runs])
+            print(f"{name:>8}: load {load_s * 1000:7.1f} ms, first prediction {predict_s * 1000:7.1f} ms, "
+                  f"first score {first_score_s * 1000:7.1f} ms (median of {args.runs})")
+
+    checksums = {name: runs[0]['checksum'] for name, runs in results.items()}
+    assert np.allclose(list(checksums.values()), checksums['pickle'], rtol=1e-6), checksums
+    print("Predictions match")
+
+
+if __name__ == '__main__':
+    main()
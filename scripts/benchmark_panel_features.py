@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-symbol mask loops vs the panel feature builder.
+
+Builds a synthetic multi-symbol OHLCV batch (default 500 symbols x 250 bars,
+the window a full transform reads per symbol) and times
+TimeSeriesDailyAdjustedTransformer.build_features with feature_engine
+'legacy' and 'panel'. The legacy path scales with symbols x rows, so it is
+timed on a sample of symbols and extrapolated. That both paths produce the
+same features is tested in test_panel_features.py.
+
+No database access is needed.
+
+Usage:
+    python scripts/benchmark_panel_features.py
+    python scripts/benchmark_panel_features.py --symbols 2000 --bars 250 --legacy-symbols 50
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# PostgresDatabaseManager only validates that a password is configured; the
+# benchmark never connects.
+os.environ.setdefault("POSTGRES_PASSWORD", "benchmark")
+
+from transforms.transform_time_series_daily_adjusted import TimeSeriesDailyAdjustedTransformer
+
+
+def make_batch(n_symbols, bars, seed=7):
+    """Random-walk OHLCV rows for n_symbols, shuffled like an unordered query result."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-02", periods=bars)
+    n = n_symbols * bars
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, bars)), axis=1)).ravel()
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    df = pd.DataFrame({
+        "symbol_id": np.repeat(np.arange(1, n_symbols + 1), bars),
+        "symbol": np.repeat([f"SYM{i}" for i in range(1, n_symbols + 1)], bars),
+        "date": np.tile(dates, n_symbols),
+        "open": close * (1 + rng.normal(0, 0.005, n)),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "adjusted_close": close,
+        "volume": rng.lognormal(13, 0.6, n).astype(np.int64),
+    })
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def transformer(engine):
+    """Transformer with default parameters and the given feature engine, no DB."""
+    t = TimeSeriesDailyAdjustedTransformer.__new__(TimeSeriesDailyAdjustedTransformer)
+    t.config = {"feature_engine": engine}
+    t._load_feature_params()
+    return t
+
+
+def timed(t, df):
+    start = time.perf_counter()
+    out = t.build_features(df.copy())
+    return time.perf_counter() - start, out
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs panel feature building")
+    parser.add_argument("--symbols", type=int, default=500, help="Symbols in the batch")
+    parser.add_argument("--bars", type=int, default=250, help="Bars per symbol")
+    parser.add_argument("--legacy-symbols", type=int, default=25,
+                        help="Symbols to time on the legacy path")
+    args = parser.parse_args()
+
+    # legacy logs a line per feature group
+    logging.disable(logging.WARNING)
+
+    batch = make_batch(args.symbols, args.bars)
+    sample_ids = batch["symbol_id"].drop_duplicates().iloc[: args.legacy_symbols]
+    sample = batch[batch["symbol_id"].isin(sample_ids)]
+    print(f"Batch: {args.symbols} symbols x {args.bars} bars = {len(batch):,} rows")
+
+    legacy_time, _ = timed(transformer("legacy"), sample)
+    # Linear extrapolation is a lower bound: each mask scan also grows with
+    # the batch, so the real legacy cost is worse than this
+    legacy_estimate = legacy_time * args.symbols / len(sample_ids)
+
+    panel_sample_time, _ = timed(transformer("panel"), sample)
+    panel_time, _ = timed(transformer("panel"), batch)
+
+    print()
+    print(f"{'path':<30}{'symbols':>9}{'seconds':>12}{'rows/sec':>14}")
+    print(f"{'legacy (measured sample)':<30}{len(sample_ids):>9}{legacy_time:>12.2f}{len(sample) / legacy_time:>14,.0f}")
+    print(f"{'panel (same sample)':<30}{len(sample_ids):>9}{panel_sample_time:>12.2f}{len(sample) / panel_sample_time:>14,.0f}")
+    print(f"{'legacy (linear estimate)':<30}{args.symbols:>9}{legacy_estimate:>12.2f}{len(batch) / legacy_estimate:>14,.0f}")
+    print(f"{'panel':<30}{args.symbols:>9}{panel_time:>12.2f}{len(batch) / panel_time:>14,.0f}")
+    print()
+    print(f"Speedup on full batch: at least {legacy_estimate / panel_time:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PortfolioSimulator on a synthetic universe.
+
+Builds daily closes for a large universe (default 20,000 symbols x 10 years
+of trading days) and random candidate trades across it, then times one
+portfolio simulation and the equity-curve metrics. It also checks that the
+final equity equals the starting capital plus the P&L of the trades taken.
+No database access is needed.
+
+Usage:
+    python scripts/benchmark_portfolio_simulator.py
+    python scripts/benchmark_portfolio_simulator.py --symbols 5000 --years 5 --trades 50000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtesting.portfolio_simulator import PortfolioSimulator, equity_metrics
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def make_prices(n_symbols, n_days, seed=42):
+    """Random-walk closes in long form, sorted by (symbol_id, date)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-02", periods=n_days).to_numpy()
+
+    close = np.empty((n_symbols, n_days))
+    for start in range(0, n_symbols, 1000):
+        block = slice(start, min(start + 1000, n_symbols))
+        steps = rng.normal(0, 0.02, (block.stop - block.start, n_days))
+        close[block] = rng.uniform(5, 200, (block.stop - block.start, 1)) * np.exp(np.cumsum(steps, axis=1))
+
+    prices_df = pd.DataFrame({
+        "symbol_id": np.repeat(np.arange(1, n_symbols + 1, dtype=np.int64), n_days),
+        "date": np.tile(dates, n_symbols),
+        "close": close.ravel(),
+    })
+    return prices_df, close, dates
+
+
+def make_trades(close, dates, n_trades, seed=7):
+    """Random candidate trades held 1-60 days, in entry order."""
+    rng = np.random.default_rng(seed)
+    n_symbols, n_days = close.shape
+    symbol = rng.integers(0, n_symbols, n_trades)
+    entry = np.sort(rng.integers(0, n_days - 1, n_trades))
+    exit_ = np.minimum(entry + rng.integers(1, 61, n_trades), n_days - 1)
+    return pd.DataFrame({
+        "strategy": "benchmark",
+        "symbol": [f"SYM{i}" for i in symbol + 1],
+        "symbol_id": symbol + 1,
+        "entry_date": dates[entry],
+        "exit_date": dates[exit_],
+        "entry_price": close[symbol, entry],
+        "exit_price": close[symbol, exit_],
+    })
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the portfolio simulator")
+    parser.add_argument("--symbols", type=int, default=20000, help="Symbols in the synthetic universe")
+    parser.add_argument("--years", type=int, default=10, help="Years of daily bars per symbol")
+    parser.add_argument("--trades", type=int, default=200000, help="Candidate trades")
+    parser.add_argument("--max-positions", type=int, default=50, help="Most positions held at once")
+    args = parser.parse_args()
+
+    n_days = args.years * TRADING_DAYS_PER_YEAR
+    print(f"Building synthetic universe: {args.symbols:,} symbols x {n_days:,} days...")
+    prices_df, close, dates = make_prices(args.symbols, n_days)
+    trades_df = make_trades(close, dates, args.trades)
+    del close
+    print(f"  {len(prices_df):,} closes, {len(trades_df):,} candidate trades")
+
+    simulator = PortfolioSimulator(initial_capital=1_000_000, position_size=0.02,
+                                   max_positions=args.max_positions)
+
+    start = time.perf_counter()
+    equity_df, taken = simulator.simulate(trades_df, prices_df)
+    simulate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    metrics = equity_metrics(equity_df["equity"].to_numpy(), simulator.initial_capital)
+    metrics_time = time.perf_counter() - start
+
+    # Every trade is closed by the last day, so the books must balance
+    expected = simulator.initial_capital + taken["pnl"].sum()
+    final = equity_df["equity"].iloc[-1]
+    assert np.isclose(final, expected, rtol=1e-9), f"final equity {final} != {expected}"
+
+    print()
+    print(f"{'step':<20}{'seconds':>12}")
+    print(f"{'simulate':<20}{simulate_time:>12.2f}")
+    print(f"{'equity metrics':<20}{metrics_time:>12.4f}")
+    print()
+    print(f"Days: {len(equity_df):,}  trades taken: {len(taken):,} of {len(trades_df):,}  "
+          f"max open: {equity_df['open_positions'].max()}")
+    print(f"Return: {metrics['total_return_pct']:.2f}%  Sharpe: {metrics['sharpe_ratio']:.2f}  "
+          f"max drawdown: {metrics['max_drawdown']:.2f}%")
+    print(f"Books balance: final equity {final:,.2f} = capital + P&L {expected:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark: legacy row-by-row strategies vs the vectorized signal engine.
+
+Builds a synthetic OHLCV + indicator panel (default 500 symbols x 10 years of
+trading days), then times:
+  - legacy:     TradingSignalsTransformer(engine='legacy').generate_signals per symbol
+  - vectorized: the same call with engine='vectorized' per symbol (process_symbol path)
+  - panel:      one VectorizedSignalEngine.generate call over the whole panel
+
+The legacy path is slow enough that it is timed on a sample of symbols and
+extrapolated; every sampled symbol is also checked for identical output.
+No database access is needed.
+
+Usage:
+    python scripts/benchmark_signal_engine.py
+    python scripts/benchmark_signal_engine.py --symbols 500 --years 10 --legacy-symbols 10
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# PostgresDatabaseManager only validates that a password is configured; the
+# benchmark never connects.
+os.environ.setdefault("POSTGRES_PASSWORD", "benchmark")
+
+from transforms.signal_engine import VectorizedSignalEngine
+from transforms.transform_trading_signals import TradingSignalsTransformer
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _rsi(close, length=14):
+    """Wilder RSI."""
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / length, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / length, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def _symbol_frame(rng, symbol_id, dates):
+    """One symbol's random-walk OHLCV with the indicator columns signals read."""
+    n = len(dates)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    df = pd.DataFrame({
+        "symbol_id": symbol_id,
+        "symbol": f"SYM{symbol_id}",
+        "date": dates,
+        "open": close + rng.normal(0, 0.005, n) * close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "adjusted_close": close,
+        "volume": rng.lognormal(13, 0.6, n).astype(np.int64),
+    })
+
+    c = df["close"]
+    df["ohlcv_ema_8"] = c.ewm(span=8, adjust=False).mean()
+    df["ohlcv_ema_21"] = c.ewm(span=21, adjust=False).mean()
+    df["ohlcv_rsi_14"] = _rsi(c)
+    macd = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    df["ohlcv_macd"] = macd
+    df["ohlcv_macd_signal"] = macd.ewm(span=9, adjust=False).mean()
+    df["ohlcv_macd_histogram"] = df["ohlcv_macd"] - df["ohlcv_macd_signal"]
+    mid = c.rolling(20).mean()
+    std = c.rolling(20).std()
+    df["ohlcv_bb_upper"] = mid + 2 * std
+    df["ohlcv_bb_middle"] = mid
+    df["ohlcv_bb_lower"] = mid - 2 * std
+    df["ohlcv_volume_sma_20"] = df["volume"].rolling(20).mean()
+    hh = df["high"].rolling(14).max()
+    ll = df["low"].rolling(14).min()
+    df["ohlcv_willr_14"] = -100 * (hh - c) / (hh - ll)
+    for window in (5, 10, 20, 50):
+        df[f"ohlcv_sma_{window}"] = c.rolling(window).mean()
+
+    # Indicators are NULL for the warm-up bars, as in transforms.time_series_daily_adjusted
+    df.loc[df.index[:20], "ohlcv_rsi_14"] = np.nan
+    return df
+
+
+def make_panel(n_symbols, years, seed=42):
+    """Synthetic panel sorted by symbol_id then date."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-02", periods=years * TRADING_DAYS_PER_YEAR)
+    frames = [_symbol_frame(rng, symbol_id, dates) for symbol_id in range(1, n_symbols + 1)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _per_symbol(transformer, groups):
+    """Run generate_signals symbol by symbol, as process_symbol does."""
+    results = []
+    start = time.perf_counter()
+    for df in groups:
+        results.append(transformer.generate_signals(df))
+    return time.perf_counter() - start, results
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs vectorized signal generation")
+    parser.add_argument("--symbols", type=int, default=500, help="Symbols in the synthetic panel")
+    parser.add_argument("--years", type=int, default=10, help="Years of daily bars per symbol")
+    parser.add_argument("--legacy-symbols", type=int, default=10,
+                        help="Symbols to time (and verify) on the legacy path")
+    args = parser.parse_args()
+
+    print(f"Building synthetic panel: {args.symbols} symbols x {args.years} years...")
+    panel = make_panel(args.symbols, args.years)
+    groups = [df.reset_index(drop=True) for _, df in panel.groupby("symbol_id", sort=True)]
+    print(f"  {len(panel):,} rows")
+
+    legacy = TradingSignalsTransformer(engine="legacy")
+    vectorized = TradingSignalsTransformer(engine="vectorized")
+    engine = VectorizedSignalEngine()
+
+    sample = groups[: min(args.legacy_symbols, len(groups))]
+    legacy_time, legacy_results = _per_symbol(legacy, sample)
+    legacy_estimate = legacy_time / len(sample) * len(groups)
+
+    vector_time, vector_results = _per_symbol(vectorized, groups)
+
+    start = time.perf_counter()
+    panel_signals = engine.generate(panel)
+    panel_time = time.perf_counter() - start
+
+    # Output must be identical, both per symbol and for the panel-wide call
+    for old, new in zip(legacy_results, vector_results):
+        pd.testing.assert_frame_equal(old, new, check_dtype=False, check_exact=True)
+    sample_ids = {df["symbol_id"].iloc[0] for df in sample}
+    panel_sample = panel_signals[panel_signals["symbol_id"].isin(sample_ids)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        pd.concat(legacy_results, ignore_index=True), panel_sample,
+        check_dtype=False, check_exact=True,
+    )
+    pd.testing.assert_frame_equal(
+        pd.concat(vector_results, ignore_index=True), panel_signals,
+        check_dtype=False, check_exact=True,
+    )
+
+    print()
+    print(f"{'path':<28}{'seconds':>12}{'symbols/sec':>14}")
+    print(f"{'legacy (measured sample)':<28}{legacy_time:>12.2f}{len(sample) / legacy_time:>14.1f}")
+    print(f"{'legacy (extrapolated)':<28}{legacy_estimate:>12.2f}{len(groups) / legacy_estimate:>14.1f}")
+    print(f"{'vectorized per symbol':<28}{vector_time:>12.2f}{len(groups) / vector_time:>14.1f}")
+    print(f"{'vectorized panel':<28}{panel_time:>12.2f}{len(groups) / panel_time:>14.1f}")
+    print()
+    print(f"Signals: {len(panel_signals):,} (identical on {len(sample)} verified symbols)")
+    print(f"Speedup per symbol: {legacy_estimate / vector_time:,.0f}x, panel: {legacy_estimate / panel_time:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Migration: typed integer symbol key on raw.time_series_daily_adjusted.
+
+raw.time_series_daily_adjusted.symbol_id is TEXT while every other table keys
+symbols by INTEGER, so joins were written as ``r.symbol_id::integer =
+t.symbol_id``. The cast hides the column from idx_time_series_symbol_date and
+forces sequential scans of the largest table. This migration adds
+
+    symbol_id_int  INTEGER GENERATED ALWAYS AS (symbol_id::integer) STORED
+    idx_time_series_symbol_id_int_date  (symbol_id_int, date)
+    idx_time_series_date                (date)
+
+and the query sites (transforms, backtesting, trading bot) filter and join on
+symbol_id_int. Being generated, the column needs no change to the loaders
+writing raw rows, as long as they name their INSERT/COPY columns.
+
+Adding a stored column rewrites the table under an exclusive lock; run it
+outside market-hours jobs. --concurrently builds the indexes without blocking
+writes (slower, and not inside a transaction).
+
+After migrating (or with --check alone) the main queries are EXPLAINed and
+each scan of the tables they must hit by key is verified to be an index
+lookup on the key column. When the planner prefers a sequential scan anyway
+(small tables), the query is re-planned with sequential scans and hash/merge
+joins disabled to confirm that an index *can* serve it; only a query no index
+can serve fails.
+
+Usage:
+    python scripts/migrate_symbol_id_int.py              # migrate, then check
+    python scripts/migrate_symbol_id_int.py --check      # EXPLAIN check only
+    python scripts/migrate_symbol_id_int.py --dry-run    # print the DDL
+    python scripts/migrate_symbol_id_int.py --concurrently
+"""
+
+import re
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.postgres_database_manager import PostgresDatabaseManager
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RAW_TABLE = 'raw.time_series_daily_adjusted'
+
+NON_INTEGER_IDS_SQL = f"""
+    SELECT COUNT(*) FROM {RAW_TABLE}
+    WHERE symbol_id::text !~ '^\\s*[+-]?[0-9]+\\s*$'
+"""
+
+ADD_COLUMN_SQL = f"""
+    ALTER TABLE {RAW_TABLE}
+    ADD COLUMN IF NOT EXISTS symbol_id_int INTEGER
+    GENERATED ALWAYS AS (symbol_id::integer) STORED
+"""
+
+INDEX_SQL = [
+    f"CREATE INDEX {{concurrently}} IF NOT EXISTS idx_time_series_symbol_id_int_date "
+    f"ON {RAW_TABLE} (symbol_id_int, date)",
+    f"CREATE INDEX {{concurrently}} IF NOT EXISTS idx_time_series_date "
+    f"ON {RAW_TABLE} (date)",
+]
+
+# The queries that must reach raw rows by key, as issued by the code: name,
+# SQL, and the (table, column) pairs whose scans must be index lookups on
+# that column. Parameters are filled from a sample symbol in the database.
+SIGNALS_JOIN = """
+    FROM transforms.trading_signals s
+    INNER JOIN raw.time_series_daily_adjusted r
+        ON s.symbol_id = r.symbol_id_int
+        AND s.date = r.date
+"""
+
+CHECKS = [
+    (
+        "TradingSignalsTransformer.get_symbol_data",
+        "{signal_source} WHERE r.symbol_id_int = %(symbol_id)s AND r.date >= %(since)s ORDER BY r.date ASC",
+        [(RAW_TABLE, 'symbol_id_int'), ('transforms.time_series_daily_adjusted', 'symbol_id')],
+    ),
+    (
+        "TradingSignalsTransformer.iter_panel_chunks",
+        "{signal_source} WHERE r.symbol_id_int = ANY(%(symbol_ids)s) ORDER BY r.symbol_id_int, r.date ASC",
+        [(RAW_TABLE, 'symbol_id_int'), ('transforms.time_series_daily_adjusted', 'symbol_id')],
+    ),
+    (
+        "TradingSignalsTransformer.get_unprocessed_symbols",
+        """
+        SELECT DISTINCT r.symbol_id_int
+        FROM raw.time_series_daily_adjusted r
+        WHERE r.date >= %(since)s
+          AND NOT EXISTS (
+            SELECT 1
+            FROM transforms.trading_signals s
+            WHERE s.symbol_id = r.symbol_id_int
+              AND s.date = r.date
+              AND s.processed_at >= %(since)s
+          )
+        ORDER BY r.symbol_id_int
+        """,
+        [(RAW_TABLE, 'date'), ('transforms.trading_signals', 'symbol_id')],
+    ),
+    (
+        "TimeSeriesDailyAdjustedTransformer.transform_symbol",
+        """
+        SELECT symbol_id_int AS symbol_id, symbol, date, open, high, low, close, adjusted_close, volume
+        FROM raw.time_series_daily_adjusted
+        WHERE symbol_id_int = %(symbol_id)s
+        ORDER BY date DESC
+        LIMIT 250
+        """,
+        [(RAW_TABLE, 'symbol_id_int')],
+    ),
+    (
+        "TimeSeriesDailyAdjustedTransformer.transform_new_bars",
+        """
+        SELECT date, open, high, low, close, adjusted_close, volume
+        FROM raw.time_series_daily_adjusted
+        WHERE symbol_id_int = %(symbol_id)s AND date > %(since)s
+        ORDER BY date ASC
+        """,
+        [(RAW_TABLE, 'symbol_id_int')],
+    ),
+    (
+        "StrategyBacktester.get_signals",
+        f"""
+        SELECT s.symbol, s.symbol_id, s.date, s.buy_signal, s.sell_signal, s.trade_strategy,
+               s.signal_strength, r.open, r.high, r.low, r.close, r.volume
+        {SIGNALS_JOIN}
+        WHERE s.trade_strategy = %(strategy)s AND s.date >= %(since)s
+        ORDER BY s.trade_strategy, s.date, s.symbol
+        """,
+        [(RAW_TABLE, 'symbol_id_int')],
+    ),
+    (
+        "StrategyBacktester.get_price_data",
+        """
+        SELECT date, open, high, low, close, volume
+        FROM raw.time_series_daily_adjusted
+        WHERE symbol_id_int = %(symbol_id)s AND date >= %(since)s AND date <= %(until)s
+        ORDER BY date
+        """,
+        [(RAW_TABLE, 'symbol_id_int')],
+    ),
+    (
+        "DailySignalScorer.get_latest_signals",
+        f"""
+        SELECT DISTINCT ON (s.symbol_id, s.trade_strategy)
+               s.symbol, s.symbol_id, s.date AS signal_date, s.trade_strategy, s.signal_strength,
+               r.close, r.volume
+        {SIGNALS_JOIN}
+        WHERE s.buy_signal = TRUE AND s.date >= %(since)s
+        ORDER BY s.symbol_id, s.trade_strategy, s.date DESC
+        """,
+        [(RAW_TABLE, 'symbol_id_int')],
+    ),
+    (
+        "AutomatedTradingBot.validate_entry_conditions",
+        """
+        SELECT close
+        FROM raw.time_series_daily_adjusted
+        WHERE symbol_id_int = %(symbol_id)s
+        AND date = %(until)s
+        """,
+        [(RAW_TABLE, 'symbol_id_int')],
+    ),
+]
+
+INDEX_NODES = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+
+def column_exists(db):
+    """Whether symbol_id_int has been added already."""
+    return bool(db.fetch_query("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'raw' AND table_name = 'time_series_daily_adjusted'
+          AND column_name = 'symbol_id_int'
+    """))
+
+
+def migrate(db, concurrently=False, dry_run=False):
+    """Add the generated column and indexes, then refresh planner statistics."""
+    statements = [ADD_COLUMN_SQL] + [
+        sql.format(concurrently='CONCURRENTLY' if concurrently else '') for sql in INDEX_SQL
+    ] + [f"ANALYZE {RAW_TABLE}"]
+
+    if dry_run:
+        for sql in statements:
+            print(' '.join(sql.split()) + ';')
+        return
+
+    bad_ids = db.fetch_query(NON_INTEGER_IDS_SQL)[0][0]
+    if bad_ids:
+        raise ValueError(
+            f"{bad_ids:,} rows in {RAW_TABLE} have a non-integer symbol_id; "
+            "clean them up before migrating"
+        )
+
+    if not column_exists(db):
+        logger.info("Adding generated column symbol_id_int (rewrites the table)...")
+    db.execute_query(ADD_COLUMN_SQL)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    db.connection.autocommit = concurrently
+    try:
+        for sql in statements[1:]:
+            logger.info(' '.join(sql.split()))
+            db.execute_query(sql)
+    finally:
+        db.connection.autocommit = False
+    logger.info("Migration complete")
+
+
+def sample_params(db):
+    """Query parameters from a real symbol with recent data."""
+    symbol_id, last_date = db.fetch_query(f"""
+        SELECT symbol_id_int, MAX(date) FROM {RAW_TABLE}
+        GROUP BY symbol_id_int ORDER BY MAX(date) DESC, symbol_id_int LIMIT 1
+    """)[0]
+    symbol_ids = [row[0] for row in db.fetch_query(
+        f"SELECT DISTINCT symbol_id_int FROM {RAW_TABLE} ORDER BY 1 LIMIT 5"
+    )]
+    strategy = db.fetch_query("SELECT trade_strategy FROM transforms.trading_signals LIMIT 1")
+    return {
+        'symbol_id': symbol_id,
+        'symbol_ids': symbol_ids,
+        'since': last_date.replace(day=1),
+        'until': last_date,
+        'strategy': strategy[0][0] if strategy else 'ema_crossover',
+    }
+
+
+def _scans(plan, found=None):
+    """(qualified table, node) for every table scan in a JSON plan tree."""
+    found = [] if found is None else found
+    if 'Relation Name' in plan:
+        found.append((f"{plan.get('Schema', 'public')}.{plan['Relation Name']}", plan))
+    for child in plan.get('Plans', []):
+        _scans(child, found)
+    return found
+
+
+def _keyed(node, column):
+    """Whether a scan node reaches rows through an index condition on column."""
+    if node['Node Type'] not in INDEX_NODES:
+        return False
+    conditions = [node.get('Index Cond', '')]
+    pending = list(node.get('Plans', [])) if node['Node Type'] == 'Bitmap Heap Scan' else []
+    while pending:
+        child = pending.pop()
+        conditions.append(child.get('Index Cond', ''))
+        pending.extend(child.get('Plans', []))
+    return re.search(rf'\b{column}\b', ' '.join(conditions)) is not None
+
+
+def explain(db, sql, params, force_index=False):
+    """EXPLAIN a query (optionally with seq scans and hash/merge joins disabled)."""
+    cursor = db.connection.cursor()
+    try:
+        if force_index:
+            for setting in ('enable_seqscan', 'enable_hashjoin', 'enable_mergejoin'):
+                cursor.execute(f"SET LOCAL {setting} = off")
+        cursor.execute("EXPLAIN (VERBOSE, FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+        return json.loads(plan)[0]['Plan'] if isinstance(plan, str) else plan[0]['Plan']
+    finally:
+        cursor.close()
+        db.connection.rollback()
+
+
+def describe(node):
+    index = node.get('Index Name') or next(
+        (child.get('Index Name') for child in node.get('Plans', []) if child.get('Index Name')), None
+    )
+    return f"{node['Node Type']}" + (f" using {index}" if index else "")
+
+
+def check(db):
+    """EXPLAIN the main queries; returns True when every keyed table is index-reachable."""
+    from transforms.transform_trading_signals import SIGNAL_SOURCE_QUERY
+
+    if not column_exists(db):
+        logger.error("symbol_id_int does not exist yet; run the migration first")
+        return False
+
+    params = sample_params(db)
+    all_ok = True
+    print()
+    print(f"{'query':<54}{'table':<40}{'plan':<74}result")
+    for name, sql, keys in CHECKS:
+        sql = sql.replace('{signal_source}', SIGNAL_SOURCE_QUERY)
+        natural = explain(db, sql, params)
+        forced = None
+        for table, column in keys:
+            nodes = [node for qualified, node in _scans(natural) if qualified == table]
+            if all(_keyed(node, column) for node in nodes):
+                result = 'index'
+            else:
+                forced = forced or explain(db, sql, params, force_index=True)
+                nodes = [node for qualified, node in _scans(forced) if qualified == table]
+                ok = all(_keyed(node, column) for node in nodes)
+                result = 'index (seq scan preferred at current size)' if ok else f'FAIL: no index on {column}'
+                all_ok &= ok
+            plan = ', '.join(sorted({describe(node) for node in nodes})) or 'not scanned'
+            print(f"{name:<54}{table:<40}{plan:<74}{result}")
+    print()
+    return all_ok
+
+
+def main():
+    """Run the migration and/or the EXPLAIN check."""
+    parser = argparse.ArgumentParser(
+        description="Add an integer symbol key to raw.time_series_daily_adjusted and verify index use"
+    )
+    parser.add_argument('--check', action='store_true', help='Only run the EXPLAIN check')
+    parser.add_argument('--dry-run', action='store_true', help='Print the migration DDL and exit')
+    parser.add_argument('--concurrently', action='store_true',
+                        help='Build indexes with CREATE INDEX CONCURRENTLY')
+    args = parser.parse_args()
+
+    with PostgresDatabaseManager() as db:
+        if args.dry_run:
+            migrate(db, dry_run=True)
+            return
+        if not args.check:
+            migrate(db, concurrently=args.concurrently)
+        ok = check(db)
+
+    if not ok:
+        logger.error("Some queries cannot use an index on their keyed tables")
+        sys.exit(1)
+    logger.info("All checked queries reach their keyed tables through an index")
+
+
+if __name__ == "__main__":
+    main()
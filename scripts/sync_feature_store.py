@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Sync the local feature store (backtesting/feature_store.py) with its source tables.
+
+The scorers sync the sources they read before scoring, so this is only needed
+to refresh everything at once, e.g. before training or a batch of experiments.
+A source is re-read only when its row count or max(processed_at) moved. Use
+--full after a source without processed_at (sector) has been restated.
+
+Usage:
+    python scripts/sync_feature_store.py
+    python scripts/sync_feature_store.py --sources fundamentals sector
+    python scripts/sync_feature_store.py --full --store-dir /data/feature_store
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backtesting.feature_store import SOURCES, FeatureStore
+
+
+def main():
+    """Sync the store and print a summary."""
+    parser = argparse.ArgumentParser(description="Sync the local feature store from Postgres")
+    parser.add_argument("--store-dir", type=str, default=None,
+                        help="Store directory (default: FEATURE_STORE_DIR or data/feature_store)")
+    parser.add_argument("--sources", nargs="+", choices=sorted(SOURCES), default=None,
+                        help="Sources to sync (default: all)")
+    parser.add_argument("--full", action="store_true", help="Re-read every source regardless of its snapshot")
+    args = parser.parse_args()
+
+    store = FeatureStore(args.store_dir)
+
+    start = time.perf_counter()
+    refreshed = store.sync(args.sources, full=args.full)
+    elapsed = time.perf_counter() - start
+
+    print(f"Re-read {len(refreshed)} sources in {elapsed:.1f}s -> {store.root}")
+    for name, info in sorted(store.manifest['sources'].items()):
+        marker = '*' if name in refreshed else ' '
+        print(f"  {marker} {name:<20} {info['rows']:>12,} rows  synced {info['synced_at']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Sync the local OHLCV cache (db/ohlcv_cache.py) with raw.time_series_daily_adjusted.
+
+Run after the daily raw load and before anything started with --ohlcv-cache.
+Incremental by default: only rows newer than each bucket's max date are read.
+Use --full after history has been restated or backfilled.
+
+Usage:
+    python scripts/sync_ohlcv_cache.py
+    python scripts/sync_ohlcv_cache.py --full
+    python scripts/sync_ohlcv_cache.py --cache-dir /data/ohlcv --buckets 128
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from db.ohlcv_cache import OhlcvCache
+
+
+def main():
+    """Sync the cache and print a summary."""
+    parser = argparse.ArgumentParser(description="Sync the local OHLCV cache from Postgres")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Cache directory (default: OHLCV_CACHE_DIR or data/ohlcv_cache)")
+    parser.add_argument("--full", action="store_true", help="Rebuild every bucket from the whole table")
+    parser.add_argument("--buckets", type=int, default=64,
+                        help="Symbol buckets when creating a new cache (default: 64)")
+    parser.add_argument("--max-parts", type=int, default=8,
+                        help="Parts per bucket before it is compacted (default: 8)")
+    args = parser.parse_args()
+
+    cache = OhlcvCache(args.cache_dir, n_buckets=args.buckets, max_parts=args.max_parts)
+
+    start = time.perf_counter()
+    rows = cache.sync(full=args.full)
+    elapsed = time.perf_counter() - start
+
+    buckets = cache.manifest['buckets']
+    total_rows = sum(info['rows'] for info in buckets.values())
+    max_date = max((info['max_date'] for info in buckets.values()), default=None)
+    print(f"Synced {rows:,} rows in {elapsed:.1f}s -> {cache.root}")
+    print(f"Cache: {total_rows:,} rows in {len(buckets)} buckets, through {max_date}")
+
+
+if __name__ == "__main__":
+    main()
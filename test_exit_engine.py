@@ -0,0 +1,203 @@
+"""Tests for intrabar stop-loss / take-profit exits (backtesting/exit_engine.py).
+
+Hand-made bars check the fill rules: stop and target prices, gaps through
+either level, a bar reaching both, and the search window (the bar after the
+entry through the end date). Random bars check the windowed search against a
+bar-by-bar loop. ArrayTradeSimulator with stops is checked on a hand-worked
+symbol, against its own signal-only results when the levels are never
+reached, and for the rules every price exit must satisfy.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.exit_engine import IntrabarExitEngine, _date_ns
+from backtesting.trade_simulator import ArrayTradeSimulator, TRADE_COLUMNS
+
+
+def make_bars(bars, symbol_id=1, start='2022-01-03'):
+    """Daily bars from [(open, high, low, close), ...] on business days."""
+    dates = pd.bdate_range(start, periods=len(bars))
+    df = pd.DataFrame(bars, columns=['open', 'high', 'low', 'close'])
+    return df.assign(symbol_id=symbol_id, date=dates), dates
+
+
+def test_fill_rules():
+    bars, dates = make_bars([
+        (100, 101, 99, 100),   # 0: entry at 100
+        (100, 102, 95, 97),    # 1: low touches nothing (stop 90, target 110)
+        (97, 98, 89, 92),      # 2: stop hit intrabar -> 90
+    ] + [
+        (100, 100, 100, 100),  # 3: entry at 100
+        (85, 88, 84, 86),      # 4: gap below the stop -> open 85
+    ] + [
+        (100, 100, 100, 100),  # 5: entry at 100
+        (104, 111, 103, 109),  # 6: target hit intrabar -> 110
+    ] + [
+        (100, 100, 100, 100),  # 7: entry at 100
+        (112, 115, 111, 114),  # 8: gap above the target -> open 112
+    ] + [
+        (100, 100, 100, 100),  # 9: entry at 100
+        (101, 112, 88, 100),   # 10: both levels: stop first -> 90
+    ] + [
+        (100, 100, 100, 100),  # 11: entry at 100
+        (111, 112, 88, 100),   # 12: both, but opened through the target -> 111
+    ])
+    engine = IntrabarExitEngine(bars, window=4)
+    entries = [0, 3, 5, 7, 9, 11]
+    exits = engine.first_exits(
+        np.ones(len(entries), dtype=np.int64), dates[entries], np.full(len(entries), 100.0),
+        np.full(len(entries), dates[-1]), stop_loss_pct=0.10, take_profit_pct=0.10,
+    )
+    assert exits['hit'].all()
+    assert exits['bar'].tolist() == [2, 4, 6, 8, 10, 12]
+    assert np.allclose(exits['price'], [90.0, 85.0, 110.0, 112.0, 90.0, 111.0], rtol=1e-12)
+    assert exits['reason'].tolist() == [1, 1, 2, 2, 1, 2]
+    assert (exits['date_ns'] == _date_ns(dates[[2, 4, 6, 8, 10, 12]])).all()
+
+
+def test_search_window():
+    bars, dates = make_bars([(100, 100, 100, 100)] * 3 + [(100, 100, 80, 90)] + [(100, 100, 100, 100)] * 2)
+    engine = IntrabarExitEngine(bars)
+    ones = np.ones(4, dtype=np.int64)
+    exits = engine.first_exits(
+        np.array([1, 1, 1, 2]),
+        dates[[0, 0, 3, 0]],        # the entry bar itself is never searched
+        np.full(4, 100.0),
+        dates[[3, 2, 5, 5]],        # end date inclusive; unknown symbol 2
+        stop_loss_pct=0.10,
+    )
+    assert exits['hit'].tolist() == [True, False, False, False]
+    assert exits['bar'].tolist() == [3, -1, -1, -1]
+
+    # Neither level set: nothing to search
+    assert not engine.first_exits(ones, dates[[0] * 4], np.full(4, 100.0), dates[[5] * 4])['hit'].any()
+
+
+def test_matches_bar_by_bar_loop():
+    rng = np.random.default_rng(5)
+    frames = []
+    for symbol_id in range(1, 21):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+        open_ = close * np.exp(rng.normal(0, 0.01, 300))
+        bars = np.column_stack([open_, np.maximum(open_, close) * 1.01, np.minimum(open_, close) * 0.99, close])
+        frame, dates = make_bars(bars[rng.random(300) < 0.9], symbol_id)  # gaps in some symbols' history
+        frames.append(frame)
+    bars = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=1)
+    engine = IntrabarExitEngine(bars, window=7)
+
+    entries = bars.sample(500, random_state=2)
+    end_dates = entries['date'] + pd.to_timedelta(rng.integers(0, 120, 500), 'D')
+    exits = engine.first_exits(entries['symbol_id'].to_numpy(), entries['date'], entries['close'].to_numpy(),
+                               end_dates, stop_loss_pct=0.08, take_profit_pct=0.12)
+
+    by_symbol = {sid: group.sort_values('date') for sid, group in bars.groupby('symbol_id')}
+    for i, (sid, date, price, end) in enumerate(zip(entries['symbol_id'], entries['date'], entries['close'], end_dates)):
+        group = by_symbol[sid]
+        window = group[(group['date'] > date) & (group['date'] <= end)]
+        breach = (window['low'] <= price * 0.92) | (window['high'] >= price * 1.12)
+        if not breach.any():
+            assert not exits['hit'][i]
+            continue
+        bar = window[breach].iloc[0]
+        assert exits['hit'][i]
+        assert exits['date_ns'][i] == _date_ns([bar['date']])[0]
+        stop_first = bar['low'] <= price * 0.92 and bar['open'] < price * 1.12
+        expected = min(bar['open'], price * 0.92) if stop_first else max(bar['open'], price * 1.12)
+        assert exits['price'][i] == expected
+
+
+def make_signal_bars(n_symbols=30, n_days=300, seed=0):
+    """Bars for every day plus random buy/sell signals on a subset of days."""
+    rng = np.random.default_rng(seed)
+    frames, signals = [], []
+    for i in range(n_symbols):
+        close = 30 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        open_ = close * np.exp(rng.normal(0, 0.01, n_days))
+        bars = np.column_stack([open_, np.maximum(open_, close) * 1.01, np.minimum(open_, close) * 0.99, close])
+        frame, _ = make_bars(bars, 100 + i)
+        frames.append(frame)
+        rows = frame[rng.random(n_days) < 0.3]
+        signals.append(pd.DataFrame({
+            'symbol': f'SYM{i:03d}',
+            'symbol_id': 100 + i,
+            'date': rows['date'].to_numpy(),
+            'buy_signal': rng.random(len(rows)) < 0.25,
+            'sell_signal': rng.random(len(rows)) < 0.25,
+            'close': rows['close'].to_numpy(),
+        }))
+    signals = pd.concat(signals, ignore_index=True).sample(frac=1, random_state=seed).reset_index(drop=True)
+    return pd.concat(frames, ignore_index=True), signals
+
+
+def test_simulator_hand_worked():
+    bars, dates = make_bars([
+        (10, 10, 10, 10),      # 0: buy at 10
+        (10, 10.5, 9.5, 10),   # 1: nothing
+        (9.5, 9.6, 8.8, 9.0),  # 2: stop 9.0 hit -> exit 9.0
+        (9, 9, 9, 9),          # 3: buy at 9 (day 2's buy row is skipped: it is the stop's day)
+        (9, 11, 9, 11),        # 4: target 10.8 hit -> exit 10.8
+        (11, 11, 11, 11),      # 5: buy at 11
+        (11, 11.5, 10.5, 11),  # 6: sell signal at 11
+    ], symbol_id=7)
+    signals = pd.DataFrame({
+        'symbol': 'S7', 'symbol_id': 7, 'date': dates[[0, 2, 3, 5, 6]],
+        'buy_signal': [True, True, True, True, False],
+        'sell_signal': [False, False, False, False, True],
+        'close': [10.0, 9.0, 9.0, 11.0, 11.0],
+    })
+    simulator = ArrayTradeSimulator(initial_capital=1000, position_size=0.5, commission=0.0,
+                                    exit_engine=IntrabarExitEngine(bars), stop_loss_pct=0.10, take_profit_pct=0.20)
+    trades = simulator.simulate(signals, 'test', cooldown_days=0)
+
+    assert list(trades.columns) == TRADE_COLUMNS + ['exit_reason']
+    assert trades['entry_date'].tolist() == list(dates[[0, 3, 5]])
+    assert trades['exit_date'].tolist() == list(dates[[2, 4, 6]])
+    assert np.allclose(trades['exit_price'], [9.0, 10.8, 11.0], rtol=1e-12)
+    assert trades['exit_reason'].tolist() == ['stop_loss', 'take_profit', 'signal']
+    assert trades['holding_days'].tolist() == [2, 1, 1]
+
+
+def test_unreached_levels_match_signal_exits():
+    bars, signals = make_signal_bars(seed=3)
+    engine = IntrabarExitEngine(bars)
+    for cooldown_days in (0, 20):
+        baseline = ArrayTradeSimulator().simulate(signals, 'test', cooldown_days)
+        wide = ArrayTradeSimulator(exit_engine=engine, stop_loss_pct=0.999, take_profit_pct=1e6)
+        trades = wide.simulate(signals, 'test', cooldown_days)
+        assert set(trades['exit_reason']) <= {'signal', 'end_of_data'}
+        pd.testing.assert_frame_equal(trades[TRADE_COLUMNS], baseline, check_exact=True)
+
+
+def test_price_exit_rules():
+    bars, signals = make_signal_bars(seed=4)
+    engine = IntrabarExitEngine(bars)
+    baseline = ArrayTradeSimulator().simulate(signals, 'test', cooldown_days=5)
+    trades = ArrayTradeSimulator(exit_engine=engine, stop_loss_pct=0.05, take_profit_pct=0.08).simulate(
+        signals, 'test', cooldown_days=5
+    )
+    assert trades['exit_reason'].isin(['stop_loss', 'take_profit']).any()
+    assert len(trades) > len(baseline) * 0.8
+
+    stops = trades[trades['exit_reason'] == 'stop_loss']
+    targets = trades[trades['exit_reason'] == 'take_profit']
+    assert (stops['exit_price'] <= stops['entry_price'] * 0.95 + 1e-9).all()
+    assert (targets['exit_price'] >= targets['entry_price'] * 1.08 - 1e-9).all()
+    price_exits = pd.concat([stops, targets])
+    assert (price_exits['exit_date'] > price_exits['entry_date']).all()
+
+    # One position per symbol at a time, and the cooldown holds after every exit
+    for _, group in trades.sort_values('entry_date').groupby('symbol'):
+        gap = group['entry_date'].iloc[1:].to_numpy() - group['exit_date'].iloc[:-1].to_numpy()
+        assert (gap >= np.timedelta64(5, 'D')).all()
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
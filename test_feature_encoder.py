@@ -0,0 +1,96 @@
+"""Tests for the feature encoder (backtesting/feature_encoder.py).
+
+transform() must equal pd.get_dummies on the training vocabularies with
+median-filled numeric gaps, in model column order, for any batch: categories
+never seen in training set no column and a missing category counts as
+UNKNOWN. The encoder must survive to_dict()/from_dict(), and models saved
+with feature names only must fill gaps with batch medians.
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.feature_encoder import FeatureEncoder, UNKNOWN
+
+NUMERIC = ['overall_quality_score', 'is_growth_score']
+CATEGORICAL = ['sector', 'strategy']
+
+
+def make_rows(n=300, seed=3, sectors=('ENERGY', 'TECHNOLOGY', None), strategies=('rsi_crossing', 'ema_crossover')):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'overall_quality_score': rng.normal(60, 10, n),
+        'is_growth_score': rng.normal(50, 20, n),
+        'sector': rng.choice(np.array(sectors, dtype=object), n),
+        'strategy': rng.choice(strategies, n),
+    })
+    df.loc[df.index[::9], 'is_growth_score'] = np.nan
+    return df
+
+
+def expected_features(df, medians):
+    X = df[NUMERIC].fillna(medians)
+    for col in CATEGORICAL:
+        X = pd.concat([X, pd.get_dummies(df[col].fillna(UNKNOWN), prefix=col)], axis=1)
+    return X.astype(np.float32)
+
+
+def test_fit_transform_matches_get_dummies():
+    train = make_rows()
+    encoder = FeatureEncoder.fit(train, NUMERIC, CATEGORICAL)
+    assert encoder.vocabularies['sector'] == ['ENERGY', 'TECHNOLOGY', UNKNOWN]
+    assert encoder.fill_values['is_growth_score'] == train['is_growth_score'].median()
+
+    X = encoder.transform(train)
+    expected = expected_features(train, train[NUMERIC].median())
+    assert X.dtype == np.float32 and X.flags['C_CONTIGUOUS']
+    assert encoder.feature_names == list(expected.columns)
+    assert np.array_equal(X, expected.to_numpy())
+
+
+def test_unseen_categories_and_frozen_fill():
+    train = make_rows()
+    encoder = FeatureEncoder.fit(train, NUMERIC, CATEGORICAL)
+    batch = make_rows(n=50, seed=8, sectors=('ENERGY', 'UTILITIES', None), strategies=('new_strategy', 'rsi_crossing'))
+    batch = batch.rename(columns={'strategy': 'trade_strategy'})
+
+    X = pd.DataFrame(encoder.transform(batch, columns={'strategy': 'trade_strategy'}), columns=encoder.feature_names)
+    unseen = (batch['sector'] == 'UTILITIES').to_numpy()
+    assert (X.loc[unseen, ['sector_ENERGY', 'sector_TECHNOLOGY', 'sector_UNKNOWN']] == 0).all().all()
+    assert (X.loc[batch['sector'].isna().to_numpy(), 'sector_UNKNOWN'] == 1).all()
+    assert X['strategy_rsi_crossing'].sum() == (batch['trade_strategy'] == 'rsi_crossing').sum()
+    assert X.filter(like='strategy_').sum(axis=1).max() == 1
+
+    gaps = batch['is_growth_score'].isna().to_numpy()
+    assert np.allclose(X.loc[gaps, 'is_growth_score'], encoder.fill_values['is_growth_score'])
+
+
+def test_round_trip_and_feature_name_order():
+    train = make_rows()
+    encoder = FeatureEncoder.fit(train, NUMERIC, CATEGORICAL)
+    restored = FeatureEncoder.from_dict(json.loads(json.dumps(encoder.to_dict())))
+    assert np.array_equal(restored.transform(train), encoder.transform(train))
+
+    # Model saved with its column names only, in an order of its own
+    shuffled = encoder.feature_names[::-1]
+    legacy = FeatureEncoder.from_feature_names(shuffled, CATEGORICAL)
+    assert legacy.numeric == NUMERIC[::-1] and legacy.fill_values is None
+    X = pd.DataFrame(legacy.transform(train), columns=shuffled)
+    assert np.array_equal(X[encoder.feature_names].to_numpy(), encoder.transform(train))
+
+    batch = make_rows(n=40, seed=11)
+    X = pd.DataFrame(legacy.transform(batch), columns=shuffled)
+    gaps = batch['is_growth_score'].isna().to_numpy()
+    assert np.allclose(X.loc[gaps, 'is_growth_score'], batch['is_growth_score'].median())
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
@@ -0,0 +1,124 @@
+"""Tests for the feature-matrix cache (backtesting/feature_matrix_cache.py).
+
+A cached matrix must come back memory-mapped and equal to the prepared one,
+a second load of the same file must skip loading and encoding, and the key
+must move with the file's content, the feature definition and the synced
+sector snapshot. The sector join is replaced by the sectors already in the
+synthetic trades and the feature store reads synthetic sources, so no
+database is needed.
+"""
+
+import sys
+import functools
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.feature_matrix_cache import FeatureMatrixCache
+from backtesting.trade_success_predictor import TradeSuccessPredictor
+from test_feature_store import make_sources, make_store
+from test_walk_forward import make_trades
+
+
+def make_predictor(root):
+    """
+    A TradeSuccessPredictor that reads trades without a sector join, counting
+    loads, over a feature store in root with synthetic sources.
+    """
+    store = make_store(Path(root) / 'store', {'sector': make_sources()['sector']})
+    store.sync = functools.partial(store.sync, db=object())
+    predictor = TradeSuccessPredictor(feature_store=store)
+    predictor.loads = 0
+
+    def load_data_with_sector(input_file=None, sync=True):
+        predictor.loads += 1
+        return pd.read_parquet(input_file)
+
+    predictor.load_data_with_sector = load_data_with_sector
+    return predictor
+
+
+def test_second_load_skips_preparation():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'trades.parquet')
+        make_trades(n=2000).to_parquet(path)
+        cache = FeatureMatrixCache(Path(tmp) / 'cache')
+
+        predictor = make_predictor(tmp)
+        X, y, names = predictor.load_features(path, cache=cache)
+        dates = predictor.entry_dates
+        X_hit, y_hit, names_hit = predictor.load_features(path, cache=cache)
+        assert predictor.loads == 1
+        assert len(dates) == len(y) and np.array_equal(predictor.entry_dates, dates)
+
+        X_fresh, y_fresh, names_fresh = make_predictor(tmp).load_features(path)
+        assert names == names_hit == names_fresh
+        assert isinstance(cache.get(cache.key(cache.file_hash(path), predictor.feature_spec()))[0], np.memmap)
+        pd.testing.assert_frame_equal(X_hit, X_fresh)
+        assert np.array_equal(y_hit, y_fresh) and np.array_equal(y, y_fresh)
+        assert X.dtypes.eq(np.float32).all()
+
+        fresh_model = predictor.make_classifier(n_jobs=1).fit(X_fresh, y_fresh)
+        cached_model = predictor.make_classifier(n_jobs=1).fit(X_hit, y_hit)
+        assert np.allclose(fresh_model.predict_proba(X_fresh), cached_model.predict_proba(X_fresh))
+
+
+def test_sector_sync_before_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'trades.parquet')
+        make_trades(n=500).to_parquet(path)
+        cache = FeatureMatrixCache(Path(tmp) / 'cache')
+
+        predictor = make_predictor(tmp)
+        store = predictor.feature_store
+        predictor.load_features(path, cache=cache)
+        predictor.load_features(path, cache=cache)
+        assert predictor.loads == 1 and store.fetched == ['sector']
+
+        # The sector source moved since the last sync: the lookup must sync
+        # first and miss, as an uncached load would have joined the new rows
+        store.snapshots['sector'] = {'rows': 31, 'max_watermark': None}
+        predictor.load_features(path, cache=cache)
+        assert store.fetched == ['sector', 'sector']
+        assert predictor.loads == 2
+        predictor.load_features(path, cache=cache)
+        assert predictor.loads == 2
+
+
+def test_key_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'trades.parquet'
+        make_trades(n=500).to_parquet(path)
+        first = FeatureMatrixCache.file_hash(path)
+        assert first == FeatureMatrixCache.file_hash(path)
+
+        make_trades(n=500, seed=1).to_parquet(path)
+        second = FeatureMatrixCache.file_hash(path)
+        assert second != first
+
+        spec = TradeSuccessPredictor().feature_spec()
+        key = FeatureMatrixCache.key(second, spec)
+        assert key == FeatureMatrixCache.key(second, dict(spec))
+        assert key != FeatureMatrixCache.key(first, spec)
+        assert key != FeatureMatrixCache.key(second, {**spec, 'numeric': spec['numeric'][:-1]})
+        assert key != FeatureMatrixCache.key(second, {**spec, 'sector': {'rows': 1}})
+
+
+def test_clear():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FeatureMatrixCache(Path(tmp) / 'cache')
+        cache.put('k', np.ones((3, 2)), [0, 1, 1], ['a', 'b'])
+        X, y, names = cache.get('k')
+        assert X.dtype == np.float32 and y.dtype == np.int8 and names == ['a', 'b']
+        cache.clear()
+        assert cache.get('k') is None
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
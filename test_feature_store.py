@@ -0,0 +1,135 @@
+"""Tests for the point-in-time feature store (backtesting/feature_store.py).
+
+get_features must give each (symbol, date) pair the same as-of values as
+point_in_time_join, in the order asked, with static sources as plain lookups
+and market-wide series as one column per series. sync() must re-read only
+sources whose snapshot moved. Source reads are replaced by synthetic frames,
+so no database is needed.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.feature_store import SOURCES, FeatureStore
+from backtesting.point_in_time import point_in_time_join
+from test_point_in_time import make_fundamentals
+
+
+def make_sources(n_symbols=30):
+    """Synthetic rows for the fundamentals, sector and economic sources."""
+    fundamentals = make_fundamentals(n_symbols).drop(columns=['is_high_quality'])
+    rng = np.random.default_rng(3)
+    for col in SOURCES['fundamentals']['columns'][1:]:
+        fundamentals[col] = rng.uniform(0, 100, len(fundamentals))
+    sector = pd.DataFrame({
+        'symbol': [f"SYM{i:03d}" for i in range(n_symbols)],
+        'sector': [['TECHNOLOGY', 'ENERGY', 'FINANCE'][i % 3] for i in range(n_symbols)],
+        'industry': [f"IND{i % 7}" for i in range(n_symbols)],
+    })
+    months = pd.date_range('2019-01-01', '2025-06-01', freq='MS')
+    economic = pd.concat([
+        pd.DataFrame({'series': name, 'date': months, 'value': rng.normal(size=len(months)),
+                      'econ_return_21d': rng.normal(size=len(months)),
+                      'econ_value_zscore_63d': rng.normal(size=len(months))})
+        for name in ['CPI', 'UNEMPLOYMENT']
+    ], ignore_index=True)
+    return {'fundamentals': fundamentals, 'sector': sector, 'economic': economic}
+
+
+def make_store(root, tables, **kwargs):
+    """A FeatureStore whose source reads come from tables, counting each read."""
+    store = FeatureStore(root, sources={name: SOURCES[name] for name in tables}, row_group_size=100, **kwargs)
+    store.fetched = []
+    store.snapshots = {name: {'rows': len(df), 'max_watermark': '2025-01-01'} for name, df in tables.items()}
+
+    def fetch(name, db):
+        store.fetched.append(name)
+        return tables[name]
+
+    store._fetch = fetch
+    store._snapshot = lambda name, db: store.snapshots[name]
+    return store
+
+
+def test_get_features_matches_point_in_time_join():
+    tables = make_sources()
+    rng = np.random.default_rng(4)
+    symbols = [f"SYM{i:03d}" for i in rng.integers(0, 35, 2000)]
+    dates = pd.date_range('2019-01-01', '2025-06-30', freq='D')[rng.integers(0, 2350, 2000)]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = make_store(root, tables)
+        store.sync(db=object())
+        features = store.get_features(symbols, dates, sources=['fundamentals', 'sector', 'economic'])
+
+        pairs = pd.DataFrame({'symbol': symbols, 'date': dates})
+        expected = point_in_time_join(pairs, tables['fundamentals'], left_on='date',
+                                      right_on='fiscal_date_ending', date_columns=False)
+        assert len(features) == len(pairs)
+        assert list(features['symbol']) == symbols
+        for col in ['overall_quality_score', 'is_growth_score']:
+            assert np.allclose(features[col], expected[col], equal_nan=True)
+
+        sectors = tables['sector'].set_index('symbol')['sector']
+        assert (features['sector'].fillna('-') == pd.Series(symbols).map(sectors).fillna('-')).all()
+
+        cpi = tables['economic'][tables['economic']['series'] == 'CPI']
+        expected_cpi = point_in_time_join(pairs, cpi, left_on='date', right_on='date', by=None,
+                                          publication_lag_days=30, validity_days=None, date_columns=False)
+        assert np.allclose(features['econ_cpi_value'], expected_cpi['value'], equal_nan=True)
+        assert 'econ_unemployment_return_21d' in features
+        assert store.feature_columns(['sector', 'economic'])[:2] == ['sector', 'industry']
+
+
+def test_symbol_reads_and_join_keep_rows():
+    tables = make_sources()
+    with tempfile.TemporaryDirectory() as root:
+        store = make_store(root, tables)
+        store.sync(db=object())
+        subset = store.table('fundamentals', symbols=['SYM003', 'SYM017', 'NOPE'])
+        assert set(subset['symbol']) == {'SYM003', 'SYM017'}
+        assert subset['symbol'].is_monotonic_increasing
+
+        trades = pd.DataFrame({
+            'symbol': pd.Categorical(['SYM003', 'SYM099', 'SYM017']),
+            'entry_date': pd.to_datetime(['2024-06-03', '2024-06-03', '2019-01-02']),
+            'sector': ['stale', 'stale', 'stale'],
+        }, index=[10, 20, 30])
+        joined = store.join(trades, 'entry_date')
+        assert joined.index.equals(trades.index)
+        assert joined['sector'].tolist()[0] == 'TECHNOLOGY' and pd.isna(joined['sector'].iloc[1])
+        assert joined['overall_quality_score'].iloc[1:].isna().all()
+        assert list(joined.columns).count('sector') == 1
+
+        in_memory = make_store(root, tables, in_memory=True)
+        pd.testing.assert_frame_equal(in_memory.join(trades, 'entry_date'), joined)
+        in_memory.write_table('sector', tables['sector'].assign(sector='ENERGY'))
+        assert in_memory.join(trades, 'entry_date')['sector'].iloc[0] == 'ENERGY'
+
+
+def test_sync_rereads_only_changed_sources():
+    tables = make_sources()
+    with tempfile.TemporaryDirectory() as root:
+        store = make_store(root, tables)
+        assert store.sync(db=object()) == ['fundamentals', 'sector', 'economic']
+        assert store.sync(db=object()) == []
+
+        store.snapshots['fundamentals'] = {'rows': len(tables['fundamentals']), 'max_watermark': '2025-02-01'}
+        assert store.sync(db=object()) == ['fundamentals']
+
+        reopened = make_store(root, tables)
+        reopened.snapshots = store.snapshots
+        assert reopened.sync(db=object()) == []
+        assert reopened.sync(['sector'], full=True, db=object()) == ['sector']
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
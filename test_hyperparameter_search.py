@@ -0,0 +1,93 @@
+"""Tests for the hyperparameter search (backtesting/hyperparameter_search.py).
+
+Synthetic trades with a learnable signal check that folds never validate on
+trades older than their training rows, that each rung keeps 1/eta of the
+configurations with more rounds, that the pooled search matches the serial
+one, and that the winner has the best AUC of the final rung and max_rounds
+boosting rounds, however few configurations were drawn.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.hyperparameter_search import SuccessiveHalvingSearch, time_series_folds
+from backtesting.trade_success_predictor import TradeSuccessPredictor
+from test_walk_forward import make_trades
+
+
+def make_data(n=3000):
+    predictor = TradeSuccessPredictor()
+    X, y, _ = predictor.prepare_features(make_trades(n=n))
+    return predictor, X.astype(np.float32).reset_index(drop=True), y, predictor.entry_dates
+
+
+def make_search(predictor, **kwargs):
+    return SuccessiveHalvingSearch(predictor, n_trials=9, n_folds=3, eta=3, min_rounds=10, max_rounds=40, **kwargs)
+
+
+def test_folds_are_time_ordered():
+    _, _, _, dates = make_data()
+    folds = time_series_folds(dates, n_folds=4)
+    assert len(folds) == 4
+    seen = set()
+    for i, (train_idx, valid_idx) in enumerate(folds):
+        assert dates[train_idx].max() <= dates[valid_idx].min()
+        assert not set(train_idx) & set(valid_idx)
+        assert len(train_idx) > (len(folds[i - 1][0]) if i else 0)
+        seen |= set(valid_idx)
+    assert len(seen) + len(folds[0][0]) == len(dates)
+
+
+def test_halving_keeps_best():
+    predictor, X, y, dates = make_data()
+    search = make_search(predictor)
+    assert search.rungs() == [10, 30, 40]
+
+    trials_df, best_params = search.run(X, y, dates, workers=1)
+    per_rung = trials_df.groupby('rung').agg(trials=('trial', 'count'), rounds=('n_estimators', 'first'))
+    assert per_rung['trials'].tolist() == [9, 3, 1]
+    assert per_rung['rounds'].tolist() == [10, 30, 40]
+
+    first = trials_df[trials_df['rung'] == 0].sort_values('auc', ascending=False)
+    assert set(trials_df.loc[trials_df['rung'] == 1, 'trial']) == set(first['trial'].head(3))
+    assert (trials_df['seconds'] > 0).all() and (trials_df['folds'] == 3).all()
+    assert trials_df['auc'].min() > 0.6
+
+    final = trials_df[trials_df['rung'] == 2].iloc[0]
+    assert best_params['n_estimators'] == 40
+    assert best_params['max_depth'] == final['max_depth']
+    assert np.isclose(best_params['learning_rate'], final['learning_rate'])
+
+    predictor.params = best_params
+    assert predictor.make_classifier().get_params()['max_depth'] == best_params['max_depth']
+
+
+def test_few_trials_train_max_rounds():
+    """Fewer than eta**2 configurations must still end on max_rounds."""
+    predictor, X, y, dates = make_data(n=1500)
+    for n_trials, rounds in [(1, [40]), (2, [10, 40]), (5, [10, 40])]:
+        search = SuccessiveHalvingSearch(predictor, n_trials=n_trials, n_folds=3, eta=3,
+                                         min_rounds=10, max_rounds=40)
+        trials_df, best_params = search.run(X, y, dates, workers=8)
+        assert best_params['n_estimators'] == 40, n_trials
+        assert trials_df.groupby('rung')['n_estimators'].first().tolist() == rounds, n_trials
+        assert (trials_df['rung'] == trials_df['rung'].max()).sum() == 1
+
+
+def test_pool_matches_serial():
+    predictor, X, y, dates = make_data(n=2000)
+    serial, serial_best = make_search(predictor).run(X, y, dates, workers=1)
+    pooled, pooled_best = make_search(predictor).run(X, y, dates, workers=3)
+    assert serial_best == pooled_best
+    assert serial['trial'].tolist() == pooled['trial'].tolist()
+    assert np.allclose(serial['auc'], pooled['auc'])
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
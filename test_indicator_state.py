@@ -0,0 +1,239 @@
+"""Regression tests for carried-over indicator state (transforms/indicator_state.py).
+
+State seeded at the end of a full computation and advanced bar by bar, with
+a JSONB round trip after every step as the incremental transform stores it,
+must reproduce a full recompute over the whole history: every feature column
+of the new bars, and the refreshed targets of bars whose forward horizon the
+new bars complete. Stored states that are missing fields, come from an older
+version or another configuration must be refused, so the symbol is
+recomputed in full instead.
+
+An incremental load must leave a symbol with the same HISTORY_BARS dates a
+full load writes, trimmed in the transaction that appends the new bars. The
+table is an in-memory stand-in, so no database is needed.
+"""
+
+import os
+import sys
+import json
+import copy
+import logging
+from pathlib import Path
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+# PostgresDatabaseManager only validates that a password is configured; the
+# tests never connect.
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+
+from transforms.indicator_state import _to_json
+from transforms.transform_time_series_daily_adjusted import (
+    TimeSeriesDailyAdjustedTransformer, HISTORY_BARS, _TRIM_HISTORY
+)
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+def make_bars(bars=320, seed=17):
+    """Random-walk OHLCV for one symbol, with a flat (zero-range) bar and a volume gap."""
+    rng = np.random.default_rng(seed)
+    close = 40 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    df = pd.DataFrame({
+        'symbol_id': 7,
+        'symbol': 'SYM',
+        'date': pd.bdate_range('2023-01-02', periods=bars),
+        'open': close * (1 + rng.normal(0, 0.005, bars)),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'adjusted_close': close,
+        'volume': rng.lognormal(13, 0.6, bars).round(),
+    })
+    df.loc[250, ['high', 'low']] = df.loc[250, 'close']
+    df.loc[270, 'volume'] = 0.0
+    return df
+
+
+def make_transformer():
+    """Transformer with default parameters, no DB."""
+    logging.disable(logging.WARNING)
+    t = TimeSeriesDailyAdjustedTransformer.__new__(TimeSeriesDailyAdjustedTransformer)
+    t.config = {}
+    t._load_feature_params()
+    return t
+
+
+def stored(state):
+    """State as it comes back from the JSONB column."""
+    return json.loads(_to_json(state))
+
+
+class FakeDb:
+    """transforms.time_series_daily_adjusted and the state table, in memory."""
+
+    def __init__(self, rows, states):
+        self.rows = rows.set_index(['symbol_id', 'date'])
+        self.states = states
+        self.depth = 0
+        self.writes = []
+
+    @contextmanager
+    def transaction(self):
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+
+    def fetch_query(self, query, params=None):
+        return [(i, self.states[i]) for i in params[0] if i in self.states]
+
+    def execute_many(self, query, params):
+        self.writes.append(('states', self.depth))
+        for symbol_id, _, state in params:
+            self.states[symbol_id] = json.loads(state)
+
+    def execute_query(self, query, params=None):
+        assert query == _TRIM_HISTORY
+        self.writes.append(('trim', self.depth))
+        symbol_ids, keep = params
+        bar = self.rows.groupby(level='symbol_id').cumcount(ascending=False) + 1
+        trimmed = self.rows.index.get_level_values('symbol_id').isin(symbol_ids) & (bar > keep)
+        self.rows = self.rows[~trimmed]
+
+    def bulk_upsert_dataframe(self, table_name, df, conflict_cols, update_cols=None, mode='upsert', **kwargs):
+        self.writes.append((mode, self.depth))
+        df = df.set_index(conflict_cols)
+        if mode == 'update':
+            self.rows.update(df[update_cols])
+        else:
+            self.rows = pd.concat([self.rows[~self.rows.index.isin(df.index)], df]).sort_index()
+        return len(df)
+
+
+def assert_columns_match(expected, actual, columns):
+    for col in columns:
+        e = pd.to_numeric(expected[col], errors='coerce').to_numpy(dtype=float)
+        a = pd.to_numeric(actual[col], errors='coerce').to_numpy(dtype=float)
+        assert np.allclose(e, a, rtol=RTOL, atol=ATOL, equal_nan=True), col
+
+
+def test_advance_bar_by_bar_matches_full_recompute():
+    t = make_transformer()
+    engine = t.state_engine
+    raw = make_bars()
+    seed_bars = 200
+
+    seeded = t.build_features(raw.iloc[:seed_bars].copy())
+    state = stored(engine.seed(seeded, seeded))
+    assert engine.is_usable(state)
+
+    # Rows as the transforms table holds them: the seed computation, then one
+    # appended row and refreshed targets per incremental run
+    table = seeded.set_index('date')
+    for i in range(seed_bars, len(raw)):
+        new_rows, target_updates, new_state = engine.advance(state, raw.iloc[[i]])
+        assert len(new_rows) == 1 and new_rows['date'].iloc[0] == raw['date'].iloc[i]
+        table = pd.concat([table, new_rows.set_index('date')])
+        table.update(target_updates.set_index('date'))
+        state = stored(new_state)
+
+    full = t.build_features(raw.copy()).set_index('date')
+    feature_cols = [col for col in full.columns if col.startswith('ohlcv_')]
+    target_cols = [col for col in full.columns if col.startswith('target_')]
+    assert set(feature_cols) <= set(table.columns) and set(target_cols) <= set(table.columns)
+
+    appended = full.index[seed_bars:]
+    assert_columns_match(full.loc[appended], table.loc[appended], feature_cols)
+    # Targets of the last seed_bars rows were completed by the appended bars
+    refreshed = full.index[seed_bars - max(engine.target_horizons):]
+    assert_columns_match(full.loc[refreshed], table.loc[refreshed], target_cols)
+
+    assert state['last_date'] == raw['date'].iloc[-1].strftime('%Y-%m-%d')
+    assert state['bars'] == len(raw)
+    assert len(state['buffer']['close']) == engine.buffer_length
+
+
+def test_batch_advance_matches_bar_by_bar():
+    t = make_transformer()
+    engine = t.state_engine
+    raw = make_bars(seed=4)
+
+    seeded = t.build_features(raw.iloc[:240].copy())
+    state = stored(engine.seed(seeded, seeded))
+    batch_rows, _, batch_state = engine.advance(state, raw.iloc[240:])
+
+    rows = []
+    for i in range(240, len(raw)):
+        new_rows, _, state = engine.advance(stored(state), raw.iloc[[i]])
+        rows.append(new_rows)
+    single_rows = pd.concat(rows, ignore_index=True)
+
+    feature_cols = [col for col in batch_rows.columns if col.startswith('ohlcv_')]
+    assert_columns_match(batch_rows, single_rows, feature_cols)
+    assert stored(batch_state)['buffer'] == stored(state)['buffer']
+
+
+def test_unusable_states_are_refused():
+    t = make_transformer()
+    engine = t.state_engine
+    raw = make_bars()
+    seeded = t.build_features(raw.copy())
+    state = stored(engine.seed(seeded, seeded))
+
+    short = t.build_features(raw.iloc[:engine.min_bars - 1].copy())
+    assert engine.seed(short, short) is None
+    assert not engine.is_usable(None)
+
+    def broken(change):
+        bad = copy.deepcopy(state)
+        change(bad)
+        return bad
+
+    assert not engine.is_usable(broken(lambda s: s.update(version=0)))
+    assert not engine.is_usable(broken(lambda s: s.pop('version')))
+    for field in ('bars', 'ema', 'macd', 'rsi', 'atr', 'obv', 'ad', 'buffer', 'last_date'):
+        assert not engine.is_usable(broken(lambda s: s.pop(field))), field
+    assert not engine.is_usable(broken(lambda s: s['buffer'].pop('volume')))
+    assert not engine.is_usable(broken(lambda s: s['ema'].pop('55')))
+    assert not engine.is_usable(broken(lambda s: s['buffer'].update(close=s['buffer']['close'][:10])))
+    assert not engine.is_usable(broken(lambda s: s.update(macd=s['macd'][:2])))
+
+    # A state seeded under another configuration
+    t.config = {'rsi_periods': [7, 14, 21]}
+    t._load_feature_params()
+    assert not t.state_engine.is_usable(state)
+
+
+def test_incremental_load_keeps_full_mode_window():
+    t = make_transformer()
+    raw = make_bars(bars=HISTORY_BARS + 70, seed=9)
+    loaded, new = raw.iloc[:HISTORY_BARS + 30], raw.iloc[HISTORY_BARS + 30:]
+
+    # Full load of the first bars, as _replace_chunk writes it
+    t.fetch_histories = lambda symbol_ids: loaded.iloc[-HISTORY_BARS:].reset_index(drop=True)
+    rows, states = t.transform_chunk([{'symbol_id': 7, 'symbol': 'SYM'}])
+    t.db = FakeDb(rows, {i: stored(state) for i, state in states.items()})
+
+    t.fetch_new_bars = lambda states: {7: new.drop(columns=['symbol_id', 'symbol']).reset_index(drop=True)}
+    results, remaining = t._append_chunk_from_state([{'symbol_id': 7, 'symbol': 'SYM'}])
+    assert not remaining and results[0]['records_loaded'] == len(new)
+
+    # Same dates a full load run now would write, trimmed in the append's transaction
+    stored_dates = t.db.rows.loc[7].index
+    assert list(stored_dates) == list(raw['date'].iloc[-HISTORY_BARS:])
+    assert [write for write, _ in t.db.writes] == ['upsert', 'update', 'trim', 'states']
+    assert all(depth == 1 for _, depth in t.db.writes)
+    assert t.db.states[7]['last_date'] == raw['date'].iloc[-1].strftime('%Y-%m-%d')
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
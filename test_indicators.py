@@ -0,0 +1,171 @@
+"""Tolerance tests: native NumPy indicators (transforms/indicators.py) vs pandas_ta.
+
+Each indicator is compared with pandas_ta on a random-walk series, on a
+series with flat (zero-range) bars and a missing close, and on series around
+pandas_ta's minimum length, where both must return None together.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas_ta
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from transforms import indicators
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+def make_ohlcv(bars=300, seed=11, flat_bars=False, gap=False):
+    """Random-walk OHLCV with an index that does not start at 0."""
+    rng = np.random.default_rng(seed)
+    close = 40 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    df = pd.DataFrame({
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.lognormal(12, 0.5, bars).round(),
+    }, index=pd.RangeIndex(1000, 1000 + bars))
+    if flat_bars:
+        flat = df.index[[40, 41, 120]]
+        df.loc[flat, ['high', 'low']] = df.loc[flat, ['close', 'close']].to_numpy()
+        df.loc[df.index[60:65], 'close'] = df['close'].iloc[59]
+    if gap:
+        df.loc[df.index[150], 'close'] = np.nan
+    return df
+
+
+CASES = {
+    'random_walk': make_ohlcv(),
+    'flat_bars': make_ohlcv(seed=3, flat_bars=True),
+    'missing_close': make_ohlcv(seed=5, gap=True),
+}
+
+
+def assert_matches(name, expected, actual):
+    """Same shape, index and names as pandas_ta, values within tolerance."""
+    if expected is None:
+        assert actual is None, f"{name}: pandas_ta returned None, native did not"
+        return
+    assert actual is not None, f"{name}: native returned None, pandas_ta did not"
+    assert actual.index.equals(expected.index), f"{name}: index differs"
+    if isinstance(expected, pd.DataFrame):
+        assert actual.shape == expected.shape, f"{name}: shape {actual.shape} != {expected.shape}"
+        pairs = [(expected.iloc[:, i], actual.iloc[:, i]) for i in range(expected.shape[1])]
+        for exp_col, act_col in zip(expected.columns, actual.columns):
+            # pandas_ta 0.4 appends the upper multiplier to Bollinger names
+            assert exp_col.startswith(act_col), f"{name}: column {act_col} vs {exp_col}"
+    else:
+        assert actual.name == expected.name, f"{name}: name {actual.name} != {expected.name}"
+        pairs = [(expected, actual)]
+    for exp, act in pairs:
+        np.testing.assert_allclose(
+            act.to_numpy(dtype=float), exp.to_numpy(dtype=float),
+            rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=name,
+        )
+
+
+def check(indicator, columns, min_length, **params):
+    """Compare one indicator on every case and on lengths around its minimum."""
+    native = getattr(indicators, indicator)
+    reference = getattr(pandas_ta, indicator)
+    for case, df in CASES.items():
+        args = [df[col] for col in columns]
+        assert_matches(f"{indicator}[{case}]", reference(*args, **params), native(*args, **params))
+
+    df = CASES['random_walk']
+    for bars in (max(min_length - 1, 1), min_length, min_length + 1):
+        args = [df[col].iloc[:bars] for col in columns]
+        assert_matches(f"{indicator}[{bars} bars]", reference(*args, **params), native(*args, **params))
+
+
+def test_ema():
+    check('ema', ['close'], 10, length=10)
+
+
+def test_rma():
+    check('rma', ['close'], 14, length=14)
+
+
+def test_rsi():
+    for length in (7, 14):
+        check('rsi', ['close'], length + 1, length=length)
+
+
+def test_macd():
+    check('macd', ['close'], 34, fast=12, slow=26, signal=9)
+
+
+def test_roc():
+    for length in (10, 20):
+        check('roc', ['close'], length + 1, length=length)
+
+
+def test_willr():
+    check('willr', ['high', 'low', 'close'], 14, length=14)
+
+
+def test_atr():
+    for length in (10, 14):
+        check('atr', ['high', 'low', 'close'], length + 1, length=length)
+
+
+def test_bbands():
+    check('bbands', ['close'], 20, length=20, std=2.0)
+
+
+def test_obv():
+    check('obv', ['close', 'volume'], 1)
+
+
+def test_cmf():
+    check('cmf', ['high', 'low', 'close', 'volume'], 20, length=20)
+
+
+def test_ad():
+    check('ad', ['high', 'low', 'close', 'volume'], 1)
+
+
+def test_matrix_backends_agree():
+    """NumpyIndicators on a ragged panel equals pandas_ta applied per row."""
+    frames = [make_ohlcv(bars, seed) for seed, bars in enumerate((300, 120, 30, 12))]
+    width = max(len(f) for f in frames)
+    lengths = np.array([len(f) for f in frames])
+
+    def matrix(col):
+        out = np.full((len(frames), width), np.nan)
+        for row, f in enumerate(frames):
+            out[row, :len(f)] = f[col].to_numpy()
+        return out
+
+    high, low, close, volume = (matrix(col) for col in ('high', 'low', 'close', 'volume'))
+    native, reference = indicators.get_backend('numpy'), indicators.get_backend('pandas_ta')
+    calls = {
+        'rsi': ((close, 14), {}),
+        'macd': ((close, 12, 26, 9), {}),
+        'roc': ((close, 10), {}),
+        'willr': ((high, low, close, 14), {}),
+        'atr': ((high, low, close, 14), {}),
+        'bbands': ((close, 20, 2.0), {}),
+        'obv': ((close, volume), {}),
+        'cmf': ((high, low, close, volume, 20), {}),
+        'ad': ((high, low, close, volume), {}),
+    }
+    for name, (args, kwargs) in calls.items():
+        expected = getattr(reference, name)(*args, lengths=lengths, **kwargs)
+        actual = getattr(native, name)(*args, lengths=lengths, **kwargs)
+        if not isinstance(expected, tuple):
+            expected, actual = (expected,), (actual,)
+        for exp, act in zip(expected, actual):
+            np.testing.assert_allclose(act, exp, rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=name)
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
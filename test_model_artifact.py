@@ -0,0 +1,99 @@
+"""Tests for the model artifact (backtesting/model_artifact.py).
+
+An artifact must predict exactly what the trained classifier predicts, read
+only its manifest until the first prediction, and record the feature order,
+one-hot vocabularies, threshold and training data hash. Pickled models must
+still load, and convert to the same artifact.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.model_artifact import ModelArtifact, load_model, manifest_path
+from backtesting.trade_success_predictor import TradeSuccessPredictor
+from test_walk_forward import make_trades
+
+
+def make_trained(tmp):
+    """A predictor trained on synthetic trades read from a Parquet file in tmp."""
+    path = str(Path(tmp) / 'trades.parquet')
+    make_trades(n=2000).to_parquet(path)
+    predictor = TradeSuccessPredictor(params={'n_estimators': 30})
+    predictor.load_data_with_sector = lambda input_file=None, sync=True: pd.read_parquet(input_file)
+    X, y, feature_names = predictor.load_features(path)
+    predictor.feature_names = feature_names
+    predictor.model = predictor.make_classifier(n_jobs=1).fit(X, y)
+    return predictor, X, path
+
+
+def test_round_trip_is_lazy_and_exact():
+    with tempfile.TemporaryDirectory() as tmp:
+        predictor, X, input_file = make_trained(tmp)
+        path = str(Path(tmp) / 'model.ubj')
+        predictor.save_model(path, threshold=0.7)
+
+        model = load_model(path)
+        assert model._booster is None
+        manifest = json.loads(manifest_path(path).read_text())
+        assert manifest['feature_names'] == predictor.feature_names == model.feature_names
+        assert manifest['threshold'] == model.threshold == 0.7
+        assert manifest['training_data_hash'] == predictor.training_data_hash
+        assert manifest['params']['n_estimators'] == 30
+        assert model.vocabularies['sector'] == ['ENERGY', 'TECHNOLOGY', 'UNKNOWN']
+        assert model.vocabularies['strategy'] == ['ema_crossover', 'rsi_crossing', 'volume_spike']
+
+        expected = predictor.model.predict_proba(X)
+        assert np.allclose(model.predict_proba(X), expected, atol=1e-6)
+        assert model._booster is not None
+        shuffled = X[X.columns[::-1]]
+        assert np.allclose(model.predict_proba(shuffled), expected, atol=1e-6)
+
+        warmed = load_model(path).load_booster()
+        assert warmed._booster is not None
+        assert np.allclose(warmed.predict_proba(X), expected, atol=1e-6)
+
+        reloaded = TradeSuccessPredictor()
+        reloaded.load_model(path)
+        assert reloaded.feature_names == predictor.feature_names
+        assert np.allclose(reloaded.model.predict_proba(X), expected, atol=1e-6)
+
+
+def test_pickle_loads_and_converts():
+    with tempfile.TemporaryDirectory() as tmp:
+        predictor, X, _ = make_trained(tmp)
+        pickle_path = str(Path(tmp) / 'model.pkl')
+        predictor.save_model(pickle_path)
+
+        pickled = load_model(pickle_path)
+        assert pickled.feature_names == predictor.feature_names
+        expected = predictor.model.predict_proba(X)
+        assert np.allclose(pickled.predict_proba(X), expected, atol=1e-6)
+
+        converted = ModelArtifact(pickled.save(Path(tmp) / 'converted.ubj'))
+        assert converted.vocabularies == pickled.vocabularies
+        assert np.allclose(converted.predict_proba(X), expected, atol=1e-6)
+
+
+def test_rejects_wrong_width():
+    with tempfile.TemporaryDirectory() as tmp:
+        predictor, X, _ = make_trained(tmp)
+        path = str(Path(tmp) / 'model.ubj')
+        predictor.save_model(path)
+        try:
+            load_model(path).predict_proba(X.to_numpy()[:, 1:])
+        except ValueError:
+            return
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
@@ -0,0 +1,114 @@
+"""Tests for the Monte Carlo bootstrap (backtesting/monte_carlo.py).
+
+The point estimates must equal calculate_metrics (trades) and equity_metrics
+(daily equity). Each batched 2-D resample must equal the same resample drawn
+and scored one at a time, and the daily-block resamples must keep blocks of
+consecutive days together.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.backtest_strategies import StrategyBacktester
+from backtesting.monte_carlo import MonteCarloBootstrap, METRICS
+from backtesting.portfolio_simulator import equity_metrics
+
+
+def make_trades(n=300, seed=0):
+    """Random trades for two strategies, not in exit order."""
+    rng = np.random.default_rng(seed)
+    entry = pd.Timestamp('2021-01-04') + pd.to_timedelta(rng.integers(0, 700, n), 'D')
+    pnl = rng.normal(5, 60, n)
+    return pd.DataFrame({
+        'strategy': rng.choice(['alpha', 'beta'], n),
+        'entry_date': entry,
+        'exit_date': entry + pd.to_timedelta(rng.integers(1, 60, n), 'D'),
+        'holding_days': rng.integers(1, 60, n),
+        'pnl': pnl,
+        'pnl_pct': pnl / 20,
+        'commission': 2.0,
+    })
+
+
+def make_backtester(initial_capital):
+    return StrategyBacktester(initial_capital=initial_capital)
+
+
+def test_trade_estimates_match_calculate_metrics():
+    trades = make_trades()
+    ci_df = MonteCarloBootstrap(n_resamples=500, random_state=1).bootstrap_trades(trades, 100000)
+
+    for strategy_name, group in trades.groupby('strategy'):
+        metrics = make_backtester(100000).calculate_metrics(group.copy(), strategy_name)
+        estimates = ci_df[ci_df['strategy'] == strategy_name].set_index('metric')['estimate']
+        for name in METRICS:
+            assert np.isclose(estimates[name], metrics[name], rtol=1e-12), name
+
+    assert (ci_df['ci_lower'] <= ci_df['ci_upper']).all()
+    assert len(ci_df) == 2 * len(METRICS)
+
+
+def test_batched_resamples_match_one_at_a_time():
+    trades = make_trades(n=80, seed=3).assign(strategy='alpha').sort_values('exit_date')
+    pnl, pnl_pct = trades['pnl'].to_numpy(), trades['pnl_pct'].to_numpy()
+
+    bootstrap = MonteCarloBootstrap(n_resamples=50, random_state=7)
+    samples = bootstrap.resample_trades(pnl, pnl_pct, 100000)
+
+    # A single batch draws the whole (resamples, trades) index array at once
+    idx = np.random.default_rng(7).integers(0, len(pnl), (50, len(pnl)))
+    backtester = make_backtester(100000)
+    for i in range(0, 50, 7):
+        resample = pd.DataFrame({
+            'exit_date': np.arange(len(pnl)),  # keep the drawn order
+            'pnl': pnl[idx[i]],
+            'pnl_pct': pnl_pct[idx[i]],
+            'holding_days': 1,
+            'commission': 0.0,
+        })
+        metrics = backtester.calculate_metrics(resample, 'alpha')
+        for name in METRICS:
+            assert np.isclose(samples[name][i], metrics[name], rtol=1e-9), (i, name)
+
+    # Small batches still give n_resamples values
+    small = MonteCarloBootstrap(n_resamples=50, random_state=7, max_cells=200)
+    assert all(len(values) == 50 for values in small.resample_trades(pnl, pnl_pct, 100000).values())
+
+
+def test_equity_blocks():
+    rng = np.random.default_rng(2)
+    equity = 100000 * np.exp(np.cumsum(rng.normal(0.0004, 0.01, 400)))
+    dates = pd.bdate_range('2022-01-03', periods=400)
+    equity_df = pd.DataFrame({'strategy': 'alpha', 'date': dates, 'equity': equity})
+
+    ci_df = MonteCarloBootstrap(n_resamples=2000, random_state=3).bootstrap_equity(equity_df, 100000)
+    estimates = ci_df.set_index('metric')['estimate']
+    expected = equity_metrics(equity, 100000)
+    for name in ('sharpe_ratio', 'max_drawdown', 'total_return_pct'):
+        assert np.isclose(estimates[name], expected[name], rtol=1e-9), name
+
+    # One block as long as the series: every resample is a rotation, so the
+    # total return (a product of all daily returns) never changes
+    returns = np.concatenate([[100000], equity])
+    returns = returns[1:] / returns[:-1] - 1
+    rotations = MonteCarloBootstrap(n_resamples=100, block_days=400, random_state=4).resample_returns(returns)
+    assert np.allclose(rotations['total_return_pct'], expected['total_return_pct'], rtol=1e-9)
+    assert rotations['max_drawdown'].std() > 0
+
+
+def test_reproducible_with_seed():
+    trades = make_trades(seed=5)
+    first = MonteCarloBootstrap(n_resamples=300, random_state=11).bootstrap_trades(trades, 50000)
+    second = MonteCarloBootstrap(n_resamples=300, random_state=11).bootstrap_trades(trades, 50000)
+    pd.testing.assert_frame_equal(first, second)
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
@@ -0,0 +1,209 @@
+"""Tests for the local OHLCV cache (db/ohlcv_cache.py).
+
+A synced cache must hand back exactly the bars the SQL read would, per symbol
+and as a panel: same dtypes, sorted by (symbol_id, date), with inclusive date
+bounds and last-N cuts. Symbols split across fetchmany() chunks must still
+land whole in one record batch. An incremental sync must read only rows past
+each bucket's watermark and add one part per bucket; buckets past max_parts
+must be compacted and the old part files removed. Postgres is replaced by a
+fake named cursor over a synthetic table, so no database is needed.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from db.ohlcv_cache import PRICE_COLUMNS, OhlcvCache
+
+SOURCE_COLUMNS = ['symbol_id', 'symbol', 'date'] + PRICE_COLUMNS
+
+
+def make_bars(n_symbols=25, end='2024-06-28', days=(5, 120), seed=2):
+    """Daily bars of symbols with different histories, one of them a single row."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_symbols):
+        symbol_id = 1000 + 7 * i
+        n_days = 1 if i == 3 else int(rng.integers(*days))
+        dates = pd.bdate_range(end=end, periods=n_days)
+        close = 50 + rng.normal(0, 1, n_days).cumsum()
+        frames.append(pd.DataFrame({
+            'symbol_id': symbol_id,
+            'symbol': f"T{i:02d}",
+            'date': dates.date,
+            'open': close + rng.normal(0, 0.2, n_days),
+            'high': close + 1,
+            'low': close - 1,
+            'close': close,
+            'adjusted_close': close * 0.98,
+            'volume': rng.integers(1000, 100000, n_days),
+        }))
+    bars = pd.concat(frames, ignore_index=True)
+    bars.loc[bars.index[::13], 'open'] = np.nan
+    return bars
+
+
+class FakeCursor:
+    """Named cursor over a table of rows, applying the sync query's watermark join."""
+
+    def __init__(self, db):
+        self.db = db
+        self.description = [(col,) for col in SOURCE_COLUMNS]
+        self.rows = []
+
+    def execute(self, query, params=None):
+        df = self.db.table
+        if params:
+            buckets, watermarks, floor = params
+            limit = pd.to_datetime(pd.Series(watermarks, index=buckets))
+            bucket_limit = limit.reindex(df['symbol_id'] % len(buckets)).to_numpy()
+            dates = pd.to_datetime(df['date']).to_numpy()
+            df = df[(dates > bucket_limit) & (dates > np.datetime64(pd.Timestamp(floor)))]
+        df = df.sort_values(['symbol_id', 'date'], kind='stable')
+        self.rows = list(df[SOURCE_COLUMNS].itertuples(index=False, name=None))
+        self.db.queries.append(params)
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        self.db.chunks += bool(chunk)
+        return chunk
+
+    def close(self):
+        pass
+
+
+class FakeDb:
+    """Stand-in for a connected PostgresDatabaseManager reading table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.queries = []
+        self.chunks = 0
+        self.connection = self
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+def sql_read(bars, symbol_id=None):
+    """Bars as pd.read_sql gives them for a symbol (or all), sorted by (symbol_id, date)."""
+    df = bars if symbol_id is None else bars[bars['symbol_id'] == symbol_id]
+    df = df.sort_values(['symbol_id', 'date']).reset_index(drop=True)
+    df = df.assign(date=pd.to_datetime(df['date']), volume=df['volume'].astype(float))
+    return df[SOURCE_COLUMNS]
+
+
+def assert_matches(cache, bars):
+    for symbol_id in bars['symbol_id'].unique():
+        expected = sql_read(bars, symbol_id)
+        frame = cache.load_frame(symbol_id)
+        pd.testing.assert_frame_equal(frame, expected[['date'] + PRICE_COLUMNS])
+    pd.testing.assert_frame_equal(cache.load_panel(), sql_read(bars))
+
+
+def part_files(root):
+    return sorted(Path(root).glob('bucket=*/part-*.arrow'))
+
+
+def test_full_sync_matches_sql_read():
+    bars = make_bars()
+    with tempfile.TemporaryDirectory() as root:
+        cache = OhlcvCache(root, n_buckets=4, batch_rows=40)
+        db = FakeDb(bars)
+        assert cache.sync(db=db, fetch_size=37) == len(bars)
+        assert db.queries == [None] and db.chunks > 10
+
+        # Symbols cut by a fetchmany() chunk still sit whole in one batch
+        cache = OhlcvCache(root)
+        assert cache.n_buckets == 4 and cache.synced_at is not None
+        for symbol_id in bars['symbol_id'].unique():
+            slices = cache._slices(int(symbol_id))
+            assert len(slices) == 1 and slices[0].num_rows == (bars['symbol_id'] == symbol_id).sum()
+        assert_matches(cache, bars)
+
+        assert list(cache.symbol_ids()) == sorted(bars['symbol_id'].unique())
+        assert cache.symbol_id('T03') == 1021 and cache.symbol_id('NOPE') is None
+        arrays = cache.load_symbol(1021, columns=['close'])
+        assert list(arrays) == ['date', 'close'] and len(arrays['close']) == 1
+        assert arrays['date'].dtype == np.dtype('datetime64[s]')
+
+
+def test_incremental_sync_and_compaction():
+    bars = make_bars(end='2024-12-31', days=(150, 300))
+    cutoff = pd.Timestamp('2024-06-28').date()
+    with tempfile.TemporaryDirectory() as root:
+        cache = OhlcvCache(root, n_buckets=4, max_parts=2, batch_rows=40)
+        db = FakeDb(bars[bars['date'] <= cutoff])
+        cache.sync(db=db, fetch_size=50)
+        first_parts = {key: list(info['parts']) for key, info in cache.manifest['buckets'].items()}
+
+        # New bars: each bucket gains one part holding only the rows past its watermark
+        db.table = bars[bars['date'] <= pd.Timestamp('2024-09-30').date()]
+        added = len(db.table) - (bars['date'] <= cutoff).sum()
+        assert cache.sync(db=db, fetch_size=50) == added
+        assert db.queries[-1] is not None
+        for key, info in cache.manifest['buckets'].items():
+            assert info['parts'][:len(first_parts.get(key, []))] == first_parts.get(key, [])
+            assert len(info['parts']) == len(first_parts.get(key, [])) + 1
+            assert info['max_date'] == '2024-09-30'
+        assert_matches(OhlcvCache(root), db.table)
+
+        # A third part is past max_parts: every bucket is compacted to one
+        # part and the old files are removed
+        db.table = bars
+        cache.sync(db=db, fetch_size=50)
+        assert all(len(info['parts']) == 1 for info in cache.manifest['buckets'].values())
+        assert len(part_files(root)) == len(cache.manifest['buckets'])
+        assert_matches(OhlcvCache(root), bars)
+
+        # Nothing new: nothing written. A row behind the watermark needs a full sync
+        assert cache.sync(db=db) == 0
+        backfill = bars.iloc[[0]].assign(symbol_id=9999, symbol='LATE')
+        db.table = pd.concat([bars, backfill], ignore_index=True)
+        assert cache.sync(db=db) == 0 and cache.symbol_id('LATE') is None
+        assert cache.sync(db=db, full=True) == len(db.table)
+        assert cache.symbol_id('LATE') == 9999
+        assert_matches(OhlcvCache(root), db.table)
+
+
+def test_bounds_and_empty_reads():
+    bars = make_bars()
+    with tempfile.TemporaryDirectory() as root:
+        cache = OhlcvCache(root, n_buckets=4)
+        cache.sync(db=FakeDb(bars))
+        full = sql_read(bars)
+        start, end = pd.Timestamp('2024-05-01'), pd.Timestamp('2024-06-14')
+
+        panel = cache.load_panel(start=start, end=end, columns=['close'])
+        expected = full[(full['date'] >= start) & (full['date'] <= end)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(panel, expected[['symbol_id', 'symbol', 'date', 'close']])
+
+        panel = cache.load_panel([1007, 1000, 99], last=3, end=end)
+        expected = full[full['symbol_id'].isin([1000, 1007]) & (full['date'] <= end)]
+        expected = expected.groupby('symbol_id').tail(3).reset_index(drop=True)
+        pd.testing.assert_frame_equal(panel, expected)
+
+        frame = cache.load_frame(1000, start=start, last=5)
+        one = sql_read(bars, 1000)
+        expected = one[one['date'] >= start].tail(5).reset_index(drop=True)
+        pd.testing.assert_frame_equal(frame, expected[['date'] + PRICE_COLUMNS])
+
+        empty = cache.load_panel([99])
+        assert empty.empty and list(empty.columns) == SOURCE_COLUMNS
+        assert empty['symbol_id'].dtype == full['symbol_id'].dtype and empty['date'].dtype == full['date'].dtype
+        assert cache.load_panel(start='2030-01-01').empty
+        assert len(cache.load_symbol(99)['date']) == 0
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
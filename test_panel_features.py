@@ -0,0 +1,116 @@
+"""Equivalence tests: panel feature builder vs the per-symbol transformer path.
+
+TimeSeriesDailyAdjustedTransformer.build_features with feature_engine
+'panel' (transforms/panel_features.py) must produce the same feature and
+target columns as the 'legacy' per-symbol mask loops, row for row, on an
+unordered multi-symbol batch that includes short histories (below the
+MACD, RSI and ATR warm-ups), NaN gaps in close and volume, and a symbol with
+a single row. Columns the legacy path leaves out for a batch too short for
+an indicator must be all NaN in the panel output. No database is needed.
+"""
+
+import os
+import sys
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+# PostgresDatabaseManager only validates that a password is configured; the
+# tests never connect.
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+
+from transforms.transform_time_series_daily_adjusted import TimeSeriesDailyAdjustedTransformer
+
+RTOL = 1e-9
+ATOL = 1e-9
+
+# Bars per symbol: full windows, around the indicator warm-ups, and a single row
+LENGTHS = [250, 120, 45, 30, 15, 9, 2, 1]
+
+
+def make_batch(lengths=LENGTHS, seed=7):
+    """Random-walk OHLCV rows per symbol, shuffled like an unordered query result."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, bars in enumerate(lengths, start=1):
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+        spread = np.abs(rng.normal(0, 0.01, bars)) * close
+        frames.append(pd.DataFrame({
+            'symbol_id': i,
+            'symbol': f"SYM{i}",
+            'date': pd.bdate_range('2020-01-02', periods=bars),
+            'open': close * (1 + rng.normal(0, 0.005, bars)),
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'adjusted_close': close,
+            'volume': rng.lognormal(13, 0.6, bars).round(),
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def with_gaps(df):
+    """NaN closes and volumes inside the two longest histories."""
+    df = df.copy()
+    for symbol_id, positions in [(1, [60, 61, 200]), (2, [5, 90])]:
+        rows = df.index[df['symbol_id'] == symbol_id]
+        rows = df.loc[rows].sort_values('date').index[positions]
+        df.loc[rows[:-1], 'close'] = np.nan
+        df.loc[rows[-1], 'volume'] = np.nan
+    return df
+
+
+def transformer(engine):
+    """Transformer with default parameters and the given feature engine, no DB."""
+    logging.disable(logging.WARNING)
+    t = TimeSeriesDailyAdjustedTransformer.__new__(TimeSeriesDailyAdjustedTransformer)
+    t.config = {'feature_engine': engine}
+    t._load_feature_params()
+    return t
+
+
+def assert_panel_matches_legacy(df):
+    legacy = transformer('legacy').build_features(df.copy())
+    panel = transformer('panel').build_features(df.copy())
+    assert panel.index.equals(legacy.index)
+    assert (panel['symbol_id'] == legacy['symbol_id']).all() and (panel['date'] == legacy['date']).all()
+
+    # The legacy path adds an indicator's columns only when some symbol is
+    # long enough for it; the panel always adds them, all NaN in that case
+    feature_cols = [col for col in legacy.columns if col.startswith(('ohlcv_', 'target_'))]
+    extra = [col for col in panel.columns if col.startswith(('ohlcv_', 'target_')) and col not in feature_cols]
+    assert panel[extra].isna().all().all(), extra
+    for col in feature_cols:
+        expected = pd.to_numeric(legacy[col], errors='coerce').to_numpy(dtype=float)
+        actual = pd.to_numeric(panel[col], errors='coerce').to_numpy(dtype=float)
+        assert np.allclose(expected, actual, rtol=RTOL, atol=ATOL, equal_nan=True), col
+    return panel
+
+
+def test_panel_matches_legacy():
+    panel = assert_panel_matches_legacy(make_batch())
+    single = panel[panel['symbol_id'] == len(LENGTHS)]
+    assert len(single) == 1 and single[['ohlcv_sma_5', 'ohlcv_rsi_14', 'ohlcv_macd']].isna().all().all()
+
+
+def test_panel_matches_legacy_with_gaps():
+    df = with_gaps(make_batch(seed=3))
+    assert df['close'].isna().sum() == 3 and df['volume'].isna().sum() == 2
+    assert_panel_matches_legacy(df)
+
+
+def test_single_symbol_and_single_row():
+    batch = make_batch()
+    assert_panel_matches_legacy(batch[batch['symbol_id'] == 1])
+    assert_panel_matches_legacy(batch[batch['symbol_id'] == len(LENGTHS)])
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
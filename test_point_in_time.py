@@ -0,0 +1,109 @@
+"""Tests for the point-in-time join (backtesting/point_in_time.py).
+
+Each row must get the latest record with publication_date <= date <=
+valid_until_date, exactly as the old symbol cross join plus date filter chose
+it. Rows with no such record keep NaN. Rows come back in order with their
+index, and the key may be categorical on one side and str on the other.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.point_in_time import point_in_time_join
+
+
+def make_fundamentals(n_symbols=30, seed=0):
+    """Quarterly scores with gaps (some quarters missing) for n_symbols."""
+    rng = np.random.default_rng(seed)
+    quarters = pd.date_range('2019-03-31', '2024-12-31', freq='QE')
+    frames = []
+    for i in range(n_symbols):
+        kept = quarters[rng.random(len(quarters)) > 0.25]
+        frames.append(pd.DataFrame({
+            'symbol': f"SYM{i:03d}",
+            'fiscal_date_ending': kept,
+            'overall_quality_score': rng.uniform(0, 100, len(kept)),
+            'is_high_quality': rng.random(len(kept)) > 0.5,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_trades(n_trades=3000, n_symbols=35, seed=1):
+    """Trades for symbols with and without fundamentals, in random order."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range('2019-01-01', '2025-06-30', freq='D')
+    return pd.DataFrame({
+        'symbol': pd.Categorical([f"SYM{i:03d}" for i in rng.integers(0, n_symbols, n_trades)]),
+        'entry_date': days[rng.integers(0, len(days), n_trades)],
+        'pnl': rng.normal(0, 100, n_trades),
+    }, index=rng.permutation(n_trades) + 1000)
+
+
+def cross_join(trades, fundamentals, lag, window):
+    """The previous join: symbol cross join, date filter, latest fiscal_date_ending per trade."""
+    fund = fundamentals.copy()
+    fund['publication_date'] = fund['fiscal_date_ending'] + pd.Timedelta(days=lag)
+    fund['valid_until_date'] = fund['publication_date'] + pd.Timedelta(days=window)
+    merged = trades.assign(_id=trades.index, symbol=trades['symbol'].astype(str)).merge(fund, on='symbol')
+    merged = merged[(merged['publication_date'] <= merged['entry_date'])
+                    & (merged['entry_date'] <= merged['valid_until_date'])]
+    latest = merged.sort_values('fiscal_date_ending').drop_duplicates('_id', keep='last')
+    return latest.set_index('_id').reindex(trades.index)
+
+
+def test_matches_cross_join():
+    trades, fundamentals = make_trades(), make_fundamentals()
+    for lag, window in [(45, 90), (0, 30), (60, 365)]:
+        joined = point_in_time_join(trades, fundamentals, left_on='entry_date', right_on='fiscal_date_ending',
+                                    publication_lag_days=lag, validity_days=window)
+        expected = cross_join(trades, fundamentals, lag, window)
+
+        assert len(joined) == len(trades)
+        assert joined.index.equals(trades.index)
+        pd.testing.assert_frame_equal(joined[trades.columns], trades)
+        assert joined['overall_quality_score'].notna().sum() > 0
+        for col in ['fiscal_date_ending', 'publication_date', 'valid_until_date', 'overall_quality_score']:
+            pd.testing.assert_series_equal(joined[col], expected[col], check_names=False,
+                                           check_index=False, check_dtype=False)
+
+
+def test_never_joins_unpublished_data():
+    trades, fundamentals = make_trades(), make_fundamentals()
+    joined = point_in_time_join(trades, fundamentals, left_on='entry_date', right_on='fiscal_date_ending',
+                                publication_lag_days=45, validity_days=90)
+    matched = joined[joined['fiscal_date_ending'].notna()]
+    assert (matched['publication_date'] <= matched['entry_date']).all()
+    assert (matched['entry_date'] <= matched['valid_until_date']).all()
+    assert joined.loc[joined['symbol'].isin(['SYM030', 'SYM034']), 'overall_quality_score'].isna().all()
+
+
+def test_without_window_and_date_columns():
+    fundamentals = pd.DataFrame({
+        'symbol': ['A', 'A', 'B'],
+        'fiscal_date_ending': pd.to_datetime(['2024-03-31', '2024-06-30', '2024-03-31']),
+        'score': [1.0, 2.0, 3.0],
+    })
+    signals = pd.DataFrame({
+        'symbol': ['A', 'A', 'A', 'B', None],
+        'signal_date': ['2024-05-14', '2024-05-15', '2025-06-01', '2025-06-01', '2024-06-01'],
+        'score': [0.5] * 5,
+    })
+    joined = point_in_time_join(signals, fundamentals, left_on='signal_date', right_on='fiscal_date_ending',
+                                validity_days=None, date_columns=False)
+    assert list(joined.columns) == ['symbol', 'signal_date', 'score', 'score_pit']
+    assert np.allclose(joined['score_pit'], [np.nan, 1.0, 2.0, 3.0, np.nan], equal_nan=True)
+
+    limited = point_in_time_join(signals, fundamentals, left_on='signal_date', right_on='fiscal_date_ending',
+                                 date_columns=False)
+    assert np.allclose(limited['score_pit'], [np.nan, 1.0, np.nan, np.nan, np.nan], equal_nan=True)
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
@@ -0,0 +1,111 @@
+"""Tests for the shared-capital portfolio simulator (backtesting/portfolio_simulator.py).
+
+A small hand-worked account checks cash, mark-to-market and sizing day by
+day. Random universes check the account invariants: cash never goes negative,
+the position limit holds, and final equity equals capital plus the P&L of the
+trades taken. equity_metrics is checked against a plain pandas calculation.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.portfolio_simulator import PortfolioSimulator, equity_metrics
+
+
+def make_prices(closes, start='2021-01-04'):
+    """Long price frame from {symbol_id: [close per day]} (NaN = no bar that day)."""
+    dates = pd.bdate_range(start, periods=len(next(iter(closes.values()))))
+    frames = [
+        pd.DataFrame({'symbol_id': symbol_id, 'date': dates, 'close': values}).dropna()
+        for symbol_id, values in closes.items()
+    ]
+    return pd.concat(frames, ignore_index=True), dates
+
+
+def make_trades(rows, prices_df, dates):
+    """Candidate trades from (symbol_id, entry_day, exit_day) tuples."""
+    close = prices_df.set_index(['symbol_id', 'date'])['close']
+    return pd.DataFrame([{
+        'strategy': 'test',
+        'symbol': f'S{symbol_id}',
+        'symbol_id': symbol_id,
+        'entry_date': dates[entry],
+        'exit_date': dates[exit_],
+        'entry_price': close[(symbol_id, dates[entry])],
+        'exit_price': close[(symbol_id, dates[exit_])],
+    } for symbol_id, entry, exit_ in rows])
+
+
+def test_hand_worked_account():
+    """Cash, sizing from the previous close's equity and mark-to-market, day by day."""
+    prices, dates = make_prices({
+        1: [10.0, 11.0, 12.0, 12.0, 13.0],
+        2: [20.0, 20.0, 25.0, np.nan, 30.0],  # no bar on day 3: carried at 25
+    })
+    trades = make_trades([(1, 0, 2), (2, 1, 4), (1, 3, 4)], prices, dates)
+    simulator = PortfolioSimulator(initial_capital=1000, position_size=0.5, commission=0.0, max_positions=2)
+    equity_df, taken = simulator.simulate(trades, prices)
+
+    # day 0: buy 50 x S1 @10;                    cash 500, value 500
+    # day 1: buy 25 x S2 @20 (1000 * 0.5 / 20);  cash 0,   value 550 + 500
+    # day 2: sell S1 @12 (+600);                 cash 600, value 625
+    # day 3: 51 x S1 @12 (1225 * 0.5 / 12) costs 612 > 600 cash: skipped
+    # day 4: sell S2 @30 (+750);                 cash 1350
+    assert equity_df['cash'].tolist() == [500.0, 0.0, 600.0, 600.0, 1350.0]
+    assert equity_df['positions_value'].tolist() == [500.0, 1050.0, 625.0, 625.0, 0.0]
+    assert equity_df['open_positions'].tolist() == [1, 2, 1, 1, 0]
+    assert taken['shares'].tolist() == [50, 25]
+    assert taken['pnl'].tolist() == [100.0, 250.0]
+
+
+def test_position_limit_and_books_balance():
+    rng = np.random.default_rng(3)
+    n_symbols, n_days = 60, 300
+    closes = {i: 30 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days))) for i in range(1, n_symbols + 1)}
+    prices, dates = make_prices(closes)
+    entries = np.sort(rng.integers(0, n_days - 1, 800))
+    rows = [(int(rng.integers(1, n_symbols + 1)), int(e), int(min(e + rng.integers(0, 30), n_days - 1)))
+            for e in entries]
+    trades = make_trades(rows, prices, dates)
+
+    for max_positions in (1, 5, 25):
+        simulator = PortfolioSimulator(initial_capital=50000, position_size=0.1, commission=0.001,
+                                       max_positions=max_positions)
+        equity_df, taken = simulator.simulate(trades, prices)
+        assert (equity_df['cash'] >= -1e-6).all()
+        assert equity_df['open_positions'].max() <= max_positions
+        assert np.isclose(equity_df['equity'].iloc[-1], 50000 + taken['pnl'].sum(), rtol=1e-12)
+
+
+def test_empty_inputs():
+    prices, dates = make_prices({1: [10.0, 11.0]})
+    equity_df, taken = PortfolioSimulator().simulate(pd.DataFrame(), prices)
+    assert equity_df.empty and taken.empty
+
+
+def test_equity_metrics():
+    rng = np.random.default_rng(8)
+    equity = 1000 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, 500)))
+    metrics = equity_metrics(equity, initial_capital=1000)
+
+    curve = pd.Series(np.concatenate([[1000], equity]))
+    returns = curve.pct_change().dropna()
+    drawdown = curve / curve.cummax() - 1
+    assert np.isclose(metrics['sharpe_ratio'], returns.mean() / returns.std() * np.sqrt(252))
+    assert np.isclose(metrics['max_drawdown'], drawdown.min() * 100)
+    assert np.isclose(metrics['total_return_pct'], (equity[-1] / 1000 - 1) * 100)
+
+    underwater = (drawdown < 0).astype(int)
+    longest = underwater.groupby((underwater == 0).cumsum()).sum().max()
+    assert metrics['max_drawdown_days'] == longest
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
@@ -0,0 +1,112 @@
+"""Tests for the backtest result cache (backtesting/result_cache.py).
+
+Trades and metrics must round-trip through Parquet unchanged. The key must
+move with the signal snapshot and every parameter. backtest_all_strategies
+must only load and simulate strategies whose key is missing, and cached
+reports must match uncached ones. The backtester's signal queries are
+replaced by synthetic frames, so no database is needed.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.backtest_strategies import StrategyBacktester
+from backtesting.result_cache import BacktestResultCache
+from test_trade_simulator import make_signals
+
+
+def make_backtester(cache, signals_df, snapshots):
+    """A StrategyBacktester whose signal queries read from signals_df and snapshots."""
+    backtester = StrategyBacktester(result_cache=cache)
+    backtester.loaded = []
+
+    def get_signals(strategy=None, start_date=None, end_date=None, strategies=None):
+        names = strategies if strategies is not None else signals_df['trade_strategy'].unique()
+        backtester.loaded.append(sorted(names))
+        return signals_df[signals_df['trade_strategy'].isin(names)]
+
+    backtester.get_signals = get_signals
+    backtester.get_signal_snapshots = lambda strategy=None, start_date=None, end_date=None: snapshots
+    return backtester
+
+
+def make_strategy_signals():
+    frames = [make_signals(n_symbols=10, n_days=200, seed=seed).assign(trade_strategy=name)
+              for seed, name in enumerate(['alpha', 'beta', 'gamma'])]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as root:
+        cache = BacktestResultCache(root)
+        backtester = make_backtester(None, None, None)
+        trades = backtester.simulate_trades(make_signals(seed=2), 'alpha', 20)
+        metrics = backtester.calculate_metrics(trades, 'alpha')
+
+        assert cache.get('alpha', 'k1') is None
+        cache.put('alpha', 'k1', metrics, trades)
+        cached_metrics, cached_trades = cache.get('alpha', 'k1')
+        pd.testing.assert_frame_equal(cached_trades, trades, check_exact=True)
+        assert cached_metrics == metrics
+
+        cache.put('beta', 'k2', None, pd.DataFrame())
+        assert cache.get('beta', 'k2')[0] is None
+
+        cache.clear('alpha')
+        assert cache.get('alpha', 'k1') is None and cache.get('beta', 'k2') is not None
+
+
+def test_key_changes():
+    snapshot = {'max_processed_at': '2025-01-01 00:00:00+00:00', 'rows': 100}
+    params = {'cooldown_days': 60, 'position_size': 0.02}
+    key = BacktestResultCache.key('alpha', snapshot, params)
+
+    assert key == BacktestResultCache.key('alpha', dict(snapshot), dict(params))
+    assert key != BacktestResultCache.key('beta', snapshot, params)
+    assert key != BacktestResultCache.key('alpha', {**snapshot, 'rows': 101}, params)
+    assert key != BacktestResultCache.key('alpha', {**snapshot, 'max_processed_at': '2025-01-02'}, params)
+    assert key != BacktestResultCache.key('alpha', snapshot, {**params, 'cooldown_days': 20})
+
+
+def test_only_changed_strategies_rerun():
+    signals_df = make_strategy_signals()
+    snapshots = {name: {'max_processed_at': '2025-01-01', 'rows': int((signals_df['trade_strategy'] == name).sum())}
+                 for name in ['alpha', 'beta', 'gamma']}
+
+    expected_perf, expected_trades = make_backtester(None, signals_df, snapshots).backtest_all_strategies()
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = BacktestResultCache(root)
+
+        first = make_backtester(cache, signals_df, snapshots)
+        perf_1, trades_1 = first.backtest_all_strategies()
+        assert first.loaded == [['alpha', 'beta', 'gamma']]
+
+        second = make_backtester(cache, signals_df, snapshots)
+        perf_2, trades_2 = second.backtest_all_strategies()
+        assert second.loaded == []
+
+        snapshots['beta'] = {**snapshots['beta'], 'max_processed_at': '2025-02-01'}
+        third = make_backtester(cache, signals_df, snapshots)
+        perf_3, trades_3 = third.backtest_all_strategies()
+        assert third.loaded == [['beta']]
+
+        third.position_size = 0.05
+        third.loaded = []
+        third.backtest_all_strategies()
+        assert third.loaded == [['alpha', 'beta', 'gamma']]
+
+        for perf, trades in [(perf_1, trades_1), (perf_2, trades_2), (perf_3, trades_3)]:
+            pd.testing.assert_frame_equal(perf, expected_perf, check_exact=True)
+            pd.testing.assert_frame_equal(trades, expected_trades, check_exact=True)
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
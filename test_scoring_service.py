@@ -0,0 +1,162 @@
+"""Tests for the scoring service (backtesting/scoring_service.py).
+
+The service's feature matrix must equal the one the scorers built with
+pd.get_dummies and column-by-column alignment, including categories the
+model never saw, with gaps filled from the training medians. score() must give one row per request in order, with no
+score for requests without fundamentals, and must record metrics. The local
+endpoint must serve the same scores over TCP and a Unix socket. The feature
+store reads synthetic sources, so no database is needed.
+"""
+
+import sys
+import json
+import socket
+import tempfile
+import threading
+import http.client
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.scoring_service import ScoringService, make_server
+from test_feature_store import make_sources, make_store
+from test_model_artifact import make_trained
+
+STRATEGIES = ['ema_crossover', 'rsi_crossing', 'volume_spike', 'new_strategy']
+
+
+def legacy_features(df, encoder):
+    """The scorers' previous feature preparation, with gaps filled as the encoder fills them."""
+    feature_names = encoder.feature_names
+    X = df[encoder.numeric].copy()
+    for col in X.columns:
+        if X[col].isna().any():
+            X[col] = X[col].fillna(encoder.fill_values[col] if encoder.fill_values else X[col].median())
+    X = pd.concat([X, pd.get_dummies(df['sector'], prefix='sector', drop_first=False)], axis=1)
+    X = pd.concat([X, pd.get_dummies(df['strategy'], prefix='strategy', drop_first=False)], axis=1)
+    for feat in feature_names:
+        if feat not in X.columns:
+            X[feat] = 0
+    return X[feature_names].astype(np.float32)
+
+
+def make_service(tmp):
+    predictor, _, _ = make_trained(tmp)
+    model_path = str(Path(tmp) / 'model.ubj')
+    predictor.save_model(model_path, threshold=0.5)
+    store = make_store(Path(tmp) / 'store', make_sources(), in_memory=True)
+    store.sync(db=object())
+    return ScoringService(model_path, store=store), predictor
+
+
+def make_requests(n=500, seed=5):
+    """Requests for symbols with and without fundamentals, including an unseen strategy."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'symbol': [f"SYM{i:03d}" for i in rng.integers(0, 35, n)],
+        'date': pd.date_range('2020-01-01', '2024-12-31', freq='D')[rng.integers(0, 1800, n)],
+        'strategy': rng.choice(STRATEGIES, n),
+    })
+
+
+def test_features_match_get_dummies():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, _ = make_service(tmp)
+        requests = make_requests()
+        df = service.store.get_features(requests['symbol'], requests['date'])
+        df['strategy'] = requests['strategy']
+        df['sector'] = df['sector'].fillna('UNKNOWN')
+        df = df.dropna(subset=['overall_quality_score'])
+        df.loc[df.index[::7], 'is_growth_score'] = np.nan
+
+        X = service.build_features(df)
+        expected = legacy_features(df, service.encoder)
+        assert X.dtype == np.float32 and X.shape == expected.shape
+        assert np.allclose(X, expected.to_numpy())
+        strategy_columns = [i for i, name in enumerate(service.feature_names) if name.startswith('strategy_')]
+        assert X[:, strategy_columns].sum() < len(df)
+
+
+def test_score_batch_and_metrics():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, predictor = make_service(tmp)
+        requests = make_requests()
+        scores = service.score(requests)
+
+        assert len(scores) == len(requests)
+        assert list(scores['symbol']) == list(requests['symbol'])
+        has_fundamentals = service.store.get_features(requests['symbol'], requests['date'])['overall_quality_score'].notna()
+        assert scores['success_probability'].notna().equals(has_fundamentals)
+        assert 0 < has_fundamentals.sum() < len(requests)
+        assert (scores['take'] == (scores['success_probability'] >= 0.5)).all()
+
+        rows = requests[has_fundamentals.to_numpy()]
+        df = service.store.get_features(rows['symbol'], rows['date']).assign(strategy=rows['strategy'].to_numpy())
+        df['sector'] = df['sector'].fillna('UNKNOWN')
+        expected = predictor.model.predict_proba(legacy_features(df, service.encoder))
+        assert np.allclose(scores.loc[has_fundamentals.to_numpy(), 'success_probability'], expected[:, 1], atol=1e-6)
+
+        service.score(requests.head(10))
+        service.score([])
+        metrics = service.metrics()
+        assert metrics['batches'] == 3 and metrics['rows'] == len(requests) + 10
+        assert metrics['rows_scored'] == has_fundamentals.sum() + has_fundamentals.head(10).sum()
+        assert metrics['batch_size']['max'] == len(requests)
+        assert 0 < metrics['latency_ms']['p50'] <= metrics['latency_ms']['max']
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+
+def test_endpoint_tcp_and_unix_socket():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, _ = make_service(tmp)
+        requests = make_requests(n=50)
+        expected = service.score(requests)
+        body = json.dumps({'requests': [
+            {'symbol': r.symbol, 'date': r.date.strftime('%Y-%m-%d'), 'strategy': r.strategy}
+            for r in requests.itertuples()
+        ]})
+
+        for server, connect in [
+            (make_server(service, port=0), lambda s: http.client.HTTPConnection(*s.server_address)),
+            (make_server(service, unix_socket=str(Path(tmp) / 'score.sock')),
+             lambda s: UnixHTTPConnection(s.server_address)),
+        ]:
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                conn = connect(server)
+                conn.request('POST', '/score', body, {'Content-Type': 'application/json'})
+                scores = json.loads(conn.getresponse().read())['scores']
+                assert [s['symbol'] for s in scores] == list(requests['symbol'])
+                received = np.array([np.nan if s['success_probability'] is None else s['success_probability']
+                                     for s in scores])
+                assert np.allclose(received, expected['success_probability'], equal_nan=True)
+
+                conn.request('GET', '/metrics')
+                assert json.loads(conn.getresponse().read())['batches'] >= 2
+                conn.request('POST', '/score', 'not json')
+                response = conn.getresponse()
+                assert response.status == 400
+                assert 'error' in json.loads(response.read())
+                conn.close()
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
@@ -0,0 +1,83 @@
+"""Tests for the Parquet trade log (backtesting/trade_log.py).
+
+A trade log must read back the same trades as the CSV export, with typed
+columns, one row group per strategy, and column / symbol selection that gives
+the same rows for a trade log and a CSV. A failed write must leave no file.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.trade_log import TradeLogWriter, read_trades, write_trade_log
+from backtesting.trade_simulator import ArrayTradeSimulator
+from test_trade_simulator import make_signals
+
+
+def make_trades():
+    """Simulated trades for three strategies plus a score column."""
+    frames = [ArrayTradeSimulator().simulate(make_signals(seed=seed), name, cooldown_days=10)
+              for seed, name in enumerate(['alpha', 'beta', 'gamma'])]
+    trades = pd.concat(frames, ignore_index=True)
+    trades['success_probability'] = np.random.default_rng(0).random(len(trades))
+    return trades
+
+
+def test_round_trip_matches_csv():
+    trades = make_trades()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path, csv_path = Path(tmp) / 'trades.parquet', Path(tmp) / 'trades.csv'
+        assert write_trade_log(trades, log_path) == len(trades)
+        trades.to_csv(csv_path, index=False)
+
+        from_log, from_csv = read_trades(log_path), read_trades(csv_path)
+        assert pq.ParquetFile(log_path).num_row_groups == 3
+        assert isinstance(from_log['strategy'].dtype, pd.CategoricalDtype)
+        assert isinstance(from_log['symbol'].dtype, pd.CategoricalDtype)
+        assert from_log['holding_days'].dtype == np.int32
+        assert pd.api.types.is_datetime64_any_dtype(from_log['entry_date'])
+
+        expected = trades.astype({'strategy': 'category', 'symbol': 'category'})
+        pd.testing.assert_frame_equal(from_log, expected, check_dtype=False, check_categorical=False)
+        pd.testing.assert_frame_equal(from_csv, expected, check_dtype=False, check_categorical=False)
+
+
+def test_column_and_symbol_selection():
+    trades = make_trades()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path, csv_path = Path(tmp) / 'trades.parquet', Path(tmp) / 'trades.csv'
+        write_trade_log(trades, log_path)
+        trades.to_csv(csv_path, index=False)
+
+        columns = ['entry_date', 'exit_date', 'pnl']
+        for path in (log_path, csv_path):
+            subset = read_trades(path, columns=columns, symbols=['SYM003', 'SYM011'], strategies=['beta'])
+            expected = trades[trades['symbol'].isin(['SYM003', 'SYM011']) & (trades['strategy'] == 'beta')]
+            assert list(subset.columns) == columns
+            assert len(subset) == len(expected) > 0
+            assert np.allclose(subset['pnl'], expected['pnl'])
+
+
+def test_failed_write_leaves_no_file():
+    trades = make_trades()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'trades.parquet'
+        try:
+            with TradeLogWriter(path) as writer:
+                writer.write(trades[trades['strategy'] == 'alpha'])
+                raise RuntimeError('backtest failed')
+        except RuntimeError:
+            pass
+        assert list(Path(tmp).iterdir()) == []
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
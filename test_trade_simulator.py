@@ -0,0 +1,160 @@
+"""Regression tests: array trade simulator (backtesting/trade_simulator.py) vs the legacy iterrows loop.
+
+Both engines run on the same synthetic signal frames and must return the same
+trade list: same trades, same order, same values. The frames cover cooldown
+boundaries, rows with both flags, several rows per symbol and date, prices too
+high to buy a share, and positions still open at the end (with and without a
+row on the last date).
+
+The parameter sweep (StrategyBacktester.sweep_parameters) is checked against
+one backtest per parameter set, serially and through the process pool.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from backtesting.backtest_strategies import StrategyBacktester, parse_sweep
+
+
+def make_backtester(engine, **params):
+    """A StrategyBacktester without a database connection."""
+    return StrategyBacktester(engine=engine, **params)
+
+
+def make_signals(n_symbols=40, n_days=400, density=0.3, seed=0, duplicates=False):
+    """Random buy/sell signals on business days, shuffled like a query result."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2020-01-01', periods=n_days)
+    rows = []
+    for i in range(n_symbols):
+        days = np.sort(rng.choice(n_days, size=int(n_days * density), replace=duplicates))
+        buy = rng.random(len(days)) < 0.25
+        sell = rng.random(len(days)) < 0.25
+        close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+        if i % 7 == 0:
+            close[::5] = 5000.0  # too expensive for a single share
+        rows.append(pd.DataFrame({
+            'symbol': f'SYM{i:03d}',
+            'symbol_id': 1000 + i,
+            'date': dates[days],
+            'buy_signal': buy,
+            'sell_signal': sell,
+            'close': close,
+        }))
+    df = pd.concat(rows, ignore_index=True)
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def assert_same_trades(signals_df, cooldown_days, **params):
+    """Legacy and array engines produce identical trade lists."""
+    expected = make_backtester('legacy', **params).simulate_trades(signals_df, 'test', cooldown_days)
+    actual = make_backtester('array', **params).simulate_trades(signals_df, 'test', cooldown_days)
+    assert len(actual) == len(expected), f"{len(actual)} trades != {len(expected)}"
+    if expected.empty:
+        return
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_exact=True)
+
+
+def test_random_signals():
+    for seed in range(5):
+        signals = make_signals(seed=seed)
+        for cooldown_days in (0, 1, 20, 60):
+            assert_same_trades(signals, cooldown_days)
+
+
+def test_duplicate_rows_per_day():
+    signals = make_signals(n_symbols=15, n_days=120, density=0.9, seed=11, duplicates=True)
+    for cooldown_days in (0, 5, 60):
+        assert_same_trades(signals, cooldown_days)
+
+
+def test_position_parameters():
+    signals = make_signals(n_symbols=10, seed=3)
+    assert_same_trades(signals, 20, initial_capital=25000, position_size=0.1, commission=0.0025)
+
+
+def test_cooldown_boundary():
+    """A buy exactly cooldown_days after an exit is allowed; one day earlier is not."""
+    dates = pd.to_datetime(['2021-01-04', '2021-01-05', '2021-01-14', '2021-01-15', '2021-01-20'])
+    signals = pd.DataFrame({
+        'symbol': 'ABC',
+        'symbol_id': 1,
+        'date': dates,
+        'buy_signal': [True, False, True, True, False],
+        'sell_signal': [False, True, False, False, True],
+        'close': [10.0, 11.0, 12.0, 13.0, 14.0],
+    })
+    trades = make_backtester('array').simulate_trades(signals, 'test', cooldown_days=10)
+    assert trades['entry_date'].tolist() == [dates[0], dates[3]]
+    assert_same_trades(signals, 10)
+
+
+def test_open_positions_at_end():
+    """Leftover positions close on the last date, and are dropped without a row that day."""
+    signals = pd.DataFrame({
+        'symbol': ['AAA', 'BBB', 'AAA', 'CCC', 'BBB'],
+        'symbol_id': [1, 2, 1, 3, 2],
+        'date': pd.to_datetime(['2021-03-01', '2021-03-01', '2021-03-03', '2021-03-02', '2021-03-03']),
+        'buy_signal': [True, True, False, True, False],
+        'sell_signal': [False, False, False, False, False],
+        'close': [10.0, 20.0, 12.0, 30.0, 18.0],
+    })
+    trades = make_backtester('array').simulate_trades(signals, 'test', cooldown_days=60)
+    assert trades['symbol'].tolist() == ['AAA', 'BBB']
+    assert_same_trades(signals, 60)
+
+
+def test_no_trades():
+    signals = make_signals(n_symbols=3, seed=5)
+    signals['buy_signal'] = False
+    assert make_backtester('array').simulate_trades(signals, 'test').empty
+    assert_same_trades(signals, 60)
+
+
+def test_parse_sweep():
+    grid = parse_sweep(['cooldown_days=0,20,60', 'position_size=0.01,0.02'])
+    assert grid == {'cooldown_days': [0, 20, 60], 'position_size': [0.01, 0.02]}
+    for bad in (['foo=1'], ['cooldown_days'], ['cooldown_days=a'], ['commission=']):
+        try:
+            parse_sweep(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} should be rejected")
+
+
+def test_sweep_matches_single_backtests():
+    signals = pd.concat([
+        make_signals(n_symbols=8, seed=21).assign(trade_strategy='alpha'),
+        make_signals(n_symbols=8, seed=22).assign(trade_strategy='beta'),
+    ], ignore_index=True)
+    grid = {'cooldown_days': [0, 30], 'position_size': [0.01, 0.05]}
+
+    backtester = make_backtester('array', commission=0.002)
+    backtester.get_signals = lambda strategy=None, start_date=None, end_date=None: signals
+
+    serial = backtester.sweep_parameters(grid, workers=1)
+    pooled = backtester.sweep_parameters(grid, workers=2)
+    pd.testing.assert_frame_equal(serial, pooled)
+    assert len(serial) == 8
+
+    for row in serial.itertuples():
+        single = make_backtester('array', position_size=row.position_size, commission=0.002)
+        trades = single.simulate_trades(
+            signals[signals['trade_strategy'] == row.strategy], row.strategy, row.cooldown_days
+        )
+        expected = single.calculate_metrics(trades, row.strategy)
+        assert row.commission == 0.002
+        assert row.total_trades == expected['total_trades']
+        assert row.total_return == expected['total_return']
+
+
+if __name__ == '__main__':
+    from run_tests import run_module
+    sys.exit(run_module(globals()))
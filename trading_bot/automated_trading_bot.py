@@ -18,7 +18,7 @@ import sys
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import time
 
 import pandas as pd
@@ -89,6 +89,11 @@ class AutomatedTradingBot:
         logger.info(f"Lookback Days: {lookback_days}")
         logger.info("="*80)
     
+    def _ensure_connection(self):
+        """Connect once and reuse the connection across per-symbol checks."""
+        if not self.db.connection or self.db.connection.closed:
+            self.db.connect()
+    
     def get_current_positions(self) -> Dict[str, Dict]:
         """Get current positions as dictionary keyed by symbol."""
         positions = self.alpaca.get_positions()
@@ -114,7 +119,7 @@ class AutomatedTradingBot:
         
         # Check for sell signals
         try:
-            self.db.connect()
+            self._ensure_connection()
             query = """
                 SELECT sell_signal, trade_strategy
                 FROM transforms.trading_signals
@@ -125,7 +130,6 @@ class AutomatedTradingBot:
                 LIMIT 1
             """
             result = self.db.fetch_query(query, (symbol,))
-            self.db.close()
             
             if result:
                 return True, f"Sell signal detected ({result[0][1]})"
@@ -179,10 +183,14 @@ class AutomatedTradingBot:
         return exits_executed
     
     def validate_entry_conditions(self, symbol: str, current_price: float, 
-                                   signal_date: datetime) -> Tuple[bool, str]:
+                                   signal_date: datetime,
+                                   symbol_id: Optional[int] = None) -> Tuple[bool, str]:
         """
         Validate that entry conditions are still valid.
         
+        symbol_id (from the recommendations) keys the price lookup directly;
+        without it the id is resolved from the ticker first.
+        
         Returns:
             (is_valid, reason)
         """
@@ -194,18 +202,21 @@ class AutomatedTradingBot:
         # Check if price hasn't moved too much from signal date
         # This prevents buying if stock has already rallied significantly
         try:
-            self.db.connect()
+            self._ensure_connection()
+            if symbol_id is None:
+                found = self.db.fetch_query(
+                    "SELECT symbol_id_int FROM raw.time_series_daily_adjusted WHERE symbol = %s LIMIT 1",
+                    (symbol,)
+                )
+                symbol_id = found[0][0] if found else None
+            
             query = """
                 SELECT close
                 FROM raw.time_series_daily_adjusted
-                WHERE symbol_id::integer IN (
-                    SELECT symbol_id FROM raw.time_series_daily_adjusted 
-                    WHERE symbol = %s LIMIT 1
-                )
+                WHERE symbol_id_int = %s
                 AND date = %s
             """
-            result = self.db.fetch_query(query, (symbol, signal_date))
-            self.db.close()
+            result = self.db.fetch_query(query, (symbol_id, signal_date)) if symbol_id is not None else None
             
             if result:
                 signal_price = float(result[0][0])
@@ -275,7 +286,10 @@ class AutomatedTradingBot:
             
             # Validate entry conditions
             signal_date = pd.to_datetime(row['signal_date']).date()
-            is_valid, reason = self.validate_entry_conditions(symbol, current_price, signal_date)
+            symbol_id = int(row['symbol_id']) if pd.notna(row.get('symbol_id')) else None
+            is_valid, reason = self.validate_entry_conditions(
+                symbol, current_price, signal_date, symbol_id=symbol_id
+            )
             
             logger.info(f"\n{symbol}:")
             logger.info(f"  Strategy: {row['trade_strategy']}")
@@ -385,6 +399,7 @@ class AutomatedTradingBot:
         except Exception as e:
             logger.error(f"Error during execution: {e}", exc_info=True)
         finally:
+            self.db.close()
             logger.info("\n" + "="*80)
             logger.info("TRADING BOT EXECUTION COMPLETE")
             logger.info("="*80)
@@ -12,11 +12,9 @@ Output: Ranked list of buy recommendations for the next trading day
 
 import sys
 import os
-import pickle
 import logging
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List
 
 import pandas as pd
 import numpy as np
@@ -25,6 +23,8 @@ import numpy as np
 sys.path.append(str(Path(__file__).parent.parent))
 
 from db.postgres_database_manager import PostgresDatabaseManager
+from backtesting.feature_store import DEFAULT_SOURCES, FeatureStore
+from backtesting.scoring_service import ScoringService
 
 logger = logging.getLogger(__name__)
 
@@ -32,26 +32,26 @@ logger = logging.getLogger(__name__)
 class DailySignalScorer:
     """Score and rank trading signals for daily trading decisions."""
     
-    def __init__(self, model_path='models/trade_success_model.pkl', 
+    def __init__(self, model_path='models/trade_success_model.ubj', 
                  min_probability=0.80, min_quality_score=50):
         """
         Initialize scorer.
         
         Args:
-            model_path: Path to trained ML model
+            model_path: Trained model artifact (.ubj), or a pickled model
             min_probability: Minimum success probability (default: 80%)
             min_quality_score: Minimum fundamental quality score (default: 50)
         """
         self.db = PostgresDatabaseManager()
+        self.feature_store = FeatureStore()
         self.min_probability = min_probability
         self.min_quality_score = min_quality_score
         
-        # Load ML model
+        # Load ML model (the booster itself loads on the first prediction)
         logger.info(f"Loading ML model from {model_path}...")
-        with open(model_path, 'rb') as f:
-            model_data = pickle.load(f)
-        self.model = model_data['model']
-        self.feature_names = model_data['feature_names']
+        self.service = ScoringService(model_path, store=self.feature_store)
+        self.model = self.service.model
+        self.feature_names = self.service.feature_names
         logger.info(f"Model loaded successfully")
     
     def get_latest_signals(self, lookback_days=3) -> pd.DataFrame:
@@ -81,7 +81,7 @@ class DailySignalScorer:
                     r.volume
                 FROM transforms.trading_signals s
                 INNER JOIN raw.time_series_daily_adjusted r
-                    ON s.symbol_id = r.symbol_id::integer 
+                    ON s.symbol_id = r.symbol_id_int
                     AND s.date = r.date
                 WHERE s.buy_signal = TRUE
                     AND s.date >= %s
@@ -99,111 +99,6 @@ class DailySignalScorer:
         finally:
             self.db.close()
     
-    def get_fundamental_data(self, symbols: List[str]) -> pd.DataFrame:
-        """Get fundamental quality scores for symbols."""
-        try:
-            self.db.connect()
-            
-            # Get latest fundamental scores
-            query = """
-                SELECT DISTINCT ON (symbol)
-                    symbol,
-                    overall_quality_score,
-                    balance_sheet_quality_score,
-                    cash_flow_quality_score,
-                    income_statement_quality_score,
-                    bs_liquidity_score,
-                    bs_leverage_score,
-                    bs_asset_quality_score,
-                    cf_generation_score,
-                    cf_efficiency_score,
-                    cf_sustainability_score,
-                    is_profitability_score,
-                    is_margin_score,
-                    is_growth_score
-                FROM transforms.fundamental_quality_scores
-                WHERE symbol = ANY(%s)
-                ORDER BY symbol, fiscal_date_ending DESC
-            """
-            
-            df = pd.read_sql(query, self.db.connection, params=(symbols,))
-            logger.info(f"Fetched fundamental data for {len(df):,} symbols")
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error fetching fundamental data: {e}")
-            return pd.DataFrame()
-        finally:
-            self.db.close()
-    
-    def get_sector_data(self, symbols: List[str]) -> pd.DataFrame:
-        """Get sector information for symbols."""
-        try:
-            self.db.connect()
-            
-            query = """
-                SELECT symbol, sector
-                FROM raw.company_overview
-                WHERE symbol = ANY(%s)
-                    AND sector IS NOT NULL
-            """
-            
-            df = pd.read_sql(query, self.db.connection, params=(symbols,))
-            logger.info(f"Fetched sector data for {len(df):,} symbols")
-            
-            return df
-            
-        except Exception as e:
-            logger.error(f"Error fetching sector data: {e}")
-            return pd.DataFrame()
-        finally:
-            self.db.close()
-    
-    def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepare features for ML model prediction."""
-        # Numeric features
-        numeric_features = [
-            'overall_quality_score', 'balance_sheet_quality_score',
-            'cash_flow_quality_score', 'income_statement_quality_score',
-            'bs_liquidity_score', 'bs_leverage_score', 'bs_asset_quality_score',
-            'cf_generation_score', 'cf_efficiency_score', 'cf_sustainability_score',
-            'is_profitability_score', 'is_margin_score', 'is_growth_score'
-        ]
-        
-        # Filter to signals with fundamentals
-        df_filtered = df.dropna(subset=['overall_quality_score']).copy()
-        
-        if len(df_filtered) == 0:
-            logger.warning("No signals with fundamental data!")
-            return None
-        
-        # Create feature matrix
-        X = df_filtered[numeric_features].copy()
-        
-        # Fill missing values with median
-        for col in X.columns:
-            if X[col].isna().any():
-                X[col] = X[col].fillna(X[col].median())
-        
-        # One-hot encode sector
-        sector_dummies = pd.get_dummies(df_filtered['sector'], prefix='sector', drop_first=False)
-        X = pd.concat([X, sector_dummies], axis=1)
-        
-        # One-hot encode strategy
-        strategy_dummies = pd.get_dummies(df_filtered['trade_strategy'], prefix='strategy', drop_first=False)
-        X = pd.concat([X, strategy_dummies], axis=1)
-        
-        # Ensure all required features exist
-        for feat in self.feature_names:
-            if feat not in X.columns:
-                X[feat] = 0
-        
-        # Remove extra features and reorder
-        X = X[self.feature_names]
-        
-        return X, df_filtered
-    
     def score_signals(self, lookback_days=3) -> pd.DataFrame:
         """
         Score all recent signals and return ranked recommendations.
@@ -224,14 +119,13 @@ class DailySignalScorer:
         
         logger.info(f"Processing {len(signals_df):,} signals...")
         
-        # Get fundamental data
-        symbols = signals_df['symbol'].unique().tolist()
-        fundamentals_df = self.get_fundamental_data(symbols)
-        sector_df = self.get_sector_data(symbols)
-        
-        # Merge data
-        df = signals_df.merge(sector_df, on='symbol', how='left')
-        df = df.merge(fundamentals_df, on='symbol', how='left')
+        # Sector and the fundamentals published by each signal date, from the
+        # feature store (synced first so today's quarters are in it)
+        try:
+            self.feature_store.sync(DEFAULT_SOURCES)
+        except Exception as e:
+            logger.error(f"Error syncing feature store, using features from its last sync: {e}")
+        df = self.feature_store.join(signals_df, 'signal_date', sources=DEFAULT_SOURCES)
         df['sector'] = df['sector'].fillna('UNKNOWN')
         
         # Filter by minimum quality score
@@ -242,17 +136,10 @@ class DailySignalScorer:
             logger.warning("No signals passed quality filter!")
             return pd.DataFrame()
         
-        # Prepare features for prediction
-        X, df_filtered = self.prepare_features(df)
-        
-        if X is None or X.empty:
-            logger.warning("Could not prepare features!")
-            return pd.DataFrame()
-        
-        # Predict success probability
+        # Predict success probability (features built by the scoring service)
         logger.info("Predicting success probabilities...")
-        probabilities = self.model.predict_proba(X)[:, 1]
-        df_filtered['success_probability'] = probabilities
+        df['success_probability'] = self.service.score_frame(df, strategy_column='trade_strategy')
+        df_filtered = df.dropna(subset=['success_probability'])
         
         # Filter by minimum probability
         df_scored = df_filtered[df_filtered['success_probability'] >= self.min_probability].copy()
@@ -274,7 +161,7 @@ class DailySignalScorer:
         
         # Select key columns for output
         output_cols = [
-            'symbol', 'signal_date', 'trade_strategy', 'close',
+            'symbol', 'symbol_id', 'signal_date', 'trade_strategy', 'close',
             'success_probability', 'signal_strength', 'overall_quality_score',
             'composite_score', 'sector', 'volume'
         ]
@@ -45,15 +45,13 @@ except Exception as e:
 # Test 3: ML Model
 print("\n3. Testing ML Model...")
 try:
-    import pickle
-    model_path = 'models/trade_success_model.pkl'
-    with open(model_path, 'rb') as f:
-        model_data = pickle.load(f)
+    from backtesting.model_artifact import load_model
+    model = load_model('models/trade_success_model.ubj')
     print(f"   ✓ ML Model loaded")
-    print(f"   Features: {len(model_data['feature_names'])}")
+    print(f"   Features: {len(model.feature_names)}")
 except Exception as e:
     print(f"   ✗ FAILED: {e}")
-    print(f"   Run: python backtesting/trade_success_predictor.py")
+    print("   Run: python backtesting/trade_success_predictor.py --output models/trade_success_model.ubj")
     sys.exit(1)
 
 # Test 4: Signal Scorer
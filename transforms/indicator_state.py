@@ -0,0 +1,462 @@
+"""
+Carried-over indicator state for incremental time-series transforms.
+
+A full transform recomputes every indicator from the last 250 raw bars. This
+module captures, at the end of such a computation, everything needed to
+continue it bar by bar:
+
+- recursive values: adjusted-EWM numerators/denominators for the trend EMAs,
+  pandas_ta's fast/slow EMAs and signal line for MACD, Wilder (RMA) gain/loss
+  averages for each RSI period and the RMA of true range for each ATR period
+- running totals: OBV and the Accumulation/Distribution line
+- a rolling buffer of the last raw bars, enough for every rolling-window
+  feature (SMA, Bollinger Bands, Williams %R, ROC, CMF, volume averages) and
+  for the forward-return targets of the newest stored rows
+
+``IndicatorStateEngine.advance`` then produces feature rows for new bars only,
+identical (to floating-point noise) to recomputing the seed window extended by
+those bars, plus refreshed target columns for stored rows whose forward
+horizon the new bars complete.
+
+State is stored as JSONB in transforms.time_series_indicator_state, one row
+per symbol.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from transforms import indicators
+
+STATE_TABLE = 'transforms.time_series_indicator_state'
+
+STATE_VERSION = 1
+
+BUFFER_COLUMNS = ['close', 'high', 'low', 'volume']
+
+# Keys every stored state must carry to be advanced
+STATE_FIELDS = ['last_date', 'bars', 'ema', 'macd', 'rsi', 'atr', 'obv', 'ad', 'buffer']
+
+# Fixed windows used by the transformer regardless of configuration
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_LENGTH, BB_STD = 20, 2
+ROC_LENGTHS = (10, 20)
+WILLR_LENGTH = 14
+CMF_LENGTH = 20
+VOLUME_SMA_LENGTHS = (20, 50)
+
+
+def _non_zero_range(high, low):
+    """high - low, nudged by epsilon when any range is zero (as pandas_ta does)."""
+    diff = high - low
+    if np.any(diff == 0):
+        diff = diff + np.finfo(float).eps
+    return diff
+
+
+def _safe_ratio(numerator, denominator):
+    """numerator / denominator with +/-inf mapped to NaN, like transformer.safe_divide."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.asarray(numerator, dtype=float) / np.asarray(denominator, dtype=float)
+    result[np.isinf(result)] = np.nan
+    return result
+
+
+def _to_json(value):
+    """JSON text for a state dict; NaN (not valid JSON for Postgres) becomes null."""
+    def clean(item):
+        if isinstance(item, dict):
+            return {key: clean(val) for key, val in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [clean(val) for val in item]
+        if isinstance(item, (float, np.floating)):
+            return None if np.isnan(item) else float(item)
+        if isinstance(item, np.integer):
+            return int(item)
+        return item
+    return json.dumps(clean(value))
+
+
+def _from_json_array(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _from_json_number(value):
+    return np.nan if value is None else float(value)
+
+
+class IndicatorStateEngine:
+    """Seed and advance per-symbol indicator state.
+
+    Args mirror the transformer's configuration so both produce the same
+    feature columns.
+    """
+
+    def __init__(self, ma_periods, ema_periods, rsi_periods, atr_periods, target_horizons):
+        self.ma_periods = list(ma_periods)
+        self.ema_periods = list(ema_periods)
+        self.rsi_periods = list(rsi_periods)
+        self.atr_periods = list(atr_periods)
+        self.target_horizons = list(target_horizons)
+
+        # The 8/21 crossover always uses these spans, configured or not
+        self.ema_spans = sorted(set(self.ema_periods) | {8, 21})
+
+        self.buffer_length = max(
+            self.ma_periods + list(VOLUME_SMA_LENGTHS) + self.target_horizons
+            + [BB_LENGTH, WILLR_LENGTH, CMF_LENGTH, max(ROC_LENGTHS) + 1]
+        )
+
+        # Fewer bars than this and some indicators are still warming up (or
+        # pandas_ta returns nothing); such symbols are always fully recomputed.
+        self.min_bars = max(
+            self.buffer_length,
+            MACD_SLOW + MACD_SIGNAL - 1,
+            max(self.rsi_periods) + 1,
+            max(self.atr_periods) + 1,
+        ) + 1
+
+    def seed(self, raw_df, features_df):
+        """Capture state at the last bar of a full computation.
+
+        Args:
+            raw_df (pd.DataFrame): Raw bars the features were computed from,
+                ascending by date (close, high, low, volume, date)
+            features_df (pd.DataFrame): The transformer's output for raw_df
+
+        Returns:
+            dict: JSON-serializable state, or None when the history is too
+            short to continue incrementally
+        """
+        n = len(raw_df)
+        if n < self.min_bars:
+            return None
+
+        close = raw_df['close'].astype(float).reset_index(drop=True)
+        high = raw_df['high'].astype(float).reset_index(drop=True)
+        low = raw_df['low'].astype(float).reset_index(drop=True)
+
+        def last(col):
+            return pd.to_numeric(features_df[col], errors='coerce').iloc[-1]
+
+        ema = {}
+        for span in self.ema_spans:
+            decay = 1 - 2 / (span + 1)
+            den = (1 - decay ** n) / (1 - decay)
+            value = close.ewm(span=span).mean().iloc[-1]
+            ema[str(span)] = [value * den, den]
+
+        delta = close.diff()
+        rsi = {}
+        for period in self.rsi_periods:
+            gains = delta.clip(lower=0)
+            losses = delta.clip(upper=0)
+            rsi[str(period)] = [
+                indicators.rma(gains, length=period).iloc[-1],
+                indicators.rma(losses, length=period).iloc[-1],
+            ]
+
+        atr = {
+            str(period): indicators.atr(high, low, close, length=period).iloc[-1]
+            for period in self.atr_periods
+        }
+
+        tail = raw_df.iloc[-self.buffer_length:]
+        return {
+            'version': STATE_VERSION,
+            'last_date': pd.Timestamp(raw_df['date'].iloc[-1]).strftime('%Y-%m-%d'),
+            'bars': n,
+            'ema': ema,
+            'macd': [
+                indicators.ema(close, length=MACD_FAST).iloc[-1],
+                indicators.ema(close, length=MACD_SLOW).iloc[-1],
+                last('ohlcv_macd_signal'),
+            ],
+            'rsi': rsi,
+            'atr': atr,
+            'obv': last('ohlcv_obv'),
+            'ad': last('ohlcv_ad'),
+            'buffer': {
+                'date': [pd.Timestamp(d).strftime('%Y-%m-%d') for d in tail['date']],
+                **{col: tail[col].astype(float).tolist() for col in BUFFER_COLUMNS},
+            },
+        }
+
+    def is_usable(self, state):
+        """Whether a stored state can be advanced by this configuration.
+
+        States missing a field, from another STATE_VERSION or seeded under
+        other periods are not; their symbols are recomputed in full.
+        """
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            return False
+        if any(key not in state for key in STATE_FIELDS):
+            return False
+        buffer = state['buffer']
+        if not isinstance(buffer, dict) or any(col not in buffer for col in ['date'] + BUFFER_COLUMNS):
+            return False
+        return (
+            (state['bars'] or 0) >= self.min_bars
+            and set(state['ema'] or {}) == {str(s) for s in self.ema_spans}
+            and set(state['rsi'] or {}) == {str(p) for p in self.rsi_periods}
+            and set(state['atr'] or {}) == {str(p) for p in self.atr_periods}
+            and len(state['macd'] or []) == 3
+            and all(len(buffer[col]) >= self.buffer_length for col in ['date'] + BUFFER_COLUMNS)
+        )
+
+    def advance(self, state, new_df):
+        """Compute features for new bars and roll the state forward.
+
+        Args:
+            state (dict): State from seed() or a previous advance()
+            new_df (pd.DataFrame): Raw bars strictly after state['last_date'],
+                ascending by date
+
+        Returns:
+            tuple: (features_df, target_updates_df, new_state) where
+            features_df has one row per new bar and target_updates_df holds
+            refreshed target columns for already-stored bars
+        """
+        n_new = len(new_df)
+        buffer = state['buffer']
+        n_old = len(buffer['close'])
+
+        dates = pd.to_datetime(list(buffer['date']) + list(new_df['date']))
+        close = np.concatenate([_from_json_array(buffer['close']), new_df['close'].to_numpy(dtype=float)])
+        high = np.concatenate([_from_json_array(buffer['high']), new_df['high'].to_numpy(dtype=float)])
+        low = np.concatenate([_from_json_array(buffer['low']), new_df['low'].to_numpy(dtype=float)])
+        volume = np.concatenate([_from_json_array(buffer['volume']), new_df['volume'].to_numpy(dtype=float)])
+        new = slice(n_old, n_old + n_new)
+
+        out = {'date': dates[new]}
+        new_close = close[new]
+        prev_close = close[n_old - 1:n_old + n_new - 1]
+
+        # Trend: SMAs from the buffer, adjusted EMAs from carried numerator/denominator
+        close_s = pd.Series(close)
+        for period in self.ma_periods:
+            sma = close_s.rolling(period).mean().to_numpy()[new]
+            out[f'ohlcv_sma_{period}'] = sma
+            out[f'ohlcv_sma_{period}_ratio'] = _safe_ratio(new_close, sma)
+
+        ema_state = {}
+        ema_values = {}
+        for span in self.ema_spans:
+            decay = 1 - 2 / (span + 1)
+            num, den = map(_from_json_number, state['ema'][str(span)])
+            values = np.empty(n_new)
+            for i, x in enumerate(new_close):
+                num = x + decay * num
+                den = 1 + decay * den
+                values[i] = num / den
+            ema_state[str(span)] = [num, den]
+            ema_values[span] = values
+
+        for period in self.ema_periods:
+            out[f'ohlcv_ema_{period}'] = ema_values[period]
+            out[f'ohlcv_ema_{period}_ratio'] = _safe_ratio(new_close, ema_values[period])
+        out['ohlcv_ema_8_21_cross'] = (
+            np.nan_to_num(ema_values[8]) > np.nan_to_num(ema_values[21])
+        ).astype(int)
+        out['ohlcv_ema_8_21_ratio'] = _safe_ratio(ema_values[8], ema_values[21])
+
+        # Momentum: Wilder-smoothed RSI, MACD from carried EMAs, ROC and %R from the buffer
+        delta = new_close - prev_close
+        rsi_state = {}
+        for period in self.rsi_periods:
+            alpha = 1 / period
+            gain_avg, loss_avg = map(_from_json_number, state['rsi'][str(period)])
+            values = np.empty(n_new)
+            for i, d in enumerate(delta):
+                gain_avg = alpha * max(d, 0.0) + (1 - alpha) * gain_avg
+                loss_avg = alpha * min(d, 0.0) + (1 - alpha) * loss_avg
+                values[i] = 100 * gain_avg / (gain_avg + abs(loss_avg))
+            rsi_state[str(period)] = [gain_avg, loss_avg]
+            out[f'ohlcv_rsi_{period}'] = values
+            out[f'ohlcv_rsi_{period}_oversold'] = (np.nan_to_num(values, nan=50) < 30).astype(int)
+            out[f'ohlcv_rsi_{period}_overbought'] = (np.nan_to_num(values, nan=50) > 70).astype(int)
+
+        fast, slow, signal = map(_from_json_number, state['macd'])
+        fast_alpha = 2 / (MACD_FAST + 1)
+        slow_alpha = 2 / (MACD_SLOW + 1)
+        signal_alpha = 2 / (MACD_SIGNAL + 1)
+        macd = np.empty(n_new)
+        macd_signal = np.empty(n_new)
+        for i, x in enumerate(new_close):
+            fast = fast_alpha * x + (1 - fast_alpha) * fast
+            slow = slow_alpha * x + (1 - slow_alpha) * slow
+            macd[i] = fast - slow
+            signal = signal_alpha * macd[i] + (1 - signal_alpha) * signal
+            macd_signal[i] = signal
+        out['ohlcv_macd'] = macd
+        out['ohlcv_macd_signal'] = macd_signal
+        out['ohlcv_macd_histogram'] = macd - macd_signal
+        out['ohlcv_macd_bullish'] = (np.nan_to_num(macd) > np.nan_to_num(macd_signal)).astype(int)
+
+        for length in ROC_LENGTHS:
+            base = close[n_old - length:n_old + n_new - length]
+            out[f'ohlcv_roc_{length}'] = 100 * (new_close - base) / base
+
+        lowest = pd.Series(low).rolling(WILLR_LENGTH).min().to_numpy()[new]
+        highest = pd.Series(high).rolling(WILLR_LENGTH).max().to_numpy()[new]
+        out['ohlcv_willr_14'] = 100 * ((new_close - lowest) / (highest - lowest) - 1)
+
+        # Volatility: ATR from carried RMA of true range, Bollinger Bands from the buffer
+        true_range = np.nanmax(np.abs(np.vstack([
+            _non_zero_range(high[new], low[new]),
+            high[new] - prev_close,
+            prev_close - low[new],
+        ])), axis=0)
+        atr_state = {}
+        for period in self.atr_periods:
+            alpha = 1 / period
+            value = _from_json_number(state['atr'][str(period)])
+            values = np.empty(n_new)
+            for i, tr in enumerate(true_range):
+                value = alpha * tr + (1 - alpha) * value
+                values[i] = value
+            atr_state[str(period)] = value
+            out[f'ohlcv_atr_{period}'] = values
+            out[f'ohlcv_atr_{period}_pct'] = _safe_ratio(values, new_close) * 100
+
+        mid = close_s.rolling(BB_LENGTH).mean().to_numpy()[new]
+        std = close_s.rolling(BB_LENGTH).std().to_numpy()[new]
+        upper = mid + BB_STD * std
+        lower = mid - BB_STD * std
+        out['ohlcv_bb_upper'] = upper
+        out['ohlcv_bb_middle'] = mid
+        out['ohlcv_bb_lower'] = lower
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out['ohlcv_bb_width'] = (upper - lower) / mid
+            out['ohlcv_bb_position'] = (new_close - lower) / (upper - lower)
+
+        # Volume: running OBV/AD totals, CMF and volume averages from the buffer
+        direction = np.sign(delta)
+        obv = _from_json_number(state['obv']) + np.cumsum(direction * volume[new])
+        money_flow = (2 * close - (high + low)) * volume / _non_zero_range(high, low)
+        ad = _from_json_number(state['ad']) + np.cumsum(money_flow[new])
+        out['ohlcv_obv'] = obv
+        out['ohlcv_cmf'] = (
+            pd.Series(money_flow).rolling(CMF_LENGTH).sum().to_numpy()[new]
+            / pd.Series(volume).rolling(CMF_LENGTH).sum().to_numpy()[new]
+        )
+        out['ohlcv_ad'] = ad
+
+        volume_s = pd.Series(volume)
+        for length in VOLUME_SMA_LENGTHS:
+            out[f'ohlcv_volume_sma_{length}'] = volume_s.rolling(length).mean().to_numpy()[new]
+        out['ohlcv_volume_ratio'] = _safe_ratio(volume[new], out['ohlcv_volume_sma_20'])
+
+        # Targets for new bars, and for stored bars whose horizon now reaches new bars
+        targets = self._targets(close)
+        features_df = pd.DataFrame(out)
+        for col, values in targets.items():
+            features_df[col] = values[new]
+
+        refresh = slice(max(0, n_old - max(self.target_horizons)), n_old)
+        target_updates_df = pd.DataFrame({'date': dates[refresh]})
+        for col, values in targets.items():
+            target_updates_df[col] = values[refresh]
+
+        keep = slice(n_old + n_new - self.buffer_length, n_old + n_new)
+        new_state = {
+            'version': STATE_VERSION,
+            'last_date': dates[-1].strftime('%Y-%m-%d'),
+            'bars': state['bars'] + n_new,
+            'ema': ema_state,
+            'macd': [fast, slow, signal],
+            'rsi': rsi_state,
+            'atr': atr_state,
+            'obv': float(obv[-1]),
+            'ad': float(ad[-1]),
+            'buffer': {
+                'date': [d.strftime('%Y-%m-%d') for d in dates[keep]],
+                'close': close[keep].tolist(),
+                'high': high[keep].tolist(),
+                'low': low[keep].tolist(),
+                'volume': volume[keep].tolist(),
+            },
+        }
+        return features_df, target_updates_df, new_state
+
+    def _targets(self, close):
+        """Forward-return targets over a close array (same rules as create_target_variables)."""
+        targets = {}
+        n = len(close)
+        for horizon in self.target_horizons:
+            future = np.full(n, np.nan)
+            future[:n - horizon] = close[horizon:]
+            pct_return = _safe_ratio(future - close, close)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = future / close
+                ratio[np.isinf(ratio)] = 1
+                log_return = np.log(ratio)
+
+            ternary = pd.array(np.full(n, pd.NA), dtype='Int64')
+            present = ~np.isnan(pct_return)
+            ternary[present] = np.where(
+                pct_return[present] <= -0.02, 0, np.where(pct_return[present] <= 0.02, 1, 2)
+            )
+
+            targets[f'target_return_{horizon}d'] = pct_return
+            targets[f'target_log_return_{horizon}d'] = log_return
+            targets[f'target_direction_{horizon}d'] = (np.nan_to_num(pct_return) > 0).astype(int)
+            targets[f'target_ternary_{horizon}d'] = ternary
+        return targets
+
+
+def load_states(db, symbol_ids):
+    """Stored states for the given symbols, keyed by symbol_id."""
+    rows = db.fetch_query(
+        f"SELECT symbol_id, state FROM {STATE_TABLE} WHERE symbol_id = ANY(%s)",
+        (list(symbol_ids),),
+    )
+    return {symbol_id: state for symbol_id, state in rows}
+
+
+_UPSERT_STATE = f"""
+    INSERT INTO {STATE_TABLE} (symbol_id, last_date, state, updated_at)
+    VALUES (%s, %s, %s::jsonb, CURRENT_TIMESTAMP)
+    ON CONFLICT (symbol_id) DO UPDATE SET
+        last_date = EXCLUDED.last_date,
+        state = EXCLUDED.state,
+        updated_at = EXCLUDED.updated_at
+"""
+
+
+def save_state(db, symbol_id, state):
+    """Insert or replace one symbol's state."""
+    db.execute_query(_UPSERT_STATE, (symbol_id, state['last_date'], _to_json(state)))
+
+
+def save_states(db, states):
+    """Insert or replace several states ({symbol_id: state}) in one call."""
+    if states:
+        db.execute_many(_UPSERT_STATE, [
+            (int(symbol_id), state['last_date'], _to_json(state)) for symbol_id, state in states.items()
+        ])
+
+
+def delete_state(db, symbol_id):
+    """Forget a symbol's state (its next incremental run recomputes in full)."""
+    db.execute_query(f"DELETE FROM {STATE_TABLE} WHERE symbol_id = %s", (symbol_id,))
+
+
+def delete_states(db, symbol_ids):
+    """Forget several symbols' states."""
+    symbol_ids = [int(symbol_id) for symbol_id in symbol_ids]
+    if symbol_ids:
+        db.execute_query(f"DELETE FROM {STATE_TABLE} WHERE symbol_id = ANY(%s)", (symbol_ids,))
+
+
+def create_state_table(db):
+    """Create the state table if it doesn't exist."""
+    db.execute_query(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            symbol_id INTEGER PRIMARY KEY,
+            last_date DATE NOT NULL,
+            state JSONB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
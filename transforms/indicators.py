@@ -0,0 +1,468 @@
+"""
+Native NumPy technical indicators, numerically matching pandas_ta.
+
+Two layers share the same kernels:
+
+- Per-series functions (rsi, macd, roc, willr, atr, bbands, obv, cmf, ad,
+  plus the ema/rma they build on) are drop-in replacements for the pandas_ta
+  calls: same arguments, same result names and index, and None when the
+  series is shorter than pandas_ta's minimum length.
+- Matrix backends compute an indicator for many symbols at once over a
+  (symbols x bars) matrix, right-padded with NaN. NumpyIndicators does this
+  with the vectorized kernels below; PandasTaIndicators calls pandas_ta per
+  row and exists to cross-check and fall back. Select one with get_backend().
+
+The definitions follow pandas_ta's pure-pandas path (no TA-Lib): SMA-seeded
+EMAs for MACD and ATR, Wilder smoothing (RMA) for RSI and ATR, the
+epsilon-nudged high-low range, and pandas_ta's minimum-length rules. Bollinger
+Bands use the sample standard deviation (ddof=1) as pandas_ta 0.4 does; pass
+ddof=0 for the 0.3.x behaviour.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+BACKENDS = ('numpy', 'pandas_ta')
+
+
+# ---------------------------------------------------------------------------
+# Kernels: operate along axis 1 of a (groups x bars) matrix
+# ---------------------------------------------------------------------------
+
+def _windows(x, window):
+    """Trailing windows, NaN before the first full window."""
+    padded = np.concatenate([np.full((x.shape[0], window - 1), np.nan), x], axis=1)
+    return sliding_window_view(padded, window, axis=1)
+
+
+def rolling_mean(x, window):
+    """rolling(window).mean(): NaN unless all window values are present."""
+    return _windows(x, window).mean(axis=-1)
+
+
+def rolling_sum(x, window):
+    """rolling(window).sum()."""
+    return _windows(x, window).sum(axis=-1)
+
+
+def rolling_std(x, window, ddof=1):
+    """rolling(window).std(ddof)."""
+    return _windows(x, window).std(axis=-1, ddof=ddof)
+
+
+def rolling_min(x, window):
+    """rolling(window).min()."""
+    return _windows(x, window).min(axis=-1)
+
+
+def rolling_max(x, window):
+    """rolling(window).max()."""
+    return _windows(x, window).max(axis=-1)
+
+
+def shift(x, periods):
+    """Series.shift(periods) per row; negative periods look ahead."""
+    out = np.full_like(x, np.nan)
+    if periods > 0:
+        out[:, periods:] = x[:, :-periods]
+    elif periods < 0:
+        out[:, :periods] = x[:, -periods:]
+    else:
+        out[:] = x
+    return out
+
+
+def ewm_mean(x, alpha, adjust=True):
+    """Series.ewm(alpha=alpha, adjust=adjust).mean() per row.
+
+    Same recurrence as pandas (ignore_na=False, min_periods=0): output starts
+    at the first observation, missing values decay the old weight and carry
+    the previous mean forward.
+
+    Few long rows (a single series, a handful of symbols) go through pandas'
+    compiled recursion column by column; many rows step over bars with every
+    row updated together, which is faster once rows outnumber bars.
+    """
+    n_groups, width = x.shape
+    if 0 < n_groups < width:
+        return pd.DataFrame(x.T).ewm(alpha=alpha, adjust=adjust).mean().to_numpy().T
+
+    out = np.full((n_groups, width), np.nan)
+    if width == 0:
+        return out
+
+    factor = 1 - alpha
+    new_weight = 1.0 if adjust else alpha
+    weighted = x[:, 0].copy()
+    old_weight = np.ones(n_groups)
+    out[:, 0] = weighted
+
+    for i in range(1, width):
+        cur = x[:, i]
+        observed = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+
+        old_weight = np.where(started, old_weight * factor, old_weight)
+        update = started & observed
+        with np.errstate(invalid='ignore'):
+            blended = (old_weight * weighted + new_weight * cur) / (old_weight + new_weight)
+        weighted = np.where(update & (weighted != cur), blended, weighted)
+        if adjust:
+            old_weight = np.where(update, old_weight + new_weight, old_weight)
+        else:
+            old_weight = np.where(update, 1.0, old_weight)
+
+        weighted = np.where(~started & observed, cur, weighted)
+        out[:, i] = weighted
+    return out
+
+
+def sma_seeded(x, length, start=None):
+    """Input to pandas_ta's SMA-seeded EMA/RMA: NaN before the seed bar and the
+    mean of the first ``length`` values at it.
+
+    Args:
+        x: (groups x bars) values
+        length: Seed window
+        start: Per-group bar where the series begins (default 0), e.g. the
+            first valid MACD value for the signal line
+    """
+    n_groups, width = x.shape
+    start = np.zeros(n_groups, dtype=int) if start is None else start
+    bars = np.arange(width)[None, :]
+    seed_bar = start[:, None] + length - 1
+
+    in_seed = (bars >= start[:, None]) & (bars <= seed_bar)
+    with np.errstate(invalid='ignore'):
+        seed = np.nanmean(np.where(in_seed, x, np.nan), axis=1)
+
+    out = np.where(bars < seed_bar, np.nan, x)
+    rows = np.flatnonzero(seed_bar[:, 0] < width)
+    out[rows, seed_bar[rows, 0]] = seed[rows]
+    return out
+
+
+def first_valid(x):
+    """Per-row index of the first non-NaN value (width when none)."""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+
+def non_zero_range(high, low):
+    """high - low, plus epsilon on every bar of a row that has any zero range."""
+    diff = high - low
+    has_zero = (diff == 0).any(axis=1, keepdims=True)
+    return np.where(has_zero, diff + np.finfo(float).eps, diff)
+
+
+def nan_cumsum(x):
+    """Series.cumsum() per row: skips NaN but leaves it in place."""
+    out = np.nancumsum(x, axis=1)
+    out[np.isnan(x)] = np.nan
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Matrix backends
+# ---------------------------------------------------------------------------
+
+def _mask(values, lengths, min_length=1):
+    """NaN past each row's real bars, and everywhere in rows shorter than min_length."""
+    if lengths is None:
+        return values if values.shape[1] >= min_length else np.full_like(values, np.nan)
+    lengths = np.asarray(lengths)[:, None]
+    bars = np.arange(values.shape[1])[None, :]
+    return np.where((bars < lengths) & (lengths >= min_length), values, np.nan)
+
+
+class NumpyIndicators:
+    """pandas_ta indicators for every row of a (symbols x bars) matrix at once.
+
+    Each method takes NaN right-padded float matrices and, optionally, the
+    number of real bars per row (``lengths``, default: every row fills the
+    matrix). Output is NaN past each row's bars, and rows shorter than
+    pandas_ta's minimum come back all NaN, where pandas_ta would return None.
+    """
+
+    name = 'numpy'
+
+    @property
+    def series(self):
+        """Per-series functions with pandas_ta's signatures (this module)."""
+        return sys.modules[__name__]
+
+    def ema(self, close, length=10, lengths=None):
+        out = ewm_mean(sma_seeded(close, length), 2 / (length + 1), adjust=False)
+        return _mask(out, lengths, length)
+
+    def rma(self, close, length=10, lengths=None):
+        out = ewm_mean(close, 1 / length, adjust=False)
+        return _mask(out, lengths, length)
+
+    def rsi(self, close, length=14, lengths=None):
+        delta = close - shift(close, 1)
+        gain_avg = ewm_mean(np.where(delta < 0, 0.0, delta), 1 / length, adjust=False)
+        loss_avg = ewm_mean(np.where(delta > 0, 0.0, delta), 1 / length, adjust=False)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 * gain_avg / (gain_avg + np.abs(loss_avg))
+        return _mask(rsi, lengths, length + 1)
+
+    def macd(self, close, fast=12, slow=26, signal=9, lengths=None):
+        """Returns (macd, histogram, signal) matrices."""
+        if slow < fast:
+            fast, slow = slow, fast
+        line = (
+            ewm_mean(sma_seeded(close, fast), 2 / (fast + 1), adjust=False)
+            - ewm_mean(sma_seeded(close, slow), 2 / (slow + 1), adjust=False)
+        )
+        signal_line = ewm_mean(
+            sma_seeded(line, signal, start=first_valid(line)), 2 / (signal + 1), adjust=False
+        )
+        min_length = slow + signal - 1
+        line = _mask(line, lengths, min_length)
+        signal_line = _mask(signal_line, lengths, min_length)
+        return line, line - signal_line, signal_line
+
+    def roc(self, close, length=10, lengths=None):
+        previous = shift(close, length)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roc = 100 * (close - previous) / previous
+        return _mask(roc, lengths, length + 1)
+
+    def willr(self, high, low, close, length=14, lengths=None):
+        lowest = rolling_min(low, length)
+        highest = rolling_max(high, length)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            willr = 100 * ((close - lowest) / (highest - lowest) - 1)
+        return _mask(willr, lengths, length)
+
+    def true_range(self, high, low, close):
+        previous_close = shift(close, 1)
+        return np.fmax(
+            np.abs(non_zero_range(high, low)),
+            np.fmax(np.abs(high - previous_close), np.abs(previous_close - low)),
+        )
+
+    def atr(self, high, low, close, length=14, lengths=None):
+        true_range = self.true_range(high, low, close)
+        atr = ewm_mean(sma_seeded(true_range, length), 1 / length, adjust=False)
+        return _mask(atr, lengths, length + 1)
+
+    def bbands(self, close, length=5, std=2.0, ddof=1, lengths=None):
+        """Returns (lower, middle, upper, bandwidth, percent) matrices."""
+        middle = _mask(rolling_mean(close, length), lengths, length)
+        deviation = std * rolling_std(close, length, ddof=ddof)
+        lower = middle - deviation
+        upper = middle + deviation
+        band_range = non_zero_range(upper, lower)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bandwidth = 100 * band_range / middle
+            percent = non_zero_range(close, lower) / band_range
+        return lower, middle, upper, bandwidth, percent
+
+    def obv(self, close, volume, lengths=None):
+        direction = np.sign(close - shift(close, 1))
+        return _mask(nan_cumsum(direction * volume), lengths)
+
+    def money_flow(self, high, low, close, volume):
+        """Per-bar accumulation/distribution: the AD line's increments."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (2 * close - (high + low)) * (volume / non_zero_range(high, low))
+
+    def cmf(self, high, low, close, volume, length=20, lengths=None):
+        money_flow = self.money_flow(high, low, close, volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cmf = rolling_sum(money_flow, length) / rolling_sum(volume, length)
+        return _mask(cmf, lengths, length)
+
+    def ad(self, high, low, close, volume, lengths=None):
+        return _mask(nan_cumsum(self.money_flow(high, low, close, volume)), lengths)
+
+
+class PandasTaIndicators:
+    """NumpyIndicators' interface, computed by calling pandas_ta row by row.
+
+    Slow; kept as the reference implementation and as a fallback should the
+    native kernels ever need to be bypassed.
+    """
+
+    name = 'pandas_ta'
+
+    def __init__(self):
+        import pandas_ta
+        self.ta = pandas_ta
+
+    @property
+    def series(self):
+        """Per-series functions (pandas_ta itself)."""
+        return self.ta
+
+    def _per_row(self, func, inputs, lengths, n_out=None, **params):
+        """Apply a pandas_ta function to each row's real bars and re-pad."""
+        n_rows, width = inputs[0].shape
+        lengths = np.full(n_rows, width) if lengths is None else lengths
+        outputs = [np.full((n_rows, width), np.nan) for _ in range(n_out or 1)]
+        for row, n in enumerate(lengths):
+            result = func(*(pd.Series(x[row, :n]) for x in inputs), **params)
+            if result is None:
+                continue
+            if n_out is None:
+                outputs[0][row, :n] = result.to_numpy(dtype=float)
+            else:
+                for i in range(n_out):
+                    outputs[i][row, :n] = result.iloc[:, i].to_numpy(dtype=float)
+        return outputs[0] if n_out is None else tuple(outputs)
+
+    def ema(self, close, length=10, lengths=None):
+        return self._per_row(self.ta.ema, [close], lengths, length=length)
+
+    def rma(self, close, length=10, lengths=None):
+        return self._per_row(self.ta.rma, [close], lengths, length=length)
+
+    def rsi(self, close, length=14, lengths=None):
+        return self._per_row(self.ta.rsi, [close], lengths, length=length)
+
+    def macd(self, close, fast=12, slow=26, signal=9, lengths=None):
+        # pandas_ta's column order is already (macd, histogram, signal)
+        return self._per_row(self.ta.macd, [close], lengths, n_out=3,
+                             fast=fast, slow=slow, signal=signal)
+
+    def roc(self, close, length=10, lengths=None):
+        return self._per_row(self.ta.roc, [close], lengths, length=length)
+
+    def willr(self, high, low, close, length=14, lengths=None):
+        return self._per_row(self.ta.willr, [high, low, close], lengths, length=length)
+
+    def atr(self, high, low, close, length=14, lengths=None):
+        return self._per_row(self.ta.atr, [high, low, close], lengths, length=length)
+
+    def bbands(self, close, length=5, std=2.0, ddof=1, lengths=None):
+        # 0.3.x takes a single ``std``, 0.4 separate lower/upper multipliers;
+        # both order the columns lower, middle, upper, bandwidth, percent
+        return self._per_row(self.ta.bbands, [close], lengths, n_out=5, length=length,
+                             std=std, lower_std=std, upper_std=std, ddof=ddof)
+
+    def obv(self, close, volume, lengths=None):
+        return self._per_row(self.ta.obv, [close, volume], lengths)
+
+    def cmf(self, high, low, close, volume, length=20, lengths=None):
+        return self._per_row(self.ta.cmf, [high, low, close, volume], lengths, length=length)
+
+    def ad(self, high, low, close, volume, lengths=None):
+        return self._per_row(self.ta.ad, [high, low, close, volume], lengths)
+
+
+def get_backend(name='numpy'):
+    """Matrix indicator backend by name: 'numpy' (default) or 'pandas_ta'."""
+    if name == 'numpy':
+        return NumpyIndicators()
+    if name == 'pandas_ta':
+        return PandasTaIndicators()
+    raise ValueError(f"Unknown indicator backend: {name} (expected one of {', '.join(BACKENDS)})")
+
+
+# ---------------------------------------------------------------------------
+# Per-series API (pandas_ta-compatible)
+# ---------------------------------------------------------------------------
+
+_native = NumpyIndicators()
+
+
+def _row(series):
+    return series.to_numpy(dtype=float, na_value=np.nan)[None, :]
+
+
+def _series(values, like, name):
+    return pd.Series(values[0], index=like.index, name=name)
+
+
+def ema(close, length=10):
+    """Exponential moving average, seeded with the SMA of the first ``length`` values."""
+    if len(close) < length:
+        return None
+    return _series(_native.ema(_row(close), length), close, f'EMA_{length}')
+
+
+def rma(close, length=10):
+    """Wilder's moving average (EWM with alpha = 1 / length)."""
+    if len(close) < length:
+        return None
+    return _series(_native.rma(_row(close), length), close, f'RMA_{length}')
+
+
+def rsi(close, length=14):
+    """Relative Strength Index."""
+    if len(close) < length + 1:
+        return None
+    return _series(_native.rsi(_row(close), length), close, f'RSI_{length}')
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD line, histogram and signal line (MACD_, MACDh_, MACDs_ columns)."""
+    if slow < fast:
+        fast, slow = slow, fast
+    if len(close) < slow + signal - 1:
+        return None
+    line, histogram, signal_line = _native.macd(_row(close), fast, slow, signal)
+    props = f'_{fast}_{slow}_{signal}'
+    return pd.DataFrame({
+        f'MACD{props}': line[0],
+        f'MACDh{props}': histogram[0],
+        f'MACDs{props}': signal_line[0],
+    }, index=close.index)
+
+
+def roc(close, length=10):
+    """Rate of change, in percent."""
+    if len(close) < length + 1:
+        return None
+    return _series(_native.roc(_row(close), length), close, f'ROC_{length}')
+
+
+def willr(high, low, close, length=14):
+    """Williams %R."""
+    if len(close) < length:
+        return None
+    values = _native.willr(_row(high), _row(low), _row(close), length)
+    return _series(values, close, f'WILLR_{length}')
+
+
+def atr(high, low, close, length=14):
+    """Average True Range (RMA of the true range, SMA-seeded)."""
+    if len(close) < length + 1:
+        return None
+    values = _native.atr(_row(high), _row(low), _row(close), length)
+    return _series(values, close, f'ATRr_{length}')
+
+
+def bbands(close, length=5, std=2.0, ddof=1):
+    """Bollinger Bands: BBL_, BBM_, BBU_, BBB_ (bandwidth) and BBP_ (percent) columns."""
+    if len(close) < length:
+        return None
+    bands = _native.bbands(_row(close), length, float(std), ddof)
+    props = f'_{length}_{float(std)}'
+    names = [f'{prefix}{props}' for prefix in ('BBL', 'BBM', 'BBU', 'BBB', 'BBP')]
+    return pd.DataFrame({name: band[0] for name, band in zip(names, bands)}, index=close.index)
+
+
+def obv(close, volume):
+    """On-Balance Volume."""
+    if len(close) < 1:
+        return None
+    return _series(_native.obv(_row(close), _row(volume)), close, 'OBV')
+
+
+def cmf(high, low, close, volume, length=20):
+    """Chaikin Money Flow."""
+    if len(close) < length:
+        return None
+    values = _native.cmf(_row(high), _row(low), _row(close), _row(volume), length)
+    return _series(values, close, f'CMF_{length}')
+
+
+def ad(high, low, close, volume):
+    """Accumulation/Distribution line."""
+    return _series(_native.ad(_row(high), _row(low), _row(close), _row(volume)), close, 'AD')
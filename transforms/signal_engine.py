@@ -0,0 +1,453 @@
+"""
+Vectorized Strategy Engine for Trading Signals
+
+Array implementation of the strategies in transform_trading_signals.py. Instead of
+walking the frame with df.iloc[i] and building one dict per signal, every strategy
+is expressed as a boolean buy mask, a boolean sell mask and a strength array
+computed over shifted columns.
+
+The engine is group-aware: a frame may hold many symbols as long as each symbol's
+rows are contiguous and sorted by date. "Previous bar" always means the previous
+row of the same symbol that survives the strategy's NaN filter, which is exactly
+what the row-by-row implementations see after their dropna().
+
+The output matches the legacy strategy_* methods row for row: same signals, same
+signal_strength values and the same order (per symbol, strategies in the order
+requested, each strategy in its legacy emission order).
+
+Usage:
+    from transforms.signal_engine import VectorizedSignalEngine
+
+    engine = VectorizedSignalEngine()
+    signals_df = engine.generate(df)                       # all strategies
+    signals_df = engine.generate(df, ['ema_crossover'])    # subset
+"""
+
+import numpy as np
+import pandas as pd
+
+SIGNAL_COLUMNS = [
+    'symbol',
+    'symbol_id',
+    'date',
+    'buy_signal',
+    'sell_signal',
+    'trade_strategy',
+    'signal_strength',
+]
+
+
+def _cap(values):
+    """Vectorized min(100, x) with the same NaN handling as Python's min (NaN -> 100)."""
+    return np.where(values < 100, values, 100.0)
+
+
+def _prev(values):
+    """Shift an array down by one position, padding with NaN."""
+    shifted = np.empty_like(values)
+    shifted[:1] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+
+class _SymbolPanel:
+    """Column arrays and symbol boundaries of a frame sorted by symbol then date."""
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = set(df.columns)
+        self.n_rows = len(df)
+
+        symbol_ids = df['symbol_id'].to_numpy()
+        starts = np.ones(self.n_rows, dtype=bool)
+        starts[1:] = symbol_ids[1:] != symbol_ids[:-1]
+
+        self.group = np.cumsum(starts) - 1
+        self.n_groups = int(self.group[-1]) + 1 if self.n_rows else 0
+
+        start_index = np.flatnonzero(starts)
+        self.position_in_group = np.arange(self.n_rows) - start_index[self.group]
+
+        self._arrays = {}
+
+    def has(self, *columns):
+        """True when every column is present in the frame."""
+        return all(col in self.columns for col in columns)
+
+    def array(self, column):
+        """Float64 view of a column (cached)."""
+        if column not in self._arrays:
+            self._arrays[column] = self.df[column].to_numpy(dtype=float, na_value=np.nan)
+        return self._arrays[column]
+
+    def rows(self, columns):
+        """Positions of rows with no NaN in columns (the legacy dropna subset)."""
+        mask = np.ones(self.n_rows, dtype=bool)
+        for col in columns:
+            mask &= ~np.isnan(self.array(col))
+        return np.flatnonzero(mask)
+
+    def has_prev(self, pos):
+        """For each surviving row, whether the previous surviving row is the same symbol."""
+        groups = self.group[pos]
+        has_prev = np.zeros(len(pos), dtype=bool)
+        has_prev[1:] = groups[1:] == groups[:-1]
+        return has_prev
+
+    def group_size(self, pos):
+        """For each surviving row, how many surviving rows its symbol has."""
+        groups = self.group[pos]
+        return np.bincount(groups, minlength=self.n_groups)[groups]
+
+    def rolling(self, column, window, func):
+        """Trailing rolling aggregate that never crosses a symbol boundary."""
+        values = pd.Series(self.array(column)).rolling(window)
+        result = getattr(values, func)().to_numpy(copy=True)
+        result[self.position_in_group < window - 1] = np.nan
+        return result
+
+
+def _block(pos, buy, sell, buy_strength, sell_strength):
+    """Collapse buy/sell masks over surviving rows into one (rows, is_buy, strength) block."""
+    sell = sell & ~buy
+    mask = buy | sell
+    strength = np.where(buy, buy_strength, sell_strength)
+    return pos[mask], buy[mask], strength[mask]
+
+
+class VectorizedSignalEngine:
+    """Generate trading signals for one or many symbols with array operations."""
+
+    def __init__(self):
+        """Initialize the strategy registry (same names as TradingSignalsTransformer)."""
+        self.strategies = {
+            'ema_crossover': self._ema_crossover,
+            'rsi_mean_reversion': self._rsi_mean_reversion,
+            'rsi_crossing': self._rsi_crossing,
+            'macd_histogram_reversal': self._macd_histogram_reversal,
+            'bollinger_breakout': self._bollinger_breakout,
+            'volume_spike': self._volume_spike,
+            'williams_extremes': self._williams_extremes,
+            'ma_ribbon': self._ma_ribbon,
+            'price_breakout': self._price_breakout,
+            'rsi_divergence': self._rsi_divergence,
+            'trend_following': self._trend_following,
+        }
+
+    def generate(self, df, strategy_names=None):
+        """
+        Run strategies over a frame and return one row per signal.
+
+        Args:
+            df (pd.DataFrame): OHLCV + indicator rows, contiguous per symbol_id
+                and sorted by date within each symbol
+            strategy_names (list, optional): Strategies to run (default: all)
+
+        Returns:
+            pd.DataFrame: Signals with SIGNAL_COLUMNS
+        """
+        if strategy_names is None:
+            strategy_names = list(self.strategies.keys())
+
+        if df is None or df.empty:
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+        panel = _SymbolPanel(df)
+
+        rows, is_buy, strength, order_keys, names = [], [], [], [], []
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for strategy_order, name in enumerate(strategy_names):
+                blocks = self.strategies[name](panel)
+                for rank, (block_rows, block_buy, block_strength) in enumerate(blocks):
+                    rows.append(block_rows)
+                    is_buy.append(block_buy)
+                    strength.append(block_strength)
+                    order_keys.append(np.full(len(block_rows), strategy_order * 2 + rank))
+                    names.append(np.full(len(block_rows), name, dtype=object))
+
+        if not rows:
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+        rows = np.concatenate(rows)
+        if len(rows) == 0:
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+        is_buy = np.concatenate(is_buy)
+        strength = np.concatenate(strength)
+        order_keys = np.concatenate(order_keys)
+        names = np.concatenate(names)
+
+        # Per symbol, then strategy (and block), then bar - the legacy loop order
+        order = np.lexsort((rows, order_keys, panel.group[rows]))
+        rows = rows[order]
+
+        return pd.DataFrame({
+            'symbol': df['symbol'].to_numpy()[rows],
+            'symbol_id': df['symbol_id'].to_numpy()[rows],
+            'date': df['date'].to_numpy()[rows],
+            'buy_signal': is_buy[order],
+            'sell_signal': ~is_buy[order],
+            'trade_strategy': names[order],
+            'signal_strength': strength[order],
+        })
+
+    # ==================== STRATEGY KERNELS ====================
+
+    def _crossing(self, panel, column):
+        """Current and previous values of one column over its non-NaN rows."""
+        pos = panel.rows([column])
+        curr = panel.array(column)[pos]
+        return pos, curr, _prev(curr), panel.has_prev(pos)
+
+    def _ema_crossover(self, panel):
+        """EMA 8/21 crossover: buy on bullish cross, sell on bearish cross."""
+        cols = ['ohlcv_ema_8', 'ohlcv_ema_21']
+        if not panel.has(*cols):
+            return []
+
+        pos = panel.rows(cols)
+        has_prev = panel.has_prev(pos)
+        ema8 = panel.array('ohlcv_ema_8')[pos]
+        ema21 = panel.array('ohlcv_ema_21')[pos]
+        prev_ema8, prev_ema21 = _prev(ema8), _prev(ema21)
+
+        buy = has_prev & (prev_ema8 <= prev_ema21) & (ema8 > ema21)
+        sell = has_prev & (prev_ema8 >= prev_ema21) & (ema8 < ema21)
+        strength = _cap(np.abs(ema8 - ema21) / ema21 * 100)
+
+        return [_block(pos, buy, sell, strength, strength)]
+
+    def _rsi_mean_reversion(self, panel):
+        """RSI crosses above 30 (buy) or below 70 (sell)."""
+        if not panel.has('ohlcv_rsi_14'):
+            return []
+
+        pos, rsi, prev_rsi, has_prev = self._crossing(panel, 'ohlcv_rsi_14')
+
+        buy = has_prev & (prev_rsi <= 30) & (rsi > 30)
+        sell = has_prev & (prev_rsi >= 70) & (rsi < 70)
+
+        return [_block(pos, buy, sell, rsi, 100 - rsi)]
+
+    def _rsi_crossing(self, panel):
+        """
+        RSI reversal out of a confirmed extreme zone.
+
+        The legacy loop carries an oversold/overbought flag from bar to bar. Here
+        the flag is a forward-filled zone marker: for every bar we scan back to
+        the last bar that was <= 30 (+1) or >= 70 (-1) within the same symbol.
+        A signal additionally needs the immediately preceding bar to be in that
+        zone, which also makes the legacy reset-after-signal implicit.
+        """
+        if not panel.has('ohlcv_rsi_14'):
+            return []
+
+        pos, rsi, _, has_prev = self._crossing(panel, 'ohlcv_rsi_14')
+        if len(pos) == 0:
+            return []
+
+        zone = np.where(rsi <= 30, 1, np.where(rsi >= 70, -1, 0))
+
+        # Index of the last zone bar at or before each bar, not crossing symbols
+        index = np.arange(len(pos))
+        groups = panel.group[pos]
+        group_start = np.zeros(len(pos), dtype=bool)
+        group_start[0] = True
+        group_start[1:] = groups[1:] != groups[:-1]
+        first_in_group = np.maximum.accumulate(np.where(group_start, index, 0))
+        last_zone = np.maximum.accumulate(np.where(zone != 0, index, -1))
+
+        prev_last_zone = np.full(len(pos), -1)
+        prev_last_zone[1:] = last_zone[:-1]
+        in_group = prev_last_zone >= first_in_group
+        carried_zone = np.where(in_group, zone[np.maximum(prev_last_zone, 0)], 0)
+
+        prev_zone = np.zeros(len(pos), dtype=zone.dtype)
+        prev_zone[1:] = zone[:-1]
+        confirmed = has_prev & (carried_zone == prev_zone)
+
+        enough = panel.group_size(pos) >= 3  # Need at least 3 bars to detect pattern
+        neutral = (zone == 0) & enough & confirmed
+
+        buy = neutral & (prev_zone == 1)
+        sell = neutral & (prev_zone == -1)
+
+        return [_block(pos, buy, sell, rsi, 100 - rsi)]
+
+    def _macd_histogram_reversal(self, panel):
+        """MACD histogram crosses zero."""
+        if not panel.has('ohlcv_macd_histogram'):
+            return []
+
+        pos, hist, prev_hist, has_prev = self._crossing(panel, 'ohlcv_macd_histogram')
+
+        buy = has_prev & (prev_hist <= 0) & (hist > 0)
+        sell = has_prev & (prev_hist >= 0) & (hist < 0)
+        strength = _cap(np.abs(hist) * 10)
+
+        return [_block(pos, buy, sell, strength, strength)]
+
+    def _bollinger_breakout(self, panel):
+        """Close breaks above the upper band (buy) or below the lower band (sell)."""
+        cols = ['close', 'ohlcv_bb_upper', 'ohlcv_bb_lower']
+        if not panel.has(*cols):
+            return []
+
+        pos = panel.rows(cols)
+        has_prev = panel.has_prev(pos)
+        close = panel.array('close')[pos]
+        upper = panel.array('ohlcv_bb_upper')[pos]
+        lower = panel.array('ohlcv_bb_lower')[pos]
+
+        buy = has_prev & (_prev(close) <= _prev(upper)) & (close > upper)
+        sell = has_prev & (_prev(close) >= _prev(lower)) & (close < lower)
+
+        return [_block(
+            pos, buy, sell,
+            _cap((close - upper) / upper * 100),
+            _cap((lower - close) / lower * 100),
+        )]
+
+    def _volume_spike(self, panel):
+        """Volume above 2x average with a >2% price move."""
+        cols = ['close', 'volume', 'ohlcv_volume_sma_20']
+        if not panel.has(*cols):
+            return []
+
+        pos = panel.rows(cols)
+        has_prev = panel.has_prev(pos)
+        close = panel.array('close')[pos]
+        volume = panel.array('volume')[pos]
+        avg_volume = panel.array('ohlcv_volume_sma_20')[pos]
+        prev_close = _prev(close)
+
+        volume_ratio = volume / avg_volume
+        price_change_pct = (close - prev_close) / prev_close * 100
+        spike = has_prev & (avg_volume != 0) & (volume_ratio > 2.0)
+
+        buy = spike & (price_change_pct > 2.0)
+        sell = spike & (price_change_pct < -2.0)
+        strength = _cap(volume_ratio * 10)
+
+        return [_block(pos, buy, sell, strength, strength)]
+
+    def _williams_extremes(self, panel):
+        """Williams %R crosses above -80 (buy) or below -20 (sell)."""
+        if not panel.has('ohlcv_willr_14'):
+            return []
+
+        pos, willr, prev_willr, has_prev = self._crossing(panel, 'ohlcv_willr_14')
+
+        buy = has_prev & (prev_willr <= -80) & (willr > -80)
+        sell = has_prev & (prev_willr >= -20) & (willr < -20)
+        strength = _cap(np.abs(willr + 50) * 2)
+
+        return [_block(pos, buy, sell, strength, strength)]
+
+    def _ma_ribbon(self, panel):
+        """Close and SMAs 5/10/20/50 fully aligned."""
+        cols = ['close', 'ohlcv_sma_5', 'ohlcv_sma_10', 'ohlcv_sma_20', 'ohlcv_sma_50']
+        if not panel.has(*cols):
+            return []
+
+        pos = panel.rows(cols)
+        close, sma5, sma10, sma20, sma50 = (panel.array(col)[pos] for col in cols)
+
+        buy = (close > sma5) & (sma5 > sma10) & (sma10 > sma20) & (sma20 > sma50)
+        sell = (close < sma5) & (sma5 < sma10) & (sma10 < sma20) & (sma20 < sma50)
+
+        return [_block(
+            pos, buy, sell,
+            _cap((close - sma50) / sma50 * 100),
+            _cap((sma50 - close) / sma50 * 100),
+        )]
+
+    def _price_breakout(self, panel):
+        """High breaks the prior 20-day high (buy) or low breaks the 20-day low (sell)."""
+        if not panel.has('high', 'low'):
+            return []
+
+        high_20 = panel.rolling('high', 20, 'max')
+        low_20 = panel.rolling('low', 20, 'min')
+
+        pos = np.flatnonzero(~np.isnan(high_20) & ~np.isnan(low_20))
+        has_prev = panel.has_prev(pos)
+        high = panel.array('high')[pos]
+        low = panel.array('low')[pos]
+        prev_high_20 = _prev(high_20[pos])
+        prev_low_20 = _prev(low_20[pos])
+
+        buy = has_prev & (high > prev_high_20)
+        sell = has_prev & (low < prev_low_20)
+
+        return [_block(
+            pos, buy, sell,
+            _cap((high - prev_high_20) / prev_high_20 * 100),
+            _cap((prev_low_20 - low) / prev_low_20 * 100),
+        )]
+
+    def _rsi_divergence(self, panel):
+        """
+        Price/RSI divergence between consecutive 5-bar local extremes.
+
+        Returns two blocks (bullish, then bearish) because the legacy method emits
+        all of a symbol's buys before its sells.
+        """
+        cols = ['close', 'ohlcv_rsi_14']
+        if not panel.has(*cols):
+            return []
+
+        pos = panel.rows(cols)
+        pos = pos[panel.group_size(pos) >= 20]  # Need enough data for divergence detection
+        if len(pos) < 5:
+            return []
+
+        close = panel.array('close')[pos]
+        rsi = panel.array('ohlcv_rsi_14')[pos]
+        groups = panel.group[pos]
+
+        # Centered 5-bar window, only where all five bars belong to one symbol
+        windows = np.lib.stride_tricks.sliding_window_view(close, 5)
+        full_window = np.zeros(len(pos), dtype=bool)
+        full_window[2:-2] = groups[:-4] == groups[4:]
+
+        is_low = np.zeros(len(pos), dtype=bool)
+        is_high = np.zeros(len(pos), dtype=bool)
+        is_low[2:-2] = windows.min(axis=1) == close[2:-2]
+        is_high[2:-2] = windows.max(axis=1) == close[2:-2]
+
+        blocks = []
+        for extremes, bullish in ((is_low & full_window, True), (is_high & full_window, False)):
+            idx = np.flatnonzero(extremes)
+            prev_idx, curr_idx = idx[:-1], idx[1:]
+            same_symbol = groups[prev_idx] == groups[curr_idx]
+
+            if bullish:
+                hit = (close[curr_idx] < close[prev_idx]) & (rsi[curr_idx] > rsi[prev_idx])
+                strength = _cap(rsi[curr_idx] - rsi[prev_idx])
+            else:
+                hit = (close[curr_idx] > close[prev_idx]) & (rsi[curr_idx] < rsi[prev_idx])
+                strength = _cap(rsi[prev_idx] - rsi[curr_idx])
+
+            hit &= same_symbol
+            blocks.append((
+                pos[curr_idx[hit]],
+                np.full(int(hit.sum()), bullish),
+                strength[hit],
+            ))
+
+        return blocks
+
+    def _trend_following(self, panel):
+        """Close vs SMA 50, EMA 8 vs EMA 21 and RSI vs 50 all agree."""
+        cols = ['close', 'ohlcv_sma_50', 'ohlcv_ema_8', 'ohlcv_ema_21', 'ohlcv_rsi_14']
+        if not panel.has(*cols):
+            return []
+
+        pos = panel.rows(cols)
+        close, sma50, ema8, ema21, rsi = (panel.array(col)[pos] for col in cols)
+
+        buy = (close > sma50) & (ema8 > ema21) & (rsi > 50)
+        sell = (close < sma50) & (ema8 < ema21) & (rsi < 50)
+
+        return [_block(pos, buy, sell, _cap(rsi), _cap(100 - rsi))]
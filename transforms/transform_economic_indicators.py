@@ -305,24 +305,16 @@ class EconomicIndicatorsTransformer:
             if df[col].dtype in ['float64', 'int64']:
                 df[col] = df[col].replace([np.inf, -np.inf], None)
         
-        # Build update query
-        set_clause = ', '.join([f"{col} = %s" for col in feature_cols])
-        update_sql = f"""
-            UPDATE transforms.economic_indicators
-            SET {set_clause}, processed_at = NOW()
-            WHERE indicator = %s AND date = %s
-        """
-        
-        # Prepare records
-        records = []
-        for _, row in df.iterrows():
-            values = [None if pd.isna(row[col]) else row[col] for col in feature_cols]
-            values.extend([row['indicator'], row['date']])
-            records.append(tuple(values))
-        
-        # Execute batch update
-        self.db.execute_many(update_sql, records)
-        logger.info(f"Updated {len(records)} records")
+        # COPY into staging, then one UPDATE ... FROM
+        updated = self.db.bulk_upsert_dataframe(
+            'transforms.economic_indicators',
+            df[['indicator', 'date'] + feature_cols],
+            conflict_cols=['indicator', 'date'],
+            update_cols=feature_cols,
+            mode='update',
+            timestamp_cols=['processed_at'],
+        )
+        logger.info(f"Updated {updated} records")
 
 
 def main():
@@ -315,24 +315,16 @@ class IncomeStatementTransformer:
             if df[col].dtype in ['float64', 'int64']:
                 df[col] = df[col].replace([np.inf, -np.inf], None)
         
-        # Build update query
-        set_clause = ', '.join([f"{col} = %s" for col in feature_cols])
-        update_sql = f"""
-            UPDATE transforms.income_statement
-            SET {set_clause}, processed_at = NOW()
-            WHERE symbol_id = %s AND fiscal_date_ending = %s
-        """
-        
-        # Prepare records
-        records = []
-        for _, row in df.iterrows():
-            values = [None if pd.isna(row[col]) else row[col] for col in feature_cols]
-            values.extend([row['symbol_id'], row['fiscal_date_ending']])
-            records.append(tuple(values))
-        
-        # Execute batch
-        self.db.execute_many(update_sql, records)
-        logger.info(f"Updated {len(records):,} records")
+        # COPY into staging, then one UPDATE ... FROM
+        updated = self.db.bulk_upsert_dataframe(
+            'transforms.income_statement',
+            df[['symbol_id', 'fiscal_date_ending'] + feature_cols],
+            conflict_cols=['symbol_id', 'fiscal_date_ending'],
+            update_cols=feature_cols,
+            mode='update',
+            timestamp_cols=['processed_at'],
+        )
+        logger.info(f"Updated {updated:,} records")
 
 
 def main():
@@ -15,9 +15,12 @@ Usage:
     # Full mode (recreate table)
     python transform_time_series_daily_adjusted.py --mode full
     
-    # Incremental mode (watermark-based)
+    # Incremental mode (watermark-based; appends new bars from saved indicator state)
     python transform_time_series_daily_adjusted.py --mode incremental --staleness-hours 168
     
+    # Incremental mode, recomputing the last 250 bars of each stale symbol instead
+    python transform_time_series_daily_adjusted.py --mode incremental --recompute
+    
     # Initialize transformation group
     python transform_time_series_daily_adjusted.py --init-group time_series_daily_adjusted
     
@@ -32,17 +35,24 @@ from datetime import datetime
 from pathlib import Path
 import yaml
 from multiprocessing import Pool, cpu_count
+from multiprocessing.util import Finalize
 from functools import partial
 
 import pandas as pd
 import numpy as np
-import pandas_ta as ta
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from db.postgres_database_manager import PostgresDatabaseManager
+from db.ohlcv_cache import OhlcvCache
 from transforms.transformation_watermark_manager import TransformationWatermarkManager
+from transforms.panel_features import PanelFeatureBuilder
+from transforms.indicators import get_backend
+from transforms.indicator_state import (
+    IndicatorStateEngine, create_state_table, load_states, save_state, save_states,
+    delete_state, delete_states, STATE_TABLE
+)
 
 # Configure logging
 logging.basicConfig(
@@ -53,59 +63,75 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def _process_symbol_worker(symbol_data, config, mode='full'):
+# Bars kept per symbol in transforms.time_series_daily_adjusted: full mode
+# recomputes this window, incremental mode trims back to it after appending
+# 250 periods covers: 55 EMA lookback + 40 forward targets + 155 buffer
+HISTORY_BARS = 250
+
+# Latest HISTORY_BARS rows of each symbol stay, older ones are deleted
+_TRIM_HISTORY = """
+    DELETE FROM transforms.time_series_daily_adjusted t
+    USING (
+        SELECT symbol_id, date,
+               ROW_NUMBER() OVER (PARTITION BY symbol_id ORDER BY date DESC) AS bar
+        FROM transforms.time_series_daily_adjusted
+        WHERE symbol_id = ANY(%s)
+    ) ranked
+    WHERE t.symbol_id = ranked.symbol_id
+      AND t.date = ranked.date
+      AND ranked.bar > %s
+"""
+
+# Transformer owned by a pool worker process for its whole lifetime (set by _init_worker)
+_worker_transformer = None
+
+
+def _init_worker(config):
     """
-    Worker function for parallel processing of symbols.
+    Pool initializer: build one transformer and open its connection per process.
     
-    This function is defined at module level to be picklable for multiprocessing.
-    Each worker creates its own database connection to avoid conflicts.
+    Defined at module level to be picklable for multiprocessing. The
+    connection stays open across every chunk the process receives and is
+    closed when the pool shuts the worker down.
     
     Args:
-        symbol_data (dict): Symbol information from watermark table
         config (dict): Configuration dictionary
+    """
+    global _worker_transformer
+    
+    transformer = TimeSeriesDailyAdjustedTransformer.__new__(TimeSeriesDailyAdjustedTransformer)
+    transformer.db = PostgresDatabaseManager()
+    transformer.config = config
+    transformer.transformation_group = 'time_series_daily_adjusted'
+    transformer._load_feature_params()
+    transformer.db.connect()
+    
+    Finalize(transformer, transformer.db.close, exitpriority=10)
+    _worker_transformer = transformer
+
+
+def _process_chunk_worker(symbols_chunk, mode='full'):
+    """
+    Worker function: transform and load a chunk of symbols on this process's transformer.
+    
+    Args:
+        symbols_chunk (list): Symbol data dictionaries from the watermark table
         mode (str): Processing mode ('full' or 'incremental')
         
     Returns:
-        dict: Result with success status, records loaded, and symbol info
+        list: One result dict per symbol, as transform_and_load
+    """
+    return _worker_transformer.transform_and_load_chunk(symbols_chunk, mode=mode)
+
+
+def _chunk_symbols(symbols, chunk_size, workers=1):
     """
-    symbol_id = symbol_data['symbol_id']
-    symbol = symbol_data['symbol']
+    Split symbols into chunks of at most chunk_size.
     
-    try:
-        # Create transformer instance (each worker gets its own DB connection)
-        transformer = TimeSeriesDailyAdjustedTransformer.__new__(TimeSeriesDailyAdjustedTransformer)
-        transformer.db = PostgresDatabaseManager()
-        transformer.config = config
-        transformer.transformation_group = 'time_series_daily_adjusted'
-        
-        # Load configuration parameters
-        transformer.rolling_window = config.get('rolling_window', 8)
-        transformer.ma_periods = config.get('ma_periods', [5, 10, 20, 50])
-        transformer.ema_periods = config.get('ema_periods', [8, 21, 34, 55])
-        transformer.rsi_periods = config.get('rsi_periods', [7, 14])
-        transformer.atr_periods = config.get('atr_periods', [10, 14])
-        transformer.target_horizons = config.get('target_horizons', [5, 10, 20, 30, 40])
-        
-        # Connect to database
-        transformer.db.connect()
-        
-        # Transform and load
-        result = transformer.transform_and_load(symbol_id, symbol, mode=mode)
-        
-        # Close connection
-        transformer.db.close()
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"Worker error processing {symbol}: {e}")
-        return {
-            'symbol': symbol,
-            'symbol_id': symbol_id,
-            'success': False,
-            'records_loaded': 0,
-            'error': str(e)
-        }
+    Chunks shrink when there are too few symbols to give every worker one.
+    """
+    chunk_size = max(1, min(chunk_size, -(-len(symbols) // workers)))
+    return [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
 
 
 class TimeSeriesDailyAdjustedTransformer:
@@ -126,6 +152,10 @@ class TimeSeriesDailyAdjustedTransformer:
         self.config = self._load_config(config_path)
         
         # Feature parameters from config
+        self._load_feature_params()
+        
+    def _load_feature_params(self):
+        """Set feature parameters, the feature and indicator engines and the indicator state engine from self.config."""
         self.rolling_window = self.config.get('rolling_window', 8)
         self.ma_periods = self.config.get('ma_periods', [5, 10, 20, 50])
         self.ema_periods = self.config.get('ema_periods', [8, 21, 34, 55])
@@ -133,6 +163,31 @@ class TimeSeriesDailyAdjustedTransformer:
         self.atr_periods = self.config.get('atr_periods', [10, 14])
         self.target_horizons = self.config.get('target_horizons', [5, 10, 20, 30, 40])
         
+        # 'panel' computes all symbols at once (transforms/panel_features.py);
+        # 'legacy' keeps the per-symbol loops below
+        self.feature_engine = self.config.get('feature_engine', 'panel')
+        if self.feature_engine not in ('panel', 'legacy'):
+            raise ValueError(f"Unknown feature_engine: {self.feature_engine}")
+        
+        # 'numpy' uses the native indicators in transforms/indicators.py;
+        # 'pandas_ta' calls pandas_ta (same values, much slower)
+        self.indicator_backend = self.config.get('indicator_backend', 'numpy')
+        self.indicators = get_backend(self.indicator_backend)
+        
+        params = (self.ma_periods, self.ema_periods, self.rsi_periods,
+                  self.atr_periods, self.target_horizons)
+        self.panel_builder = PanelFeatureBuilder(*params, indicators=self.indicators)
+        self.state_engine = IndicatorStateEngine(*params)
+        
+        # Symbols per read/commit in transform_and_load_chunk
+        self.chunk_symbols = self.config.get('chunk_symbols', 100)
+        
+        # Read raw bars from the local OHLCV cache (db/ohlcv_cache.py) instead
+        # of Postgres; it must be synced before the run. '' means the default
+        # cache directory
+        cache_dir = self.config.get('ohlcv_cache_dir')
+        self.ohlcv_cache = OhlcvCache(cache_dir or None) if cache_dir is not None else None
+    
     def _load_config(self, config_path):
         """Load configuration from YAML file or return defaults."""
         if config_path and Path(config_path).exists():
@@ -146,7 +201,10 @@ class TimeSeriesDailyAdjustedTransformer:
             'ema_periods': [8, 21, 34, 55],
             'rsi_periods': [7, 14],
             'atr_periods': [10, 14],
-            'target_horizons': [5, 10, 20, 30, 40]
+            'target_horizons': [5, 10, 20, 30, 40],
+            'feature_engine': 'panel',
+            'indicator_backend': 'numpy',
+            'chunk_symbols': 100
         }
     
     @staticmethod
@@ -174,6 +232,9 @@ class TimeSeriesDailyAdjustedTransformer:
         """
         logger.info('Creating trend features...')
         
+        if self.feature_engine == 'panel':
+            return self.panel_builder.trend(df)
+        
         for symbol in df['symbol'].unique():
             mask = df['symbol'] == symbol
             symbol_data = df.loc[mask].copy().sort_values('date')
@@ -221,6 +282,10 @@ class TimeSeriesDailyAdjustedTransformer:
         """
         logger.info('Creating momentum features...')
         
+        if self.feature_engine == 'panel':
+            return self.panel_builder.momentum(df)
+        
+        ta = self.indicators.series
         for symbol in df['symbol'].unique():
             mask = df['symbol'] == symbol
             symbol_data = df.loc[mask].copy().sort_values('date')
@@ -276,6 +341,10 @@ class TimeSeriesDailyAdjustedTransformer:
         """
         logger.info('Creating volatility features...')
         
+        if self.feature_engine == 'panel':
+            return self.panel_builder.volatility(df)
+        
+        ta = self.indicators.series
         for symbol in df['symbol'].unique():
             mask = df['symbol'] == symbol
             symbol_data = df.loc[mask].copy().sort_values('date')
@@ -299,15 +368,18 @@ class TimeSeriesDailyAdjustedTransformer:
             try:
                 bb = ta.bbands(symbol_data['close'], length=20, std=2)
                 if bb is not None and not bb.empty:
-                    df.loc[mask, 'ohlcv_bb_upper'] = bb['BBU_20_2.0']
-                    df.loc[mask, 'ohlcv_bb_middle'] = bb['BBM_20_2.0']
-                    df.loc[mask, 'ohlcv_bb_lower'] = bb['BBL_20_2.0']
-                    df.loc[mask, 'ohlcv_bb_width'] = (
-                        bb['BBU_20_2.0'] - bb['BBL_20_2.0']
-                    ) / bb['BBM_20_2.0']
+                    # Column suffixes differ across pandas_ta versions
+                    # (BBU_20_2.0 vs BBU_20_2.0_2.0); match on the prefix
+                    upper, middle, lower = (
+                        bb.filter(regex=f'^{prefix}_').iloc[:, 0] for prefix in ('BBU', 'BBM', 'BBL')
+                    )
+                    df.loc[mask, 'ohlcv_bb_upper'] = upper
+                    df.loc[mask, 'ohlcv_bb_middle'] = middle
+                    df.loc[mask, 'ohlcv_bb_lower'] = lower
+                    df.loc[mask, 'ohlcv_bb_width'] = (upper - lower) / middle
                     df.loc[mask, 'ohlcv_bb_position'] = (
-                        symbol_data['close'] - bb['BBL_20_2.0']
-                    ) / (bb['BBU_20_2.0'] - bb['BBL_20_2.0'])
+                        symbol_data['close'] - lower
+                    ) / (upper - lower)
             except Exception as e:
                 logger.warning(f"Bollinger Bands calculation failed for {symbol}: {e}")
                 
@@ -331,6 +403,10 @@ class TimeSeriesDailyAdjustedTransformer:
         """
         logger.info('Creating volume features...')
         
+        if self.feature_engine == 'panel':
+            return self.panel_builder.volume(df)
+        
+        ta = self.indicators.series
         for symbol in df['symbol'].unique():
             mask = df['symbol'] == symbol
             symbol_data = df.loc[mask].copy().sort_values('date')
@@ -378,6 +454,9 @@ class TimeSeriesDailyAdjustedTransformer:
         """
         logger.info('Creating target variables...')
         
+        if self.feature_engine == 'panel':
+            return self.panel_builder.targets(df)
+        
         for symbol in df['symbol'].unique():
             mask = df['symbol'] == symbol
             symbol_data = df.loc[mask].copy().sort_values('date')
@@ -411,42 +490,68 @@ class TimeSeriesDailyAdjustedTransformer:
                 
         return df
     
-    def transform_symbol(self, symbol_id, symbol):
+    def build_features(self, df):
+        """
+        Add every feature group (trend, momentum, volatility, volume, targets).
+        
+        With the panel engine this is a single pass over any number of symbols.
+        
+        Args:
+            df (pd.DataFrame): OHLCV rows for one or more symbols
+            
+        Returns:
+            pd.DataFrame: DataFrame with all feature and target columns added
+        """
+        if self.feature_engine == 'panel':
+            logger.info('Creating features (panel)...')
+            return self.panel_builder.build(df)
+        
+        df = self.create_trend_features(df)
+        df = self.create_momentum_features(df)
+        df = self.create_volatility_features(df)
+        df = self.create_volume_features(df)
+        df = self.create_target_variables(df)
+        return df
+    
+    def transform_symbol(self, symbol_id, symbol, with_state=False):
         """
         Transform time series data for a single symbol.
         
         Args:
             symbol_id (int): Symbol ID from watermark table (will be converted to string for raw table)
             symbol (str): Symbol ticker
+            with_state (bool): Also return the indicator state at the last bar,
+                for later incremental runs
             
         Returns:
             pd.DataFrame: Transformed data with features, or None if failed
+            (a (DataFrame, state) tuple when with_state is True; state is None
+            for histories too short to continue incrementally)
         """
         try:
-            # Convert symbol_id to string for raw table comparison (raw.symbol_id is TEXT)
-            symbol_id_str = str(symbol_id)
-            
-            # Fetch time series data for symbol (last 250 periods for efficiency)
-            # 250 periods covers: 55 EMA lookback + 40 forward targets + 155 buffer
-            query = """
+            # Fetch time series data for symbol (last HISTORY_BARS periods for efficiency)
+            query = f"""
                 SELECT symbol_id, symbol, date, open, high, low, 
                        close, adjusted_close, volume
                 FROM (
-                    SELECT symbol_id, symbol, date, open, high, low, 
+                    SELECT symbol_id_int AS symbol_id, symbol, date, open, high, low, 
                            close, adjusted_close, volume
                     FROM raw.time_series_daily_adjusted
-                    WHERE symbol_id = %s
+                    WHERE symbol_id_int = %s
                     ORDER BY date DESC
-                    LIMIT 250
+                    LIMIT {HISTORY_BARS}
                 ) subq
                 ORDER BY date ASC
             """
             
-            df = pd.read_sql(query, self.db.connection, params=(symbol_id_str,))
+            if self.ohlcv_cache is not None:
+                df = self.ohlcv_cache.load_panel([symbol_id], last=HISTORY_BARS)
+            else:
+                df = pd.read_sql(query, self.db.connection, params=(int(symbol_id),))
             
             if df.empty:
                 logger.warning(f"No data found for {symbol} (ID: {symbol_id})")
-                return None
+                return (None, None) if with_state else None
             
             # Ensure date column is datetime
             df['date'] = pd.to_datetime(df['date'])
@@ -455,11 +560,7 @@ class TimeSeriesDailyAdjustedTransformer:
             df['symbol_id'] = symbol_id  # Use the integer from watermark table
             
             # Create comprehensive features
-            df = self.create_trend_features(df)
-            df = self.create_momentum_features(df)
-            df = self.create_volatility_features(df)
-            df = self.create_volume_features(df)
-            df = self.create_target_variables(df)
+            df = self.build_features(df)
             
             # Prepare final dataframe
             feature_columns = [col for col in df.columns if col.startswith(('ohlcv_', 'target_'))]
@@ -470,11 +571,111 @@ class TimeSeriesDailyAdjustedTransformer:
             # Replace pandas NA with None for database insertion
             final_df = final_df.replace({pd.NA: None})
             
+            if with_state:
+                return final_df, self.state_engine.seed(df, df)
             return final_df
             
         except Exception as e:
             logger.error(f"Error transforming {symbol}: {e}")
+            return (None, None) if with_state else None
+    
+    def transform_new_bars(self, symbol_id, symbol, state):
+        """
+        Compute features for bars after the saved state, without re-reading history.
+        
+        Args:
+            symbol_id (int): Symbol ID from watermark table
+            symbol (str): Symbol ticker
+            state (dict): Saved indicator state for the symbol
+            
+        Returns:
+            tuple: (new_rows_df, target_updates_df, new_state); new_rows_df is
+            empty when no bars arrived since the state was saved
+        """
+        query = """
+            SELECT date, open, high, low, close, adjusted_close, volume
+            FROM raw.time_series_daily_adjusted
+            WHERE symbol_id_int = %s AND date > %s
+            ORDER BY date ASC
+        """
+        if self.ohlcv_cache is not None:
+            new_df = self.ohlcv_cache.load_frame(
+                symbol_id, start=pd.Timestamp(state['last_date']) + pd.Timedelta(days=1)
+            )
+        else:
+            new_df = pd.read_sql(query, self.db.connection, params=(int(symbol_id), state['last_date']))
+        if new_df.empty:
+            return new_df, None, state
+        
+        new_df['date'] = pd.to_datetime(new_df['date'])
+        return self._advance_state(symbol_id, symbol, state, new_df)
+    
+    def _advance_state(self, symbol_id, symbol, state, new_df):
+        """Features for new_df's bars and refreshed trailing targets, ready to load."""
+        features_df, target_updates_df, new_state = self.state_engine.advance(state, new_df)
+        
+        now = pd.Timestamp.now()
+        features_df.insert(0, 'symbol', symbol)
+        features_df.insert(0, 'symbol_id', symbol_id)
+        features_df['created_at'] = now
+        features_df['updated_at'] = now
+        target_updates_df.insert(0, 'symbol_id', symbol_id)
+        target_updates_df['updated_at'] = now
+        
+        return features_df, target_updates_df, new_state
+    
+    def _append_from_state(self, symbol_id, symbol):
+        """
+        Incremental load: append rows for new bars and refresh trailing targets.
+        
+        The symbol is then trimmed back to its latest HISTORY_BARS rows, the
+        window full mode writes, in the same transaction.
+        
+        Returns:
+            dict: Statistics as in transform_and_load, or None when the symbol
+            has no usable saved state (the caller then recomputes in full)
+        """
+        state = load_states(self.db, [int(symbol_id)]).get(int(symbol_id))
+        if not self.state_engine.is_usable(state):
             return None
+        
+        new_rows_df, target_updates_df, new_state = self.transform_new_bars(symbol_id, symbol, state)
+        records_loaded = 0
+        
+        if not new_rows_df.empty:
+            feature_columns = [col for col in new_rows_df.columns 
+                             if col.startswith(('ohlcv_', 'target_'))]
+            target_columns = [col for col in target_updates_df.columns if col.startswith('target_')]
+            
+            with self.db.transaction():
+                records_loaded = self.db.bulk_upsert_dataframe(
+                    'transforms.time_series_daily_adjusted',
+                    new_rows_df,
+                    conflict_cols=['symbol_id', 'date'],
+                    update_cols=['symbol'] + feature_columns + ['updated_at'],
+                )
+                
+                # Stored rows whose forward horizon now reaches the new bars
+                self.db.bulk_upsert_dataframe(
+                    'transforms.time_series_daily_adjusted',
+                    target_updates_df,
+                    conflict_cols=['symbol_id', 'date'],
+                    update_cols=target_columns + ['updated_at'],
+                    mode='update',
+                )
+                
+                self.db.execute_query(_TRIM_HISTORY, ([int(symbol_id)], HISTORY_BARS))
+                save_state(self.db, symbol_id, new_state)
+        
+        logger.info(f"Appended {records_loaded} new bars for {symbol}")
+        
+        return {
+            'symbol': symbol,
+            'symbol_id': symbol_id,
+            'success': True,
+            'records_loaded': records_loaded,
+            'error': None
+        }
     
     def transform_and_load(self, symbol_id, symbol, mode='full'):
         """
@@ -483,13 +684,20 @@ class TimeSeriesDailyAdjustedTransformer:
         Args:
             symbol_id (str): Symbol ID (TEXT type)
             symbol (str): Symbol ticker
-            mode (str): 'full' to replace, 'incremental' to append
+            mode (str): 'full' to replace, 'incremental' to append new bars
+                from the saved indicator state (falls back to 'full' for
+                symbols without one)
             
         Returns:
             dict: Statistics about the transformation
         """
         try:
-            transformed_df = self.transform_symbol(symbol_id, symbol)
+            if mode == 'incremental':
+                result = self._append_from_state(symbol_id, symbol)
+                if result is not None:
+                    return result
+            
+            transformed_df, state = self.transform_symbol(symbol_id, symbol, with_state=True)
             
             if transformed_df is None or transformed_df.empty:
                 return {
@@ -509,41 +717,30 @@ class TimeSeriesDailyAdjustedTransformer:
             """
             self.db.execute_query(delete_query, (symbol_id,))
             
-            # Insert transformed data
-            insert_query = """
-                INSERT INTO transforms.time_series_daily_adjusted 
-                (symbol_id, symbol, date, {columns}, created_at, updated_at)
-                VALUES ({placeholders})
-            """
-            
+            # Insert transformed data (COPY into staging, one merge)
             feature_columns = [col for col in transformed_df.columns 
                              if col.startswith(('ohlcv_', 'target_'))]
-            columns_str = ', '.join(feature_columns)
-            placeholders = ', '.join(['%s'] * (len(feature_columns) + 5))
+            load_columns = ['symbol_id', 'symbol', 'date'] + feature_columns + ['created_at', 'updated_at']
             
-            insert_query = insert_query.format(
-                columns=columns_str,
-                placeholders=placeholders
+            records_loaded = self.db.bulk_upsert_dataframe(
+                'transforms.time_series_daily_adjusted',
+                transformed_df[load_columns],
+                conflict_cols=['symbol_id', 'date'],
+                update_cols=['symbol'] + feature_columns + ['updated_at'],
             )
             
-            records = []
-            for _, row in transformed_df.iterrows():
-                record = [
-                    row['symbol_id'], row['symbol'], row['date']
-                ] + [row[col] for col in feature_columns] + [
-                    row['created_at'], row['updated_at']
-                ]
-                records.append(tuple(record))
-            
-            self.db.execute_many(insert_query, records)
+            if state is not None:
+                save_state(self.db, symbol_id, state)
+            else:
+                delete_state(self.db, symbol_id)
             
-            logger.info(f"Loaded {len(records)} records for {symbol}")
+            logger.info(f"Loaded {records_loaded} records for {symbol}")
             
             return {
                 'symbol': symbol,
                 'symbol_id': symbol_id,
                 'success': True,
-                'records_loaded': len(records),
+                'records_loaded': records_loaded,
                 'error': None
             }
             
@@ -557,6 +754,254 @@ class TimeSeriesDailyAdjustedTransformer:
                 'error': str(e)
             }
     
+    def fetch_histories(self, symbol_ids):
+        """
+        Last 250 bars of every symbol in one query.
+        
+        Args:
+            symbol_ids (list): Integer symbol IDs
+            
+        Returns:
+            pd.DataFrame: Raw bars ascending by (symbol_id, date)
+        """
+        query = f"""
+            SELECT h.symbol_id, h.symbol, h.date, h.open, h.high, h.low,
+                   h.close, h.adjusted_close, h.volume
+            FROM unnest(%s::int[]) AS s(symbol_id)
+            CROSS JOIN LATERAL (
+                SELECT symbol_id_int AS symbol_id, symbol, date, open, high, low,
+                       close, adjusted_close, volume
+                FROM raw.time_series_daily_adjusted
+                WHERE symbol_id_int = s.symbol_id
+                ORDER BY date DESC
+                LIMIT {HISTORY_BARS}
+            ) h
+            ORDER BY h.symbol_id, h.date
+        """
+        if self.ohlcv_cache is not None:
+            return self.ohlcv_cache.load_panel(symbol_ids, last=HISTORY_BARS)
+        df = pd.read_sql(query, self.db.connection, params=([int(i) for i in symbol_ids],))
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+    
+    def fetch_new_bars(self, states):
+        """
+        Bars after each symbol's saved state, for every symbol in one query.
+        
+        Args:
+            states (dict): Saved indicator states keyed by symbol_id
+            
+        Returns:
+            dict: symbol_id -> raw bars ascending by date (symbols without
+            new bars are absent)
+        """
+        query = """
+            SELECT r.symbol_id_int AS symbol_id, r.date, r.open, r.high, r.low,
+                   r.close, r.adjusted_close, r.volume
+            FROM unnest(%s::int[], %s::date[]) AS s(symbol_id, last_date)
+            JOIN raw.time_series_daily_adjusted r
+              ON r.symbol_id_int = s.symbol_id AND r.date > s.last_date
+            ORDER BY r.symbol_id_int, r.date
+        """
+        symbol_ids = [int(i) for i in states]
+        last_dates = [states[i]['last_date'] for i in states]
+        if self.ohlcv_cache is not None:
+            frames = {
+                symbol_id: self.ohlcv_cache.load_frame(
+                    symbol_id, start=pd.Timestamp(last_date) + pd.Timedelta(days=1)
+                )
+                for symbol_id, last_date in zip(symbol_ids, last_dates)
+            }
+            return {symbol_id: df for symbol_id, df in frames.items() if not df.empty}
+        
+        df = pd.read_sql(query, self.db.connection, params=(symbol_ids, last_dates))
+        df['date'] = pd.to_datetime(df['date'])
+        return {
+            int(symbol_id): group.drop(columns='symbol_id').reset_index(drop=True)
+            for symbol_id, group in df.groupby('symbol_id', sort=False)
+        }
+    
+    def transform_chunk(self, symbols):
+        """
+        Transform the last 250 bars of several symbols with one read and one feature pass.
+        
+        Args:
+            symbols (list): Symbol data dictionaries from the watermark table
+            
+        Returns:
+            tuple: (final_df, states) - rows for every symbol with data, and
+            the indicator state at each of those symbols' last bar, keyed by
+            symbol_id (None for histories too short to continue incrementally)
+        """
+        df = self.fetch_histories([s['symbol_id'] for s in symbols])
+        if df.empty:
+            return df, {}
+        
+        df = self.build_features(df)
+        
+        feature_columns = [col for col in df.columns if col.startswith(('ohlcv_', 'target_'))]
+        final_df = df[['symbol_id', 'symbol', 'date'] + feature_columns].copy()
+        final_df['created_at'] = pd.Timestamp.now()
+        final_df['updated_at'] = pd.Timestamp.now()
+        final_df = final_df.replace({pd.NA: None})
+        
+        states = {
+            int(symbol_id): self.state_engine.seed(group, group)
+            for symbol_id, group in df.groupby('symbol_id', sort=False)
+        }
+        return final_df, states
+    
+    def transform_and_load_chunk(self, symbols, mode='full'):
+        """
+        Transform and load several symbols with one read and one commit per step.
+        
+        Same rows and states as calling transform_and_load per symbol. If a
+        chunk step fails, its symbols are retried one by one so a single bad
+        symbol only fails itself.
+        
+        Args:
+            symbols (list): Symbol data dictionaries from the watermark table
+            mode (str): 'full' to replace, 'incremental' to append new bars
+                from the saved indicator state (falls back to 'full' for
+                symbols without one)
+            
+        Returns:
+            list: One statistics dict per symbol, as transform_and_load
+        """
+        results = []
+        
+        if mode == 'incremental':
+            try:
+                results, symbols = self._append_chunk_from_state(symbols)
+            except Exception as e:
+                logger.warning(f"Incremental chunk of {len(symbols)} symbols failed, retrying one by one: {e}")
+                return [self.transform_and_load(s['symbol_id'], s['symbol'], mode=mode) for s in symbols]
+        
+        if symbols:
+            try:
+                results += self._replace_chunk(symbols)
+            except Exception as e:
+                logger.warning(f"Chunk of {len(symbols)} symbols failed, retrying one by one: {e}")
+                results += [self.transform_and_load(s['symbol_id'], s['symbol']) for s in symbols]
+        
+        return results
+    
+    def _replace_chunk(self, symbols):
+        """Full load of a chunk: replace each symbol's rows and state in one transaction."""
+        transformed_df, states = self.transform_chunk(symbols)
+        
+        if states:
+            feature_columns = [col for col in transformed_df.columns 
+                             if col.startswith(('ohlcv_', 'target_'))]
+            load_columns = ['symbol_id', 'symbol', 'date'] + feature_columns + ['created_at', 'updated_at']
+            
+            with self.db.transaction():
+                self.db.execute_query("""
+                    DELETE FROM transforms.time_series_daily_adjusted
+                    WHERE symbol_id = ANY(%s)
+                """, (list(states),))
+                records_loaded = self.db.bulk_upsert_dataframe(
+                    'transforms.time_series_daily_adjusted',
+                    transformed_df[load_columns],
+                    conflict_cols=['symbol_id', 'date'],
+                    update_cols=['symbol'] + feature_columns + ['updated_at'],
+                )
+                save_states(self.db, {i: state for i, state in states.items() if state is not None})
+                delete_states(self.db, [i for i, state in states.items() if state is None])
+            
+            logger.info(f"Loaded {records_loaded} records for {len(states)} symbols")
+        
+        rows = transformed_df['symbol_id'].value_counts() if states else {}
+        return [
+            {
+                'symbol': s['symbol'],
+                'symbol_id': s['symbol_id'],
+                'success': True,
+                'records_loaded': int(rows[int(s['symbol_id'])]),
+                'error': None
+            } if int(s['symbol_id']) in states else {
+                'symbol': s['symbol'],
+                'symbol_id': s['symbol_id'],
+                'success': False,
+                'records_loaded': 0,
+                'error': 'No data to transform'
+            }
+            for s in symbols
+        ]
+    
+    def _append_chunk_from_state(self, symbols):
+        """
+        Incremental load of a chunk from saved states, in one transaction.
+        
+        Appended symbols are trimmed back to their latest HISTORY_BARS rows,
+        the window full mode writes, so a symbol keeps the same span of
+        history whichever mode ran last. The appended rows continue the
+        indicators from the state, as if the history had never been cut, so
+        they can differ slightly from a fresh HISTORY_BARS recompute, which
+        restarts the EMA and Wilder warm-ups at the start of the window.
+        
+        Returns:
+            tuple: (results, remaining) - statistics for symbols appended from
+            state, and the symbols without a usable state (to recompute in full)
+        """
+        states = load_states(self.db, [int(s['symbol_id']) for s in symbols])
+        states = {i: state for i, state in states.items() if self.state_engine.is_usable(state)}
+        remaining = [s for s in symbols if int(s['symbol_id']) not in states]
+        if not states:
+            return [], remaining
+        
+        new_bars = self.fetch_new_bars(states)
+        new_rows, target_updates, new_states = [], [], {}
+        results = []
+        
+        for s in symbols:
+            symbol_id = int(s['symbol_id'])
+            if symbol_id not in states:
+                continue
+            records = 0
+            if symbol_id in new_bars:
+                features_df, target_updates_df, new_states[symbol_id] = self._advance_state(
+                    s['symbol_id'], s['symbol'], states[symbol_id], new_bars[symbol_id]
+                )
+                new_rows.append(features_df)
+                target_updates.append(target_updates_df)
+                records = len(features_df)
+            results.append({
+                'symbol': s['symbol'],
+                'symbol_id': s['symbol_id'],
+                'success': True,
+                'records_loaded': records,
+                'error': None
+            })
+        
+        if new_rows:
+            new_rows_df = pd.concat(new_rows, ignore_index=True)
+            target_updates_df = pd.concat(target_updates, ignore_index=True)
+            feature_columns = [col for col in new_rows_df.columns 
+                             if col.startswith(('ohlcv_', 'target_'))]
+            target_columns = [col for col in target_updates_df.columns if col.startswith('target_')]
+            
+            with self.db.transaction():
+                self.db.bulk_upsert_dataframe(
+                    'transforms.time_series_daily_adjusted',
+                    new_rows_df,
+                    conflict_cols=['symbol_id', 'date'],
+                    update_cols=['symbol'] + feature_columns + ['updated_at'],
+                )
+                self.db.bulk_upsert_dataframe(
+                    'transforms.time_series_daily_adjusted',
+                    target_updates_df,
+                    conflict_cols=['symbol_id', 'date'],
+                    update_cols=target_columns + ['updated_at'],
+                    mode='update',
+                )
+                self.db.execute_query(_TRIM_HISTORY, (list(new_states), HISTORY_BARS))
+                save_states(self.db, new_states)
+        
+        logger.info(f"Appended {sum(len(df) for df in new_rows)} new bars for {len(results)} symbols")
+        
+        return results, remaining
+    
     def create_transforms_table(self):
         """Create the transforms.time_series_daily_adjusted table if it doesn't exist."""
         try:
@@ -654,6 +1099,7 @@ class TimeSeriesDailyAdjustedTransformer:
             """
             
             self.db.execute_query(create_table_sql)
+            create_state_table(self.db)
             logger.info("Created transforms.time_series_daily_adjusted table")
             
         except Exception as e:
@@ -671,6 +1117,7 @@ class TimeSeriesDailyAdjustedTransformer:
             self.db.connect()
             self.db.execute_query("DROP TABLE IF EXISTS transforms.time_series_daily_adjusted CASCADE")
             self.create_transforms_table()
+            self.db.execute_query(f"TRUNCATE {STATE_TABLE}")
             
             # Get all symbols from watermark table
             symbols = self.watermark_mgr.get_symbols_needing_transformation(
@@ -724,7 +1171,7 @@ class TimeSeriesDailyAdjustedTransformer:
     
     def _process_sequential(self, symbols, mode='full'):
         """
-        Process symbols sequentially (single-threaded).
+        Process symbols sequentially (single-threaded), a chunk at a time.
         
         Args:
             symbols (list): List of symbol data dictionaries
@@ -736,19 +1183,19 @@ class TimeSeriesDailyAdjustedTransformer:
         total_records = 0
         success_count = 0
         failed_symbols = []
+        processed = 0
         
-        for idx, symbol_data in enumerate(symbols, 1):
-            symbol_id = symbol_data['symbol_id']
-            symbol = symbol_data['symbol']
-            logger.info(f"[{idx}/{len(symbols)}] Processing {symbol} (ID: {symbol_id})")
-            
-            result = self.transform_and_load(symbol_id, symbol, mode=mode)
+        for chunk in _chunk_symbols(symbols, self.chunk_symbols):
+            logger.info(f"[{processed + 1}-{processed + len(chunk)}/{len(symbols)}] "
+                        f"Processing {chunk[0]['symbol']} .. {chunk[-1]['symbol']}")
             
-            if result['success']:
-                success_count += 1
-                total_records += result['records_loaded']
-            else:
-                failed_symbols.append(symbol)
+            for result in self.transform_and_load_chunk(chunk, mode=mode):
+                if result['success']:
+                    success_count += 1
+                    total_records += result['records_loaded']
+                else:
+                    failed_symbols.append(result['symbol'])
+            processed += len(chunk)
         
         return total_records, success_count, failed_symbols
     
@@ -756,6 +1203,11 @@ class TimeSeriesDailyAdjustedTransformer:
         """
         Process symbols in parallel using multiprocessing.
         
+        Each worker process builds one transformer and connection when it
+        starts (_init_worker) and keeps them while it works through chunks of
+        up to chunk_symbols symbols, each read with one query and committed
+        once.
+        
         Args:
             symbols (list): List of symbol data dictionaries
             mode (str): Processing mode ('full' or 'incremental')
@@ -764,39 +1216,47 @@ class TimeSeriesDailyAdjustedTransformer:
         Returns:
             tuple: (total_records, success_count, failed_symbols)
         """
-        # Create worker function with bound parameters
-        worker_func = partial(
-            _process_symbol_worker,
-            config=self.config,
-            mode=mode
-        )
+        chunks = _chunk_symbols(symbols, self.chunk_symbols, workers)
+        worker_func = partial(_process_chunk_worker, mode=mode)
         
         # Process in parallel
         total_records = 0
         success_count = 0
         failed_symbols = []
+        processed = 0
         
-        with Pool(processes=workers) as pool:
-            # Process symbols and collect results
-            for idx, result in enumerate(pool.imap_unordered(worker_func, symbols), 1):
-                if idx % 50 == 0 or idx == len(symbols):
-                    logger.info(f"Progress: {idx}/{len(symbols)} symbols processed")
+        with Pool(processes=workers, initializer=_init_worker, initargs=(self.config,)) as pool:
+            # Process chunks and collect results
+            for results in pool.imap_unordered(worker_func, chunks):
+                processed += len(results)
+                logger.info(f"Progress: {processed}/{len(symbols)} symbols processed")
                 
-                if result['success']:
-                    success_count += 1
-                    total_records += result['records_loaded']
-                else:
-                    failed_symbols.append(result['symbol'])
+                for result in results:
+                    if result['success']:
+                        success_count += 1
+                        total_records += result['records_loaded']
+                    else:
+                        failed_symbols.append(result['symbol'])
+            
+            # Let workers exit normally so their connections are closed
+            pool.close()
+            pool.join()
         
         return total_records, success_count, failed_symbols
     
-    def run_incremental_mode(self, staleness_hours=168, workers=None):
+    def run_incremental_mode(self, staleness_hours=168, workers=None, recompute=False):
         """
         Run transformation in incremental mode (watermark-based).
         
+        Stale symbols with saved indicator state only get rows for bars that
+        arrived since (plus refreshed targets on the trailing stored rows);
+        the rest are recomputed from their last 250 bars.
+        
         Args:
             staleness_hours (int): Hours after which to re-process symbols
             workers (int, optional): Number of parallel workers. Defaults to CPU count - 1.
+            recompute (bool): Recompute the last 250 bars of every stale symbol
+                instead of appending from saved state
         """
         logger.info("=" * 80)
         logger.info(f"INCREMENTAL MODE: Processing stale symbols (>{staleness_hours}h)")
@@ -824,15 +1284,17 @@ class TimeSeriesDailyAdjustedTransformer:
             
             logger.info(f"Processing {len(symbols)} symbols in incremental mode with {workers} workers")
             
+            mode = 'full' if recompute else 'incremental'
+            
             # Process symbols in parallel
             if workers > 1:
                 total_records, success_count, failed_symbols = self._process_parallel(
-                    symbols, mode='full', workers=workers
+                    symbols, mode=mode, workers=workers
                 )
             else:
                 # Single-threaded fallback
                 total_records, success_count, failed_symbols = self._process_sequential(
-                    symbols, mode='full'
+                    symbols, mode=mode
                 )
             
             # Bulk update watermarks
@@ -948,6 +1410,14 @@ Examples:
     parser.add_argument('--workers', type=int, default=None,
                        help='Number of parallel workers (default: CPU count - 1)')
     parser.add_argument('--config', type=str, help='Path to configuration file')
+    parser.add_argument('--chunk-symbols', type=int, default=None,
+                       help='Symbols per worker chunk: one read and one commit each (default: 100)')
+    parser.add_argument('--ohlcv-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Read raw bars from the local OHLCV cache (scripts/sync_ohlcv_cache.py) '
+                            'instead of Postgres; DIR defaults to OHLCV_CACHE_DIR or data/ohlcv_cache')
+    parser.add_argument('--recompute', action='store_true',
+                       help='Incremental mode: recompute the last 250 bars per symbol '
+                            'instead of appending from saved indicator state')
     parser.add_argument('--init-group', type=str, 
                        help='Initialize transformation group')
     parser.add_argument('--show-summary', action='store_true',
@@ -974,12 +1444,19 @@ Examples:
     
     # Initialize transformer
     transformer = TimeSeriesDailyAdjustedTransformer(config_path=args.config)
+    if args.chunk_symbols:
+        transformer.chunk_symbols = args.chunk_symbols
+    if args.ohlcv_cache is not None:
+        transformer.config['ohlcv_cache_dir'] = args.ohlcv_cache
+        transformer._load_feature_params()
     
     # Execute transformation
     if args.mode == 'full':
         transformer.run_full_mode(workers=args.workers)
     elif args.mode == 'incremental':
-        transformer.run_incremental_mode(staleness_hours=args.staleness_hours, workers=args.workers)
+        transformer.run_incremental_mode(
+            staleness_hours=args.staleness_hours, workers=args.workers, recompute=args.recompute
+        )
     
     logger.info("✅ Time series transformation completed!")
 
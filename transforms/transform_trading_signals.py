@@ -28,6 +28,12 @@ Usage:
     
     # Specific strategy only
     python transform_trading_signals.py --mode incremental --strategy ema_crossover
+    
+    # Use the original row-by-row strategy implementations
+    python transform_trading_signals.py --mode incremental --engine legacy
+    
+    # Panel mode (stream all symbols in chunks, bounded memory)
+    python transform_trading_signals.py --mode full --panel --chunk-symbols 1000
 """
 
 import sys
@@ -43,6 +49,8 @@ import numpy as np
 sys.path.append(str(Path(__file__).parent.parent))
 
 from db.postgres_database_manager import PostgresDatabaseManager
+from db.ohlcv_cache import OhlcvCache
+from transforms.signal_engine import SIGNAL_COLUMNS, VectorizedSignalEngine
 
 # Configure logging
 logging.basicConfig(
@@ -52,16 +60,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Technical indicators the strategies read (transforms.time_series_daily_adjusted)
+SIGNAL_INDICATOR_COLUMNS = [
+    'ohlcv_ema_8',
+    'ohlcv_ema_21',
+    'ohlcv_ema_8_21_cross',
+    'ohlcv_rsi_14',
+    'ohlcv_rsi_14_oversold',
+    'ohlcv_rsi_14_overbought',
+    'ohlcv_macd',
+    'ohlcv_macd_signal',
+    'ohlcv_macd_histogram',
+    'ohlcv_bb_upper',
+    'ohlcv_bb_middle',
+    'ohlcv_bb_lower',
+    'ohlcv_bb_position',
+    'ohlcv_volume_sma_20',
+    'ohlcv_volume_ratio',
+    'ohlcv_willr_14',
+    'ohlcv_sma_5',
+    'ohlcv_sma_10',
+    'ohlcv_sma_20',
+    'ohlcv_sma_50',
+    'ohlcv_atr_14',
+    'ohlcv_obv',
+    'ohlcv_ad',
+]
+
+# Raw OHLCV joined to the technical indicators the strategies read
+SIGNAL_SOURCE_QUERY = f"""
+    SELECT 
+        r.symbol_id_int AS symbol_id,
+        r.symbol,
+        r.date,
+        r.open,
+        r.high,
+        r.low,
+        r.close,
+        r.adjusted_close,
+        r.volume,
+        {', '.join('t.' + col for col in SIGNAL_INDICATOR_COLUMNS)}
+    FROM raw.time_series_daily_adjusted r
+    LEFT JOIN transforms.time_series_daily_adjusted t
+        ON r.symbol_id_int = t.symbol_id AND r.date = t.date
+"""
+
+# The indicator side of SIGNAL_SOURCE_QUERY, for raw bars read from the OHLCV cache
+SIGNAL_INDICATOR_QUERY = f"""
+    SELECT symbol_id, date, {', '.join(SIGNAL_INDICATOR_COLUMNS)}
+    FROM transforms.time_series_daily_adjusted
+    WHERE symbol_id = ANY(%s)
+"""
+
+# Symbols per chunk in panel mode
+DEFAULT_CHUNK_SYMBOLS = 500
+
 
 class TradingSignalsTransformer:
     """Generate trading signals from multiple strategies using self-watermarking."""
     
-    def __init__(self):
-        """Initialize transformer with database connection."""
+    def __init__(self, engine='vectorized', ohlcv_cache=None):
+        """
+        Initialize transformer with database connection.
+        
+        Args:
+            engine (str): 'vectorized' (array masks, default) or 'legacy'
+                (row-by-row strategy_* methods)
+            ohlcv_cache (OhlcvCache, optional): Read raw bars from this local
+                cache and only the indicators from Postgres
+        """
         self.db = PostgresDatabaseManager()
         self.table_name = 'transforms.trading_signals'
+        self.engine = engine
+        self.ohlcv_cache = ohlcv_cache
+        self.signal_engine = VectorizedSignalEngine()
         
-        # Strategy registry
+        # Strategy registry (legacy row-by-row implementations)
         self.strategies = {
             'ema_crossover': self.strategy_ema_crossover,
             'rsi_mean_reversion': self.strategy_rsi_mean_reversion,
@@ -138,56 +212,26 @@ class TradingSignalsTransformer:
             
             # Build date filter if specified
             date_filter = ""
-            params = [str(symbol_id)]
+            params = [int(symbol_id)]
+            cutoff = None
             
             if days_back:
                 cutoff_date = datetime.now() - timedelta(days=days_back)
                 date_filter = "AND r.date >= %s"
-                params.append(cutoff_date.strftime('%Y-%m-%d'))
+                cutoff = cutoff_date.strftime('%Y-%m-%d')
+                params.append(cutoff)
             
             query = f"""
-                SELECT 
-                    r.symbol_id,
-                    r.symbol,
-                    r.date,
-                    r.open,
-                    r.high,
-                    r.low,
-                    r.close,
-                    r.adjusted_close,
-                    r.volume,
-                    t.ohlcv_ema_8,
-                    t.ohlcv_ema_21,
-                    t.ohlcv_ema_8_21_cross,
-                    t.ohlcv_rsi_14,
-                    t.ohlcv_rsi_14_oversold,
-                    t.ohlcv_rsi_14_overbought,
-                    t.ohlcv_macd,
-                    t.ohlcv_macd_signal,
-                    t.ohlcv_macd_histogram,
-                    t.ohlcv_bb_upper,
-                    t.ohlcv_bb_middle,
-                    t.ohlcv_bb_lower,
-                    t.ohlcv_bb_position,
-                    t.ohlcv_volume_sma_20,
-                    t.ohlcv_volume_ratio,
-                    t.ohlcv_willr_14,
-                    t.ohlcv_sma_5,
-                    t.ohlcv_sma_10,
-                    t.ohlcv_sma_20,
-                    t.ohlcv_sma_50,
-                    t.ohlcv_atr_14,
-                    t.ohlcv_obv,
-                    t.ohlcv_ad
-                FROM raw.time_series_daily_adjusted r
-                LEFT JOIN transforms.time_series_daily_adjusted t
-                    ON r.symbol_id::integer = t.symbol_id AND r.date = t.date
-                WHERE r.symbol_id = %s
+                {SIGNAL_SOURCE_QUERY}
+                WHERE r.symbol_id_int = %s
                 {date_filter}
                 ORDER BY r.date ASC
             """
             
-            df = pd.read_sql(query, self.db.connection, params=params)
+            if self.ohlcv_cache is not None:
+                df = self._load_source_from_cache([symbol_id], cutoff)
+            else:
+                df = pd.read_sql(query, self.db.connection, params=params)
             
             if df.empty:
                 return None
@@ -216,6 +260,34 @@ class TradingSignalsTransformer:
             logger.error(f"Error fetching data for symbol_id {symbol_id}: {e}")
             return None
     
+    def _load_source_from_cache(self, symbol_ids, cutoff=None):
+        """
+        SIGNAL_SOURCE_QUERY's rows with raw bars from the OHLCV cache.
+        
+        Only the indicator columns are read from Postgres and left-joined in,
+        so the result has the same rows, order and columns as the SQL join.
+        
+        Args:
+            symbol_ids (list): Symbol IDs
+            cutoff (str, optional): First date (YYYY-MM-DD)
+            
+        Returns:
+            pd.DataFrame: Raw bars with indicators, sorted by symbol then date
+        """
+        raw_df = self.ohlcv_cache.load_panel(symbol_ids, start=cutoff)
+        
+        query = SIGNAL_INDICATOR_QUERY
+        params = [[int(symbol_id) for symbol_id in symbol_ids]]
+        if cutoff:
+            query += " AND date >= %s"
+            params.append(cutoff)
+        
+        indicators_df = pd.read_sql(query, self.db.connection, params=params)
+        indicators_df['date'] = pd.to_datetime(indicators_df['date'])
+        indicators_df['symbol_id'] = indicators_df['symbol_id'].astype(raw_df['symbol_id'].dtype)
+        
+        return raw_df.merge(indicators_df, on=['symbol_id', 'date'], how='left')
+    
     # ==================== STRATEGY IMPLEMENTATIONS ====================
     
     def strategy_ema_crossover(self, df):
@@ -833,25 +905,11 @@ class TradingSignalsTransformer:
                 return 0
             
             # Generate signals from strategies
-            all_signals = []
-            
-            strategies_to_run = [strategy_filter] if strategy_filter else self.strategies.keys()
-            
-            for strategy_name in strategies_to_run:
-                if strategy_name not in self.strategies:
-                    logger.warning(f"Unknown strategy: {strategy_name}")
-                    continue
-                
-                strategy_func = self.strategies[strategy_name]
-                signals = strategy_func(df)
-                all_signals.extend(signals)
+            signals_df = self.generate_signals(df, strategy_filter)
             
-            if not all_signals:
+            if signals_df.empty:
                 return 0
             
-            # Convert to DataFrame
-            signals_df = pd.DataFrame(all_signals)
-            
             # Add timestamps
             signals_df['processed_at'] = pd.Timestamp.now()
             signals_df['created_at'] = pd.Timestamp.now()
@@ -866,6 +924,208 @@ class TradingSignalsTransformer:
             logger.error(f"Error processing symbol_id {symbol_id}: {e}")
             return 0
     
+    def _strategy_names(self, strategy_filter=None):
+        """Resolve strategy_filter to the list of registered strategies to run."""
+        strategies_to_run = [strategy_filter] if strategy_filter else list(self.strategies.keys())
+        
+        strategy_names = []
+        for strategy_name in strategies_to_run:
+            if strategy_name not in self.strategies:
+                logger.warning(f"Unknown strategy: {strategy_name}")
+                continue
+            strategy_names.append(strategy_name)
+        
+        return strategy_names
+    
+    def generate_signals(self, df, strategy_filter=None):
+        """
+        Run the selected strategies over a symbol's data.
+        
+        Args:
+            df (pd.DataFrame): Combined OHLCV and technical indicators
+            strategy_filter (str, optional): Run only this strategy
+            
+        Returns:
+            pd.DataFrame: One row per signal (SIGNAL_COLUMNS)
+        """
+        strategy_names = self._strategy_names(strategy_filter)
+        
+        if self.engine == 'vectorized':
+            return self.signal_engine.generate(df, strategy_names)
+        
+        all_signals = []
+        for strategy_name in strategy_names:
+            all_signals.extend(self.strategies[strategy_name](df))
+        
+        return pd.DataFrame(all_signals, columns=SIGNAL_COLUMNS)
+    
+    # ==================== PANEL MODE ====================
+    
+    def iter_panel_chunks(self, symbol_ids=None, days_back=None, chunk_symbols=DEFAULT_CHUNK_SYMBOLS,
+                          fetch_size=50000):
+        """
+        Stream the joined OHLCV + indicator table in symbol-ordered chunks.
+        
+        Uses a server-side (named) cursor on a dedicated read connection, so only
+        one fetch batch plus one chunk of symbols is held in memory at a time and
+        signal loads on self.db can commit between chunks.
+        
+        Args:
+            symbol_ids (list, optional): Restrict to these symbol IDs (default: all)
+            days_back (int, optional): Number of days to look back
+            chunk_symbols (int): Maximum symbols per yielded chunk
+            fetch_size (int): Rows per round trip from the server-side cursor
+            
+        Yields:
+            pd.DataFrame: Rows for up to chunk_symbols complete symbols, sorted by
+                symbol then date
+        """
+        filters = []
+        params = []
+        
+        if symbol_ids is not None:
+            filters.append("r.symbol_id_int = ANY(%s)")
+            params.append([int(symbol_id) for symbol_id in symbol_ids])
+        
+        if days_back:
+            cutoff_date = datetime.now() - timedelta(days=days_back)
+            filters.append("r.date >= %s")
+            params.append(cutoff_date.strftime('%Y-%m-%d'))
+        
+        if self.ohlcv_cache is not None:
+            yield from self._iter_cached_panel_chunks(symbol_ids, days_back, chunk_symbols)
+            return
+        
+        where_clause = f"WHERE {' AND '.join(filters)}" if filters else ""
+        query = f"""
+            {SIGNAL_SOURCE_QUERY}
+            {where_clause}
+            ORDER BY r.symbol_id_int, r.date ASC
+        """
+        
+        reader = PostgresDatabaseManager(self.db.config)
+        reader.connect()
+        
+        try:
+            cursor = reader.connection.cursor(name='trading_signals_panel')
+            cursor.itersize = fetch_size
+            cursor.execute(query, params or None)
+            
+            buffer = None
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                
+                columns = [desc[0] for desc in cursor.description]
+                batch = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                buffer = batch if buffer is None else pd.concat([buffer, batch], ignore_index=True)
+                
+                # Emit whole symbols; the last symbol may continue in the next batch
+                while True:
+                    ids = buffer['symbol_id'].to_numpy()
+                    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+                    if len(starts) <= chunk_symbols:
+                        break
+                    cut = starts[chunk_symbols]
+                    yield self._prepare_panel_chunk(buffer.iloc[:cut])
+                    buffer = buffer.iloc[cut:].reset_index(drop=True)
+            
+            if buffer is not None and not buffer.empty:
+                yield self._prepare_panel_chunk(buffer)
+            
+            cursor.close()
+            
+        finally:
+            reader.close()
+    
+    def _iter_cached_panel_chunks(self, symbol_ids, days_back, chunk_symbols):
+        """iter_panel_chunks with raw bars from the OHLCV cache: one indicator query per chunk."""
+        if symbol_ids is None:
+            symbol_ids = self.ohlcv_cache.symbol_ids()
+        symbol_ids = sorted(int(symbol_id) for symbol_id in symbol_ids)
+        
+        cutoff = None
+        if days_back:
+            cutoff = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        
+        for i in range(0, len(symbol_ids), chunk_symbols):
+            df = self._load_source_from_cache(symbol_ids[i:i + chunk_symbols], cutoff)
+            if not df.empty:
+                yield self._prepare_panel_chunk(df)
+    
+    def _prepare_panel_chunk(self, df):
+        """Apply get_symbol_data's type handling to a multi-symbol chunk."""
+        df = df.reset_index(drop=True)
+        df['date'] = pd.to_datetime(df['date'])
+        df['symbol_id'] = df['symbol_id'].astype(int)
+        return df
+    
+    def _drop_symbols_without_indicators(self, df):
+        """Panel equivalent of process_symbol's technical indicator check."""
+        indicator_cols = ['ohlcv_ema_8', 'ohlcv_ema_21', 'ohlcv_rsi_14', 'ohlcv_macd', 'ohlcv_bb_upper']
+        has_indicators = (
+            df[indicator_cols].notna().any(axis=1)
+            .groupby(df['symbol_id'], sort=False)
+            .transform('any')
+        )
+        
+        missing = df.loc[~has_indicators, 'symbol_id'].nunique()
+        if missing:
+            logger.debug(
+                f"{missing} symbols in chunk have raw data but no technical indicators. "
+                f"Run transform_time_series_daily_adjusted.py first."
+            )
+        
+        return df[has_indicators.to_numpy()].reset_index(drop=True)
+    
+    def process_panel(self, symbol_ids=None, strategy_filter=None, days_back=None,
+                      chunk_symbols=DEFAULT_CHUNK_SYMBOLS):
+        """
+        Generate signals for many symbols from one streamed read.
+        
+        Each chunk goes through the vectorized engine in a single call and is
+        written with a single load, instead of one query and one load per symbol.
+        
+        Args:
+            symbol_ids (list, optional): Restrict to these symbol IDs (default: all)
+            strategy_filter (str, optional): Process only this strategy
+            days_back (int, optional): Number of days to look back
+            chunk_symbols (int): Maximum symbols held in memory at once
+            
+        Returns:
+            tuple: (symbols_read, symbols_with_signals, total_signals)
+        """
+        symbols_read = 0
+        symbols_with_signals = 0
+        total_signals = 0
+        
+        for chunk_idx, chunk in enumerate(
+            self.iter_panel_chunks(symbol_ids, days_back, chunk_symbols), 1
+        ):
+            symbols_read += chunk['symbol_id'].nunique()
+            chunk = self._drop_symbols_without_indicators(chunk)
+            
+            signals_df = self.signal_engine.generate(chunk, self._strategy_names(strategy_filter))
+            
+            if not signals_df.empty:
+                now = pd.Timestamp.now()
+                signals_df['processed_at'] = now
+                signals_df['created_at'] = now
+                signals_df['updated_at'] = now
+                
+                self.load_signals(signals_df)
+                
+                symbols_with_signals += signals_df['symbol_id'].nunique()
+                total_signals += len(signals_df)
+            
+            logger.info(
+                f"Chunk {chunk_idx}: {len(chunk):,} rows, {len(signals_df):,} signals "
+                f"({symbols_read} symbols so far)"
+            )
+        
+        return symbols_read, symbols_with_signals, total_signals
+    
     def load_signals(self, signals_df):
         """
         Load signals to database using upsert.
@@ -874,37 +1134,17 @@ class TradingSignalsTransformer:
             signals_df (pd.DataFrame): Signals to load
         """
         try:
-            insert_query = """
-                INSERT INTO transforms.trading_signals 
-                (symbol, symbol_id, date, buy_signal, sell_signal, trade_strategy, 
-                 signal_strength, processed_at, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (symbol_id, date, trade_strategy) 
-                DO UPDATE SET
-                    buy_signal = EXCLUDED.buy_signal,
-                    sell_signal = EXCLUDED.sell_signal,
-                    signal_strength = EXCLUDED.signal_strength,
-                    processed_at = EXCLUDED.processed_at,
-                    updated_at = EXCLUDED.updated_at
-            """
-            
-            records = []
-            for _, row in signals_df.iterrows():
-                record = (
-                    row['symbol'],
-                    row['symbol_id'],
-                    row['date'],
-                    row['buy_signal'],
-                    row['sell_signal'],
-                    row['trade_strategy'],
-                    row['signal_strength'],
-                    row['processed_at'],
-                    row['created_at'],
-                    row['updated_at']
-                )
-                records.append(record)
-            
-            self.db.execute_many(insert_query, records)
+            columns = [
+                'symbol', 'symbol_id', 'date', 'buy_signal', 'sell_signal', 'trade_strategy',
+                'signal_strength', 'processed_at', 'created_at', 'updated_at'
+            ]
+            
+            self.db.bulk_upsert_dataframe(
+                self.table_name,
+                signals_df[columns],
+                conflict_cols=['symbol_id', 'date', 'trade_strategy'],
+                update_cols=['buy_signal', 'sell_signal', 'signal_strength', 'processed_at', 'updated_at'],
+            )
             
         except Exception as e:
             logger.error(f"Error loading signals: {e}")
@@ -928,17 +1168,17 @@ class TradingSignalsTransformer:
             cutoff_date = datetime.now() - timedelta(days=days_back)
             
             query = """
-                SELECT DISTINCT r.symbol_id::integer
+                SELECT DISTINCT r.symbol_id_int
                 FROM raw.time_series_daily_adjusted r
                 WHERE r.date >= %s
                   AND NOT EXISTS (
                     SELECT 1 
                     FROM transforms.trading_signals s
-                    WHERE s.symbol_id = r.symbol_id::integer
+                    WHERE s.symbol_id = r.symbol_id_int
                       AND s.date = r.date
                       AND s.processed_at >= %s
                   )
-                ORDER BY r.symbol_id::integer
+                ORDER BY r.symbol_id_int
             """
             
             results = self.db.fetch_query(query, (cutoff_date, cutoff_date))
@@ -966,13 +1206,16 @@ class TradingSignalsTransformer:
         finally:
             self.db.close()
     
-    def process_unprocessed(self, strategy_filter=None, days_back=7):
+    def process_unprocessed(self, strategy_filter=None, days_back=7, panel=False,
+                            chunk_symbols=DEFAULT_CHUNK_SYMBOLS):
         """
         Process only unprocessed symbols (incremental mode).
         
         Args:
             strategy_filter (str, optional): Process only this strategy
             days_back (int): Look back this many days
+            panel (bool): Stream symbols in chunks instead of one query per symbol
+            chunk_symbols (int): Symbols per chunk in panel mode
         """
         logger.info("=" * 80)
         logger.info(f"INCREMENTAL MODE: Processing unprocessed symbols ({days_back} days)")
@@ -998,17 +1241,23 @@ class TradingSignalsTransformer:
             success_count = 0
             no_data_count = 0
             
-            for idx, symbol_id in enumerate(symbol_ids, 1):
-                if idx % 50 == 0 or idx == len(symbol_ids):
-                    logger.info(f"Progress: {idx}/{len(symbol_ids)} symbols")
-                
-                signals_count = self.process_symbol(symbol_id, strategy_filter, days_back)
-                
-                if signals_count > 0:
-                    success_count += 1
-                    total_signals += signals_count
-                else:
-                    no_data_count += 1
+            if panel:
+                _, success_count, total_signals = self.process_panel(
+                    symbol_ids, strategy_filter, days_back, chunk_symbols
+                )
+                no_data_count = len(symbol_ids) - success_count
+            else:
+                for idx, symbol_id in enumerate(symbol_ids, 1):
+                    if idx % 50 == 0 or idx == len(symbol_ids):
+                        logger.info(f"Progress: {idx}/{len(symbol_ids)} symbols")
+                    
+                    signals_count = self.process_symbol(symbol_id, strategy_filter, days_back)
+                    
+                    if signals_count > 0:
+                        success_count += 1
+                        total_signals += signals_count
+                    else:
+                        no_data_count += 1
             
             # Summary
             logger.info("=" * 80)
@@ -1036,12 +1285,14 @@ class TradingSignalsTransformer:
         finally:
             self.db.close()
     
-    def run_full_mode(self, strategy_filter=None):
+    def run_full_mode(self, strategy_filter=None, panel=False, chunk_symbols=DEFAULT_CHUNK_SYMBOLS):
         """
         Run full mode - recreate all signals.
         
         Args:
             strategy_filter (str, optional): Process only this strategy
+            panel (bool): Stream all symbols in chunks instead of one query per symbol
+            chunk_symbols (int): Symbols per chunk in panel mode
         """
         logger.info("=" * 80)
         logger.info("FULL MODE: Recreating all trading signals")
@@ -1054,37 +1305,44 @@ class TradingSignalsTransformer:
             self.db.execute_query("DROP TABLE IF EXISTS transforms.trading_signals CASCADE")
             self.create_table()
             
-            # Get all symbols
-            query = """
-                SELECT DISTINCT symbol_id::integer
-                FROM raw.time_series_daily_adjusted
-                ORDER BY symbol_id::integer
-            """
-            
-            results = self.db.fetch_query(query)
-            symbol_ids = [row[0] for row in results]
-            
-            logger.info(f"Processing {len(symbol_ids)} symbols")
-            
-            # Process each symbol
-            total_signals = 0
-            success_count = 0
-            
-            for idx, symbol_id in enumerate(symbol_ids, 1):
-                if idx % 50 == 0 or idx == len(symbol_ids):
-                    logger.info(f"Progress: {idx}/{len(symbol_ids)} symbols")
+            if panel:
+                logger.info(f"Panel mode: streaming all symbols in chunks of {chunk_symbols}")
+                symbols_processed, success_count, total_signals = self.process_panel(
+                    strategy_filter=strategy_filter, chunk_symbols=chunk_symbols
+                )
+            else:
+                # Get all symbols
+                query = """
+                    SELECT DISTINCT symbol_id_int
+                    FROM raw.time_series_daily_adjusted
+                    ORDER BY symbol_id_int
+                """
                 
-                signals_count = self.process_symbol(symbol_id, strategy_filter)
+                results = self.db.fetch_query(query)
+                symbol_ids = [row[0] for row in results]
+                symbols_processed = len(symbol_ids)
                 
-                if signals_count > 0:
-                    success_count += 1
-                    total_signals += signals_count
+                logger.info(f"Processing {len(symbol_ids)} symbols")
+                
+                # Process each symbol
+                total_signals = 0
+                success_count = 0
+                
+                for idx, symbol_id in enumerate(symbol_ids, 1):
+                    if idx % 50 == 0 or idx == len(symbol_ids):
+                        logger.info(f"Progress: {idx}/{len(symbol_ids)} symbols")
+                    
+                    signals_count = self.process_symbol(symbol_id, strategy_filter)
+                    
+                    if signals_count > 0:
+                        success_count += 1
+                        total_signals += signals_count
             
             # Summary
             logger.info("=" * 80)
             logger.info("FULL MODE SUMMARY")
             logger.info("=" * 80)
-            logger.info(f"Symbols processed: {len(symbol_ids)}")
+            logger.info(f"Symbols processed: {symbols_processed}")
             logger.info(f"Successful: {success_count}")
             logger.info(f"Total signals generated: {total_signals:,}")
             
@@ -1113,6 +1371,12 @@ Examples:
   
   # Specific strategy only
   python transform_trading_signals.py --mode incremental --strategy ema_crossover
+  
+  # Original row-by-row strategy implementations
+  python transform_trading_signals.py --mode incremental --engine legacy
+  
+  # Panel mode: one streamed read, one load per chunk of 1000 symbols
+  python transform_trading_signals.py --mode full --panel --chunk-symbols 1000
         """
     )
     
@@ -1124,11 +1388,24 @@ Examples:
                        help='Days to look back (incremental mode)')
     parser.add_argument('--strategy', type=str,
                        help='Process only this strategy')
+    parser.add_argument('--engine', choices=['vectorized', 'legacy'], default='vectorized',
+                       help='Signal engine: vectorized masks (default) or legacy row loops')
+    parser.add_argument('--panel', action='store_true',
+                       help='Stream all symbols in chunks from one query instead of one query per symbol')
+    parser.add_argument('--chunk-symbols', type=int, default=DEFAULT_CHUNK_SYMBOLS,
+                       help=f'Symbols held in memory per chunk in panel mode (default: {DEFAULT_CHUNK_SYMBOLS})')
+    parser.add_argument('--ohlcv-cache', nargs='?', const='', default=None, metavar='DIR',
+                       help='Read raw bars from the local OHLCV cache (scripts/sync_ohlcv_cache.py) '
+                            'instead of Postgres; DIR defaults to OHLCV_CACHE_DIR or data/ohlcv_cache')
     
     args = parser.parse_args()
     
+    if args.panel and args.engine == 'legacy':
+        parser.error("--panel requires the vectorized engine")
+    
     # Initialize transformer
-    transformer = TradingSignalsTransformer()
+    ohlcv_cache = OhlcvCache(args.ohlcv_cache or None) if args.ohlcv_cache is not None else None
+    transformer = TradingSignalsTransformer(engine=args.engine, ohlcv_cache=ohlcv_cache)
     
     # Handle initialization
     if args.init:
@@ -1141,9 +1418,14 @@ Examples:
     
     # Execute transformation
     if args.mode == 'full':
-        transformer.run_full_mode(strategy_filter=args.strategy)
+        transformer.run_full_mode(
+            strategy_filter=args.strategy, panel=args.panel, chunk_symbols=args.chunk_symbols
+        )
     elif args.mode == 'incremental':
-        transformer.process_unprocessed(strategy_filter=args.strategy, days_back=args.days_back)
+        transformer.process_unprocessed(
+            strategy_filter=args.strategy, days_back=args.days_back,
+            panel=args.panel, chunk_symbols=args.chunk_symbols
+        )
     
     logger.info("Trading signals transformation completed!")
 